@@ -3,7 +3,7 @@ from typing import Optional
 import jwt
 from jwt.exceptions import InvalidTokenError
 from passlib.context import CryptContext
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, status, Header, Request
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session, joinedload
 import os
@@ -14,6 +14,13 @@ from app.database import get_db
 from app.models import User, PersonalAccessToken
 from app.schemas import TokenData
 from app.utils import utcnow
+from app.services.pat_verification_cache import (
+    forget_verified_pat,
+    get_verified_pat,
+    record_pat_use,
+    remember_verified_pat,
+)
+from app.services.user_identity_cache import UserSnapshot, get_user_snapshot, remember_user_snapshot
 
 logger = logging.getLogger(__name__)
 
@@ -104,12 +111,98 @@ def verify_token(token: str) -> Optional[TokenData]:
     except InvalidTokenError:
         return None
 
+def decode_request_token(request: Optional[Request], token: str) -> Optional[TokenData]:
+    """verify_token, decoded at most once per request (memoized on request.state)."""
+    state = getattr(request, "state", None)
+    cached = getattr(state, "jwt_token_data", None)
+    if cached is not None and cached[0] == token:
+        return cached[1]
+    token_data = verify_token(token)
+    if state is not None:
+        state.jwt_token_data = (token, token_data)
+    return token_data
+
+def resolve_jwt_user(request: Optional[Request], token: str, db: Session) -> Optional[User]:
+    """
+    User of a JWT, decoded and loaded at most once per request: dependencies
+    resolving the current user for the same request share the result.
+    """
+    state = getattr(request, "state", None)
+    cached = getattr(state, "jwt_user", None)
+    if cached is not None and cached[0] == token and cached[1] in db:
+        return cached[1]
+
+    token_data = decode_request_token(request, token)
+    if token_data is None:
+        return None
+    user = db.query(User).filter(User.username == token_data.username).first()
+    if user is None:
+        return None
+
+    remember_user_snapshot(user)
+    if state is not None:
+        state.jwt_user = (token, user)
+    return user
+
+def resolve_request_identity(request: Request, db: Optional[Session] = None) -> Optional[UserSnapshot]:
+    """
+    Identity snapshot of the JWT bearer of a request, for checks that only need
+    the user's id and roles. Served from the user snapshot cache when possible;
+    otherwise loaded with db, or a short-lived session when none is given.
+    """
+    auth_header = request.headers.get("authorization")
+    if not auth_header or not auth_header.startswith("Bearer "):
+        return None
+    token = auth_header[7:]
+    if token.startswith("dm_pat_"):
+        return None
+
+    token_data = decode_request_token(request, token)
+    if token_data is None:
+        return None
+    snapshot = get_user_snapshot(token_data.username)
+    if snapshot is not None:
+        return snapshot
+
+    if db is not None:
+        user = resolve_jwt_user(request, token, db)
+        return UserSnapshot.from_user(user) if user else None
+
+    session = next(get_db())
+    try:
+        user = session.query(User).filter(User.username == token_data.username).first()
+        return remember_user_snapshot(user) if user else None
+    finally:
+        session.close()
+
 def verify_pat(token: str, db: Session) -> Optional[User]:
-    """Verify a Personal Access Token (PAT) using efficient prefix lookup."""
+    """
+    Verify a Personal Access Token (PAT) using efficient prefix lookup.
+
+    Tokens that already passed the bcrypt check are cached (see
+    app.services.pat_verification_cache): a cached token is only re-checked
+    against its row, and last_used_at is updated in batches.
+    """
     if not token.startswith("dm_pat_"):
         return None
         
     try:
+        from app.utils import utcnow, normalize_datetime_to_utc
+        now = utcnow()
+
+        # Previously verified token: load its row and re-check, skipping bcrypt
+        verified = get_verified_pat(token)
+        if verified:
+            pat = db.query(PersonalAccessToken).options(
+                joinedload(PersonalAccessToken.user)
+            ).filter(PersonalAccessToken.id == verified.pat_id).first()
+            expires_at = normalize_datetime_to_utc(pat.expires_at) if pat else None
+            if pat and pat.is_active and pat.token_hash == verified.token_hash and not (expires_at and expires_at < now):
+                record_pat_use(pat.id, now)
+                return pat.user
+            forget_verified_pat(token)
+            return None
+
         # Extract prefix (first 12 chars of the part after 'dm_pat_')
         token_suffix = token[7:]
         prefix = token_suffix[:12]
@@ -126,8 +219,6 @@ def verify_pat(token: str, db: Session) -> Optional[User]:
         if not matching_pats:
             return None
 
-        from app.utils import utcnow, normalize_datetime_to_utc
-        now = utcnow()
         for pat in matching_pats:
             # 1. Check expiration
             expires_at = normalize_datetime_to_utc(pat.expires_at)
@@ -136,9 +227,9 @@ def verify_pat(token: str, db: Session) -> Optional[User]:
             
             # 2. Verify slow Bcrypt hash (only for prefix matches)
             if verify_password(token, pat.token_hash):
-                # Update last used timestamp
-                pat.last_used_at = now
-                db.commit()
+                remember_verified_pat(token, pat)
+                # Update last used timestamp (flushed in batches)
+                record_pat_use(pat.id, now)
                 return pat.user
                 
     except Exception as e:
@@ -148,6 +239,7 @@ def verify_pat(token: str, db: Session) -> Optional[User]:
     return None
 
 async def get_current_user(
+    request: Request,
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
 ) -> User:
@@ -167,11 +259,7 @@ async def get_current_user(
         raise credentials_exception
 
     # Otherwise try JWT
-    token_data = verify_token(token)
-    if token_data is None:
-        raise credentials_exception
-
-    user = db.query(User).filter(User.username == token_data.username).first()
+    user = resolve_jwt_user(request, token, db)
     if user is None:
         raise credentials_exception
 
@@ -221,6 +309,7 @@ async def get_optional_bearer_token(
     return authorization[7:]  # Remove "Bearer " prefix
 
 async def get_current_user_optional(
+    request: Request,
     token: Optional[str] = Depends(get_optional_bearer_token),
     db: Session = Depends(get_db)
 ) -> Optional[User]:
@@ -232,11 +321,7 @@ async def get_current_user_optional(
             return verify_pat(token, db)
 
         # Otherwise try JWT
-        token_data = verify_token(token)
-        if token_data is None:
-            return None
-        user = db.query(User).filter(User.username == token_data.username).first()
-        return user
+        return resolve_jwt_user(request, token, db)
     except Exception:
         return None
 
@@ -4,9 +4,8 @@ from slowapi.util import get_remote_address
 from fastapi import Request, Depends
 from typing import Optional
 from functools import wraps
-from app.auth import get_current_user_optional, get_current_admin_user, verify_token
-from app.database import get_db
-from app.models import User
+from sqlalchemy.orm import Session
+from app.auth import get_current_user_optional, get_current_admin_user, resolve_request_identity
 from app.utils import get_client_ip, is_localhost_ip, format_ip_for_logging
 
 # Track logged requests to avoid spam
@@ -97,31 +96,14 @@ def skip_rate_limit_for_admin(limit_string: str):
                     print(f"[RATE_LIMIT] {endpoint_info} - Skipping rate limiting for localhost IP: {formatted_ip}")
                     return await func(*args, **kwargs)
                 
-                # Try to get current user by extracting token from headers
+                # Skip rate limiting for admins; the identity is resolved once per
+                # request and usually served from the user snapshot cache
                 try:
-                    # Extract authorization header
-                    auth_header = request.headers.get("authorization")
-                    
-                    if auth_header and auth_header.startswith("Bearer "):
-                        token = auth_header[7:]  # Remove "Bearer " prefix
-                        
-                        # Verify token and get user
-                        token_data = verify_token(token)
-                        
-                        if token_data:
-                            # Get database session
-                            db = None
-                            try:
-                                db = next(get_db())
-                                user = db.query(User).filter(User.username == token_data.username).first()
-                                
-                                if user and user.is_admin:
-                                    print(f"[RATE_LIMIT] {endpoint_info} - Skipping rate limiting for admin user: {user.username}")
-                                    return await func(*args, **kwargs)
-                            finally:
-                                # Always close the database session
-                                if db:
-                                    db.close()
+                    db = kwargs.get('db')
+                    identity = resolve_request_identity(request, db if isinstance(db, Session) else None)
+                    if identity and identity.is_admin:
+                        print(f"[RATE_LIMIT] {endpoint_info} - Skipping rate limiting for admin user: {identity.username}")
+                        return await func(*args, **kwargs)
                 except Exception:
                     # If there's any error, continue with normal rate limiting
                     pass
@@ -8,6 +8,8 @@ from slowapi.errors import RateLimitExceeded
 from fastapi.responses import JSONResponse, ORJSONResponse
 from datetime import datetime, timedelta, timezone
 from contextlib import asynccontextmanager
+import asyncio
+import contextlib
 import os
 import logging
 import time
@@ -114,8 +116,46 @@ async def lifespan(app: FastAPI):
     from app.database import warm_database_connections
     warm_database_connections()
 
+    # Keep precomputed wind suitability (used by the dive site wind filter) fresh
+    wind_suitability_task = None
+    if not is_testing:
+        from app.services.wind_suitability_service import run_wind_suitability_refresher
+        wind_suitability_task = asyncio.create_task(run_wind_suitability_refresher())
+
+    # Write Personal Access Token last_used_at timestamps in batches
+    pat_flush_task = None
+    if not is_testing:
+        from app.services.pat_verification_cache import run_pat_last_used_flusher
+        pat_flush_task = asyncio.create_task(run_pat_last_used_flusher())
+
+    # Write buffered view counts in batches
+    view_count_task = None
+    if not is_testing:
+        from app.services.view_counter import run_view_count_flusher
+        view_count_task = asyncio.create_task(run_view_count_flusher())
+
+    # Deliver chat events from other workers to this worker's event streams
+    chat_events_task = None
+    if not is_testing:
+        from app.services.chat_events import chat_event_bus
+        chat_events_task = asyncio.create_task(chat_event_bus.run_backend())
+
+    # Build the in-memory dive site/center geo indexes and keep them converged
+    geo_index_task = None
+    if not is_testing:
+        from app.services.geo_index_service import run_geo_index_refresher
+        geo_index_task = asyncio.create_task(run_geo_index_refresher())
+
     yield
-    # Shutdown logic (if any) can be added here
+    # Shutdown logic
+    for task in (wind_suitability_task, pat_flush_task, view_count_task, chat_events_task, geo_index_task):
+        if task is not None:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
+
+    from app.services.open_meteo_service import close_async_client
+    await close_async_client()
 
 app = FastAPI(
     title="Divemap API",
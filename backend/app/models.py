@@ -2,6 +2,7 @@ from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Foreign
 from sqlalchemy.orm import relationship
 from app.database import Base
 import enum
+import math
 import sqlalchemy as sa
 from sqlalchemy import event, text
 from sqlalchemy.dialects.mysql import LONGTEXT
@@ -313,6 +314,7 @@ class DiveSite(Base):
     shore_direction_method = Column(String(50), nullable=True, default='osm_coastline')  # Method used to determine shore direction (e.g., 'osm_coastline', 'manual', 'ai')
     shore_direction_distance_m = Column(DECIMAL(8, 2), nullable=True)  # Distance to coastline in meters (for reference/debugging)
     media_order = Column(sa.JSON, nullable=True)  # JSON array for custom media ordering ['site_1', 'dive_5']
+    cover_media_key = Column(String(32), nullable=True)  # First media of the gallery ('site_1' or 'dive_5'), kept by cover_media_service
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
     deleted_at = Column(DateTime(timezone=True), nullable=True, index=True)
@@ -907,6 +909,26 @@ class WindDataCache(Base):
     )
 
 
+class DiveSiteWindSuitability(Base):
+    """
+    Precomputed wind suitability per dive site and forecast hour.
+
+    Filled from cached wind data by app.services.wind_suitability_service so the
+    dive site list can filter and paginate on wind suitability in SQL. Sites
+    without a row for an hour have unknown suitability.
+    """
+    __tablename__ = "dive_site_wind_suitability"
+
+    dive_site_id = Column(Integer, ForeignKey("dive_sites.id", ondelete="CASCADE"), primary_key=True)
+    forecast_hour = Column(DateTime(timezone=True), primary_key=True)  # Target hour (rounded down), same convention as wind cache target_datetime
+    suitability = Column(String(20), nullable=False)  # good, caution, difficult, avoid, unknown
+    computed_at = Column(DateTime(timezone=True), nullable=False, index=True)  # When the refresher computed this row (UTC)
+
+    __table_args__ = (
+        sa.Index('idx_wind_suitability_hour_suitability', 'forecast_hour', 'suitability'),
+    )
+
+
 class NotificationPreference(Base):
     """User notification preferences for different categories."""
     __tablename__ = "notification_preferences"
@@ -919,6 +941,17 @@ class NotificationPreference(Base):
     enable_email = Column(Boolean, default=False, nullable=False)
     frequency = Column(String(20), default="immediate", nullable=False)  # 'immediate', 'daily_digest', 'weekly_digest'
     area_filter = Column(sa.JSON, nullable=True)  # {country, region, radius_km, center_lat, center_lng}
+    # Normalized copy of area_filter (kept in sync by the hooks below) so that
+    # candidate users for a notification can be selected in SQL
+    area_country = Column(String(100), nullable=True)
+    area_region = Column(String(100), nullable=True)
+    area_center_lat = Column(sa.Float, nullable=True)
+    area_center_lng = Column(sa.Float, nullable=True)
+    area_radius_km = Column(sa.Float, nullable=True)
+    area_min_lat = Column(sa.Float, nullable=True)
+    area_max_lat = Column(sa.Float, nullable=True)
+    area_min_lng = Column(sa.Float, nullable=True)
+    area_max_lng = Column(sa.Float, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
@@ -927,9 +960,72 @@ class NotificationPreference(Base):
 
     __table_args__ = (
         sa.UniqueConstraint('user_id', 'category', name='unique_user_category'),
+        sa.Index('idx_notification_pref_area_country', 'category', 'area_country', 'area_region'),
+        sa.Index('idx_notification_pref_area_bbox', 'category', 'area_min_lat', 'area_max_lat'),
     )
 
 
+EARTH_RADIUS_KM = 6371
+
+AREA_FILTER_COLUMNS = (
+    'area_country', 'area_region', 'area_center_lat', 'area_center_lng', 'area_radius_km',
+    'area_min_lat', 'area_max_lat', 'area_min_lng', 'area_max_lng',
+)
+
+
+def area_bounding_box(center_lat: float, center_lng: float, radius_km: float) -> dict:
+    """
+    Smallest lat/lng box containing every point within radius_km of the center
+    (same spherical earth as the haversine distance used for the exact check).
+
+    Near the poles, or when the circle crosses the antimeridian, the box spans
+    all longitudes.
+    """
+    # Small margin so rounding never excludes a point on the circle
+    angular_radius = radius_km / EARTH_RADIUS_KM + 1e-9
+    lat = math.radians(center_lat)
+    min_lat, max_lat = lat - angular_radius, lat + angular_radius
+    min_lng = max_lng = None
+    if min_lat > -math.pi / 2 and max_lat < math.pi / 2:
+        delta_lng = math.asin(min(1.0, math.sin(angular_radius) / math.cos(lat)))
+        lng = math.radians(center_lng)
+        if lng - delta_lng >= -math.pi and lng + delta_lng <= math.pi:
+            min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    return {
+        'area_min_lat': max(math.degrees(min_lat), -90.0),
+        'area_max_lat': min(math.degrees(max_lat), 90.0),
+        'area_min_lng': math.degrees(min_lng) if min_lng is not None else -180.0,
+        'area_max_lng': math.degrees(max_lng) if max_lng is not None else 180.0,
+    }
+
+
+def area_filter_columns(area_filter) -> dict:
+    """Normalized column values for an area_filter JSON blob."""
+    values = dict.fromkeys(AREA_FILTER_COLUMNS)
+    if not area_filter:
+        return values
+    values['area_country'] = area_filter.get('country') or None
+    values['area_region'] = area_filter.get('region') or None
+    try:
+        radius_km = float(area_filter.get('radius_km') or 0)
+        center_lat = float(area_filter['center_lat'])
+        center_lng = float(area_filter['center_lng'])
+    except (KeyError, TypeError, ValueError):
+        # The radius filter only applies with a radius and a center
+        return values
+    if radius_km > 0:
+        values.update(area_center_lat=center_lat, area_center_lng=center_lng, area_radius_km=radius_km)
+        values.update(area_bounding_box(center_lat, center_lng, radius_km))
+    return values
+
+
+@event.listens_for(NotificationPreference, "before_insert")
+@event.listens_for(NotificationPreference, "before_update")
+def _notification_preference_set_area_columns(mapper, connection, target):
+    for column, value in area_filter_columns(target.area_filter).items():
+        setattr(target, column, value)
+
+
 class Notification(Base):
     """Individual notification records for users."""
     __tablename__ = "notifications"
@@ -1245,8 +1341,10 @@ class UserChatMessage(Base):
 
     # Indexes
     # Composite index for optimized cursor-based polling: (room_id, updated_at)
+    # Composite index for the grouped unread counts: (room_id, created_at)
     __table_args__ = (
         sa.Index("idx_chat_messages_room_updated", "room_id", "updated_at"),
+        sa.Index("idx_chat_messages_room_created", "room_id", "created_at"),
     )
 
     # Relationships
@@ -7,6 +7,7 @@ from app.models import DiveSite, User
 from app.auth import get_current_active_user
 from app.schemas import DiveSiteResponse
 from app.limiter import skip_rate_limit_for_admin
+from app.services.cover_media_service import refresh_cover_media
 
 router = APIRouter(
     prefix="/dive-sites",
@@ -145,6 +146,8 @@ async def approve_edit_request(request: Request, request_id: int, db: Session =
         media_id = edit_req.proposed_data.get("id")
         if media_id:
             db.query(SiteMedia).filter(SiteMedia.id == media_id).delete()
+            # Bulk delete skips the ORM flush hooks
+            refresh_cover_media(db, [edit_req.dive_site_id])
 
     elif edit_req.edit_type == EditRequestType.tag_addition:
         from app.models import DiveSiteTag
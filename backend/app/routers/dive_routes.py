@@ -298,7 +298,7 @@ async def get_route(
 
     # Increment view count in the background without blocking the response
     from app.utils import increment_view_count
-    background_tasks.add_task(increment_view_count, db, DiveRoute, route.id)
+    background_tasks.add_task(increment_view_count, DiveRoute, route.id)
 
     # Add related data
     route_dict = route.__dict__.copy()
@@ -7,21 +7,35 @@ from datetime import datetime, timedelta
 import difflib
 import orjson
 import uuid
-import random
 from pathlib import Path
 from app.services.r2_storage_service import get_r2_storage
 from app.services.image_processing import image_processing
+from app.services.notification_service import send_new_content_notifications
 from app.database import get_db
-from app.models import DiveSite, SiteRating, SiteComment, SiteMedia, User, DivingCenter, CenterDiveSite, UserCertification, DivingOrganization, Dive, DiveTag, AvailableTag, DiveSiteAlias, DiveSiteTag, ParsedDive, DiveRoute, DifficultyLevel, get_difficulty_id_by_code, OwnershipStatus
+from app.models import DiveSite, SiteRating, SiteComment, SiteMedia, User, DivingCenter, CenterDiveSite, UserCertification, DivingOrganization, Dive, DiveTag, AvailableTag, DiveSiteAlias, DiveSiteTag, ParsedDive, DiveRoute, DifficultyLevel, get_difficulty_id_by_code, OwnershipStatus, DiveSiteWindSuitability
 from app.services.osm_coastline_service import detect_shore_direction
-from app.services.wind_recommendation_service import calculate_wind_suitability
+from app.services.wind_recommendation_service import (
+    SUITABILITY_CODES,
+    SUITABILITY_LEVELS,
+    calculate_wind_suitability,
+    calculate_wind_suitability_batch,
+)
 from app.services.open_meteo_service import fetch_wind_data_single_point
+from app.services.wind_suitability_service import forecast_hour, is_forecast_hour_materialized, note_forecast_hour_requested
+from app.services.search_index_service import dive_site_search_index, DEFAULT_CANDIDATE_LIMIT
+from app.services.spatial_query import radius_prefilter
+from app.services.cover_media_service import load_cover_media
+from app.services.geo_index_service import dive_site_geo_index, distance_column, catalog_points
+from app.services.map_clusters import MAX_CLUSTER_ZOOM
+from app.services.map_points import (
+    POINTS_BINARY_MEDIA_TYPE, POINTS_JSON_MEDIA_TYPE, encode_points_binary, encode_points_json, etag_matches, points_etag
+)
 from app.models import DiveSite, SiteRating, SiteComment, SiteMedia, User, DivingCenter, CenterDiveSite, UserCertification, DivingOrganization, Dive, DiveTag, AvailableTag, DiveSiteAlias, DiveSiteTag, ParsedDive, DiveRoute, DifficultyLevel, get_difficulty_id_by_code, OwnershipStatus, DiveMedia, DiveSiteEditRequest, EditRequestStatus, EditRequestType
 from app.auth import is_trusted_contributor
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 
 from app.schemas import (
-    DiveSiteCreate, DiveSiteUpdate, DiveSiteResponse, DiveSiteListResponse,
+    DiveSiteCreate, DiveSiteUpdate, DiveSiteResponse, DiveSiteListResponse, DiveSiteClusterResponse, DiveSitePointsResponse,
     SiteRatingCreate, SiteRatingResponse,
     SiteCommentCreate, SiteCommentUpdate, SiteCommentResponse,
     SiteMediaCreate, SiteMediaUpdate, SiteMediaResponse, DiveSiteMediaOrderRequest,
@@ -33,9 +47,11 @@ import requests
 from app.auth import get_current_active_user, get_current_admin_user, get_current_user_optional, get_current_user
 from app.limiter import limiter, skip_rate_limit_for_admin
 from app.utils import (
-    calculate_unified_phrase_aware_score,
+    QueryScorer,
+    ScoringCandidate,
     classify_match_type,
     get_unified_fuzzy_trigger_conditions,
+    load_tag_names_map,
     UNIFIED_TYPO_TOLERANCE
 )
 import logging
@@ -440,21 +456,15 @@ def search_dive_sites_with_fuzzy(query: str, exact_results: List[DiveSite], db:
         List of dive sites with exact results first, followed by fuzzy matches
     """
     # Convert exact results to the expected format with phrase-aware scoring
+    # Tags for all exact results are fetched in one query to avoid N+1 lookups
+    exact_tag_map = load_tag_names_map(db, DiveSiteTag.dive_site_id, [site.id for site in exact_results])
+    # Compile the query once and reuse it for every candidate
+    scorer = QueryScorer(query)
     exact_results_with_scores = []
     for site in exact_results:
-        # Get tags for this dive site for scoring
-        site_tags = []
-        if hasattr(site, 'tags') and site.tags:
-            site_tags = [tag.name if hasattr(tag, 'name') else str(tag) for tag in site.tags]
-        else:
-            from app.models import DiveSiteTag, AvailableTag
-            tags = db.query(AvailableTag).join(DiveSiteTag).filter(
-                DiveSiteTag.dive_site_id == site.id
-            ).all()
-            site_tags = [tag.name for tag in tags]
-            
-        score = calculate_unified_phrase_aware_score(
-            query.lower(),
+        site_tags = exact_tag_map.get(site.id, [])
+
+        score = scorer.score(
             site.name,
             site.description,
             site.country,
@@ -520,11 +530,14 @@ def search_dive_sites_with_fuzzy(query: str, exact_results: List[DiveSite], db:
         filtered_query = filtered_query.filter(DiveSite.deleted_at.is_(None))
 
     # Apply status filter if provided
+    filtered_status = None
     if 'status' in filters and filters['status'] and ('current_user' in filters and (filters['current_user'].is_admin or filters['current_user'].is_moderator)):
-        filtered_query = filtered_query.filter(DiveSite.status == filters['status'])
+        filtered_status = filters['status']
+        filtered_query = filtered_query.filter(DiveSite.status == filtered_status)
     elif not show_archived:
         # Default to approved for non-admins if no explicit status is provided
-        filtered_query = filtered_query.filter(DiveSite.status == 'approved')
+        filtered_status = 'approved'
+        filtered_query = filtered_query.filter(DiveSite.status == filtered_status)
 
     # Apply the same filters that were used in the main query
     if 'dive_site_id' in filters and filters['dive_site_id'] and ('current_user' in filters and (filters['current_user'].is_admin or filters['current_user'].is_moderator)):
@@ -565,44 +578,50 @@ def search_dive_sites_with_fuzzy(query: str, exact_results: List[DiveSite], db:
     if 'my_dive_sites' in filters and filters['my_dive_sites'] and 'current_user' in filters and filters['current_user']:
         filtered_query = filtered_query.filter(DiveSite.created_by == filters['current_user'].id)
 
-    # Get filtered dive sites for fuzzy matching
-    all_dive_sites = filtered_query.all()
-
     # Create a set of exact result IDs to avoid duplicates
     exact_ids = {site.id for site in exact_results}
 
+    # Shortlist candidates from the in-memory trigram index so full scoring only
+    # runs on the top-K sites. Fall back to scanning the filtered catalog if the
+    # index cannot be built.
+    try:
+        dive_site_search_index.ensure_ready(db)
+        candidate_ids = dive_site_search_index.candidates(
+            query,
+            limit=max(DEFAULT_CANDIDATE_LIMIT, max_fuzzy_results * 20),
+            exclude_ids=exact_ids,
+            status=filtered_status,
+            include_deleted=show_archived,
+        )
+        all_dive_sites = filtered_query.filter(DiveSite.id.in_(candidate_ids)).all() if candidate_ids else []
+    except Exception as e:
+        logger.warning(f"Dive site search index unavailable, scanning catalog: {e}")
+        all_dive_sites = filtered_query.all()
+
     # Perform fuzzy matching on filtered dive sites (case-insensitive)
     fuzzy_matches = []
     query_lower = query.lower()  # Convert query to lowercase for case-insensitive comparison
 
-    for site in all_dive_sites:
-        # Skip if already in exact results
-        if site.id in exact_ids:
-            continue
+    # Skip sites already in exact results
+    candidate_sites = [site for site in all_dive_sites if site.id not in exact_ids]
 
-        # Get tags for this dive site for scoring
-        site_tags = []
-        if hasattr(site, 'tags') and site.tags:
-            site_tags = [tag.name if hasattr(tag, 'name') else str(tag) for tag in site.tags]
-        else:
-            # Query tags from database if not already loaded
-            from app.models import DiveSiteTag, AvailableTag
-            tags = db.query(AvailableTag).join(DiveSiteTag).filter(
-                DiveSiteTag.dive_site_id == site.id
-            ).all()
-            site_tags = [tag.name for tag in tags]
-
-        # Use the unified phrase-aware scoring function with tags
-        weighted_score = calculate_unified_phrase_aware_score(
-            query_lower,
+    # Preload tags for all candidates in a single query
+    candidate_tag_map = load_tag_names_map(db, DiveSiteTag.dive_site_id, [site.id for site in candidate_sites])
+
+    # Score the shortlist in one batch with the unified phrase-aware scorer
+    candidate_scores = scorer.score_batch([
+        ScoringCandidate.build(
             site.name,
             site.description,
             site.country,
             site.region,
             None,  # city parameter (not used for dive sites)
-            site_tags
+            candidate_tag_map.get(site.id, [])
         )
+        for site in candidate_sites
+    ])
 
+    for site, weighted_score in zip(candidate_sites, candidate_scores):
         # Check for partial matches (substring matches) for match type classification
         name_contains = query_lower in site.name.lower()
         country_contains = site.country and query_lower in site.country.lower()
@@ -1109,140 +1128,154 @@ async def get_dive_sites(
                 query = query.filter(False)
                 allowed_suitabilities = []
 
-            # Get all matching dive sites before pagination (needed for wind filtering)
-            all_matching_sites = query.all()
-            logger.info(f"[WIND FILTER] Found {len(all_matching_sites)} sites before wind suitability filtering")
-
-            if all_matching_sites and allowed_suitabilities:
-                sites_with_coords = [s for s in all_matching_sites if s.latitude is not None and s.longitude is not None]
-                if sites_with_coords:
-                    # OPTIMIZATION: Group sites by cache key (0.1° grid cell) to batch fetch wind data
-                    # This reduces API calls and improves accuracy (sites get wind data from their actual grid cell)
-                    # The open_meteo_service cache already handles deduplication at the 0.1° level
-
-                    def get_cache_key_for_site(site, target_datetime):
-                        """Generate cache key for a site (matches open_meteo_service logic)."""
-                        rounded_lat = round(site.latitude * 10) / 10
-                        rounded_lon = round(site.longitude * 10) / 10
-                        base_key = (rounded_lat, rounded_lon)
-
-                        if target_datetime:
-                            # Round to nearest hour for cache efficiency
-                            hour_key = target_datetime.replace(minute=0, second=0, microsecond=0).isoformat()
-                            return (base_key, hour_key)
-                        return base_key
-
-                    # Group sites by cache key
-                    sites_by_cache_key = {}
-                    for site in sites_with_coords:
-                        cache_key = get_cache_key_for_site(site, target_datetime)
-                        if cache_key not in sites_by_cache_key:
-                            sites_by_cache_key[cache_key] = []
-                        sites_by_cache_key[cache_key].append(site)
-
-                    # Fetch wind data once per unique grid cell
-                    # Use a representative site from each group (first site in group)
-                    wind_data_by_cache_key = {}
-                    fetch_errors = []
-
-                    for cache_key, sites_in_group in sites_by_cache_key.items():
-                        # Use first site in group as representative for fetching wind data
-                        representative_site = sites_in_group[0]
-
-                        try:
-                            wind_data = fetch_wind_data_single_point(
-                                representative_site.latitude,
-                                representative_site.longitude,
-                                target_datetime,
-                                skip_validation=True  # Validation already done at endpoint level
-                            )
-
-                            if wind_data:
-                                wind_data_by_cache_key[cache_key] = wind_data
-                            else:
-                                fetch_errors.append(f"Failed to fetch wind data for grid cell {cache_key}")
-                        except Exception as e:
-                            logger.error(f"Error fetching wind data for grid cell {cache_key}: {str(e)}")
-                            fetch_errors.append(f"Error fetching wind data for grid cell {cache_key}: {str(e)}")
-
-                    # Calculate suitability for each site
-                    filtered_site_ids = []
-
-                    for site in all_matching_sites:
-                        try:
-                            # Handle sites without coordinates (they have "unknown" suitability)
-                            if site.latitude is None or site.longitude is None:
-                                if include_unknown_wind:
-                                    filtered_site_ids.append(site.id)
-                                continue
-
-                            # Get cache key for this site
+            suitability_hour = forecast_hour(target_datetime)
+            if allowed_suitabilities and is_forecast_hour_materialized(db, suitability_hour):
+                # Precomputed suitability for this hour: filter with a join so counting
+                # and pagination stay in SQL (sites without a row are "unknown")
+                query = query.outerjoin(
+                    DiveSiteWindSuitability,
+                    and_(
+                        DiveSiteWindSuitability.dive_site_id == DiveSite.id,
+                        DiveSiteWindSuitability.forecast_hour == suitability_hour
+                    )
+                )
+                suitability_filter = DiveSiteWindSuitability.suitability.in_(allowed_suitabilities)
+                if include_unknown_wind:
+                    suitability_filter = or_(
+                        suitability_filter,
+                        DiveSiteWindSuitability.suitability.is_(None),
+                        DiveSiteWindSuitability.suitability == "unknown"
+                    )
+                query = query.filter(suitability_filter)
+                logger.info(f"[WIND FILTER] Using precomputed suitability for {suitability_hour.isoformat()}")
+            else:
+                # Not materialized yet: evaluate in Python and ask the refresher to precompute this hour
+                if allowed_suitabilities:
+                    note_forecast_hour_requested(suitability_hour)
+
+                # Get all matching dive sites before pagination (needed for wind filtering)
+                all_matching_sites = query.all()
+                logger.info(f"[WIND FILTER] Found {len(all_matching_sites)} sites before wind suitability filtering")
+
+                if all_matching_sites and allowed_suitabilities:
+                    sites_with_coords = [s for s in all_matching_sites if s.latitude is not None and s.longitude is not None]
+                    if sites_with_coords:
+                        # OPTIMIZATION: Group sites by cache key (0.1° grid cell) to batch fetch wind data
+                        # This reduces API calls and improves accuracy (sites get wind data from their actual grid cell)
+                        # The open_meteo_service cache already handles deduplication at the 0.1° level
+
+                        def get_cache_key_for_site(site, target_datetime):
+                            """Generate cache key for a site (matches open_meteo_service logic)."""
+                            rounded_lat = round(site.latitude * 10) / 10
+                            rounded_lon = round(site.longitude * 10) / 10
+                            base_key = (rounded_lat, rounded_lon)
+
+                            if target_datetime:
+                                # Round to nearest hour for cache efficiency
+                                hour_key = target_datetime.replace(minute=0, second=0, microsecond=0).isoformat()
+                                return (base_key, hour_key)
+                            return base_key
+
+                        # Group sites by cache key
+                        sites_by_cache_key = {}
+                        for site in sites_with_coords:
                             cache_key = get_cache_key_for_site(site, target_datetime)
+                            if cache_key not in sites_by_cache_key:
+                                sites_by_cache_key[cache_key] = []
+                            sites_by_cache_key[cache_key].append(site)
+
+                        # Fetch wind data once per unique grid cell
+                        # Use a representative site from each group (first site in group)
+                        wind_data_by_cache_key = {}
+                        fetch_errors = []
+
+                        for cache_key, sites_in_group in sites_by_cache_key.items():
+                            # Use first site in group as representative for fetching wind data
+                            representative_site = sites_in_group[0]
+
+                            try:
+                                wind_data = fetch_wind_data_single_point(
+                                    representative_site.latitude,
+                                    representative_site.longitude,
+                                    target_datetime,
+                                    skip_validation=True  # Validation already done at endpoint level
+                                )
 
-                            # Get wind data for this site's grid cell
-                            wind_data = wind_data_by_cache_key.get(cache_key)
-
-                            if not wind_data:
-                                # No wind data for this grid cell - site has "unknown" suitability
+                                if wind_data:
+                                    wind_data_by_cache_key[cache_key] = wind_data
+                                else:
+                                    fetch_errors.append(f"Failed to fetch wind data for grid cell {cache_key}")
+                            except Exception as e:
+                                logger.error(f"Error fetching wind data for grid cell {cache_key}: {str(e)}")
+                                fetch_errors.append(f"Error fetching wind data for grid cell {cache_key}: {str(e)}")
+
+                        # Calculate suitability for all sites with wind data in one vectorized pass
+                        filtered_site_ids = []
+                        evaluated_sites = []
+                        site_conditions = []
+
+                        for site in all_matching_sites:
+                            wind_data = None
+                            if site.latitude is not None and site.longitude is not None:
+                                wind_data = wind_data_by_cache_key.get(get_cache_key_for_site(site, target_datetime))
+
+                            if not wind_data or wind_data.get("wind_direction_10m") is None or wind_data.get("wind_speed_10m") is None:
+                                # No coordinates, no wind data for the grid cell or invalid wind data - "unknown" suitability
                                 if include_unknown_wind:
                                     filtered_site_ids.append(site.id)
                                 continue
 
-                            wind_direction = wind_data.get("wind_direction_10m")
-                            wind_speed = wind_data.get("wind_speed_10m")
-                            wind_gusts = wind_data.get("wind_gusts_10m")
-                            wave_height = wind_data.get("wave_height")
-                            wave_period = wind_data.get("wave_period")
-
-                            if wind_direction is not None and wind_speed is not None:
-                                suitability_result = calculate_wind_suitability(
-                                    wind_direction=wind_direction,
-                                    wind_speed=wind_speed,
-                                    shore_direction=float(site.shore_direction) if site.shore_direction else None,
-                                    wind_gusts=wind_gusts,
-                                    wave_height=wave_height,
-                                    wave_period=wave_period
-                                )
+                            evaluated_sites.append(site)
+                            site_conditions.append((
+                                wind_data.get("wind_direction_10m"),
+                                wind_data.get("wind_speed_10m"),
+                                float(site.shore_direction) if site.shore_direction else None,
+                                wind_data.get("wind_gusts_10m"),
+                                wind_data.get("wave_height"),
+                                wind_data.get("wave_period"),
+                            ))
+
+                        if evaluated_sites:
+                            directions, speeds, shores, gusts, wave_heights, wave_periods = zip(*site_conditions)
+                            suitability_codes = calculate_wind_suitability_batch(
+                                wind_direction=directions,
+                                wind_speed=speeds,
+                                shore_direction=shores,
+                                wind_gusts=gusts,
+                                wave_height=wave_heights,
+                                wave_period=wave_periods
+                            )
 
-                                site_suitability = suitability_result["suitability"]
+                            allowed_codes = {SUITABILITY_CODES[level] for level in allowed_suitabilities}
+                            if include_unknown_wind:
+                                allowed_codes.add(SUITABILITY_CODES["unknown"])
+                            filtered_site_ids.extend(
+                                site.id for site, code in zip(evaluated_sites, suitability_codes.tolist())
+                                if code in allowed_codes
+                            )
 
-                                # Filter by suitability range
-                                if site_suitability in allowed_suitabilities:
-                                    filtered_site_ids.append(site.id)
-                                elif include_unknown_wind and site_suitability == "unknown":
-                                    # Include unknown if checkbox is checked
-                                    filtered_site_ids.append(site.id)
-                            else:
-                                # Invalid wind data - site has "unknown" suitability
-                                if include_unknown_wind:
-                                    filtered_site_ids.append(site.id)
-                        except Exception as e:
-                            logger.error(f"Error calculating suitability for site {site.id}: {str(e)}")
-                            # Skip this site if calculation fails
-                            continue
-
-                    # Rebuild query with filtered site IDs
-                    logger.info(f"[WIND FILTER] After filtering: {len(filtered_site_ids)} sites match wind_suitability={wind_suitability} (range: {allowed_suitabilities}), include_unknown={include_unknown_wind} for target_datetime={target_datetime}")
-                    if filtered_site_ids:
-                        query = query.filter(DiveSite.id.in_(filtered_site_ids))
-                    else:
-                        # No sites match the suitability filter
-                        logger.info(f"[WIND FILTER] No sites match, returning empty result")
-                        query = query.filter(False)
-                else:
-                    # No sites with valid coordinates
-                    if include_unknown_wind:
-                        # Include sites without coordinates if unknown is allowed
-                        sites_without_coords = [s.id for s in all_matching_sites if s.latitude is None or s.longitude is None]
-                        if sites_without_coords:
-                            query = query.filter(DiveSite.id.in_(sites_without_coords))
+                        # Rebuild query with filtered site IDs
+                        logger.info(f"[WIND FILTER] After filtering: {len(filtered_site_ids)} sites match wind_suitability={wind_suitability} (range: {allowed_suitabilities}), include_unknown={include_unknown_wind} for target_datetime={target_datetime}")
+                        if filtered_site_ids:
+                            query = query.filter(DiveSite.id.in_(filtered_site_ids))
                         else:
+                            # No sites match the suitability filter
+                            logger.info(f"[WIND FILTER] No sites match, returning empty result")
                             query = query.filter(False)
                     else:
-                        query = query.filter(False)
-            else:
-                # No matching sites, return empty result
-                query = query.filter(False)
+                        # No sites with valid coordinates
+                        if include_unknown_wind:
+                            # Include sites without coordinates if unknown is allowed
+                            sites_without_coords = [s.id for s in all_matching_sites if s.latitude is None or s.longitude is None]
+                            if sites_without_coords:
+                                query = query.filter(DiveSite.id.in_(sites_without_coords))
+                            else:
+                                query = query.filter(False)
+                        else:
+                            query = query.filter(False)
+                else:
+                    # No matching sites, return empty result
+                    query = query.filter(False)
         except Exception as e:
             logger.error(f"Error in wind suitability filter: {str(e)}")
             # If any error occurs, return empty result when filtering by suitability
@@ -1393,29 +1426,10 @@ async def get_dive_sites(
                     }
 
 
-    # Bulk fetch media to avoid N+1 queries
-    site_media_map = {}
-    dive_media_map = {}
+    # Bulk fetch the cover media of the page (one row per site, by primary key)
+    cover_media_map = {}
     if detail_level in ['basic', 'full'] and dive_sites:
-        site_ids = [s.id for s in dive_sites]
-
-        # Fetch all media from SiteMedia for these sites
-        from app.models import SiteMedia, DiveMedia, Dive
-        all_site_media = db.query(SiteMedia).filter(SiteMedia.dive_site_id.in_(site_ids)).all()
-        for sm in all_site_media:
-            if sm.dive_site_id not in site_media_map:
-                site_media_map[sm.dive_site_id] = []
-            site_media_map[sm.dive_site_id].append(sm)
-
-        # Fetch all media from DiveMedia for these sites
-        all_dive_media = db.query(DiveMedia).join(Dive).filter(Dive.dive_site_id.in_(site_ids)).all()
-        for dm in all_dive_media:
-            # We need to find the dive site id for this dive media
-            # Since we joined with Dive, dm.dive.dive_site_id should work
-            ds_id = dm.dive.dive_site_id
-            if ds_id not in dive_media_map:
-                dive_media_map[ds_id] = []
-            dive_media_map[ds_id].append(dm)
+        cover_media_map = load_cover_media(db, [s.cover_media_key for s in dive_sites])
 
     # Bulk fetch creator usernames if needed
     creator_map = {}
@@ -1441,28 +1455,10 @@ async def get_dive_sites(
         thumbnail_id = None
 
         if detail_level in ['basic', 'full']:
-            site_media = site_media_map.get(site.id, [])
-            dive_media = dive_media_map.get(site.id, [])
-
-            # Combine all media items with source info
-            all_media = [(m, 'site_media') for m in site_media] + [(m, 'dive_media') for m in dive_media]
-
-            if all_media:
-                # Use ordering logic if available
-                if site.media_order and len(site.media_order) > 0:
-                    ordered_media = []
-                    media_map = {f"{src}_{m.id}": (m, src) for m, src in all_media}
-                    for key in site.media_order:
-                        if key in media_map:
-                            ordered_media.append(media_map[key])
-
-                    if ordered_media:
-                        selected_media, source = ordered_media[0]
-                    else:
-                        selected_media, source = random.choice(all_media)
-                else:
-                    selected_media, source = random.choice(all_media)
+            cover = cover_media_map.get(site.cover_media_key)
 
+            if cover:
+                selected_media, source = cover
                 thumbnail = selected_media.thumbnail_url or selected_media.url
                 thumbnail_id = selected_media.id
                 thumbnail_source = source
@@ -1724,26 +1720,35 @@ async def get_wind_recommendations(
 
         dive_sites = query.all()
 
-        # Calculate suitability for each dive site
+        # Evaluate all sites in one vectorized pass; reasoning is only built for returned sites
+        shore_directions = [float(site.shore_direction) if site.shore_direction else None for site in dive_sites]
+        suitability_codes = calculate_wind_suitability_batch(
+            wind_direction=wind_direction,
+            wind_speed=wind_speed,
+            shore_direction=shore_directions,
+            wind_gusts=wind_gusts,
+            wave_height=wave_height,
+            wave_period=wave_period
+        ).tolist() if dive_sites else []
+
+        suitability_order = {"good": 0, "caution": 1, "difficult": 2, "avoid": 3, "unknown": 4}
+        min_order = suitability_order.get(min_suitability.lower(), 0) if min_suitability else None
+
         recommendations = []
-        for site in dive_sites:
+        for site, shore_direction, code in zip(dive_sites, shore_directions, suitability_codes):
+            # Apply min_suitability filter if specified
+            if min_order is not None and suitability_order[SUITABILITY_LEVELS[code]] > min_order:
+                continue
+
             suitability_result = calculate_wind_suitability(
                 wind_direction=wind_direction,
                 wind_speed=wind_speed,
-                shore_direction=float(site.shore_direction) if site.shore_direction else None,
+                shore_direction=shore_direction,
                 wind_gusts=wind_gusts,
                 wave_height=wave_height,
                 wave_period=wave_period
             )
 
-            # Apply min_suitability filter if specified
-            if min_suitability:
-                suitability_order = {"good": 0, "caution": 1, "difficult": 2, "avoid": 3, "unknown": 4}
-                min_order = suitability_order.get(min_suitability.lower(), 0)
-                site_order = suitability_order.get(suitability_result["suitability"], 4)
-                if site_order > min_order:
-                    continue
-
             recommendations.append({
                 "dive_site_id": site.id,
                 "name": site.name,
@@ -1759,13 +1764,12 @@ async def get_wind_recommendations(
                 "swell_wave_period": swell_wave_period,
                 "sea_surface_temperature": sea_surface_temperature,
                 "sea_level_height_msl": sea_level_height_msl,
-                "shore_direction": float(site.shore_direction) if site.shore_direction else None,
+                "shore_direction": shore_direction,
                 "reasoning": suitability_result["reasoning"],
                 "wind_speed_category": suitability_result["wind_speed_category"]
             })
 
         # Sort by suitability (good first, then caution, then difficult, then avoid, then unknown)
-        suitability_order = {"good": 0, "caution": 1, "difficult": 2, "avoid": 3, "unknown": 4}
         recommendations.sort(key=lambda x: suitability_order.get(x["suitability"], 4))
 
         return {
@@ -1795,6 +1799,132 @@ async def get_wind_recommendations(
             detail="Internal server error while calculating recommendations"
         )
 
+@router.get("/clusters", response_model=DiveSiteClusterResponse)
+@skip_rate_limit_for_admin("250/minute")
+async def get_dive_site_clusters(
+    request: Request,
+    zoom: int = Query(..., ge=0, le=MAX_CLUSTER_ZOOM, description="Map zoom level the clusters are computed for"),
+    north: float = Query(90, ge=-90, le=90, description="North bound of the viewport"),
+    south: float = Query(-90, ge=-90, le=90, description="South bound of the viewport"),
+    east: float = Query(180, ge=-180, le=180, description="East bound of the viewport"),
+    west: float = Query(-180, ge=-180, le=180, description="West bound of the viewport (greater than east when crossing the antimeridian)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Approved dive sites clustered for the map at low zoom: one aggregate
+    (count, centroid, representative id) per grid cell of about 64 pixels.
+    Cells holding a single site also carry what its map popup shows (name,
+    difficulty, average rating).
+
+    Served from the in-memory geo index, which is built by the first request
+    if the background refresher has not built it yet.
+    """
+    if south > north:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="south must not be greater than north"
+        )
+
+    dive_site_geo_index.warm(db)
+    dive_site_geo_index.ready(db)
+    clusters = dive_site_geo_index.clusters(zoom, west, south, east, north)
+
+    lone_ids = [cluster["id"] for cluster in clusters if cluster["count"] == 1]
+    if lone_ids:
+        details = {
+            row.id: row
+            for row in db.query(
+                DiveSite.id, DiveSite.name,
+                DifficultyLevel.code.label("difficulty_code"), DifficultyLevel.label.label("difficulty_label")
+            ).outerjoin(DifficultyLevel, DiveSite.difficulty_id == DifficultyLevel.id).filter(
+                DiveSite.id.in_(lone_ids)
+            )
+        }
+        ratings = dict(
+            db.query(SiteRating.dive_site_id, func.avg(SiteRating.score)).filter(
+                SiteRating.dive_site_id.in_(lone_ids)
+            ).group_by(SiteRating.dive_site_id).all()
+        )
+        for cluster in clusters:
+            row = details.get(cluster["id"]) if cluster["count"] == 1 else None
+            if row is not None:
+                rating = ratings.get(row.id)
+                cluster.update(
+                    name=row.name,
+                    difficulty_code=row.difficulty_code,
+                    difficulty_label=row.difficulty_label,
+                    average_rating=float(rating) if rating else None,
+                )
+
+    return {
+        "zoom": zoom,
+        "total": sum(cluster["count"] for cluster in clusters),
+        "clusters": clusters,
+    }
+
+
+@router.get(
+    "/points",
+    response_model=DiveSitePointsResponse,
+    responses={200: {"content": {POINTS_BINARY_MEDIA_TYPE: {}}}, 304: {"description": "Points unchanged"}},
+)
+@skip_rate_limit_for_admin("250/minute")
+async def get_dive_site_points(
+    request: Request,
+    encoding: str = Query("json", pattern="^(json|binary)$", description="'json' for column arrays, 'binary' for packed int32/float32 arrays"),
+    north: float = Query(90, ge=-90, le=90, description="North bound of the viewport"),
+    south: float = Query(-90, ge=-90, le=90, description="South bound of the viewport"),
+    east: float = Query(180, ge=-180, le=180, description="East bound of the viewport"),
+    west: float = Query(-180, ge=-180, le=180, description="West bound of the viewport (greater than east when crossing the antimeridian)"),
+    db: Session = Depends(get_db)
+):
+    """
+    Ids and coordinates of the approved dive sites within the bounds, as
+    column arrays (the minimal map payload without one object per site).
+
+    The ETag is derived from the catalog version, so a client revalidating
+    an unchanged viewport with If-None-Match gets 304 Not Modified.
+    """
+    if south > north:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="south must not be greater than north"
+        )
+
+    if dive_site_geo_index.ready(db):
+        version = dive_site_geo_index.catalog_version
+        etag = points_etag(version, encoding, west, south, east, north)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+        version, ids, latitudes, longitudes = dive_site_geo_index.points(west, south, east, north)
+    else:
+        rows = db.query(DiveSite.id, DiveSite.latitude, DiveSite.longitude).filter(
+            DiveSite.deleted_at.is_(None),
+            DiveSite.status == 'approved',
+            DiveSite.latitude.isnot(None),
+            DiveSite.longitude.isnot(None)
+        ).all()
+        version, ids, latitudes, longitudes = catalog_points(rows, west, south, east, north)
+
+    # Recomputed: the catalog may have changed since the check above
+    etag = points_etag(version, encoding, west, south, east, north)
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    if encoding == "binary":
+        return Response(
+            content=encode_points_binary(ids, latitudes, longitudes),
+            media_type=POINTS_BINARY_MEDIA_TYPE,
+            headers=headers
+        )
+    return Response(
+        content=encode_points_json(version, ids, latitudes, longitudes),
+        media_type=POINTS_JSON_MEDIA_TYPE,
+        headers=headers
+    )
+
+
 @router.get("/count")
 @skip_rate_limit_for_admin("250/minute")
 async def get_dive_sites_count(
@@ -1860,27 +1990,28 @@ async def _send_pending_moderation_notification(dive_site_id: int):
     finally:
         db.close()
 
-async def _send_dive_site_notifications(dive_site_id: int):
-    """Background task to send notifications for a new dive site."""
-    try:
-        from app.services.notification_service import NotificationService
-        from app.database import SessionLocal
-
-        # Create a new database session for the background task
-        db = SessionLocal()
-        try:
-            notification_service = NotificationService()
-            await notification_service.notify_users_for_new_dive_site(dive_site_id, db)
-        finally:
-            db.close()
-    except Exception as e:
-        logger.error(f"Failed to send notifications for new dive site {dive_site_id}: {e}")
-
 async def _update_shore_direction_background(dive_site_id: int):
     """Legacy background task wrapper for shore direction detection, now uses unified location update."""
     await _update_location_data_background(dive_site_id)
 
 
+def approved_sites_by_distance(db: Session, matches, distance_label: str, *columns, scale: float = 1.0):
+    """
+    Query approved dive sites for (id, distance_m) geo index matches, nearest
+    first, with the distance as a `distance_label` column (divided by scale).
+    Returns None when there are no matches.
+    """
+    if not matches:
+        return None
+    distances = dict(matches)
+    distance = distance_column(distances, DiveSite.id, distance_label, scale)
+    return db.query(*columns, distance).filter(
+        DiveSite.id.in_(distances),
+        DiveSite.deleted_at.is_(None),
+        DiveSite.status == 'approved'
+    ).order_by(distance, DiveSite.id)
+
+
 def is_similar_name(name1: str, name2: str) -> bool:
     """
     Check if two dive site names are highly similar.
@@ -1941,48 +2072,59 @@ async def check_proximity(
     bind = db.get_bind()
     dialect = bind.dialect.name if bind is not None else None
 
-    if dialect == 'mysql':
-        nearby_query = text("""
-            SELECT
-                ds.id, ds.name, ds.description,
-                ds.latitude, ds.longitude,
-                ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) AS distance_m
-            FROM dive_sites ds
-            WHERE ds.location IS NOT NULL
-            AND ds.deleted_at IS NULL
-            AND ds.status = 'approved'
-            AND ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) <= :radius_m
-            ORDER BY distance_m ASC
-            LIMIT 5
-        """)
+    if dive_site_geo_index.ready(db):
+        query = approved_sites_by_distance(
+            db, dive_site_geo_index.within(lat, lng, radius_m, limit=5, status='approved'), 'distance_m',
+            DiveSite.id, DiveSite.name, DiveSite.description, DiveSite.latitude, DiveSite.longitude
+        )
+        result = query.all() if query is not None else []
     else:
-        nearby_query = text("""
-            SELECT
-                ds.id, ds.name, ds.description,
-                ds.latitude, ds.longitude,
-                (6371 * acos(
-                    cos(radians(:lat)) * cos(radians(ds.latitude)) *
-                    cos(radians(ds.longitude) - radians(:lng)) +
-                    sin(radians(:lat)) * sin(radians(ds.latitude))
-                )) * 1000 AS distance_m
-            FROM dive_sites ds
-            WHERE ds.latitude IS NOT NULL
-            AND ds.longitude IS NOT NULL
-            AND ds.deleted_at IS NULL
-            AND ds.status = 'approved'
-            HAVING distance_m <= :radius_m
-            ORDER BY distance_m ASC
-            LIMIT 5
-        """)
-
-    result = db.execute(
-        nearby_query,
-        {
-            "lat": lat,
-            "lng": lng,
-            "radius_m": radius_m
-        }
-    ).fetchall()
+        envelope_params = {}
+        if dialect == 'mysql':
+            envelope, envelope_params = radius_prefilter("ds.location", lat, lng, radius_m)
+            nearby_query = text(f"""
+                SELECT
+                    ds.id, ds.name, ds.description,
+                    ds.latitude, ds.longitude,
+                    ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) AS distance_m
+                FROM dive_sites ds
+                WHERE ds.location IS NOT NULL
+                AND {envelope}
+                AND ds.deleted_at IS NULL
+                AND ds.status = 'approved'
+                AND ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) <= :radius_m
+                ORDER BY distance_m ASC
+                LIMIT 5
+            """)
+        else:
+            nearby_query = text("""
+                SELECT
+                    ds.id, ds.name, ds.description,
+                    ds.latitude, ds.longitude,
+                    (6371 * acos(
+                        cos(radians(:lat)) * cos(radians(ds.latitude)) *
+                        cos(radians(ds.longitude) - radians(:lng)) +
+                        sin(radians(:lat)) * sin(radians(ds.latitude))
+                    )) * 1000 AS distance_m
+                FROM dive_sites ds
+                WHERE ds.latitude IS NOT NULL
+                AND ds.longitude IS NOT NULL
+                AND ds.deleted_at IS NULL
+                AND ds.status = 'approved'
+                HAVING distance_m <= :radius_m
+                ORDER BY distance_m ASC
+                LIMIT 5
+            """)
+
+        result = db.execute(
+            nearby_query,
+            {
+                "lat": lat,
+                "lng": lng,
+                "radius_m": radius_m,
+                **envelope_params
+            }
+        ).fetchall()
 
     nearby_sites = []
     for row in result:
@@ -2028,47 +2170,58 @@ async def create_dive_site(
         bind = db.get_bind()
         dialect = bind.dialect.name if bind is not None else None
 
-        if dialect == 'mysql':
-            fifty_km_query = text("""
-                SELECT
-                    ds.id, ds.name, ds.description,
-                    ds.latitude, ds.longitude,
-                    ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) AS distance_m
-                FROM dive_sites ds
-                WHERE ds.location IS NOT NULL
-                AND ds.deleted_at IS NULL
-                AND ds.status = 'approved'
-                AND ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) <= 50000
-                ORDER BY distance_m ASC
-                LIMIT 100
-            """)
+        if dive_site_geo_index.ready(db):
+            query = approved_sites_by_distance(
+                db, dive_site_geo_index.within(dive_site.latitude, dive_site.longitude, 50000, limit=100, status='approved'),
+                'distance_m', DiveSite.id, DiveSite.name, DiveSite.description, DiveSite.latitude, DiveSite.longitude
+            )
+            candidate_results = query.all() if query is not None else []
         else:
-            fifty_km_query = text("""
-                SELECT
-                    ds.id, ds.name, ds.description,
-                    ds.latitude, ds.longitude,
-                    (6371 * acos(
-                        cos(radians(:lat)) * cos(radians(ds.latitude)) *
-                        cos(radians(ds.longitude) - radians(:lng)) +
-                        sin(radians(:lat)) * sin(radians(ds.latitude))
-                    )) * 1000 AS distance_m
-                FROM dive_sites ds
-                WHERE ds.latitude IS NOT NULL
-                AND ds.longitude IS NOT NULL
-                AND ds.deleted_at IS NULL
-                AND ds.status = 'approved'
-                HAVING distance_m <= 50000
-                ORDER BY distance_m ASC
-                LIMIT 100
-            """)
-
-        candidate_results = db.execute(
-            fifty_km_query,
-            {
-                "lat": dive_site.latitude,
-                "lng": dive_site.longitude
-            }
-        ).fetchall()
+            envelope_params = {}
+            if dialect == 'mysql':
+                envelope, envelope_params = radius_prefilter("ds.location", dive_site.latitude, dive_site.longitude, 50000)
+                fifty_km_query = text(f"""
+                    SELECT
+                        ds.id, ds.name, ds.description,
+                        ds.latitude, ds.longitude,
+                        ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) AS distance_m
+                    FROM dive_sites ds
+                    WHERE ds.location IS NOT NULL
+                    AND {envelope}
+                    AND ds.deleted_at IS NULL
+                    AND ds.status = 'approved'
+                    AND ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) <= 50000
+                    ORDER BY distance_m ASC
+                    LIMIT 100
+                """)
+            else:
+                fifty_km_query = text("""
+                    SELECT
+                        ds.id, ds.name, ds.description,
+                        ds.latitude, ds.longitude,
+                        (6371 * acos(
+                            cos(radians(:lat)) * cos(radians(ds.latitude)) *
+                            cos(radians(ds.longitude) - radians(:lng)) +
+                            sin(radians(:lat)) * sin(radians(ds.latitude))
+                        )) * 1000 AS distance_m
+                    FROM dive_sites ds
+                    WHERE ds.latitude IS NOT NULL
+                    AND ds.longitude IS NOT NULL
+                    AND ds.deleted_at IS NULL
+                    AND ds.status = 'approved'
+                    HAVING distance_m <= 50000
+                    ORDER BY distance_m ASC
+                    LIMIT 100
+                """)
+
+            candidate_results = db.execute(
+                fifty_km_query,
+                {
+                    "lat": dive_site.latitude,
+                    "lng": dive_site.longitude,
+                    **envelope_params
+                }
+            ).fetchall()
 
         similar_sites = []
         for row in candidate_results:
@@ -2123,7 +2276,7 @@ async def create_dive_site(
 
     # Schedule notification sending as a background task
     if db_dive_site.status == 'approved':
-        background_tasks.add_task(_send_dive_site_notifications, db_dive_site.id)
+        background_tasks.add_task(send_new_content_notifications, 'dive_site', db_dive_site.id)
     else:
         background_tasks.add_task(_send_pending_moderation_notification, db_dive_site.id)
 
@@ -2209,7 +2362,7 @@ async def get_dive_site(
 
     # Increment view count in the background without blocking the response
     from app.utils import increment_view_count
-    background_tasks.add_task(increment_view_count, db, DiveSite, dive_site.id)
+    background_tasks.add_task(increment_view_count, DiveSite, dive_site.id)
 
     # Calculate average rating
     avg_rating = db.query(func.avg(SiteRating.score)).filter(
@@ -2270,39 +2423,11 @@ async def get_dive_site(
     thumbnail_source = None
     thumbnail_id = None
 
-    # Get all media from SiteMedia (id, media_type, url, thumbnail_url)
-    site_media = db.query(SiteMedia.id, SiteMedia.media_type, SiteMedia.url, SiteMedia.thumbnail_url).filter(
-        SiteMedia.dive_site_id == dive_site.id
-    ).all()
+    # Cover media (first item of the gallery), maintained on media changes
+    cover = load_cover_media(db, [dive_site.cover_media_key]).get(dive_site.cover_media_key)
 
-    # Get all media from DiveMedia (id, media_type, url, thumbnail_url)
-    dive_media = db.query(DiveMedia.id, DiveMedia.media_type, DiveMedia.url, DiveMedia.thumbnail_url).join(Dive).filter(
-        Dive.dive_site_id == dive_site.id
-    ).all()
-
-    # Combine all media items with source info
-    # Format: (media_object, source_string)
-    all_media = [(m, 'site_media') for m in site_media] + [(m, 'dive_media') for m in dive_media]
-
-    if all_media:
-        import random
-        # If there's a defined media order, try to respect it
-        if dive_site.media_order and len(dive_site.media_order) > 0:
-            ordered_media = []
-            media_map = {f"{src}_{m.id}": (m, src) for m, src in all_media}
-
-            # Add ordered items first
-            for key in dive_site.media_order:
-                if key in media_map:
-                    ordered_media.append(media_map[key])
-
-            # If we found ordered items, pick the first one
-            if ordered_media:
-                selected_media, source = ordered_media[0]
-            else:
-                selected_media, source = random.choice(all_media)
-        else:
-            selected_media, source = random.choice(all_media)
+    if cover:
+        selected_media, source = cover
 
         # Use thumbnail_url if available, otherwise fallback to url (original)
         if selected_media.thumbnail_url:
@@ -3058,7 +3183,7 @@ async def approve_dive_site(
     db.refresh(dive_site)
 
     # Trigger notifications as if it was just created
-    background_tasks.add_task(_send_dive_site_notifications, dive_site.id)
+    background_tasks.add_task(send_new_content_notifications, 'dive_site', dive_site.id)
 
     response_data = {
         **dive_site.__dict__,
@@ -3533,7 +3658,7 @@ async def get_nearby_dive_sites(
 ):
     """
     Get nearby dive sites based on geographic proximity.
-    Uses MySQL native spatial functions (ST_Distance_Sphere) with Spatial Index for performance.
+    Uses MySQL native spatial functions, with an MBRContains pre-filter so the Spatial Index is used.
     Falls back to Haversine formula for non-MySQL dialects.
     """
     # Check if dive site exists
@@ -3555,62 +3680,84 @@ async def get_nearby_dive_sites(
     bind = db.get_bind()
     dialect = bind.dialect.name if bind is not None else None
 
-    if dialect == 'mysql':
-        # Optimized Spatial Query using MySQL 8.0 native functions and Spatial Index
-        # ST_Distance_Sphere returns distance in meters, we divide by 1000 for km
-        nearby_query = text("""
-            SELECT
-                ds.id, ds.name, ds.description,
-                dl.code AS difficulty_code, dl.label AS difficulty_label,
-                ds.latitude, ds.longitude,
-                ds.access_instructions, ds.safety_information, ds.marine_life,
-                ds.created_at, ds.updated_at,
-                ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) / 1000.0 AS distance_km
-            FROM dive_sites ds
-            LEFT JOIN difficulty_levels dl ON ds.difficulty_id = dl.id
-            WHERE ds.id != :site_id
-            AND ds.location IS NOT NULL
-            AND ds.deleted_at IS NULL
-            AND ds.status = 'approved'
-            AND ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) <= 100000
-            ORDER BY distance_km ASC
-            LIMIT :limit
-        """)
+    if dive_site_geo_index.ready(db):
+        matches = dive_site_geo_index.nearest(
+            float(dive_site.latitude), float(dive_site.longitude), limit, 100000,
+            status='approved', exclude_ids={dive_site_id}
+        )
+        query = approved_sites_by_distance(
+            db, matches, 'distance_km',
+            DiveSite.id, DiveSite.name, DiveSite.description,
+            DifficultyLevel.code.label('difficulty_code'), DifficultyLevel.label.label('difficulty_label'),
+            DiveSite.latitude, DiveSite.longitude,
+            DiveSite.access_instructions, DiveSite.safety_information, DiveSite.marine_life,
+            DiveSite.created_at, DiveSite.updated_at,
+            scale=1000.0
+        )
+        result = query.outerjoin(DifficultyLevel, DiveSite.difficulty_id == DifficultyLevel.id).all() if query is not None else []
     else:
-        # Fallback to Haversine formula for non-MySQL dialects (e.g., SQLite in tests)
-        nearby_query = text("""
-            SELECT
-                ds.id, ds.name, ds.description,
-                dl.code AS difficulty_code, dl.label AS difficulty_label,
-                ds.latitude, ds.longitude,
-                ds.access_instructions, ds.safety_information, ds.marine_life,
-                ds.created_at, ds.updated_at,
-                (6371 * acos(
-                    cos(radians(:lat)) * cos(radians(ds.latitude)) *
-                    cos(radians(ds.longitude) - radians(:lng)) +
-                    sin(radians(:lat)) * sin(radians(ds.latitude))
-                )) AS distance_km
-            FROM dive_sites ds
-            LEFT JOIN difficulty_levels dl ON ds.difficulty_id = dl.id
-            WHERE ds.id != :site_id
-            AND ds.latitude IS NOT NULL
-            AND ds.longitude IS NOT NULL
-            AND ds.deleted_at IS NULL
-            AND ds.status = 'approved'
-            HAVING distance_km <= 100
-            ORDER BY distance_km ASC
-            LIMIT :limit
-        """)
-
-    result = db.execute(
-        nearby_query,
-        {
-            "lat": float(dive_site.latitude),
-            "lng": float(dive_site.longitude),
-            "site_id": dive_site_id,
-            "limit": limit
-        }
-    ).fetchall()
+        envelope_params = {}
+        if dialect == 'mysql':
+            # Optimized Spatial Query using MySQL 8.0 native functions and Spatial Index
+            # ST_Distance_Sphere returns distance in meters, we divide by 1000 for km
+            envelope, envelope_params = radius_prefilter(
+                "ds.location", float(dive_site.latitude), float(dive_site.longitude), 100000
+            )
+            nearby_query = text(f"""
+                SELECT
+                    ds.id, ds.name, ds.description,
+                    dl.code AS difficulty_code, dl.label AS difficulty_label,
+                    ds.latitude, ds.longitude,
+                    ds.access_instructions, ds.safety_information, ds.marine_life,
+                    ds.created_at, ds.updated_at,
+                    ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) / 1000.0 AS distance_km
+                FROM dive_sites ds
+                LEFT JOIN difficulty_levels dl ON ds.difficulty_id = dl.id
+                WHERE ds.id != :site_id
+                AND ds.location IS NOT NULL
+                AND {envelope}
+                AND ds.deleted_at IS NULL
+                AND ds.status = 'approved'
+                AND ST_Distance_Sphere(ds.location, ST_SRID(POINT(:lng, :lat), 4326)) <= 100000
+                ORDER BY distance_km ASC
+                LIMIT :limit
+            """)
+        else:
+            # Fallback to Haversine formula for non-MySQL dialects (e.g., SQLite in tests)
+            nearby_query = text("""
+                SELECT
+                    ds.id, ds.name, ds.description,
+                    dl.code AS difficulty_code, dl.label AS difficulty_label,
+                    ds.latitude, ds.longitude,
+                    ds.access_instructions, ds.safety_information, ds.marine_life,
+                    ds.created_at, ds.updated_at,
+                    (6371 * acos(
+                        cos(radians(:lat)) * cos(radians(ds.latitude)) *
+                        cos(radians(ds.longitude) - radians(:lng)) +
+                        sin(radians(:lat)) * sin(radians(ds.latitude))
+                    )) AS distance_km
+                FROM dive_sites ds
+                LEFT JOIN difficulty_levels dl ON ds.difficulty_id = dl.id
+                WHERE ds.id != :site_id
+                AND ds.latitude IS NOT NULL
+                AND ds.longitude IS NOT NULL
+                AND ds.deleted_at IS NULL
+                AND ds.status = 'approved'
+                HAVING distance_km <= 100
+                ORDER BY distance_km ASC
+                LIMIT :limit
+            """)
+
+        result = db.execute(
+            nearby_query,
+            {
+                "lat": float(dive_site.latitude),
+                "lng": float(dive_site.longitude),
+                "site_id": dive_site_id,
+                "limit": limit,
+                **envelope_params
+            }
+        ).fetchall()
 
     # Convert to response format
     nearby_sites = []
@@ -25,6 +25,7 @@ from app.schemas import DiveCreate, DiveUpdate, DiveResponse, DiveListResponse,
 from app.models import DiveSite, DivingCenter, DiveSiteAlias, DifficultyLevel, get_difficulty_id_by_code
 from .dives_utils import generate_dive_name
 from app.services.dive_profile_parser import parse_dive_information_text
+from app.services.notification_service import send_new_content_notifications
 from .dives_search import search_dives_with_fuzzy
 from app.utils import get_unified_fuzzy_trigger_conditions
 
@@ -32,6 +33,7 @@ from app.utils import get_unified_fuzzy_trigger_conditions
 @router.post("/", response_model=DiveResponse)
 async def create_dive(
     dive: DiveCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -137,16 +139,8 @@ async def create_dive(
     db.commit()
     db.refresh(db_dive)
 
-    # Notify users about new dive
-    try:
-        from app.services.notification_service import NotificationService
-        notification_service = NotificationService()
-        await notification_service.notify_users_for_new_dive(db_dive.id, db)
-    except Exception as e:
-        # Log error but don't fail dive creation
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Failed to send notifications for new dive: {e}")
+    # Notify users about new dive after the response is sent
+    background_tasks.add_task(send_new_content_notifications, 'dive', db_dive.id)
 
     # Handle buddies if provided
     if dive.buddies:
@@ -1000,7 +994,7 @@ def get_dive(
     if not dive.is_private or (current_user and dive.user_id == current_user.id):
         # Increment view count in the background without blocking the response
         from app.utils import increment_view_count
-        background_tasks.add_task(increment_view_count, db, Dive, dive.id)
+        background_tasks.add_task(increment_view_count, Dive, dive.id)
 
     # Get dive site information if available
     dive_site_info = None
@@ -1182,7 +1176,7 @@ def get_dive_details(
     if not dive.is_private or (current_user and dive.user_id == current_user.id):
         # Increment view count in the background without blocking the response
         from app.utils import increment_view_count
-        background_tasks.add_task(increment_view_count, db, Dive, dive.id)
+        background_tasks.add_task(increment_view_count, Dive, dive.id)
 
     # Get dive site information if available
     dive_site_info = None
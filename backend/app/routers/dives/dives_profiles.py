@@ -20,7 +20,6 @@ from typing import List, Optional, Dict, Any
 from datetime import date, time, datetime
 import orjson
 import os
-import tempfile
 import uuid
 from app.utils import parse_gf_from_text, has_deco_data
 
@@ -33,6 +32,9 @@ from app.schemas import DiveCreate, DiveUpdate, DiveResponse, DiveMediaCreate, D
 from app.models import DiveSite, DiveSiteAlias
 from app.services.dive_profile_parser import DiveProfileParser
 from app.services.dive_export_service import DiveExportService
+from app.services.profile_artifact_service import load_profile_artifact_with_levels, store_profile_artifact, delete_profile_artifact
+from app.services.profile_downsampling import MIN_POINTS, NAMED_RESOLUTIONS, build_resolution_levels, downsample_profile
+from app.services.profile_format import COLUMNAR_PROFILE_EXTENSION, encode_profile, load_profile_data
 from .dives_validation import raise_validation_error
 from .dives_logging import log_dive_operation, log_error
 
@@ -44,7 +46,7 @@ def export_dive_profile(
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_active_user)
 ):
-    """Export dive profile in specified format (xml, fit, json). Only authenticated active users can export."""
+    """Export dive profile in specified format (xml, fit, json, profile). Only authenticated active users can export."""
     
     dive = db.query(Dive).filter(Dive.id == dive_id).first()
     if not dive:
@@ -69,18 +71,7 @@ def export_dive_profile(
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile file not found")
         
         # Parse profile to dict
-        parser = DiveProfileParser()
-        if dive.profile_xml_path.endswith('.json'):
-            profile_data = orjson.loads(profile_content)
-        else:
-            with tempfile.NamedTemporaryFile(mode='wb', suffix='.xml', delete=False) as temp_file:
-                temp_file.write(profile_content)
-                temp_path = temp_file.name
-            try:
-                profile_data = parser.parse_xml_file(temp_path)
-            finally:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+        profile_data = load_profile_data(dive.profile_xml_path, profile_content)
         
         # Initialize export service
         export_service = DiveExportService()
@@ -113,6 +104,15 @@ def export_dive_profile(
                 media_type="application/json",
                 headers={"Content-Disposition": f"attachment; filename={filename}"}
             )
+        elif format == 'profile':
+            # Raw profile data as JSON, whatever format it is stored in
+            content = orjson.dumps(profile_data, option=orjson.OPT_INDENT_2)
+            filename = f"dive_{dive_id}_{dive.dive_date}_profile.json"
+            return Response(
+                content=content,
+                media_type="application/json",
+                headers={"Content-Disposition": f"attachment; filename={filename}"}
+            )
         else:
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unsupported format: {format}")
 
@@ -126,10 +126,22 @@ def export_dive_profile(
 @router.get("/{dive_id}/profile")
 def get_dive_profile(
     dive_id: int,
+    max_points: Optional[int] = Query(None, ge=MIN_POINTS, description="Maximum number of samples to return"),
+    resolution: Optional[str] = Query(None, pattern="^(low|medium|full)$", description="Named resolution (low, medium, full)"),
     db: Session = Depends(get_db),
     current_user: Optional[User] = Depends(get_current_user_optional)
 ):
-    """Get dive profile data. Unauthenticated users can view public dives. Private dives are restricted to owner or admins."""
+    """
+    Get dive profile data. Unauthenticated users can view public dives. Private dives are restricted to owner or admins.
+
+    With max_points or resolution the samples are downsampled for charting, keeping the
+    deepest point, deco transitions and event samples; the response then carries a
+    "resolution" entry. Without them the full-resolution profile is returned.
+    """
+    if resolution is not None:
+        named_points = NAMED_RESOLUTIONS[resolution]
+        if named_points is not None:
+            max_points = min(max_points, named_points) if max_points else named_points
     # If authenticated, ensure account is enabled (mirror behavior of get_dive)
     if current_user and not current_user.enabled:
         raise HTTPException(
@@ -154,31 +166,19 @@ def get_dive_profile(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No profile uploaded")
     
     try:
+        # Parsed profile with deco backfill, persisted next to the profile by an earlier read
+        artifact = load_profile_artifact_with_levels(r2_storage, dive)
+        if artifact is not None:
+            profile_data, levels = artifact
+            return downsample_profile(profile_data, max_points, levels)
+
         # Download profile from R2 or local storage
         profile_content = r2_storage.download_profile(dive.user_id, dive.profile_xml_path)
         if not profile_content:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile file not found")
         
-        # Check file extension to determine parsing method
-        if dive.profile_xml_path.endswith('.json'):
-            # Imported profile (JSON format)
-            profile_data = orjson.loads(profile_content)
-        else:
-            # Manually uploaded profile (XML format) - save temporarily and parse
-            from app.services.dive_profile_parser import DiveProfileParser
-            import tempfile
-            
-            with tempfile.NamedTemporaryFile(mode='wb', suffix='.xml', delete=False) as temp_file:
-                temp_file.write(profile_content)
-                temp_path = temp_file.name
-            
-            try:
-                parser = DiveProfileParser()
-                profile_data = parser.parse_xml_file(temp_path)
-            finally:
-                # Clean up temporary file
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
+        # Columnar (imported), legacy JSON or manually uploaded XML profile
+        profile_data = load_profile_data(dive.profile_xml_path, profile_content)
 
         # Backfill decompression data if missing (either samples or heatmap)
         if profile_data and (not has_deco_data(profile_data) or 'tissue_heatmap' not in profile_data):
@@ -217,6 +217,12 @@ def get_dive_profile(
                     import logging
                     logging.warning(f"Failed to backfill deco ceiling for dive {dive_id}: {e}")
         
+        # Persist the derived result so later reads skip parsing, deco calculation and downsampling
+        if profile_data:
+            levels = build_resolution_levels(profile_data)
+            store_profile_artifact(r2_storage, dive, profile_data, levels)
+            return downsample_profile(profile_data, max_points, levels)
+
         return profile_data
     except HTTPException:
         # Re-raise HTTP exceptions (like 404 errors) as-is
@@ -274,19 +280,12 @@ async def upload_dive_profile(
         # 1. Parse based on format
         if filename_lower.endswith(('.xml', '.uddf')):
             from app.services.dive_profile_parser import DiveProfileParser
-            import tempfile
             import xml.etree.ElementTree as ET
-            with tempfile.NamedTemporaryFile(mode='wb', suffix='.xml', delete=False) as temp_file:
-                temp_file.write(content)
-                temp_path = temp_file.name
             try:
                 parser = DiveProfileParser()
-                profile_data = parser.parse_xml_file(temp_path)
+                profile_data = parser.parse_xml_stream(content)
             except (ET.ParseError, ValueError) as e:
                 raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid dive profile data: {str(e)}")
-            finally:
-                if os.path.exists(temp_path):
-                    os.remove(temp_path)
 
         elif filename_lower.endswith('.fit'):
             from .imports.garmin import parse_garmin_fit_file
@@ -307,9 +306,9 @@ async def upload_dive_profile(
             else:
                 profile_data = parsed_dives[0].get('profile_data')
             
-            # Convert to JSON for storage since we don't store raw FIT for profiles yet
-            stored_content = orjson.dumps(profile_data)
-            target_extension = '.json'
+            # Store the parsed profile since we don't store raw FIT for profiles yet
+            stored_content = encode_profile(profile_data)
+            target_extension = COLUMNAR_PROFILE_EXTENSION
 
         elif filename_lower.endswith('.json'):
             from .imports.suunto_parser import parse_suunto_json_file
@@ -324,8 +323,8 @@ async def upload_dive_profile(
             except Exception:
                 profile_data = orjson.loads(content)
             
-            stored_content = orjson.dumps(profile_data)
-            target_extension = '.json'
+            stored_content = encode_profile(profile_data)
+            target_extension = COLUMNAR_PROFILE_EXTENSION
 
         if not profile_data or not profile_data.get('samples'):
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Could not extract valid profile samples from file")
@@ -335,7 +334,8 @@ async def upload_dive_profile(
         store_filename = f"dive_{dive_id}_profile_{timestamp}{target_extension}"
         stored_path = r2_storage.upload_profile(dive.user_id, store_filename, stored_content)
 
-        # 3. Update Dive record
+        # 3. Update Dive record, dropping the derived artifact of the replaced profile
+        delete_profile_artifact(r2_storage, dive.user_id, dive.profile_xml_path)
         dive.profile_xml_path = stored_path
         dive.profile_sample_count = len(profile_data.get('samples', []))
         
@@ -384,6 +384,7 @@ def delete_dive_profile(
     try:
         # Delete profile from R2 or local storage
         r2_storage.delete_profile(dive.user_id, dive.profile_xml_path)
+        delete_profile_artifact(r2_storage, dive.user_id, dive.profile_xml_path)
         
         # Clear profile metadata from dive record
         dive.profile_xml_path = None
@@ -22,9 +22,10 @@ import tempfile
 import uuid
 import traceback
 
-from .dives_shared import router, get_db, get_current_user, get_current_admin_user, get_current_user_optional, User, Dive, DiveMedia, DiveTag, AvailableTag, DiveBuddy, r2_storage, UNIFIED_TYPO_TOLERANCE, calculate_unified_phrase_aware_score, classify_match_type
+from .dives_shared import router, get_db, get_current_user, get_current_admin_user, get_current_user_optional, User, Dive, DiveMedia, DiveTag, AvailableTag, DiveBuddy, r2_storage, UNIFIED_TYPO_TOLERANCE, QueryScorer, classify_match_type
 from app.schemas import DiveCreate, DiveUpdate, DiveResponse, DiveListResponse, DiveMediaCreate, DiveMediaResponse, DiveTagResponse
 from app.models import DiveSite, DiveSiteAlias
+from app.utils import load_tag_names_map
 from app.services.dive_profile_parser import DiveProfileParser
 from .dives_validation import raise_validation_error
 from .dives_logging import log_dive_operation, log_error
@@ -37,6 +38,8 @@ def search_dives_with_fuzzy(query: str, exact_results: List[Dive], db: Session,
     print(f"🔍 DEBUG: Starting search_dives_with_fuzzy with query: '{query}'")
     try:
         query_lower = query.lower()
+        # Compile the query once and reuse it for every candidate
+        scorer = QueryScorer(query_lower)
         
         # First, score the exact results
         if exact_results:
@@ -62,8 +65,7 @@ def search_dives_with_fuzzy(query: str, exact_results: List[Dive], db: Session,
                 
             dive_tags = [t.tag.name for t in dive.tags if t.tag]
             
-            score = calculate_unified_phrase_aware_score(
-                query_lower, 
+            score = scorer.score(
                 dive_site.name, 
                 dive_site.description, 
                 dive_site.country, 
@@ -89,8 +91,7 @@ def search_dives_with_fuzzy(query: str, exact_results: List[Dive], db: Session,
             joinedload(Dive.user),
             joinedload(Dive.dive_site),
             joinedload(Dive.diving_center),
-            selectinload(Dive.buddies),
-            selectinload(Dive.tags).joinedload(DiveTag.tag)
+            selectinload(Dive.buddies)
         ).join(DiveSite, Dive.dive_site_id == DiveSite.id)
         
         if exclude_unspecified_difficulty:
@@ -100,6 +101,8 @@ def search_dives_with_fuzzy(query: str, exact_results: List[Dive], db: Session,
         print(f"🔍 DEBUG: Found {len(all_dives)} total dives for fuzzy matching")
         
         exact_ids = {dive.id for dive in exact_results}
+        # Preload tag names for all candidate dives in a single query
+        candidate_tag_map = load_tag_names_map(db, DiveTag.dive_id, [dive.id for dive in all_dives if dive.id not in exact_ids])
         fuzzy_matches = []
         for dive in all_dives:
             if dive.id in exact_ids:
@@ -109,10 +112,9 @@ def search_dives_with_fuzzy(query: str, exact_results: List[Dive], db: Session,
             if not dive_site:
                 continue
                 
-            dive_tags = [t.tag.name for t in dive.tags if t.tag]
+            dive_tags = candidate_tag_map.get(dive.id, [])
             
-            weighted_score = calculate_unified_phrase_aware_score(
-                query_lower, 
+            weighted_score = scorer.score(
                 dive_site.name, 
                 dive_site.description, 
                 dive_site.country, 
@@ -137,6 +139,11 @@ def search_dives_with_fuzzy(query: str, exact_results: List[Dive], db: Session,
         print(f"🔍 DEBUG: Found {len(fuzzy_matches)} fuzzy matches above threshold")
         fuzzy_matches.sort(key=lambda x: x['score'], reverse=True)
         fuzzy_matches = fuzzy_matches[:max_fuzzy_results]
+        if fuzzy_matches:
+            # Callers serialize dive.tags; load them for the returned dives only, in one batch
+            db.query(Dive).options(
+                selectinload(Dive.tags).joinedload(DiveTag.tag)
+            ).filter(Dive.id.in_([match['dive'].id for match in fuzzy_matches])).all()
         all_results = exact_results_with_scores + fuzzy_matches
         all_results.sort(key=lambda x: x['score'], reverse=True)
         
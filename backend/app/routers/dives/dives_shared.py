@@ -26,6 +26,7 @@ from app.schemas import (
 )
 from app.auth import get_current_user, get_current_user_optional, get_current_admin_user, get_current_active_user
 from app.utils import (
+    QueryScorer,
     calculate_unified_phrase_aware_score,
     classify_match_type,
     get_unified_fuzzy_trigger_conditions,
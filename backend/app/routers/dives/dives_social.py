@@ -3,10 +3,9 @@ from sqlalchemy.orm import Session
 from .dives_shared import router, get_db, get_current_user, User, Dive, r2_storage, joinedload
 from app.models import DiveMedia, SiteMedia
 from app.services.social_image_service import SocialImageService
-from app.services.dive_profile_parser import DiveProfileParser
+from app.services.profile_format import load_profile_data
 from app.utils import slugify
 import httpx
-import orjson
 import os
 from urllib.parse import urlparse
 from typing import Set
@@ -182,13 +181,10 @@ async def generate_social_image(
     if dive.profile_xml_path:
         profile_content = r2_storage.download_profile(dive.user_id, dive.profile_xml_path)
         if profile_content:
-            if dive.profile_xml_path.endswith('.json'):
-                profile_data = orjson.loads(profile_content)
-            else:
-                parser = DiveProfileParser()
-                profile_data = parser.parse_xml_content(
-                    profile_content.decode('utf-8') if isinstance(profile_content, bytes) else profile_content
-                )
+            profile_data = load_profile_data(
+                dive.profile_xml_path,
+                profile_content if isinstance(profile_content, bytes) else profile_content.encode('utf-8')
+            )
 
     # Generate image
     social_service = SocialImageService()
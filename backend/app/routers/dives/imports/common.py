@@ -5,6 +5,10 @@ from datetime import date, time, datetime
 import orjson
 from app.models import Dive, DiveSite, DivingCenter, User
 from ..dives_shared import r2_storage
+from app.services.profile_artifact_service import delete_profile_artifact
+from app.services.profile_format import COLUMNAR_PROFILE_EXTENSION
+from app.services.spatial_query import radius_prefilter
+from app.services.geo_index_service import dive_site_geo_index, distance_column
 from ..dives_utils import find_dive_site_by_import_id, find_potential_matches, calculate_similarity
 import re
 
@@ -114,20 +118,32 @@ def find_existing_dive(db: Session, user_id: int, dive_date: str, dive_time: Opt
 
 def find_sites_by_coords(db: Session, lat: float, lng: float, radius_m: int = 500):
     """
-    Find dive sites within a given radius using MySQL spatial functions.
+    Find dive sites within a given radius, from the geo index when it is warm
+    and with MySQL spatial functions otherwise.
     Returns sites sorted by distance.
     """
-    sql = text("""
+    if dive_site_geo_index.ready(db):
+        matches = dive_site_geo_index.within(lat, lng, radius_m, limit=3, include_deleted=True)
+        if not matches:
+            return []
+        distance = distance_column(dict(matches), DiveSite.id, 'distance')
+        return db.query(DiveSite.id, DiveSite.name, DiveSite.country, distance).filter(
+            DiveSite.id.in_(dict(matches))
+        ).order_by(distance, DiveSite.id).all()
+
+    envelope, envelope_params = radius_prefilter("location", lat, lng, radius_m)
+    sql = text(f"""
         SELECT id, name, country, 
                ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) as distance
         FROM dive_sites
-        WHERE ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) <= :radius
+        WHERE {envelope}
+        AND ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) <= :radius
         ORDER BY distance ASC
         LIMIT 3
     """)
     
     try:
-        result = db.execute(sql, {"lat": lat, "lng": lng, "radius": radius_m}).fetchall()
+        result = db.execute(sql, {"lat": lat, "lng": lng, "radius": radius_m, **envelope_params}).fetchall()
         return result
     except Exception as e:
         print(f"Spatial query failed: {e}")
@@ -195,16 +211,20 @@ def resolve_entity(db: Session, value: str, centers=None, users=None) -> Tuple[O
     return None, None
 
 def save_dive_profile_data(dive, profile_data, db):
-    """Save dive profile data as JSON file and update dive record"""
+    """Save dive profile data in the columnar profile format and update dive record"""
     try:
-        if dive.profile_xml_path and dive.profile_xml_path.endswith('.json'):
+        if dive.profile_xml_path and dive.profile_xml_path.endswith(('.json', COLUMNAR_PROFILE_EXTENSION)):
             filename = dive.profile_xml_path
         else:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"dive_{dive.id}_profile_{timestamp}.json"
+            filename = f"dive_{dive.id}_profile_{timestamp}{COLUMNAR_PROFILE_EXTENSION}"
         
-        json_content = orjson.dumps(profile_data, option=orjson.OPT_INDENT_2)
-        stored_path = r2_storage.upload_profile(dive.user_id, filename, json_content)
+        previous_path = dive.profile_xml_path
+        stored_path = r2_storage.upload_profile_data(dive.user_id, filename, profile_data)
+        delete_profile_artifact(r2_storage, dive.user_id, previous_path)
+        # The profile moved (e.g. a .json profile rewritten as columnar): drop the old object
+        if previous_path and stored_path != previous_path:
+            r2_storage.delete_profile(dive.user_id, previous_path)
         
         dive.profile_xml_path = stored_path
         dive.profile_sample_count = len(profile_data.get('samples', []))
@@ -25,14 +25,16 @@ from app.schemas import (
 from app.auth import get_current_active_user, get_current_admin_user, get_current_user_optional, is_admin_or_moderator, get_current_user
 from app.models import OwnershipStatus
 from app.utils import (
-    calculate_unified_phrase_aware_score,
+    QueryScorer,
     classify_match_type,
     get_unified_fuzzy_trigger_conditions,
     UNIFIED_TYPO_TOLERANCE,
     is_diving_center_reviews_enabled
 )
 from app.limiter import limiter, skip_rate_limit_for_admin
-from app.services.notification_service import NotificationService
+from app.services.notification_service import NotificationService, send_new_content_notifications
+from app.services.spatial_query import radius_prefilter
+from app.services.geo_index_service import diving_center_geo_index, distance_column
 import logging
 
 logger = logging.getLogger(__name__)
@@ -124,7 +126,9 @@ async def get_nearby_diving_centers(
     bind = db.get_bind()
     dialect = bind.dialect.name if bind is not None else None
 
-    if dialect != 'mysql':
+    # The geo index serves any database; the SQL path needs MySQL
+    use_index = diving_center_geo_index.ready(db)
+    if dialect != 'mysql' and not use_index:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Nearby search requires MySQL with spatial support"
@@ -133,23 +137,36 @@ async def get_nearby_diving_centers(
     results = []
     if True:
         from sqlalchemy import text
-        query = text(
-            """
-            SELECT id, name, country, region, city,
-                   ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) AS distance_m
-            FROM diving_centers
-            WHERE location IS NOT NULL
-              AND ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) <= :radius_m
-            ORDER BY distance_m ASC
-            LIMIT :limit
-            """
-        )
-        rows = db.execute(query, {
-            "lat": lat,
-            "lng": lng,
-            "radius_m": radius_km * 1000.0,
-            "limit": limit
-        }).fetchall()
+        if use_index:
+            matches = diving_center_geo_index.within(lat, lng, radius_km * 1000.0, limit=limit)
+            rows = []
+            if matches:
+                distance = distance_column(dict(matches), DivingCenter.id, 'distance_m')
+                rows = db.query(
+                    DivingCenter.id, DivingCenter.name, DivingCenter.country, DivingCenter.region, DivingCenter.city,
+                    distance
+                ).filter(DivingCenter.id.in_(dict(matches))).order_by(distance, DivingCenter.id).all()
+        else:
+            envelope, envelope_params = radius_prefilter("location", lat, lng, radius_km * 1000.0)
+            query = text(
+                f"""
+                SELECT id, name, country, region, city,
+                       ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) AS distance_m
+                FROM diving_centers
+                WHERE location IS NOT NULL
+                  AND {envelope}
+                  AND ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) <= :radius_m
+                ORDER BY distance_m ASC
+                LIMIT :limit
+                """
+            )
+            rows = db.execute(query, {
+                "lat": lat,
+                "lng": lng,
+                "radius_m": radius_km * 1000.0,
+                "limit": limit,
+                **envelope_params
+            }).fetchall()
         for row in rows:
             results.append({
                 "id": row.id,
@@ -251,6 +268,8 @@ def search_diving_centers_with_fuzzy(query: str, exact_results: List[DivingCente
         List of diving centers with exact results first, followed by fuzzy matches
     """
     # Convert exact results to the expected format with phrase-aware scoring
+    # Compile the query once and reuse it for every candidate
+    scorer = QueryScorer(query)
     exact_results_with_scores = []
     for center in exact_results:
         # Get tags for this diving center for scoring
@@ -258,7 +277,7 @@ def search_diving_centers_with_fuzzy(query: str, exact_results: List[DivingCente
         if hasattr(center, 'tags') and center.tags:
             center_tags = [tag.name if hasattr(tag, 'name') else str(tag) for tag in center.tags]
         
-        score = calculate_unified_phrase_aware_score(query.lower(), center.name, center.description, center.country, center.region, center.city, center_tags)
+        score = scorer.score(center.name, center.description, center.country, center.region, center.city, center_tags)
         exact_results_with_scores.append({
             'center': center,
             'match_type': 'exact' if score >= 0.9 else 'exact_words' if score >= 0.7 else 'partial_words',
@@ -329,7 +348,7 @@ def search_diving_centers_with_fuzzy(query: str, exact_results: List[DivingCente
         if hasattr(center, 'tags') and center.tags:
             center_tags = [tag.name if hasattr(tag, 'name') else str(tag) for tag in center.tags]
         
-        weighted_score = calculate_unified_phrase_aware_score(query_lower, center.name, center.description, center.country, center.region, center.city, center_tags)
+        weighted_score = scorer.score(center.name, center.description, center.country, center.region, center.city, center_tags)
         
         # Check for partial matches (substring matches) for match type classification
         name_contains = query_lower in center.name.lower()
@@ -1150,6 +1169,7 @@ async def get_diving_centers(
 @router.post("/", response_model=DivingCenterResponse)
 async def create_diving_center(
     diving_center: DivingCenterCreate,
+    background_tasks: BackgroundTasks,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -1158,15 +1178,8 @@ async def create_diving_center(
     db.commit()
     db.refresh(db_diving_center)
 
-    # Notify users about new diving center
-    try:
-        notification_service = NotificationService()
-        await notification_service.notify_users_for_new_diving_center(db_diving_center.id, db)
-    except Exception as e:
-        # Log error but don't fail diving center creation
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"Failed to send notifications for new diving center: {e}")
+    # Notify users about new diving center after the response is sent
+    background_tasks.add_task(send_new_content_notifications, 'diving_center', db_diving_center.id)
 
     return {
         **diving_center.model_dump(),
@@ -1301,7 +1314,7 @@ async def get_diving_center(
 
     # Increment view count in the background without blocking the response
     from app.utils import increment_view_count
-    background_tasks.add_task(increment_view_count, db, DivingCenter, diving_center.id)
+    background_tasks.add_task(increment_view_count, DivingCenter, diving_center.id)
 
     # Check if reviews are enabled
     reviews_enabled = is_diving_center_reviews_enabled(db)
@@ -106,7 +106,7 @@ async def get_diving_organization(
 
     # Increment view count in the background without blocking the response
     from app.utils import increment_view_count
-    background_tasks.add_task(increment_view_count, db, DivingOrganization, organization.id)
+    background_tasks.add_task(increment_view_count, DivingOrganization, organization.id)
 
     return organization
 @router.get("/{identifier}/levels", response_model=List[CertificationLevelResponse])
@@ -205,7 +205,7 @@ async def get_list_by_id(
 
     # Track views
     if not is_owner:
-        background_tasks.add_task(increment_view_count, db, DiveSiteList, list_id)
+        background_tasks.add_task(increment_view_count, DiveSiteList, list_id)
 
     sanitize_list_for_response(lst)
     return lst
@@ -2261,7 +2261,7 @@ async def get_parsed_trip(
 
     # Increment view count in the background without blocking the response
     from app.utils import increment_view_count
-    background_tasks.add_task(increment_view_count, db, ParsedDiveTrip, trip.id)
+    background_tasks.add_task(increment_view_count, ParsedDiveTrip, trip.id)
 
     # Find matching user dives for this trip date to allow re-uploading profiles
     matching_user_dives_map = {}
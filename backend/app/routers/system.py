@@ -23,6 +23,7 @@ from app.schemas import (
 )
 from app.utils import get_client_ip, format_ip_for_logging
 from app.monitoring import get_turnstile_stats
+from app.services.open_meteo_service import get_wind_fetch_stats
 from app.services.r2_storage_service import r2_storage
 
 router = APIRouter()
@@ -1046,6 +1047,17 @@ async def get_turnstile_statistics(
             detail="Failed to retrieve Turnstile statistics"
         )
 
+@router.get("/wind-cache-stats")
+async def get_wind_cache_statistics(
+    current_user: User = Depends(get_current_admin_user)
+):
+    """Get Open-Meteo fetch and request coalescing counters for this worker"""
+
+    stats = get_wind_fetch_stats()
+    stats["timestamp"] = datetime.utcnow().isoformat()
+    stats["worker_pid"] = os.getpid()
+    return stats
+
 @router.get("/storage/health")
 def storage_health_check():
     """Check storage service health (R2 and local fallback)"""
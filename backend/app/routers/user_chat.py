@@ -1,14 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Query, Response
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload, selectinload
 from sqlalchemy import func, desc, or_, and_
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, timezone
+import asyncio
 import logging
 
 from fastapi import BackgroundTasks
 from app.database import get_db
 from app.utils import populate_avatar_full_url
-from app.models import User, UserChatRoom, UserChatRoomMember, UserChatMessage, DivingCenter, DivingCenterManager, BusinessChatStatus
+from app.models import User, UserChatRoom, UserChatRoomMember, UserChatMessage, DivingCenter, DivingCenterManager, DivingCenterChatSettings, BusinessChatStatus
 from app.auth import get_current_active_user
 from app.schemas.user_chat import (
     ChatRoomCreate, ChatRoomResponse, ChatRoomUpdate,
@@ -20,6 +22,9 @@ from app.services.encryption_service import (
     generate_room_dek, encrypt_room_dek, decrypt_message, encrypt_message
 )
 from app.services.sqs_service import SQSService
+from app.services.chat_events import (
+    CHAT_EVENTS_KEEPALIVE_SECONDS, chat_event_bus, format_sse, publish_message, publish_read
+)
 from app.services.chat import ChatService
 from app.schemas.chat import ChatRequest
 
@@ -57,6 +62,28 @@ def get_room_or_404(db: Session, room_id: str, user_id: int) -> tuple[UserChatRo
         
     return room, member
 
+def get_unread_counts(db: Session, user_id: int, room_ids: Optional[List[str]] = None) -> Dict[str, int]:
+    """
+    Unread message counts of a user's active memberships, in one grouped query.
+
+    Counts messages from others sent after the member joined and after they
+    last read the room. Rooms without unread messages are absent.
+    """
+    query = db.query(UserChatRoomMember.room_id, func.count(UserChatMessage.id)).join(
+        UserChatMessage, UserChatMessage.room_id == UserChatRoomMember.room_id
+    ).filter(
+        UserChatRoomMember.user_id == user_id,
+        UserChatRoomMember.left_at.is_(None),
+        UserChatMessage.created_at > UserChatRoomMember.last_read_at,
+        UserChatMessage.created_at >= UserChatRoomMember.joined_at, # Don't count messages before they joined
+        UserChatMessage.sender_id != user_id # Don't count own messages
+    )
+    if room_ids is not None:
+        if not room_ids:
+            return {}
+        query = query.filter(UserChatRoomMember.room_id.in_(room_ids))
+    return dict(query.group_by(UserChatRoomMember.room_id).all())
+
 async def process_bot_mention_task(room_id: str, user_message: str, sender_id: int, db: Session):
     """Background task to generate and inject a chatbot response into a chat room."""
     try:
@@ -304,16 +331,28 @@ async def list_chat_rooms(
         )
     ).order_by(desc(UserChatRoom.last_activity_at)).all()
     
-    # 4. Calculate unread counts
+    # 4. Calculate unread counts and prefetch quick replies (one query each)
+    memberships_by_room = {m.room_id: m for m in active_memberships}
+    unread_counts = get_unread_counts(db, current_user.id, personal_room_ids)
+
+    customer_center_ids = {
+        room.diving_center_id for room in rooms
+        if room.diving_center_id and room.diving_center_id not in managed_center_ids
+    }
+    quick_replies = {}
+    if customer_center_ids:
+        quick_replies = {
+            settings.diving_center_id: settings.quick_replies
+            for settings in db.query(DivingCenterChatSettings).filter(
+                DivingCenterChatSettings.diving_center_id.in_(customer_center_ids)
+            )
+            if settings.quick_replies
+        }
+
     for room in rooms:
-        # Fetch quick replies for customers interacting with business
-        if room.diving_center_id and room.diving_center_id not in managed_center_ids:
-            from app.models import DivingCenterChatSettings
-            settings = db.query(DivingCenterChatSettings).filter(
-                DivingCenterChatSettings.diving_center_id == room.diving_center_id
-            ).first()
-            if settings and settings.quick_replies:
-                room.quick_replies = settings.quick_replies
+        # Quick replies for customers interacting with business
+        if room.diving_center_id in quick_replies:
+            room.quick_replies = quick_replies[room.diving_center_id]
 
         # Check if it's a business room managed by the user
         if room.diving_center_id and room.diving_center_id in managed_center_ids:
@@ -326,15 +365,9 @@ async def list_chat_rooms(
         else:
             room.is_manager_view = False
             # Personal room logic
-            member_record = next((m for m in active_memberships if m.room_id == room.id), None)
+            member_record = memberships_by_room.get(room.id)
             if member_record:
-                unread_count = db.query(func.count(UserChatMessage.id)).filter(
-                    UserChatMessage.room_id == room.id,
-                    UserChatMessage.created_at > member_record.last_read_at,
-                    UserChatMessage.created_at >= member_record.joined_at, # Don't count messages before they joined
-                    UserChatMessage.sender_id != current_user.id # Don't count own messages
-                ).scalar()
-                room.unread_count = unread_count
+                room.unread_count = unread_counts.get(room.id, 0)
                 # Override room.is_archived with the user-specific member value
                 room.is_archived = member_record.is_archived
 
@@ -354,32 +387,52 @@ async def list_chat_rooms(
             
     return rooms
 
+@router.get("/events")
+async def stream_chat_events(
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Server-sent events stream of the current user's chat activity.
+
+    Pushes "message" (sent or edited, decrypted) and "unread" (count changes)
+    events for the user's rooms, and "resync" when the client fell behind and
+    should refetch. Replaces polling the messages and unread-count endpoints.
+    """
+    user_id = current_user.id
+    # Authentication is done; don't hold a pool connection for the whole stream
+    db.close()
+
+    queue = chat_event_bus.subscribe(user_id)
+
+    async def event_stream():
+        try:
+            yield "retry: 5000\n\n"
+            while not await request.is_disconnected():
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=CHAT_EVENTS_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                yield format_sse(event)
+        finally:
+            chat_event_bus.unsubscribe(user_id, queue)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.get("/unread-count", response_model=dict)
 async def get_total_unread_count(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
     """Get the total number of unread messages across all active chat rooms."""
-    # Find all rooms where user is an active member
-    active_memberships = db.query(UserChatRoomMember).filter(
-        UserChatRoomMember.user_id == current_user.id,
-        UserChatRoomMember.left_at.is_(None)
-    ).all()
-    
-    if not active_memberships:
-        return {"unread_count": 0}
-        
-    total_unread = 0
-    for member_record in active_memberships:
-        unread_count = db.query(func.count(UserChatMessage.id)).filter(
-            UserChatMessage.room_id == member_record.room_id,
-            UserChatMessage.created_at > member_record.last_read_at,
-            UserChatMessage.created_at >= member_record.joined_at,
-            UserChatMessage.sender_id != current_user.id
-        ).scalar()
-        total_unread += unread_count
-        
-    return {"unread_count": total_unread}
+    unread_counts = get_unread_counts(db, current_user.id)
+    return {"unread_count": sum(unread_counts.values())}
 
 @router.patch("/rooms/{room_id}/archive", response_model=ChatRoomResponse)
 async def toggle_room_archive(
@@ -490,6 +543,11 @@ async def send_message(
     db.commit()
     db.refresh(new_message)
     
+    # Push to connected clients
+    publish_message(db, room, new_message, message_in.content)
+    if member:
+        publish_read(member)
+    
     # Check for bot mentions to trigger AI response
     content_lower = message_in.content.lower()
     if "@bot" in content_lower or "@divemap" in content_lower:
@@ -551,6 +609,9 @@ async def edit_message(
     db.commit()
     db.refresh(message)
     
+    # Push to connected clients
+    publish_message(db, room, message, message_in.content)
+    
     # Return decrypted
     response_msg = ChatMessageResponse.model_validate(message)
     response_msg.content = message_in.content
@@ -668,6 +729,10 @@ async def mark_room_read(
         
     db.commit()
     
+    # Let the user's other open clients clear their unread badge
+    if member:
+        publish_read(member)
+    
     return {"status": "success"}
 
 @router.put("/rooms/{room_id}", response_model=ChatRoomResponse)
@@ -18,6 +18,7 @@ from app.schemas import (
 from app.auth import get_current_active_user, get_current_admin_user, get_password_hash, verify_password, is_admin_or_moderator, get_current_user_optional
 from app.services.r2_storage_service import r2_storage
 from app.services.image_processing import image_processing
+from app.services.pat_verification_cache import invalidate_pat
 from app.limiter import skip_rate_limit_for_admin
 from app.utils import utcnow, populate_avatar_full_url
 from sqlalchemy import func, extract, desc, distinct
@@ -1923,6 +1924,7 @@ async def delete_pat(
     
     db.delete(pat)
     db.commit()
+    invalidate_pat(token_id)
     
     return {"message": "Token revoked successfully"}
 
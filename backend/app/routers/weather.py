@@ -9,10 +9,11 @@ from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.orm import Session
 from pydantic import BaseModel, Field
 from datetime import datetime, timedelta
+from fastapi.concurrency import run_in_threadpool
 
 from app.database import get_db
 from app.auth import get_current_user_optional
-from app.services.open_meteo_service import fetch_wind_data_single_point, fetch_wind_data_grid
+from app.services.open_meteo_service import fetch_wind_data_single_point, fetch_wind_data_grid_async
 import logging
 
 logger = logging.getLogger(__name__)
@@ -105,7 +106,7 @@ async def get_wind_data(
         # Validate input: must have either (lat, lon) or bounds
         if latitude is not None and longitude is not None:
             # Single point query
-            wind_data = fetch_wind_data_single_point(latitude, longitude, target_datetime)
+            wind_data = await run_in_threadpool(fetch_wind_data_single_point, latitude, longitude, target_datetime)
             if not wind_data:
                 raise HTTPException(
                     status_code=503,
@@ -157,7 +158,7 @@ async def get_wind_data(
                     detail="East bound must be greater than west bound"
                 )
             
-            wind_data_points = fetch_wind_data_grid(bounds, zoom_level, target_datetime, jitter_factor)
+            wind_data_points = await fetch_wind_data_grid_async(bounds, zoom_level, target_datetime, jitter_factor)
             
             points = [
                 WindDataPoint(
@@ -366,6 +366,29 @@ class DiveSiteListResponse(BaseModel):
     has_next_page: bool
     has_prev_page: bool
 
+class DiveSiteCluster(BaseModel):
+    id: int  # Representative dive site (the site itself when count is 1)
+    latitude: float
+    longitude: float
+    count: int
+    # Popup details, only for cells holding a single site
+    name: Optional[str] = None
+    difficulty_code: Optional[str] = None
+    difficulty_label: Optional[str] = None
+    average_rating: Optional[float] = None
+
+class DiveSiteClusterResponse(BaseModel):
+    zoom: int
+    total: int
+    clusters: List[DiveSiteCluster]
+
+class DiveSitePointsResponse(BaseModel):
+    version: str  # Catalog version the points belong to
+    count: int
+    ids: List[int]
+    latitudes: List[float]
+    longitudes: List[float]
+
 # Site Rating Schemas
 class SiteRatingCreate(BaseModel):
     score: float = Field(..., ge=1, le=10)
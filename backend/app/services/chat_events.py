@@ -0,0 +1,391 @@
+"""
+Server push for buddy chat.
+
+Open chats used to poll for new messages every few seconds and the inbox for
+unread counts, each poll paying for authentication, a room lookup and a
+cursor query even when nothing had changed.
+
+Clients now keep one server-sent events stream open (GET
+/api/v1/user-chat/events) and are told when something happens:
+
+- "message": a message was sent or edited in one of their rooms
+- "unread": their unread count for a room changed ("delta" for a new message
+  from someone else, "count": 0 when they read the room on another device)
+
+Events are routed through an in-process ChatEventBus. send_message,
+edit_message and mark_room_read publish to it directly; a pluggable backend
+carries events between workers. The default backend polls the database, one
+poller per worker (not per client) and only while that worker has connected
+clients. Events are deduplicated by key, so a worker's own changes seen
+again by its poller are not delivered twice.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import orjson
+from cachetools import TTLCache
+from sqlalchemy import func, tuple_
+from sqlalchemy.orm import Session
+
+from app.models import (
+    DivingCenter, DivingCenterManager, UserChatMessage, UserChatRoom, UserChatRoomMember
+)
+from app.schemas.user_chat import ChatMessageBaseResponse
+from app.services.encryption_service import decrypt_message
+
+logger = logging.getLogger(__name__)
+
+CHAT_EVENTS_BACKEND = os.getenv("CHAT_EVENTS_BACKEND", "database")
+CHAT_EVENTS_POLL_INTERVAL_SECONDS = float(os.getenv("CHAT_EVENTS_POLL_INTERVAL_SECONDS", "2"))
+CHAT_EVENTS_KEEPALIVE_SECONDS = int(os.getenv("CHAT_EVENTS_KEEPALIVE_SECONDS", "15"))
+
+# Events buffered per connection; a client that falls further behind is told to resync
+_QUEUE_SIZE = 100
+# Rows read per database poll
+_POLL_BATCH_SIZE = 500
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    """Encode an event as a server-sent events frame."""
+    return f"event: {event['type']}\ndata: {orjson.dumps(event).decode('utf-8')}\n\n"
+
+
+def room_audiences(db: Session, rooms: Iterable[UserChatRoom]) -> Dict[str, Dict[int, Optional[datetime]]]:
+    """
+    Users who see each room, with the time they joined: active members, plus
+    the managers and owner of the diving center for business rooms (they
+    share the center inbox; None unless they are members themselves).
+    """
+    rooms = list(rooms)
+    audiences: Dict[str, Dict[int, Optional[datetime]]] = {room.id: {} for room in rooms}
+    if not rooms:
+        return audiences
+
+    for room_id, user_id, joined_at in db.query(
+        UserChatRoomMember.room_id, UserChatRoomMember.user_id, UserChatRoomMember.joined_at
+    ).filter(
+        UserChatRoomMember.room_id.in_(list(audiences)),
+        UserChatRoomMember.left_at.is_(None)
+    ):
+        audiences[room_id][user_id] = joined_at
+
+    center_ids = {room.diving_center_id for room in rooms if room.diving_center_id}
+    if center_ids:
+        staff: Dict[int, Set[int]] = defaultdict(set)
+        for center_id, user_id in db.query(DivingCenterManager.diving_center_id, DivingCenterManager.user_id).filter(
+            DivingCenterManager.diving_center_id.in_(center_ids)
+        ):
+            staff[center_id].add(user_id)
+        for center_id, owner_id in db.query(DivingCenter.id, DivingCenter.owner_id).filter(
+            DivingCenter.id.in_(center_ids),
+            DivingCenter.owner_id.is_not(None)
+        ):
+            staff[center_id].add(owner_id)
+        for room in rooms:
+            if room.diving_center_id:
+                for user_id in staff[room.diving_center_id]:
+                    audiences[room.id].setdefault(user_id, None)
+    return audiences
+
+
+def _naive(value: datetime) -> datetime:
+    return value.replace(tzinfo=None) if value.tzinfo else value
+
+
+def message_recipient_ids(audience: Dict[int, Optional[datetime]], message: UserChatMessage) -> Set[int]:
+    """
+    Users of a room's audience who may see a message: like the message
+    history, members only see messages sent since they joined.
+    """
+    sent_at = _naive(message.created_at)
+    return {
+        user_id for user_id, joined_at in audience.items()
+        if joined_at is None or _naive(joined_at) <= sent_at
+    }
+
+
+def message_event(message: UserChatMessage, content: str) -> Dict[str, Any]:
+    payload = ChatMessageBaseResponse.model_validate(message)
+    payload.content = content
+    return {
+        "type": "message",
+        "key": f"message:{message.id}:{message.updated_at.isoformat()}",
+        "room_id": message.room_id,
+        "message": payload.model_dump(mode="json"),
+    }
+
+
+def read_event(member: UserChatRoomMember) -> Dict[str, Any]:
+    return {
+        "type": "read",
+        "key": f"read:{member.room_id}:{member.user_id}:{member.last_read_at.isoformat()}",
+        "room_id": member.room_id,
+        "user_id": member.user_id,
+    }
+
+
+class ChatEventBus:
+    """Routes chat events to the event streams of the users they concern."""
+
+    def __init__(self, backend: Optional["ChatEventBackend"] = None):
+        self.backend = backend or LocalChatEventBackend()
+        self._lock = threading.Lock()
+        self._subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self._seen: TTLCache = TTLCache(maxsize=10000, ttl=600)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        queue: asyncio.Queue = asyncio.Queue(maxsize=_QUEUE_SIZE)
+        with self._lock:
+            self._loop = asyncio.get_running_loop()
+            self._subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue) -> None:
+        with self._lock:
+            queues = self._subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self._subscribers[user_id]
+
+    def has_subscribers(self) -> bool:
+        with self._lock:
+            return bool(self._subscribers)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._subscribers.clear()
+            self._seen.clear()
+
+    def publish(self, event: Dict[str, Any], recipient_ids: Iterable[int], forward: bool = True) -> None:
+        """
+        Deliver an event to connected recipients.
+
+        forward=False is used by backends delivering events that came from
+        another worker, so they are not sent back out.
+        """
+        recipient_ids = set(recipient_ids)
+        with self._lock:
+            if event["key"] in self._seen:
+                return
+            self._seen[event["key"]] = True
+            targets = [
+                (user_id, queue)
+                for user_id in recipient_ids
+                for queue in self._subscribers.get(user_id, ())
+            ]
+            loop = self._loop
+        if forward:
+            try:
+                self.backend.forward(event, recipient_ids)
+            except Exception as e:
+                logger.error(f"[CHAT EVENTS] Failed to forward event: {e}")
+        if not targets:
+            return
+
+        deliveries = [(queue, frame) for user_id, queue in targets for frame in self._frames_for(event, user_id)]
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            self._deliver(deliveries)
+        elif loop is not None and not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, deliveries)
+
+    @staticmethod
+    def _frames_for(event: Dict[str, Any], user_id: int) -> List[Dict[str, Any]]:
+        """What a given recipient is sent for an event."""
+        if event["type"] == "message":
+            frames = [{"type": "message", "room_id": event["room_id"], "message": event["message"]}]
+            message = event["message"]
+            if not message["is_edited"] and message["sender_id"] != user_id:
+                frames.append({"type": "unread", "room_id": event["room_id"], "delta": 1})
+            return frames
+        if event["type"] == "read" and event["user_id"] == user_id:
+            return [{"type": "unread", "room_id": event["room_id"], "count": 0}]
+        return []
+
+    @staticmethod
+    def _deliver(deliveries: List[Tuple[asyncio.Queue, Dict[str, Any]]]) -> None:
+        for queue, frame in deliveries:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                # The client fell behind: drop its backlog and have it refetch
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait({"type": "resync"})
+
+    async def run_backend(self) -> None:
+        """Run the cross-worker backend until cancelled."""
+        await self.backend.run(self)
+
+
+class ChatEventBackend:
+    """Carries chat events between workers."""
+
+    # Whether locally published events must be handed to forward() even when
+    # this worker has no connected clients
+    forwards_events = False
+
+    def forward(self, event: Dict[str, Any], recipient_ids: Set[int]) -> None:
+        """Hand a locally published event to the other workers."""
+
+    async def run(self, bus: ChatEventBus) -> None:
+        """Deliver events from other workers to bus.publish(..., forward=False)."""
+        await asyncio.Event().wait()
+
+
+class LocalChatEventBackend(ChatEventBackend):
+    """Single worker deployments: nothing to carry."""
+
+
+class DatabasePollingChatEventBackend(ChatEventBackend):
+    """
+    Reads recent changes from the chat tables.
+
+    The database already is the shared state, so forward() has nothing to do;
+    each worker polls for messages and read markers changed since its cursor.
+    """
+
+    def __init__(self, interval_seconds: float = CHAT_EVENTS_POLL_INTERVAL_SECONDS, session_factory=None):
+        self.interval_seconds = interval_seconds
+        self.session_factory = session_factory
+
+    def _session(self) -> Session:
+        if self.session_factory is not None:
+            return self.session_factory()
+        from app.database import SessionLocal
+        return SessionLocal()
+
+    def current_cursor(self):
+        """
+        Database time, backed off one poll so nothing sent while connecting is
+        missed, as a (messages, read markers) cursor pair.
+
+        Each stream's position is its timestamp plus the primary key of the
+        last row read there, so batches page past rows sharing a timestamp.
+        """
+        db = self._session()
+        try:
+            now = db.query(func.now()).scalar()
+        finally:
+            db.close()
+        if isinstance(now, str):
+            now = datetime.fromisoformat(now)
+        start = now - timedelta(seconds=self.interval_seconds)
+        return (start, 0), (start, "", 0)
+
+    def poll(self, cursor) -> Tuple[List[Tuple[Dict[str, Any], Set[int]]], Any]:
+        """
+        Events for changes after cursor, and the next cursor.
+
+        Messages and read markers are separate streams read in batches, so
+        each keeps its own position (see current_cursor). Ordering by
+        timestamp and then primary key lets a full batch of rows with the
+        same timestamp move the position forward.
+        """
+        message_position, read_position = cursor
+        message_key = (UserChatMessage.updated_at, UserChatMessage.id)
+        read_key = (UserChatRoomMember.last_read_at, UserChatRoomMember.room_id, UserChatRoomMember.user_id)
+        db = self._session()
+        try:
+            rows = db.query(UserChatMessage, UserChatRoom).join(
+                UserChatRoom, UserChatRoom.id == UserChatMessage.room_id
+            ).filter(
+                tuple_(*message_key) > tuple_(*message_position)
+            ).order_by(*message_key).limit(_POLL_BATCH_SIZE).all()
+            reads = db.query(UserChatRoomMember).filter(
+                tuple_(*read_key) > tuple_(*read_position),
+                UserChatRoomMember.left_at.is_(None)
+            ).order_by(*read_key).limit(_POLL_BATCH_SIZE).all()
+
+            rooms = {room.id: room for _, room in rows}
+            audiences = room_audiences(db, rooms.values())
+            events = [
+                (
+                    message_event(message, decrypt_message(message.content, room.encrypted_dek)),
+                    message_recipient_ids(audiences[room.id], message)
+                )
+                for message, room in rows
+            ]
+            events.extend((read_event(member), {member.user_id}) for member in reads)
+
+            if rows:
+                last_message = rows[-1][0]
+                message_position = (last_message.updated_at, last_message.id)
+            if reads:
+                last_read = reads[-1]
+                read_position = (last_read.last_read_at, last_read.room_id, last_read.user_id)
+            next_cursor = (message_position, read_position)
+            return events, next_cursor
+        finally:
+            db.close()
+
+    async def run(self, bus: ChatEventBus) -> None:
+        cursor = None
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            if not bus.has_subscribers():
+                # Nobody to tell; start from "now" when someone connects
+                # (clients load history through the REST endpoints)
+                cursor = None
+                continue
+            try:
+                if cursor is None:
+                    cursor = await asyncio.to_thread(self.current_cursor)
+                events, cursor = await asyncio.to_thread(self.poll, cursor)
+                for event, recipient_ids in events:
+                    bus.publish(event, recipient_ids, forward=False)
+            except Exception as e:
+                logger.error(f"[CHAT EVENTS] Poll failed: {e}", exc_info=True)
+
+
+CHAT_EVENT_BACKENDS = {
+    "local": LocalChatEventBackend,
+    "database": DatabasePollingChatEventBackend,
+}
+
+
+def _create_backend() -> ChatEventBackend:
+    backend_class = CHAT_EVENT_BACKENDS.get(CHAT_EVENTS_BACKEND)
+    if backend_class is None:
+        logger.warning(f"[CHAT EVENTS] Unknown backend '{CHAT_EVENTS_BACKEND}', using local")
+        backend_class = LocalChatEventBackend
+    return backend_class()
+
+
+chat_event_bus = ChatEventBus(_create_backend())
+
+
+def _has_audience() -> bool:
+    return chat_event_bus.has_subscribers() or chat_event_bus.backend.forwards_events
+
+
+def publish_message(db: Session, room: UserChatRoom, message: UserChatMessage, content: str) -> None:
+    """Publish a sent or edited message (after commit and refresh)."""
+    if not _has_audience():
+        return
+    try:
+        recipients = message_recipient_ids(room_audiences(db, [room])[room.id], message)
+        chat_event_bus.publish(message_event(message, content), recipients)
+    except Exception as e:
+        logger.error(f"[CHAT EVENTS] Failed to publish message {message.id}: {e}")
+
+
+def publish_read(member: UserChatRoomMember) -> None:
+    """Publish that a member read a room (after commit)."""
+    if not _has_audience():
+        return
+    try:
+        chat_event_bus.publish(read_event(member), {member.user_id})
+    except Exception as e:
+        logger.error(f"[CHAT EVENTS] Failed to publish read marker of room {member.room_id}: {e}")
@@ -0,0 +1,155 @@
+"""
+Dive Site Cover Media
+
+Each dive site keeps a denormalized `cover_media_key`: the key ("site_<id>" or
+"dive_<id>", as in `media_order`) of the first item of its media gallery.
+Listings load just that row by primary key, instead of every SiteMedia and
+DiveMedia row of the page, and the thumbnail no longer changes per request.
+
+The cover follows the gallery order of `GET /dive-sites/{id}/media`: the
+first key of `media_order` that still exists, otherwise the first of the
+remaining keys in sorted order.
+
+A session ``after_flush`` hook recomputes the cover of every site whose media,
+media order or dives changed in the flush, within the same transaction.
+Writes that bypass the ORM should call `refresh_cover_media()`.
+"""
+
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select, update
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import Dive, DiveMedia, DiveSite, SiteMedia
+
+
+def select_cover_key(keys: Iterable[str], media_order: Optional[List[str]]) -> Optional[str]:
+    """Key of the first item of a site's media gallery, or None without media."""
+    keys = set(keys)
+    for key in media_order or []:
+        if key in keys:
+            return key
+    return min(keys) if keys else None
+
+
+def refresh_cover_media(db, site_ids: Iterable[int]) -> None:
+    """
+    Recompute the cover of the given dive sites.
+
+    Args:
+        db: Session or Connection to run the queries on (inside a flush,
+            pass the session's connection)
+        site_ids: Dive sites to update
+    """
+    site_ids = {site_id for site_id in site_ids if site_id is not None}
+    if not site_ids:
+        return
+
+    keys: Dict[int, List[str]] = defaultdict(list)
+    for site_id, media_id in db.execute(
+        select(SiteMedia.dive_site_id, SiteMedia.id).where(SiteMedia.dive_site_id.in_(site_ids))
+    ):
+        keys[site_id].append(f"site_{media_id}")
+    for site_id, media_id in db.execute(
+        select(Dive.dive_site_id, DiveMedia.id).join(Dive, DiveMedia.dive_id == Dive.id).where(
+            Dive.dive_site_id.in_(site_ids)
+        )
+    ):
+        keys[site_id].append(f"dive_{media_id}")
+
+    sites = db.execute(
+        select(DiveSite.id, DiveSite.media_order, DiveSite.cover_media_key).where(DiveSite.id.in_(site_ids))
+    ).all()
+    for site_id, media_order, current in sites:
+        cover = select_cover_key(keys[site_id], media_order)
+        if cover == current:
+            continue
+        # Keep updated_at: a new cover is not an edit of the site
+        db.execute(
+            update(DiveSite.__table__)
+            .where(DiveSite.__table__.c.id == site_id)
+            .values(cover_media_key=cover, updated_at=DiveSite.__table__.c.updated_at)
+        )
+
+
+def load_cover_media(db: Session, keys: Iterable[Optional[str]]) -> Dict[str, Tuple[object, str]]:
+    """
+    Cover media rows by key, as (row, source) with source 'site_media' or
+    'dive_media'. Rows carry id, media_type, url and thumbnail_url; keys whose
+    media no longer exists are left out.
+    """
+    site_ids, dive_ids = set(), set()
+    for key in keys:
+        if not key:
+            continue
+        prefix, _, media_id = key.partition("_")
+        if not media_id.isdigit():
+            continue
+        if prefix == "site":
+            site_ids.add(int(media_id))
+        elif prefix == "dive":
+            dive_ids.add(int(media_id))
+
+    covers = {}
+    if site_ids:
+        for row in db.query(SiteMedia.id, SiteMedia.media_type, SiteMedia.url, SiteMedia.thumbnail_url).filter(
+            SiteMedia.id.in_(site_ids)
+        ):
+            covers[f"site_{row.id}"] = (row, 'site_media')
+    if dive_ids:
+        for row in db.query(DiveMedia.id, DiveMedia.media_type, DiveMedia.url, DiveMedia.thumbnail_url).filter(
+            DiveMedia.id.in_(dive_ids)
+        ):
+            covers[f"dive_{row.id}"] = (row, 'dive_media')
+    return covers
+
+
+def _changed_values(obj, attribute: str) -> Set:
+    history = inspect(obj).attrs[attribute].history
+    return {value for value in [*(history.added or ()), *(history.deleted or ())] if value is not None}
+
+
+@event.listens_for(Session, "after_flush")
+def _track_cover_media_changes(session, flush_context):
+    """Recompute the covers of dive sites whose gallery changed in this flush."""
+    touched: Set[int] = set()
+    dive_ids: Set[int] = set()
+    for obj in list(session.new) + list(session.deleted):
+        if isinstance(obj, SiteMedia):
+            touched.add(obj.dive_site_id)
+        elif isinstance(obj, DiveMedia):
+            dive_ids.add(obj.dive_id)
+        elif isinstance(obj, Dive) and obj in session.deleted:
+            touched.add(obj.dive_site_id)
+    for obj in session.dirty:
+        if isinstance(obj, DiveSite) and inspect(obj).attrs.media_order.history.has_changes():
+            touched.add(obj.id)
+        elif isinstance(obj, Dive):
+            touched |= _changed_values(obj, 'dive_site_id')
+        elif isinstance(obj, DiveMedia):
+            dive_ids |= _changed_values(obj, 'dive_id')
+        elif isinstance(obj, SiteMedia):
+            touched |= _changed_values(obj, 'dive_site_id')
+
+    dive_ids.discard(None)
+    touched.discard(None)
+    if not touched and not dive_ids:
+        return
+
+    connection = session.connection()
+    if dive_ids:
+        touched.update(connection.execute(
+            select(Dive.dive_site_id).where(Dive.id.in_(dive_ids))
+        ).scalars())
+        touched.discard(None)
+
+    refresh_cover_media(connection, touched)
+    # Keep loaded sites in step with the row, without marking them dirty
+    for site_id, cover in connection.execute(
+        select(DiveSite.id, DiveSite.cover_media_key).where(DiveSite.id.in_(touched))
+    ):
+        site = session.identity_map.get(session.identity_key(DiveSite, site_id))
+        if site is not None:
+            set_committed_value(site, 'cover_media_key', cover)
@@ -1,125 +1,247 @@
 from typing import List, Dict, Any, Optional, Tuple
 
+import numpy as np
+
+# Bühlmann ZH-L16C coefficients (variant 1a, as octo-deco's Buhlmann model uses).
+# Half-times in minutes; a in bar, b dimensionless.
+N2_HALF_TIMES = np.array([
+    4.0, 8.0, 12.5, 18.5, 27.0, 38.3, 54.3, 77.0,
+    109.0, 146.0, 187.0, 239.0, 305.0, 390.0, 498.0, 635.0
+])
+N2_A = np.array([
+    1.2599, 1.0, 0.8618, 0.7562, 0.62, 0.5043, 0.441, 0.4,
+    0.375, 0.35, 0.3295, 0.3065, 0.2835, 0.261, 0.248, 0.2327
+])
+N2_B = np.array([
+    0.505, 0.6514, 0.7222, 0.7825, 0.8126, 0.8434, 0.8693, 0.891,
+    0.9092, 0.9222, 0.9319, 0.9403, 0.9477, 0.9544, 0.9602, 0.9653
+])
+HE_HALF_TIMES = np.array([
+    1.51, 3.02, 4.72, 6.99, 10.21, 14.48, 20.53, 29.11,
+    41.2, 55.19, 70.69, 90.34, 115.29, 147.42, 188.24, 240.03
+])
+HE_A = np.array([
+    1.7424, 1.383, 1.1919, 1.0458, 0.922, 0.8205, 0.7305, 0.6502,
+    0.595, 0.5545, 0.5333, 0.5189, 0.5181, 0.5176, 0.5172, 0.5119
+])
+HE_B = np.array([
+    0.4245, 0.5747, 0.6527, 0.7223, 0.7582, 0.7957, 0.8279, 0.8553,
+    0.8757, 0.8903, 0.8997, 0.9073, 0.9122, 0.9171, 0.9217, 0.9267
+])
+
+N2_K = np.log(2.0) / N2_HALF_TIMES
+HE_K = np.log(2.0) / HE_HALF_TIMES
+
+# Model constants, as in octo-deco's Util and TissueState
+SURFACE_PRESSURE = 1.01325  # bar
+BAR_PER_METER = 1020 * 9.80 * 1e-5  # EN13319 water density
+WATER_VAPOUR_PRESSURE = 0.0627  # bar
+CO2_PRESSURE = 0.0534  # bar
+RESPIRATORY_QUOTIENT = 0.9
+AIR_N2_FRACTION = 0.79
+
+# Ceilings and heatmap rows are reported against 1 bar and 10 m per bar, as
+# stored profile artifacts always have been
+_REPORT_SURFACE_PRESSURE = 1.0
+_REPORT_METER_PER_BAR = 10.0
+
+# Largest exponent accumulated inside one vectorized segment, keeps exp() finite
+_MAX_SEGMENT_EXPONENT = 300.0
+
+
+def depth_to_pamb(depth):
+    """Ambient pressure in bar for a depth in metres of water."""
+    return SURFACE_PRESSURE + np.asarray(depth, dtype=float) * BAR_PER_METER
+
+
+def amb_to_alveolar(p_amb):
+    """Alveolar inert gas pressure for an ambient pressure (Schreiner, RQ 0.9)."""
+    return p_amb - WATER_VAPOUR_PRESSURE + (1.0 - RESPIRATORY_QUOTIENT) / RESPIRATORY_QUOTIENT * CO2_PRESSURE
+
+
+def _parse_fraction(val) -> Optional[float]:
+    if val is None:
+        return None
+    if isinstance(val, str):
+        val = val.replace('%', '').strip()
+    try:
+        return float(val)
+    except ValueError:
+        return None
+
+
+def _cylinder_gas(cylinder: Dict[str, Any]) -> Tuple[float, float]:
+    """(fN2, fHe) of a cylinder; o2/he are given in percent, missing values mean air."""
+    o2 = _parse_fraction(cylinder.get('o2'))
+    he = _parse_fraction(cylinder.get('he'))
+    if o2 is None and he is None:
+        return AIR_N2_FRACTION, 0.0
+    if he is None or he == 0:
+        return 1.0 - (o2 or 21.0) / 100.0, 0.0
+    return 1.0 - ((o2 or 21.0) + he) / 100.0, he / 100.0
+
+
+def _gas_switch_index(
+    times: np.ndarray,
+    cylinders: Optional[List[Dict[str, Any]]],
+    events: Optional[List[Dict[str, Any]]]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Resolve the breathing gas of every sample with one searchsorted over the
+    sorted switch times instead of a scan per sample.
+
+    Returns per-sample fN2 and fHe arrays. A sample breathes
+    the gas of the latest switch at or before its own time; samples before
+    the first switch keep the previous sample's gas.
+    """
+    gas_map = {}
+    if cylinders:
+        for i, c in enumerate(cylinders):
+            gas = _cylinder_gas(c)
+            # Events reference cylinders both 0- and 1-based
+            gas_map[str(i)] = gas
+            gas_map[str(i + 1)] = gas
+
+    switches = {}
+    if events:
+        for e in events:
+            if (e.get('name') == 'gaschange' or e.get('type') == '25') and 'cylinder' in e:
+                cyl_idx = str(e.get('cylinder'))
+                if cyl_idx in gas_map:
+                    switches[e.get('time_minutes', 0)] = gas_map[cyl_idx]
+
+    f_n2 = np.full(len(times), AIR_N2_FRACTION)
+    f_he = np.zeros(len(times))
+    if not switches:
+        return f_n2, f_he
+
+    switch_times = sorted(switches.keys())
+    switch_n2 = np.array([switches[t][0] for t in switch_times])
+    switch_he = np.array([switches[t][1] for t in switch_times])
+
+    idx = np.searchsorted(np.asarray(switch_times, dtype=float), times, side='right') - 1
+    # Carry the previous sample's gas forward where no switch applies yet
+    positions = np.where(idx >= 0, np.arange(len(times)), -1)
+    last_valid = np.maximum.accumulate(positions)
+    idx = np.where(last_valid >= 0, idx[np.maximum(last_valid, 0)], -1)
+
+    on_switch = idx >= 0
+    f_n2[on_switch] = switch_n2[idx[on_switch]]
+    f_he[on_switch] = switch_he[idx[on_switch]]
+    return f_n2, f_he
+
+
+def _segment_bounds(exponents: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Split the intervals into segments whose accumulated exponent stays below
+    _MAX_SEGMENT_EXPONENT, so exp() of the running sum remains finite.
+    """
+    cumulative = np.cumsum(np.abs(exponents))
+    bounds = []
+    start = 0
+    while start < len(exponents):
+        offset = cumulative[start - 1] if start else 0.0
+        end = int(np.searchsorted(cumulative, offset + _MAX_SEGMENT_EXPONENT, side='right'))
+        end = max(end, start + 1)
+        bounds.append((start, end))
+        start = end
+    return bounds
+
+
+def _load_tissues(
+    p_start: np.ndarray,
+    p_inspired: np.ndarray,
+    durations: np.ndarray,
+    k: np.ndarray
+) -> np.ndarray:
+    """
+    Tissue pressures after each interval at constant inspired pressure
+    (Haldane): p_i = p_insp_i + (p_{i-1} - p_insp_i) * exp(-k * dt_i).
+
+    The recurrence is linear, so within a segment it is evaluated in closed
+    form with cumulative sums instead of one step per sample:
+    p_i = E_i * (p_0 + sum_j p_insp_j * (1 - e_j) / E_j), E_i = prod_j e_j.
+
+    Args:
+        p_start: Tissue pressures before the first interval, shape (16,)
+        p_inspired: Inspired inert gas pressure per interval, shape (n,)
+        durations: Interval lengths in minutes, shape (n,)
+        k: Compartment rate constants, shape (16,)
+
+    Returns:
+        Tissue pressures after every interval, shape (n, 16)
+    """
+    # A single interval this long saturates every compartment; clipping keeps it finite
+    exponents = np.clip(durations[:, None] * k[None, :], -_MAX_SEGMENT_EXPONENT, _MAX_SEGMENT_EXPONENT)
+    result = np.empty((len(durations), len(k)))
+    p = p_start
+    for start, end in _segment_bounds(exponents[:, np.argmax(k)]):
+        exponent = exponents[start:end]
+        cumulative = np.cumsum(exponent, axis=0)
+        decay = np.exp(-exponent)
+        inflow = p_inspired[start:end, None] * (1.0 - decay) * np.exp(cumulative)
+        segment = np.exp(-cumulative) * (p[None, :] + np.cumsum(inflow, axis=0))
+        result[start:end] = segment
+        p = segment[-1]
+    return result
+
+
 def calculate_deco_ceiling(
-    samples: List[Dict[str, Any]], 
-    gf_low: int = 30, 
+    samples: List[Dict[str, Any]],
+    gf_low: int = 30,
     gf_high: int = 70,
     cylinders: Optional[List[Dict[str, Any]]] = None,
     events: Optional[List[Dict[str, Any]]] = None
 ) -> Tuple[List[float], Optional[List[float]], Optional[List[List[float]]]]:
     """
     Calculate the decompression ceiling, final tissue saturation, and heatmap data.
-    Uses octo-deco's internal Bühlmann ZH-L16 implementation.
-    
-    This implementation avoids using the 'DiveProfile' wrapper to bypass 
-    heavy 'pandas' dependencies during common listing requests.
+    Follows octo-deco's Buhlmann/TissueState (ZH-L16C 1a, updated_state,
+    p_ceiling_for_gf_now, GF99s) with the same constants, but with the 16
+    compartments held in NumPy arrays and all samples evaluated at once.
+
+    Each interval between samples loads the tissues at the mean ambient
+    pressure of its two samples, breathing the gas active at the later sample.
+    The ceiling is the surface-relative ceiling for gf_high, and a heatmap row
+    holds each compartment's GF99 at the surface.
     """
     if not samples:
         return [], None, None
 
-    # Defer heavy engine import to local scope
-    from octodeco.deco.Buhlmann import Buhlmann
-    from octodeco.deco.Gas import Air, Nitrox, Trimix
-    from octodeco.deco import Util
+    # 1. Sample arrays
+    times = np.array([s.get('time_minutes', 0) for s in samples], dtype=float)
+    p_amb = depth_to_pamb([s['depth'] for s in samples])
 
-    # 1. Setup Gases
-    gas_map = {}
-    default_gas = Air()
-    
-    def parse_fraction(val):
-        if val is None: return None
-        if isinstance(val, str):
-            val = val.replace('%', '').strip()
-        try:
-            return float(val)
-        except ValueError:
-            return None
+    # Normalize time to start at 0.0
+    normalized = np.maximum(0.0, times - times[0])
+    durations = np.diff(normalized)
+    p_amb_section = (p_amb[1:] + p_amb[:-1]) / 2.0
+
+    # 2. Gas per interval (the gas active at the interval's end sample)
+    f_n2, f_he = _gas_switch_index(times, cylinders, events)
+    p_alveolar = amb_to_alveolar(p_amb_section)
+
+    # 3. Tissue loading, starting from tissues saturated with air at the surface
+    n2_surface = np.full(16, amb_to_alveolar(SURFACE_PRESSURE) * AIR_N2_FRACTION)
+    p_n2 = np.vstack([n2_surface, _load_tissues(n2_surface, p_alveolar * f_n2[1:], durations, N2_K)])
+    p_he = np.vstack([np.zeros(16), _load_tissues(np.zeros(16), p_alveolar * f_he[1:], durations, HE_K)])
+
+    # 4. Combined M-value coefficients, weighted by inert gas pressures
+    p_total = p_n2 + p_he
+    a = (N2_A * p_n2 + HE_A * p_he) / p_total
+    b = (N2_B * p_n2 + HE_B * p_he) / p_total
+
+    # Ceiling, as octo-deco's p_ceiling_for_gf_now(gf_high / 100.0). That
+    # method takes a percentage, so the factor is gf_high / 10000; stored
+    # artifacts were computed this way.
+    gf = gf_high / 100.0 / 100.0
+    p_ceiling = ((p_total - gf * a) / (gf / b + 1.0 - gf)).max(axis=1)
+    ceilings = np.round(np.maximum(0.0, (p_ceiling - _REPORT_SURFACE_PRESSURE) * _REPORT_METER_PER_BAR), 2)
+
+    # Heatmap row (GF99 relative to surface)
+    m_value = a + _REPORT_SURFACE_PRESSURE / b
+    gf99 = (p_total - _REPORT_SURFACE_PRESSURE) / (m_value - _REPORT_SURFACE_PRESSURE) * 100.0
+    heatmap_data = np.round(gf99, 1).tolist()
 
-    if cylinders:
-        for i, c in enumerate(cylinders):
-            o2 = parse_fraction(c.get('o2'))
-            he = parse_fraction(c.get('he'))
-            
-            if o2 is None and he is None:
-                g = Air()
-            elif he is None or he == 0:
-                g = Nitrox(o2 or 21.0)
-            else:
-                g = Trimix(o2 or 21.0, he)
-            
-            gas_map[str(i)] = g
-            gas_map[str(i+1)] = g
-
-    # 2. Extract Gas Switches
-    switches = {}
-    if events:
-        for e in events:
-            if (e.get('name') == 'gaschange' or e.get('type') == '25') and 'cylinder' in e:
-                time_mins = e.get('time_minutes', 0)
-                cyl_idx = str(e.get('cylinder'))
-                if cyl_idx in gas_map:
-                    switches[time_mins] = gas_map[cyl_idx]
-
-    # 3. Initialize Model
-    # Note: DiveProfile usually handles some defaults, we pass them manually here.
-    # Note the spelling: 'gas_swich_mins' (missing 't') is how it's defined in octo-deco.
-    deco_model = Buhlmann(
-        gf_low, gf_high, 
-        descent_speed=20, 
-        ascent_speed=10, 
-        max_pO2_deco=1.6, 
-        gas_swich_mins=3.0, 
-        last_stop_depth=3
-    )
-    
-    # Feed samples and update tissues
-    first_sample_time = samples[0].get('time_minutes', 0)
-    current_gas = default_gas
-    sorted_switch_times = sorted(switches.keys())
-    
-    # Initialize state at surface
-    current_tissue_state = deco_model.cleared_tissue_state()
-    
-    ceiling_list = []
-    heatmap_data = []
-    
-    last_time = 0.0
-    last_p_amb = Util.depth_to_Pamb(samples[0]['depth'])
-    
-    for i, s in enumerate(samples):
-        # Normalize time to start at 0.0
-        normalized_time = max(0.0, s.get('time_minutes', 0) - first_sample_time)
-        duration = normalized_time - last_time
-        
-        # Check for gas switch
-        for t in sorted_switch_times:
-            if t <= s.get('time_minutes', 0):
-                current_gas = switches[t]
-            else:
-                break
-        
-        p_amb = Util.depth_to_Pamb(s['depth'])
-        
-        if i > 0:
-            # Update tissue state based on interval
-            p_amb_section = (p_amb + last_p_amb) / 2.0
-            current_tissue_state = current_tissue_state.updated_state(duration, p_amb_section, current_gas)
-        
-        # Calculate ceiling for current state
-        # Note: DiveProfile uses a more complex amb_to_gf tracking, 
-        # but for backfilling, p_ceiling_for_gf_now(gf_high) is a good approximation
-        # of the surface-relative risk shown in our heatmap.
-        p_ceil = current_tissue_state.p_ceiling_for_gf_now(gf_high / 100.0)
-        ceil_depth = round(max(0, (p_ceil - 1.0) * 10.0), 2)
-        ceiling_list.append(ceil_depth)
-        
-        # Heatmap row (GF99 relative to surface)
-        heatmap_row = [round(float(gf), 1) for gf in current_tissue_state.GF99s(1.0)]
-        heatmap_data.append(heatmap_row)
-        
-        last_time = normalized_time
-        last_p_amb = p_amb
-            
     final_saturation = heatmap_data[-1] if heatmap_data else None
-            
-    return ceiling_list, final_saturation, heatmap_data
+
+    return ceilings.tolist(), final_saturation, heatmap_data
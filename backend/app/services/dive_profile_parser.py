@@ -6,14 +6,174 @@ detailed dive information including sample points, events, and metadata.
 """
 
 import xml.etree.ElementTree as ET
-from typing import Dict, List, Optional, Any
+from array import array
+from typing import BinaryIO, Callable, Dict, List, Optional, Any, Union
 from datetime import datetime, time
+import io
+import math
 import os
 import logging
 import re
 
 logger = logging.getLogger(__name__)
 
+# Bytes handed to the XML parser per feed() when streaming
+_STREAM_CHUNK_SIZE = 64 * 1024
+_NAN = math.nan
+
+
+class ProfileSampleColumns:
+    """
+    Dive samples stored column-wise: one float array per field with NaN where a
+    sample does not carry the value, instead of one dict per sample.
+    """
+
+    FIELDS = (
+        'time_minutes', 'depth', 'temperature', 'pressure',
+        'ndl_minutes', 'stopdepth', 'cns_percent', 'stoptime_minutes'
+    )
+
+    def __init__(self):
+        self.columns = {field: array('d') for field in self.FIELDS}
+        self._column_list = [self.columns[field] for field in self.FIELDS]
+        # 1 / 0 for in_deco='1' / other values, -1 when the attribute is absent
+        self.in_deco = array('b')
+        # Raw time attribute, kept so to_samples() matches the element parser
+        self.time_text: List[str] = []
+
+    def __len__(self) -> int:
+        return len(self.time_text)
+
+    def __getitem__(self, field: str) -> array:
+        return self.columns[field]
+
+    def append(self, time_text: str, in_deco: int, *values: Optional[float]) -> None:
+        """Append one sample; values follow FIELDS, None is stored as NaN."""
+        self.time_text.append(time_text)
+        self.in_deco.append(in_deco)
+        for column, value in zip(self._column_list, values):
+            column.append(_NAN if value is None else value)
+
+    def to_samples(self) -> List[Dict[str, Any]]:
+        """Samples as dicts, in the shape produced by _parse_sample_element."""
+        optional = [
+            ('temperature', self.columns['temperature']),
+            ('ndl_minutes', self.columns['ndl_minutes']),
+        ]
+        trailing = [
+            ('cns_percent', self.columns['cns_percent']),
+            ('stoptime_minutes', self.columns['stoptime_minutes']),
+            ('stopdepth', self.columns['stopdepth']),
+        ]
+        samples = []
+        for i, time_text in enumerate(self.time_text):
+            sample = {
+                'time': time_text,
+                'time_minutes': self.columns['time_minutes'][i],
+                'depth': self.columns['depth'][i],
+            }
+            for field, column in optional:
+                if not math.isnan(column[i]):
+                    sample[field] = column[i]
+            if self.in_deco[i] >= 0:
+                sample['in_deco'] = self.in_deco[i] == 1
+            for field, column in trailing:
+                if not math.isnan(column[i]):
+                    sample[field] = column[i]
+            samples.append(sample)
+        return samples
+
+
+class _FirstDiveTarget:
+    """
+    XMLParser target that builds elements only for the first dive.
+
+    Samples of the dive's first divecomputer are never built as elements;
+    their attributes are handed to on_sample as they are read. Content outside the
+    dive is skipped, and nothing is built once the dive has been closed.
+    """
+
+    def __init__(self, on_sample: Callable[[Dict[str, str]], None]):
+        self.on_sample = on_sample
+        self.builder = ET.TreeBuilder()
+        self.dive: Optional[ET.Element] = None
+        self.done = False
+        # Nesting depth of the next element, and the tags of the open top two levels
+        self._depth = 0
+        self._top_tags: List[str] = []
+        # Nesting depth of the dive element and of its first divecomputer
+        self._dive_depth: Optional[int] = None
+        self._divecomputer_depth: Optional[int] = None
+        # Whether the first divecomputer is open, i.e. its samples are being read
+        self._collecting = False
+        self._in_sample = 0
+
+    def start(self, tag, attrib):
+        depth = self._depth
+        self._depth += 1
+        if depth < 2:
+            self._top_tags.append(tag)
+        if self.done:
+            return
+
+        if tag == 'sample' and self._dive_depth is not None:
+            if self._collecting and not self._in_sample and depth == self._divecomputer_depth + 1:
+                self.on_sample(attrib)
+            self._in_sample += 1
+            return
+        if self._in_sample:
+            return
+
+        if self._dive_depth is None:
+            if depth == 0 and tag not in ('dives', 'divelog', 'dive'):
+                raise ValueError("Invalid XML structure - expected 'dives', 'divelog', or 'dive' element")
+            if not self._is_first_dive(tag, depth):
+                return
+            self._dive_depth = depth
+        elif tag == 'divecomputer' and self._divecomputer_depth is None and depth == self._dive_depth + 1:
+            self._divecomputer_depth = depth
+            self._collecting = True
+
+        self.builder.start(tag, attrib)
+
+    def _is_first_dive(self, tag: str, depth: int) -> bool:
+        """Same choice of dive element as _parse_dive_element."""
+        if tag != 'dive':
+            return False
+        if depth <= 1:
+            return True
+        return depth == 2 and self._top_tags[0] == 'divelog' and self._top_tags[1] == 'dives'
+
+    def end(self, tag):
+        self._depth -= 1
+        depth = self._depth
+        if depth < 2:
+            self._top_tags.pop()
+        if self.done or self._dive_depth is None or depth < self._dive_depth:
+            return
+        if self._in_sample:
+            if tag == 'sample':
+                self._in_sample -= 1
+            return
+
+        element = self.builder.end(tag)
+        if depth == self._divecomputer_depth:
+            self._collecting = False
+        if depth == self._dive_depth:
+            self.dive = element
+            self.done = True
+
+    def data(self, text):
+        if self._dive_depth is None or self.done or self._in_sample:
+            return
+        # Whitespace between the samples of the divecomputer being read
+        if self._collecting and self._depth == self._divecomputer_depth + 1:
+            return
+        self.builder.data(text)
+
+    def close(self):
+        return self.dive
+
 
 class DiveProfileParser:
     """Parser for Subsurface XML dive profile data."""
@@ -70,6 +230,153 @@ class DiveProfileParser:
             logger.error(f"Error parsing dive profile: {e}")
             raise ValueError(f"Failed to parse dive profile: {e}")
     
+    def parse_xml_stream(self, source: Union[bytes, BinaryIO], columnar: bool = False) -> Dict[str, Any]:
+        """
+        Parse Subsurface XML from bytes or a binary file-like object while streaming it.
+
+        Produces the same result as parse_xml_file without a temporary file or a
+        full element tree: the content is fed to the XML parser in chunks,
+        sample elements are never materialized, and parsing stops once the
+        first dive has been read.
+
+        Args:
+            source: XML content as bytes, or a binary file-like object
+            columnar: Collect samples into a ProfileSampleColumns instead of
+                a list of dicts
+
+        Returns:
+            Dictionary containing parsed dive profile data
+
+        Raises:
+            ET.ParseError: If XML is malformed
+            ValueError: If dive data is invalid
+        """
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            source = io.BytesIO(source)
+
+        if columnar:
+            samples = ProfileSampleColumns()
+            on_sample = lambda attrib: self._append_sample(samples, attrib)
+        else:
+            samples = []
+
+            def on_sample(attrib):
+                sample_data = self._parse_sample_attributes(attrib)
+                if 'time_minutes' in sample_data and 'depth' in sample_data:
+                    samples.append(sample_data)
+
+        try:
+            dive = self._stream_first_dive(source, on_sample)
+            return self._parse_streamed_dive(dive, samples, columnar)
+        except ET.ParseError as e:
+            logger.error(f"XML parsing error: {e}")
+            raise
+        except ValueError:
+            raise
+        except Exception as e:
+            logger.error(f"Error parsing dive profile: {e}")
+            raise ValueError(f"Error parsing dive profile: {str(e)}")
+
+    def _parse_streamed_dive(self, dive: ET.Element, samples, columnar: bool) -> Dict[str, Any]:
+        """_parse_dive_element for a streamed dive whose samples were already collected."""
+        # The dive element holds no samples; the remaining lookups are cheap
+        dive_data = self._parse_dive_metadata(dive)
+
+        computer = dive.find('computer')
+        if computer is not None:
+            dive_data['model'] = computer.get('model')
+            dive_data['deviceid'] = computer.get('deviceid')
+
+        extra_data = dive.find('extra_data')
+        if extra_data is not None:
+            dive_data['extra_data'] = {}
+            for child in extra_data:
+                if child.text:
+                    dive_data['extra_data'][child.tag] = child.text
+            for key, value in extra_data.attrib.items():
+                dive_data['extra_data'][key] = value
+
+        divecomputer = dive.find('divecomputer')
+        if divecomputer is not None:
+            dive_data.update(self._parse_divecomputer_data(divecomputer))
+
+        dive_data['samples'] = samples
+        dive_data['events'] = self._parse_events(dive)
+        if columnar:
+            dive_data.update(self._calculate_column_metrics(samples))
+        else:
+            dive_data.update(self._calculate_derived_metrics(samples))
+
+        return dive_data
+
+    def _stream_first_dive(self, source: BinaryIO, on_sample: Callable[[Dict[str, str]], None]) -> ET.Element:
+        """
+        Feed the source through an XMLParser in chunks, building elements only
+        for the first dive (as selected by _parse_dive_element) and passing the
+        attributes of its first divecomputer's samples to on_sample.
+
+        Returns:
+            The dive element, without sample children
+        """
+        target = _FirstDiveTarget(on_sample)
+        parser = ET.XMLParser(target=target)
+        while not target.done:
+            chunk = source.read(_STREAM_CHUNK_SIZE)
+            if not chunk:
+                parser.close()
+                break
+            parser.feed(chunk)
+
+        if target.dive is None:
+            raise ValueError("No dive element found in XML")
+        return target.dive
+
+    def _append_sample(self, samples: ProfileSampleColumns, attrib: Dict[str, str]) -> None:
+        """Collect one sample element's attributes; samples without time or depth are skipped."""
+        time_str = attrib.get('time')
+        depth = self._parse_depth(attrib.get('depth'))
+        if not time_str or depth is None:
+            return
+
+        # Most samples carry only a few attributes; skip the helpers for absent ones
+        temp = attrib.get('temp')
+        pressure = attrib.get('pressure')
+        ndl = attrib.get('ndl')
+        stopdepth = attrib.get('stopdepth')
+        cns = attrib.get('cns')
+        stoptime = attrib.get('stoptime')
+        in_deco = attrib.get('in_deco')
+        samples.append(
+            time_str,
+            -1 if in_deco is None else int(in_deco == '1'),
+            self._parse_time_to_minutes(time_str),
+            depth,
+            self._parse_temperature(temp) if temp else None,
+            self._parse_pressure(pressure) if pressure else None,
+            self._parse_time_to_minutes(ndl) if ndl else None,
+            self._parse_depth(stopdepth) if stopdepth else None,
+            self._parse_cns(cns) if cns else None,
+            self._parse_time_to_minutes(stoptime) if stoptime else None,
+        )
+
+    def _calculate_column_metrics(self, samples: ProfileSampleColumns) -> Dict[str, Any]:
+        """_calculate_derived_metrics for columnar samples."""
+        if not len(samples):
+            return {}
+
+        depths = samples['depth']
+        temperatures = [t for t in samples['temperature'] if not math.isnan(t)]
+        return {
+            'calculated_avg_depth': round(sum(depths) / len(depths), 2),
+            'calculated_max_depth': round(max(depths), 2),
+            'calculated_duration_minutes': samples['time_minutes'][-1],
+            'sample_count': len(samples),
+            'temperature_range': {
+                'min': min(temperatures) if temperatures else None,
+                'max': max(temperatures) if temperatures else None
+            }
+        }
+
     def _parse_dive_element(self, root: ET.Element) -> Dict[str, Any]:
         """Parse the root dive element and extract all dive data."""
         # Handle different XML structures
@@ -393,6 +700,10 @@ class DiveProfileParser:
 
     def _parse_sample_element(self, sample: ET.Element) -> Dict[str, Any]:
         """Parse a single sample element."""
+        return self._parse_sample_attributes(sample.attrib)
+
+    def _parse_sample_attributes(self, sample: Dict[str, str]) -> Dict[str, Any]:
+        """Parse the attributes of a single sample element."""
         sample_data = {}
         
         # Parse time (convert to minutes)
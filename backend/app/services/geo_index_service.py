@@ -0,0 +1,444 @@
+"""
+Dive Site and Diving Center Geo Index
+
+Process-local grid index over the (id, lat, lng, status) of dive sites and
+diving centers. Proximity checks, nearby lists and import site matching ask it
+for the ids within a radius (or the k nearest) instead of running a spatial
+query per lookup; the caller then loads just those rows by primary key.
+
+Distances use the same spherical earth as MySQL's ST_Distance_Sphere, so the
+index and the SQL path agree, and the index works on any database (including
+SQLite in tests).
+
+The index is built by a background refresher at startup and rebuilt
+periodically to converge with writes from other workers or bulk queries that
+bypass the ORM. Between rebuilds, ORM insert/update/delete hooks collect the
+touched rows, which are marked dirty once the transaction commits and
+reloaded (in one batch) on the next lookup. While
+the index is cold, `ready()` returns False and callers fall back to SQL.
+
+The publicly visible points also carry a catalog version: an order-independent
+fingerprint of their (id, lat, lng), updated as points change. Workers that
+hold the same points report the same version, so it can back HTTP ETags.
+"""
+
+import asyncio
+import logging
+import math
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import case, event
+from sqlalchemy.orm import Session, object_session
+
+from app.models import DiveSite, DivingCenter
+from app.services.index_invalidation import mark_dirty_on_commit
+from app.services.map_clusters import ClusterPyramid
+from app.services.spatial_query import EARTH_RADIUS_M, radius_envelopes
+
+logger = logging.getLogger(__name__)
+
+GEO_INDEX_REBUILD_INTERVAL_SECONDS = int(os.getenv("GEO_INDEX_REBUILD_INTERVAL_SECONDS", "300"))
+# Grid cell size (~11 km); small radius lookups touch one to four cells
+_CELL_DEGREES = 0.1
+# First radius tried by nearest(), grown 4x until enough points are found
+_NEAREST_START_RADIUS_M = 2000
+_VERSION_MASK = (1 << 64) - 1
+
+
+def distance_column(distances: Dict[int, float], id_column, label: str, scale: float = 1.0):
+    """
+    SQL expression mapping ids to precomputed distances, so rows loaded by id
+    carry the same distance column (and ordering) as the spatial SQL query.
+    """
+    return case({item_id: distance / scale for item_id, distance in distances.items()}, value=id_column).label(label)
+
+
+def _point_hash(item_id: int, lat: float, lng: float) -> int:
+    # hash() of ints and floats is not randomized per process, unlike str
+    return hash((item_id, lat, lng)) & _VERSION_MASK
+
+
+def _in_bounds(lat: float, lng: float, west: float, south: float, east: float, north: float) -> bool:
+    if not south <= lat <= north:
+        return False
+    # West greater than east: the bounds wrap around the antimeridian
+    return west <= lng <= east if west <= east else (lng >= west or lng <= east)
+
+
+def catalog_points(
+    rows: Iterable[Tuple],
+    west: float = -180.0,
+    south: float = -90.0,
+    east: float = 180.0,
+    north: float = 90.0,
+) -> Tuple[str, List[int], List[float], List[float]]:
+    """
+    Catalog version of (id, lat, lng) rows, and the ids and coordinates of
+    those within the bounds ordered by id. Matches GeoPointIndex.points(),
+    for use while the index is cold.
+    """
+    fingerprint = 0
+    selected = []
+    for item_id, lat, lng in rows:
+        lat, lng = float(lat), float(lng)
+        fingerprint = (fingerprint + _point_hash(item_id, lat, lng)) & _VERSION_MASK
+        if _in_bounds(lat, lng, west, south, east, north):
+            selected.append((item_id, lat, lng))
+    selected.sort()
+    return (
+        f"{fingerprint:016x}",
+        [point[0] for point in selected],
+        [point[1] for point in selected],
+        [point[2] for point in selected],
+    )
+
+
+class GeoPointIndex:
+    """In-memory lat/lng grid of one model's points."""
+
+    def __init__(
+        self,
+        model,
+        has_status: bool = False,
+        clustered: bool = False,
+        rebuild_interval: int = GEO_INDEX_REBUILD_INTERVAL_SECONDS,
+    ):
+        self._model = model
+        self._has_status = has_status
+        self._clustered = clustered
+        self._rebuild_interval = rebuild_interval
+        self._lock = threading.RLock()
+        # Serializes full builds (warm(), the background refresher, rebuild())
+        self._build_lock = threading.Lock()
+        # id -> (lat_radians, lng_radians, cos(lat), status, deleted)
+        self._points: Dict[int, Tuple[float, float, float, Optional[str], bool]] = {}
+        self._cells: Dict[Tuple[int, int], Set[int]] = defaultdict(set)
+        self._point_cells: Dict[int, Tuple[int, int]] = {}
+        # Publicly visible points: id -> (lat, lng) in degrees, their catalog fingerprint and map clusters
+        self._public: Dict[int, Tuple[float, float]] = {}
+        self._fingerprint = 0
+        self._pyramid: Optional[ClusterPyramid] = ClusterPyramid() if clustered else None
+        self._dirty_ids: Set[int] = set()
+        self._built_at: Optional[float] = None
+
+    # --- Maintenance -----------------------------------------------------
+
+    def mark_dirty(self, ids: Iterable[int]) -> None:
+        """Schedule rows for reload on the next lookup."""
+        with self._lock:
+            self._dirty_ids.update(i for i in ids if i is not None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._points = {}
+            self._cells = defaultdict(set)
+            self._point_cells = {}
+            self._public = {}
+            self._fingerprint = 0
+            self._pyramid = ClusterPyramid() if self._clustered else None
+            self._dirty_ids = set()
+            self._built_at = None
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    def needs_rebuild(self) -> bool:
+        if self._built_at is None:
+            return True
+        return (time.monotonic() - self._built_at) > self._rebuild_interval
+
+    @staticmethod
+    def _cell(lat: float, lng: float) -> Tuple[int, int]:
+        return int((lat + 90.0) // _CELL_DEGREES), int((lng + 180.0) // _CELL_DEGREES)
+
+    def _load(self, db: Session, ids: Optional[List[int]] = None) -> List[Tuple]:
+        model = self._model
+        columns = [model.id, model.latitude, model.longitude]
+        if self._has_status:
+            columns += [model.status, model.deleted_at]
+        query = db.query(*columns)
+        if ids is not None:
+            query = query.filter(model.id.in_(ids))
+        return query.all()
+
+    def _remove(self, item_id: int) -> None:
+        self._points.pop(item_id, None)
+        public = self._public.pop(item_id, None)
+        if public is not None:
+            self._fingerprint = (self._fingerprint - _point_hash(item_id, *public)) & _VERSION_MASK
+            if self._pyramid is not None:
+                self._pyramid.remove(item_id)
+        cell = self._point_cells.pop(item_id, None)
+        if cell is not None:
+            bucket = self._cells.get(cell)
+            if bucket is not None:
+                bucket.discard(item_id)
+                if not bucket:
+                    del self._cells[cell]
+
+    def _entry(self, row: Tuple):
+        """(id, point, cell) for a loaded row, or None when it has no coordinates."""
+        item_id, lat, lng = row[0], row[1], row[2]
+        if lat is None or lng is None:
+            return None
+        lat, lng = float(lat), float(lng)
+        status, deleted = (row[3], row[4] is not None) if self._has_status else (None, False)
+        lat_rad = math.radians(lat)
+        return item_id, (lat_rad, math.radians(lng), math.cos(lat_rad), status, deleted), self._cell(lat, lng)
+
+    @staticmethod
+    def _is_public(point) -> bool:
+        _, _, _, point_status, deleted = point
+        return not deleted and point_status in (None, 'approved')
+
+    def _add(self, row: Tuple) -> None:
+        entry = self._entry(row)
+        if entry is None:
+            return
+        item_id, point, cell = entry
+        self._points[item_id] = point
+        self._point_cells[item_id] = cell
+        self._cells[cell].add(item_id)
+        if self._is_public(point):
+            lat, lng = float(row[1]), float(row[2])
+            self._public[item_id] = (lat, lng)
+            self._fingerprint = (self._fingerprint + _point_hash(item_id, lat, lng)) & _VERSION_MASK
+            if self._pyramid is not None:
+                self._pyramid.add(item_id, lat, lng)
+
+    def rebuild(self, db: Session) -> None:
+        """Rebuild the whole index from the database."""
+        with self._build_lock:
+            self._rebuild(db)
+
+    def _rebuild(self, db: Session) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            pending = set(self._dirty_ids)
+        rows = self._load(db)
+
+        # Build aside and swap, so lookups are not blocked meanwhile
+        points, cells, point_cells, public, fingerprint = {}, defaultdict(set), {}, {}, 0
+        pyramid = ClusterPyramid() if self._clustered else None
+        for row in rows:
+            entry = self._entry(row)
+            if entry is not None:
+                item_id, point, cell = entry
+                points[item_id] = point
+                point_cells[item_id] = cell
+                cells[cell].add(item_id)
+                if self._is_public(point):
+                    lat, lng = float(row[1]), float(row[2])
+                    public[item_id] = (lat, lng)
+                    fingerprint = (fingerprint + _point_hash(item_id, lat, lng)) & _VERSION_MASK
+                    if pyramid is not None:
+                        pyramid.add(item_id, lat, lng)
+        with self._lock:
+            self._points, self._cells, self._point_cells = points, cells, point_cells
+            self._public, self._fingerprint, self._pyramid = public, fingerprint, pyramid
+            # Rows marked dirty while loading may be newer than what was read
+            self._dirty_ids -= pending
+            self._built_at = time.monotonic()
+        logger.info(
+            f"{self._model.__name__} geo index rebuilt: {len(points)} points, "
+            f"{len(cells)} cells in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    def warm(self, db: Session) -> None:
+        """Build the index now if it is cold; concurrent callers wait for a single build."""
+        if self.is_built:
+            return
+        with self._build_lock:
+            if not self.is_built:
+                self._rebuild(db)
+
+    def rebuild_if_expired(self, db: Session) -> None:
+        """Rebuild the index if it is cold or expired, unless a build that ran meanwhile covered it."""
+        if not self.needs_rebuild():
+            return
+        with self._build_lock:
+            if self.needs_rebuild():
+                self._rebuild(db)
+
+    def refresh(self, db: Session, ids: Iterable[int]) -> None:
+        """Reload the given rows; rows no longer in the database are dropped."""
+        ids = list(set(ids))
+        if not ids:
+            return
+        rows = {row[0]: row for row in self._load(db, ids)}
+        with self._lock:
+            for item_id in ids:
+                self._remove(item_id)
+                if item_id in rows:
+                    self._add(rows[item_id])
+
+    def ready(self, db: Session) -> bool:
+        """
+        Apply pending incremental updates and report whether lookups can be
+        served; False while the index is cold, in which case query SQL.
+        """
+        if not self.is_built:
+            return False
+        with self._lock:
+            dirty = self._dirty_ids
+            self._dirty_ids = set()
+        if dirty:
+            try:
+                self.refresh(db, dirty)
+            except Exception:
+                self.mark_dirty(dirty)
+                raise
+        return True
+
+    # --- Lookup ----------------------------------------------------------
+
+    def within(
+        self,
+        lat: float,
+        lng: float,
+        radius_m: float,
+        limit: Optional[int] = None,
+        status: Optional[str] = None,
+        include_deleted: bool = False,
+        exclude_ids: Optional[Set[int]] = None,
+    ) -> List[Tuple[int, float]]:
+        """
+        Return (id, distance_m) pairs within radius_m, nearest first.
+
+        Args:
+            lat, lng: Center of the search
+            radius_m: Search radius in meters
+            limit: Maximum number of results (None = all)
+            status: Only return rows with this status (None = any status)
+            include_deleted: Whether to include soft-deleted rows
+            exclude_ids: Ids to skip (e.g. the site the search is centered on)
+        """
+        center_lat, center_lng = math.radians(lat), math.radians(lng)
+        center_cos = math.cos(center_lat)
+        # Compare haversine terms rather than distances to skip the asin per point
+        angular_radius = min(radius_m / EARTH_RADIUS_M, math.pi)
+        max_a = math.sin(angular_radius / 2) ** 2
+        matches = []
+        with self._lock:
+            for min_lng, min_lat, max_lng, max_lat in radius_envelopes(lat, lng, radius_m):
+                min_row, min_col = self._cell(min_lat, min_lng)
+                max_row, max_col = self._cell(max_lat, max_lng)
+                for row in range(min_row, max_row + 1):
+                    for col in range(min_col, max_col + 1):
+                        for item_id in self._cells.get((row, col), ()):
+                            point_lat, point_lng, point_cos, point_status, deleted = self._points[item_id]
+                            # Latitude alone rules out most of a cell's points cheaply
+                            if abs(point_lat - center_lat) > angular_radius:
+                                continue
+                            a = (math.sin((point_lat - center_lat) / 2) ** 2
+                                 + center_cos * point_cos * math.sin((point_lng - center_lng) / 2) ** 2)
+                            if a > max_a:
+                                continue
+                            if deleted and not include_deleted:
+                                continue
+                            if status is not None and point_status != status:
+                                continue
+                            if exclude_ids and item_id in exclude_ids:
+                                continue
+                            matches.append((item_id, a))
+        # Split envelopes share the antimeridian/meridian cell column
+        matches = sorted(set(matches), key=lambda item: (item[1], item[0]))
+        if limit is not None:
+            matches = matches[:limit]
+        return [(item_id, 2 * EARTH_RADIUS_M * math.asin(min(1.0, math.sqrt(a)))) for item_id, a in matches]
+
+    @property
+    def catalog_version(self) -> str:
+        """Fingerprint of the publicly visible points; changes whenever one is added, moved or removed."""
+        return f"{self._fingerprint:016x}"
+
+    def points(
+        self,
+        west: float = -180.0,
+        south: float = -90.0,
+        east: float = 180.0,
+        north: float = 90.0,
+    ) -> Tuple[str, List[int], List[float], List[float]]:
+        """
+        Catalog version, and the ids and coordinates of the publicly visible
+        points within the bounds, ordered by id.
+        """
+        with self._lock:
+            version = self.catalog_version
+            selected = sorted(
+                (item_id, lat, lng) for item_id, (lat, lng) in self._public.items()
+                if _in_bounds(lat, lng, west, south, east, north)
+            )
+        return (
+            version,
+            [point[0] for point in selected],
+            [point[1] for point in selected],
+            [point[2] for point in selected],
+        )
+
+    def clusters(self, zoom: int, west: float, south: float, east: float, north: float) -> List[Dict]:
+        """Map clusters of the publicly visible points within the bounds."""
+        with self._lock:
+            return self._pyramid.clusters(zoom, west, south, east, north)
+
+    def nearest(self, lat: float, lng: float, k: int, max_radius_m: float, **filters) -> List[Tuple[int, float]]:
+        """Return the k nearest (id, distance_m) pairs within max_radius_m, nearest first."""
+        radius_m = min(_NEAREST_START_RADIUS_M, max_radius_m)
+        while True:
+            matches = self.within(lat, lng, radius_m, limit=k, **filters)
+            # Everything within radius_m was considered, so these are the k nearest
+            if len(matches) >= k or radius_m >= max_radius_m:
+                return matches
+            radius_m = min(radius_m * 4, max_radius_m)
+
+
+dive_site_geo_index = GeoPointIndex(DiveSite, has_status=True, clustered=True)
+diving_center_geo_index = GeoPointIndex(DivingCenter)
+
+_GEO_INDEXES = ((DiveSite, dive_site_geo_index), (DivingCenter, diving_center_geo_index))
+
+
+def rebuild_geo_indexes(db: Optional[Session] = None) -> None:
+    """Rebuild every geo index that is cold or expired."""
+    owns_session = db is None
+    if owns_session:
+        from app.database import SessionLocal
+        db = SessionLocal()
+    try:
+        for _, index in _GEO_INDEXES:
+            index.rebuild_if_expired(db)
+    finally:
+        if owns_session:
+            db.close()
+
+
+async def run_geo_index_refresher(interval_seconds: int = 30):
+    """Build the geo indexes at startup and rebuild them as they expire, until cancelled."""
+    while True:
+        try:
+            await asyncio.to_thread(rebuild_geo_indexes)
+        except Exception as e:
+            logger.error(f"[GEO INDEX] Rebuild failed: {e}", exc_info=True)
+        await asyncio.sleep(interval_seconds)
+
+
+def _register_hooks(model, index: GeoPointIndex) -> None:
+    # Same moments as the POINT(location) hooks in app.models; by then the id is known
+    def _mark_dirty(mapper, connection, target):
+        session = object_session(target)
+        if session is None:
+            index.mark_dirty([target.id])
+        else:
+            mark_dirty_on_commit(session, index.mark_dirty, [target.id])
+
+    for event_name in ("after_insert", "after_update", "after_delete"):
+        event.listen(model, event_name, _mark_dirty)
+
+
+for _model, _index in _GEO_INDEXES:
+    _register_hooks(_model, _index)
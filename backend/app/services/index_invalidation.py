@@ -0,0 +1,42 @@
+"""
+Commit-time invalidation of process-local indexes and caches
+
+The search and geo indexes reload rows marked dirty on their next lookup, and
+the user identity cache drops snapshots of changed users. Doing either while
+the session flushes is too early: a lookup from another session before the
+commit reads the old row again (for the indexes, clearing the mark), leaving
+it stale until the next full rebuild or expiry, and a rollback leaves nothing
+to invalidate.
+
+Flush hooks therefore collect the ids on the session with
+`mark_dirty_on_commit()`; they are handed to the index once the transaction
+commits, and dropped if it rolls back (nothing changed then).
+"""
+
+from collections import defaultdict
+from typing import Callable, Iterable
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+_PENDING_KEY = "pending_index_invalidations"
+
+
+def mark_dirty_on_commit(session: Session, mark_dirty: Callable[[Iterable[int]], None], ids: Iterable[int]) -> None:
+    """Call mark_dirty(ids) after the session's current transaction commits."""
+    pending = session.info.setdefault(_PENDING_KEY, defaultdict(set))
+    pending[mark_dirty].update(i for i in ids if i is not None)
+
+
+@event.listens_for(Session, "after_commit")
+def _publish_pending(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    for mark_dirty, ids in (pending or {}).items():
+        mark_dirty(ids)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending(session, transaction):
+    # Still set at the end of the outermost transaction: it was rolled back
+    if transaction.parent is None:
+        session.info.pop(_PENDING_KEY, None)
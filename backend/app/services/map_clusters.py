@@ -0,0 +1,174 @@
+"""
+Map marker clusters
+
+Grid clustering of map points in Web Mercator pixel space, precomputed for
+every zoom level so a map at low zoom gets a few hundred aggregates (count,
+centroid, representative id) instead of every point.
+
+Cells are CLUSTER_CELL_PX screen pixels wide at their zoom, so each cell
+splits into four at the next zoom and the levels form a quadtree. Adding or
+removing a point updates one cell per level; the representative (lowest id)
+of a cell is recomputed from its four children when it is removed.
+"""
+
+import math
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+# Cluster cell size in screen pixels (the map clusters markers within 50 px)
+CLUSTER_CELL_PX = 64
+# Highest zoom served from precomputed clusters; the map shows individual sites beyond it
+MAX_CLUSTER_ZOOM = 10
+# Web Mercator latitude limit
+_MAX_LATITUDE = 85.0511287798
+
+
+def mercator(lat: float, lng: float) -> Tuple[float, float]:
+    """Project lat/lng to Web Mercator x/y in [0, 1] (y grows southwards)."""
+    sin_lat = math.sin(math.radians(max(-_MAX_LATITUDE, min(_MAX_LATITUDE, lat))))
+    x = (lng + 180.0) / 360.0
+    y = 0.5 - math.log((1 + sin_lat) / (1 - sin_lat)) / (4 * math.pi)
+    return min(max(x, 0.0), 1.0), min(max(y, 0.0), 1.0)
+
+
+def unmercator(x: float, y: float) -> Tuple[float, float]:
+    """Inverse of mercator()."""
+    lng = x * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lat, lng
+
+
+def _cells_across(zoom: int) -> int:
+    return (256 << zoom) // CLUSTER_CELL_PX
+
+
+def _cell(x: float, y: float, zoom: int) -> Tuple[int, int]:
+    n = _cells_across(zoom)
+    return min(int(x * n), n - 1), min(int(y * n), n - 1)
+
+
+class ClusterPyramid:
+    """Per-zoom grid aggregates of a set of points."""
+
+    def __init__(self, max_zoom: int = MAX_CLUSTER_ZOOM):
+        self.max_zoom = max_zoom
+        # zoom -> cell -> [count, sum_x, sum_y, representative_id], for zooms below max_zoom
+        self._levels: Dict[int, Dict[Tuple[int, int], list]] = {zoom: {} for zoom in range(max_zoom)}
+        # Finest level keeps the ids themselves
+        self._leaves: Dict[Tuple[int, int], Set[int]] = {}
+        self._positions: Dict[int, Tuple[float, float]] = {}
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def __contains__(self, item_id: int) -> bool:
+        return item_id in self._positions
+
+    def add(self, item_id: int, lat: float, lng: float) -> None:
+        if item_id in self._positions:
+            self.remove(item_id)
+        x, y = mercator(lat, lng)
+        self._positions[item_id] = (x, y)
+        self._leaves.setdefault(_cell(x, y, self.max_zoom), set()).add(item_id)
+        for zoom, cells in self._levels.items():
+            cell = _cell(x, y, zoom)
+            entry = cells.get(cell)
+            if entry is None:
+                cells[cell] = [1, x, y, item_id]
+            else:
+                entry[0] += 1
+                entry[1] += x
+                entry[2] += y
+                entry[3] = min(entry[3], item_id)
+
+    def remove(self, item_id: int) -> None:
+        position = self._positions.pop(item_id, None)
+        if position is None:
+            return
+        x, y = position
+        leaf_cell = _cell(x, y, self.max_zoom)
+        leaf = self._leaves[leaf_cell]
+        leaf.discard(item_id)
+        if not leaf:
+            del self._leaves[leaf_cell]
+        # Finest aggregate level first, so parents can read their children's representatives
+        for zoom in range(self.max_zoom - 1, -1, -1):
+            cells = self._levels[zoom]
+            cell = _cell(x, y, zoom)
+            entry = cells[cell]
+            entry[0] -= 1
+            if entry[0] == 0:
+                del cells[cell]
+                continue
+            entry[1] -= x
+            entry[2] -= y
+            if entry[3] == item_id:
+                entry[3] = min(self._representatives(zoom + 1, cell))
+
+    def _representatives(self, zoom: int, parent: Tuple[int, int]) -> Iterator[int]:
+        for dx in (0, 1):
+            for dy in (0, 1):
+                child = (parent[0] * 2 + dx, parent[1] * 2 + dy)
+                if zoom == self.max_zoom:
+                    if child in self._leaves:
+                        yield min(self._leaves[child])
+                elif child in self._levels[zoom]:
+                    yield self._levels[zoom][child][3]
+
+    def _aggregate(self, zoom: int, cell: Tuple[int, int]) -> Optional[Tuple[int, float, float, int]]:
+        if zoom == self.max_zoom:
+            ids = self._leaves.get(cell)
+            if not ids:
+                return None
+            xs, ys = zip(*(self._positions[i] for i in ids))
+            return len(ids), sum(xs), sum(ys), min(ids)
+        entry = self._levels[zoom].get(cell)
+        return tuple(entry) if entry is not None else None
+
+    def clusters(
+        self,
+        zoom: int,
+        west: float = -180.0,
+        south: float = -90.0,
+        east: float = 180.0,
+        north: float = 90.0,
+    ) -> List[Dict]:
+        """
+        Clusters at a zoom level (clamped to max_zoom) whose cell intersects
+        the bounds; a west bound greater than the east one wraps the antimeridian.
+        """
+        zoom = max(0, min(zoom, self.max_zoom))
+        cells = self._leaves if zoom == self.max_zoom else self._levels[zoom]
+        n = _cells_across(zoom)
+        min_x, min_y = _cell(*mercator(north, west), zoom)
+        max_x, max_y = _cell(*mercator(south, east), zoom)
+        x_ranges = [(min_x, max_x)] if west <= east else [(min_x, n - 1), (0, max_x)]
+        area = sum(hi - lo + 1 for lo, hi in x_ranges) * (max_y - min_y + 1)
+
+        # Walk the viewport's cells, or the occupied ones when there are fewer
+        if area <= len(cells):
+            candidates = [
+                (cx, cy) for lo, hi in x_ranges for cx in range(lo, hi + 1) for cy in range(min_y, max_y + 1)
+            ]
+        else:
+            candidates = [
+                (cx, cy) for cx, cy in cells
+                if min_y <= cy <= max_y and any(lo <= cx <= hi for lo, hi in x_ranges)
+            ]
+
+        result = []
+        for cell in candidates:
+            aggregate = self._aggregate(zoom, cell)
+            if aggregate is None:
+                continue
+            count, sum_x, sum_y, representative = aggregate
+            if count == 1:
+                lat, lng = unmercator(*self._positions[representative])
+            else:
+                lat, lng = unmercator(sum_x / count, sum_y / count)
+            result.append({
+                "id": representative,
+                "latitude": round(lat, 6),
+                "longitude": round(lng, 6),
+                "count": count,
+            })
+        return result
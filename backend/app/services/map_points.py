@@ -0,0 +1,67 @@
+"""
+Compact map point encodings
+
+The map only needs the id and coordinates of each site, so instead of one
+object per site the points are sent column-oriented:
+
+- JSON: {"version", "count", "ids": [...], "latitudes": [...], "longitudes": [...]}
+- Binary (POINTS_BINARY_MEDIA_TYPE), little-endian:
+    uint32 count, then count x int32 ids, count x float32 latitudes,
+    count x float32 longitudes
+
+float32 keeps coordinates to within about a meter, which is plenty for
+placing markers. Responses carry a strong ETag derived from the catalog
+version, so clients revalidating an unchanged viewport get a 304.
+"""
+
+import hashlib
+from typing import List, Optional
+
+import numpy as np
+import orjson
+
+POINTS_JSON_MEDIA_TYPE = "application/json"
+POINTS_BINARY_MEDIA_TYPE = "application/vnd.divemap.points"
+
+
+def encode_points_json(version: str, ids: List[int], latitudes: List[float], longitudes: List[float]) -> bytes:
+    return orjson.dumps({
+        "version": version,
+        "count": len(ids),
+        "ids": ids,
+        "latitudes": latitudes,
+        "longitudes": longitudes,
+    })
+
+
+def encode_points_binary(ids: List[int], latitudes: List[float], longitudes: List[float]) -> bytes:
+    return b"".join((
+        np.array([len(ids)], dtype="<u4").tobytes(),
+        np.asarray(ids, dtype="<i4").tobytes(),
+        np.asarray(latitudes, dtype="<f4").tobytes(),
+        np.asarray(longitudes, dtype="<f4").tobytes(),
+    ))
+
+
+def decode_points_binary(body: bytes):
+    """Inverse of encode_points_binary(), as (ids, latitudes, longitudes) arrays."""
+    count = int(np.frombuffer(body, dtype="<u4", count=1)[0])
+    ids = np.frombuffer(body, dtype="<i4", count=count, offset=4)
+    latitudes = np.frombuffer(body, dtype="<f4", count=count, offset=4 + 4 * count)
+    longitudes = np.frombuffer(body, dtype="<f4", count=count, offset=4 + 8 * count)
+    return ids, latitudes, longitudes
+
+
+def points_etag(version: str, encoding: str, *bounds: Optional[float]) -> str:
+    """Strong ETag for the points of a catalog version, per encoding and bounds."""
+    key = "|".join([version, encoding, *(repr(bound) for bound in bounds)])
+    return '"' + hashlib.sha1(key.encode()).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header (a list of ETags, or *) matches the ETag."""
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # If-None-Match uses weak comparison, e.g. after a proxy compressed the body
+    return "*" in candidates or etag in candidates or f"W/{etag}" in candidates
@@ -0,0 +1,294 @@
+"""
+Bulk fan-out of new-content notifications.
+
+Notifying subscribers about a new dive site, dive, diving center or dive trip
+used to cost a commit per notification row, a push subscription query and an
+SQS call per user, and an opt-out check plus unsubscribe token lookup per
+email. With thousands of subscribers that took minutes.
+
+Recipients are now processed in chunks of NOTIFICATION_FANOUT_CHUNK_SIZE:
+
+- notification rows of a chunk are written with one multi-row INSERT and a
+  single commit, and their ids read back with one grouped SELECT
+- push subscriptions and unsubscribe tokens of a chunk are loaded with one
+  query each (missing tokens are created in bulk)
+- email and push tasks of the whole chunk are handed to SQS together, so SQS
+  batches are packed across users
+
+Progress is logged per chunk and the totals are returned as FanoutStats.
+"""
+
+import logging
+import os
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.models import Notification, NotificationPreference, PushSubscription, User
+from app.services.unsubscribe_token_service import unsubscribe_token_service
+
+logger = logging.getLogger(__name__)
+
+NOTIFICATION_FANOUT_CHUNK_SIZE = int(os.getenv("NOTIFICATION_FANOUT_CHUNK_SIZE", "500"))
+
+# Subscriptions failing this many times in a row are no longer pushed to
+MAX_PUSH_FAIL_COUNT = 10
+
+PUSH_BODIES = {
+    'user_chat_message': 'You have a new message from a buddy',
+    'new_dive_sites': 'A new dive site was added in your area',
+    'new_dives': 'A buddy just logged a new dive',
+}
+
+
+def push_payload(category: str, link_url: Optional[str], tag: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Generic push payload for a notification.
+
+    The notification message is never sent in the push itself, so nothing
+    personal shows up on a lock screen.
+    """
+    return {
+        'title': 'Divemap Notification',
+        'body': PUSH_BODIES.get(category, 'You have a new update on Divemap'),
+        'url': link_url or '/',
+        'tag': tag or category
+    }
+
+
+@dataclass(frozen=True)
+class FanoutContent:
+    """What to tell every recipient of a fan-out."""
+    category: str
+    title: str
+    message: str
+    link_url: str
+    entity_type: str
+    entity_id: int
+    template_name: str
+    email_data: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class FanoutRecipient:
+    """A user and the channels they are notified on."""
+    user_id: int
+    email: Optional[str]
+    website: bool
+    email_enabled: bool
+    push: bool
+
+    @classmethod
+    def from_preference(cls, user: User, preference: NotificationPreference) -> "FanoutRecipient":
+        return cls(
+            user_id=user.id,
+            email=user.email,
+            website=bool(preference.enable_website),
+            email_enabled=bool(
+                preference.enable_email
+                and preference.frequency == 'immediate'
+                and not user.email_notifications_opted_out
+                and user.email
+            ),
+            push=bool(getattr(preference, 'enable_push', False)),
+        )
+
+
+@dataclass
+class FanoutStats:
+    """Counters of a fan-out run."""
+    recipients: int = 0
+    chunks: int = 0
+    notifications_created: int = 0
+    emails_queued: int = 0
+    emails_sent_directly: int = 0
+    push_queued: int = 0
+    elapsed_seconds: float = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class NotificationFanout:
+    """Delivers one piece of content to many recipients in chunks."""
+
+    def __init__(self, sqs_service, email_service, chunk_size: int = NOTIFICATION_FANOUT_CHUNK_SIZE):
+        self.sqs_service = sqs_service
+        self.email_service = email_service
+        self.chunk_size = max(1, chunk_size)
+
+    def run(self, content: FanoutContent, recipients: List[FanoutRecipient], db: Session) -> FanoutStats:
+        stats = FanoutStats(recipients=len(recipients))
+        started = time.monotonic()
+        total_chunks = (len(recipients) + self.chunk_size - 1) // self.chunk_size
+
+        for start in range(0, len(recipients), self.chunk_size):
+            chunk = recipients[start:start + self.chunk_size]
+            try:
+                self._deliver_chunk(content, chunk, db, stats)
+            except Exception as e:
+                db.rollback()
+                logger.error(
+                    f"[FANOUT] {content.entity_type} {content.entity_id}: "
+                    f"chunk {stats.chunks + 1}/{total_chunks} failed: {e}",
+                    exc_info=True
+                )
+            stats.chunks += 1
+            logger.info(
+                f"[FANOUT] {content.entity_type} {content.entity_id}: chunk {stats.chunks}/{total_chunks}, "
+                f"{min(start + len(chunk), len(recipients))}/{len(recipients)} recipients, "
+                f"{stats.notifications_created} notifications, "
+                f"{stats.emails_queued + stats.emails_sent_directly} emails, {stats.push_queued} pushes"
+            )
+
+        stats.elapsed_seconds = round(time.monotonic() - started, 3)
+        logger.info(f"[FANOUT] {content.entity_type} {content.entity_id} done: {stats.as_dict()}")
+        return stats
+
+    def _deliver_chunk(self, content: FanoutContent, chunk: List[FanoutRecipient], db: Session, stats: FanoutStats):
+        notification_ids = self._insert_notifications(content, [r.user_id for r in chunk if r.website], db)
+        stats.notifications_created += len(notification_ids)
+
+        email_recipients = [r for r in chunk if r.email_enabled]
+        if email_recipients:
+            self._send_emails(content, email_recipients, notification_ids, db, stats)
+
+        push_user_ids = [r.user_id for r in chunk if r.push]
+        if push_user_ids:
+            stats.push_queued += self._send_pushes(content, push_user_ids, db)
+
+    def _insert_notifications(self, content: FanoutContent, user_ids: List[int], db: Session) -> Dict[int, int]:
+        """Insert a notification row per user; returns user id -> notification id."""
+        if not user_ids:
+            return {}
+        db.execute(insert(Notification), [
+            {
+                'user_id': user_id,
+                'category': content.category,
+                'title': content.title,
+                'message': content.message,
+                'link_url': content.link_url,
+                'entity_type': content.entity_type,
+                'entity_id': content.entity_id,
+                'is_read': False,
+                'email_sent': False,
+            }
+            for user_id in user_ids
+        ])
+        # MySQL has no INSERT ... RETURNING; the newest row per user for this
+        # entity is the one just inserted
+        rows = db.query(Notification.user_id, func.max(Notification.id)).filter(
+            Notification.user_id.in_(user_ids),
+            Notification.category == content.category,
+            Notification.entity_type == content.entity_type,
+            Notification.entity_id == content.entity_id
+        ).group_by(Notification.user_id).all()
+        db.commit()
+        return {user_id: notification_id for user_id, notification_id in rows}
+
+    def _send_emails(
+        self,
+        content: FanoutContent,
+        recipients: List[FanoutRecipient],
+        notification_ids: Dict[int, int],
+        db: Session,
+        stats: FanoutStats
+    ):
+        try:
+            tokens = unsubscribe_token_service.get_or_create_unsubscribe_tokens(
+                [r.user_id for r in recipients], db
+            )
+        except Exception as e:
+            logger.warning(f"[FANOUT] Failed to get unsubscribe tokens: {e}")
+            db.rollback()
+            tokens = {}
+
+        notification_data = {
+            'title': content.title,
+            'message': content.message,
+            'link_url': content.link_url,
+            'category': content.category,
+            **content.email_data
+        }
+
+        # FORCE_DIRECT_EMAIL keeps local development off the production queue
+        force_direct_email = os.getenv('FORCE_DIRECT_EMAIL', 'false').lower() == 'true'
+        if not force_direct_email and self.sqs_service.sqs_available:
+            failed = self.sqs_service.queue_batch_email_tasks([
+                {
+                    'notification_id': notification_ids.get(r.user_id),
+                    'user_email': r.email,
+                    'notification': notification_data,
+                    'user_id': r.user_id,
+                    'unsubscribe_token': tokens.get(r.user_id)
+                }
+                for r in recipients
+            ])
+            stats.emails_queued += len(recipients) - len(failed)
+            if not failed:
+                return
+            # Messages SQS did not take are sent directly, as for a single email
+            logger.warning(f"[FANOUT] {len(failed)} email tasks not queued, sending them directly")
+            recipients = [recipients[i] for i in failed]
+
+        self._send_emails_directly(content, recipients, notification_data, tokens, notification_ids, db, stats)
+
+    def _send_emails_directly(
+        self,
+        content: FanoutContent,
+        recipients: List[FanoutRecipient],
+        notification_data: Dict[str, Any],
+        tokens: Dict[int, str],
+        notification_ids: Dict[int, int],
+        db: Session,
+        stats: FanoutStats
+    ):
+        """Send emails without SQS (development, or messages SQS rejected) and mark the rows as sent."""
+        sent_ids = []
+        for r in recipients:
+            if self.email_service.send_notification_email(
+                user_email=r.email,
+                notification=notification_data,
+                template_name=content.template_name,
+                user_id=r.user_id,
+                db=db,
+                unsubscribe_token=tokens.get(r.user_id)
+            ):
+                stats.emails_sent_directly += 1
+                if r.user_id in notification_ids:
+                    sent_ids.append(notification_ids[r.user_id])
+        if sent_ids:
+            try:
+                db.execute(
+                    update(Notification).where(Notification.id.in_(sent_ids)).values(
+                        email_sent=True, email_sent_at=datetime.now(timezone.utc)
+                    )
+                )
+                db.commit()
+            except Exception as e:
+                logger.warning(f"[FANOUT] Failed to mark {len(sent_ids)} notifications as emailed: {e}")
+                db.rollback()
+
+    def _send_pushes(self, content: FanoutContent, user_ids: List[int], db: Session) -> int:
+        subscriptions = db.query(PushSubscription).filter(
+            PushSubscription.user_id.in_(user_ids),
+            PushSubscription.fail_count < MAX_PUSH_FAIL_COUNT
+        ).all()
+        if not subscriptions:
+            return 0
+
+        payload = push_payload(content.category, content.link_url)
+        return self.sqs_service.send_push_tasks([
+            {
+                'subscription_id': sub.id,
+                'endpoint': sub.endpoint,
+                'p256dh': sub.p256dh,
+                'auth': sub.auth,
+                'payload': payload
+            }
+            for sub in subscriptions
+        ])
@@ -18,6 +18,9 @@ from app.models import (
     UserChatRoom, UserChatRoomMember, UserChatMessage
 )
 from app.services.sqs_service import SQSService
+from app.services.notification_fanout import (
+    FanoutContent, FanoutRecipient, FanoutStats, NotificationFanout, push_payload
+)
 from app.services.email_service import EmailService
 from app.services.unsubscribe_token_service import unsubscribe_token_service
 from app.utils import utcnow
@@ -204,6 +207,38 @@ class NotificationService:
         
         return True
     
+    def _area_prefilter(
+        self,
+        entity_location: Optional[Dict[str, float]],
+        entity_country: Optional[str],
+        entity_region: Optional[str]
+    ) -> list:
+        """
+        SQL conditions keeping only preferences whose area filter could match.
+        
+        The bounding box is a superset of the radius circle, so the exact
+        distance is still checked by _matches_area_filter.
+        """
+        pref = NotificationPreference
+        conditions = [
+            pref.area_country.is_(None) if not entity_country
+            else or_(pref.area_country.is_(None), pref.area_country == entity_country),
+            pref.area_region.is_(None) if not entity_region
+            else or_(pref.area_region.is_(None), pref.area_region == entity_region),
+        ]
+        if entity_location:
+            lat, lng = entity_location['lat'], entity_location['lng']
+            conditions.append(or_(
+                pref.area_min_lat.is_(None),
+                and_(
+                    pref.area_min_lat <= lat,
+                    pref.area_max_lat >= lat,
+                    pref.area_min_lng <= lng,
+                    pref.area_max_lng >= lng
+                )
+            ))
+        return conditions
+    
     def _get_users_to_notify(
         self,
         category: str,
@@ -215,9 +250,11 @@ class NotificationService:
         """
         Get list of users and their preferences who should receive notifications.
         Returns a list of tuples (User, NotificationPreference).
-        """
-        from sqlalchemy import or_
         
+        Candidates are selected in SQL on the normalized area filter columns
+        (country, region and the bounding box of the radius); only those are
+        checked exactly with _matches_area_filter.
+        """
         # optimized join to prevent N+1 queries
         results = db.query(User, NotificationPreference).join(
             NotificationPreference, User.id == NotificationPreference.user_id
@@ -229,7 +266,8 @@ class NotificationService:
                 NotificationPreference.enable_website == True,
                 NotificationPreference.enable_email == True,
                 NotificationPreference.enable_push == True
-            )
+            ),
+            *self._area_prefilter(entity_location, entity_country, entity_region)
         ).all()
         
         users_to_notify = []
@@ -237,9 +275,10 @@ class NotificationService:
             if not self._matches_area_filter(preference, entity_location, entity_country, entity_region):
                 continue
                 
+            # Users who opted out of all email still get their other channels;
+            # FanoutRecipient drops the email channel for them
             if preference.enable_email and user.email_notifications_opted_out:
                 if preference.enable_website or getattr(preference, 'enable_push', False):
-                    preference.enable_email = False
                     users_to_notify.append((user, preference))
                 continue
                 
@@ -276,6 +315,32 @@ class NotificationService:
         """
         return unsubscribe_token_service.get_or_create_unsubscribe_token(user_id, db)
     
+    def _dive_site_email_data(self, dive_site_id: int, db: Session) -> Dict[str, Any]:
+        """Country, region, creator name and tags shown in new dive site emails."""
+        data = {}
+        try:
+            from app.models import DiveSiteTag, AvailableTag
+            dive_site = db.query(DiveSite).filter(DiveSite.id == dive_site_id).first()
+            if dive_site:
+                data['site_country'] = dive_site.country or ""
+                data['site_region'] = dive_site.region or ""
+                
+                if dive_site.created_by:
+                    creator = db.query(User).filter(User.id == dive_site.created_by).first()
+                    if creator:
+                        data['site_creator_name'] = creator.name or creator.username or "A user"
+                else:
+                    data['site_creator_name'] = "A user"
+                    
+                # Fetch tags associated with this dive site
+                tags = db.query(AvailableTag.name).join(
+                    DiveSiteTag, AvailableTag.id == DiveSiteTag.tag_id
+                ).filter(DiveSiteTag.dive_site_id == dive_site.id).all()
+                data['site_tags'] = [t[0] for t in tags]
+        except Exception as e:
+            logger.warning(f"Failed to fetch extra metadata for dive site notification: {e}")
+        return data
+    
     def _queue_email_notification(
         self,
         notification: Notification,
@@ -309,31 +374,7 @@ class NotificationService:
         
         # Fetch additional metadata if this is a new dive site email
         if db and template_name == 'new_dive_site' and notification.entity_id:
-            try:
-                from app.models import DiveSite, User, DiveSiteTag, AvailableTag
-                dive_site = db.query(DiveSite).filter(DiveSite.id == notification.entity_id).first()
-                if dive_site:
-                    notification_data['site_country'] = dive_site.country or ""
-                    notification_data['site_region'] = dive_site.region or ""
-                    
-                    if dive_site.created_by:
-                        creator = db.query(User).filter(User.id == dive_site.created_by).first()
-                        if creator:
-                            notification_data['site_creator_name'] = creator.name or creator.username or "A user"
-                    else:
-                        notification_data['site_creator_name'] = "A user"
-                        
-                    # Fetch tags associated with this dive site
-                    tags = db.query(AvailableTag.name).join(
-                        DiveSiteTag, AvailableTag.id == DiveSiteTag.tag_id
-                    ).filter(DiveSiteTag.dive_site_id == dive_site.id).all()
-                    
-                    if tags:
-                        notification_data['site_tags'] = [t[0] for t in tags]
-                    else:
-                        notification_data['site_tags'] = []
-            except Exception as e:
-                logger.warning(f"Failed to fetch extra metadata for dive site notification: {e}")
+            notification_data.update(self._dive_site_email_data(notification.entity_id, db))
         
         # Get unsubscribe token if needed (exclude admin alerts and email verification)
         unsubscribe_token = None
@@ -416,23 +457,9 @@ class NotificationService:
         if not subscriptions:
             return 0
             
-        # Construct generic payload
-        # IMPORTANT: We never send the actual notification message/PII in the push
-        # to prevent lock-screen shoulder surfing.
-        payload = {
-            'title': 'Divemap Notification',
-            'body': 'You have a new update on Divemap',
-            'url': notification.link_url or '/',
-            'tag': getattr(notification, '_push_tag', notification.category)
-        }
-        
-        # Override body for specific categories with generic but helpful text
-        if notification.category == 'user_chat_message':
-            payload['body'] = 'You have a new message from a buddy'
-        elif notification.category == 'new_dive_sites':
-            payload['body'] = 'A new dive site was added in your area'
-        elif notification.category == 'new_dives':
-            payload['body'] = 'A buddy just logged a new dive'
+        payload = push_payload(
+            notification.category, notification.link_url, getattr(notification, '_push_tag', None)
+        )
             
         # Prepare batch tasks
         tasks = []
@@ -538,28 +565,33 @@ class NotificationService:
             logger.error(f"Error committing notifications for edit request {edit_request_id}: {e}")
             db.rollback()
 
-    async def notify_users_for_new_dive_site(self, dive_site_id: int, db: Session) -> int:
-        """
-        Notify users about a new dive site.
-        
-        Args:
-            dive_site_id: Dive site ID
-            db: Database session
-        
-        Returns:
-            Number of notifications created
-        """
+    def _fan_out(
+        self,
+        content: FanoutContent,
+        user_prefs: List[tuple[User, NotificationPreference]],
+        exclude_user_id: Optional[int] = None,
+        db: Session = None
+    ) -> FanoutStats:
+        """Deliver new-content notifications to the matched users in bulk."""
+        recipients = [
+            FanoutRecipient.from_preference(user, preference)
+            for user, preference in user_prefs
+            if user.id != exclude_user_id
+        ]
+        return NotificationFanout(self.sqs_service, self.email_service).run(content, recipients, db)
+    
+    def fan_out_new_dive_site(self, dive_site_id: int, db: Session) -> Optional[FanoutStats]:
+        """Notify subscribed users about a new dive site."""
         dive_site = db.query(DiveSite).filter(DiveSite.id == dive_site_id).first()
         if not dive_site:
             logger.error(f"Dive site {dive_site_id} not found")
-            return 0
+            return None
         
         # Get entity location
         entity_location = None
         if dive_site.latitude and dive_site.longitude:
             entity_location = {'lat': float(dive_site.latitude), 'lng': float(dive_site.longitude)}
         
-        # Get users to notify
         user_prefs = self._get_users_to_notify(
             category='new_dive_sites',
             entity_location=entity_location,
@@ -568,45 +600,25 @@ class NotificationService:
             db=db
         )
         
-        creator_id = dive_site.created_by
-        if creator_id:
-            user_prefs = [(u, p) for u, p in user_prefs if u.id != creator_id]
-        
-        notification_count = 0
-        for user, preference in user_prefs:
-            link_url = f"/dive-sites/{dive_site_id}"
-            
-            if preference.enable_website:
-                notification = self.create_notification(
-                    user_id=user.id, category='new_dive_sites',
-                    title=f"New Dive Site: {dive_site.name}",
-                    message=f"A new dive site '{dive_site.name}' has been added.",
-                    link_url=link_url, entity_type='dive_site', entity_id=dive_site_id, db=db
-                )
-            else:
-                notification = Notification(
-                    user_id=user.id, category='new_dive_sites',
-                    title=f"New Dive Site: {dive_site.name}",
-                    message=f"A new dive site '{dive_site.name}' has been added.",
-                    link_url=link_url, entity_type='dive_site', entity_id=dive_site_id
-                )
-            
-            if notification:
-                notification_count += 1
-                if preference.enable_email and preference.frequency == 'immediate':
-                    self._queue_email_notification(notification, user, 'new_dive_site', db)
-                if getattr(preference, 'enable_push', False):
-                    self._queue_push_notifications(notification, user, db)
-        
-        logger.info(f"Created {notification_count} notifications for dive site {dive_site_id}")
-        return notification_count
+        content = FanoutContent(
+            category='new_dive_sites',
+            title=f"New Dive Site: {dive_site.name}",
+            message=f"A new dive site '{dive_site.name}' has been added.",
+            link_url=f"/dive-sites/{dive_site_id}",
+            entity_type='dive_site',
+            entity_id=dive_site_id,
+            template_name='new_dive_site',
+            email_data=self._dive_site_email_data(dive_site_id, db) if user_prefs else {}
+        )
+        # The creator doesn't need to be notified about their own dive site
+        return self._fan_out(content, user_prefs, exclude_user_id=dive_site.created_by, db=db)
     
-    async def notify_users_for_new_dive(self, dive_id: int, db: Session) -> int:
-        """Notify users about a new dive."""
+    def fan_out_new_dive(self, dive_id: int, db: Session) -> Optional[FanoutStats]:
+        """Notify subscribed users about a new dive."""
         dive = db.query(Dive).filter(Dive.id == dive_id).first()
         if not dive:
             logger.error(f"Dive {dive_id} not found")
-            return 0
+            return None
         
         # Get dive site location
         entity_location = None
@@ -615,169 +627,108 @@ class NotificationService:
             if dive_site and dive_site.latitude and dive_site.longitude:
                 entity_location = {'lat': float(dive_site.latitude), 'lng': float(dive_site.longitude)}
         
-        users = self._get_users_to_notify(
+        user_prefs = self._get_users_to_notify(
             category='new_dives',
             entity_location=entity_location,
             db=db
         )
         
-        # Exclude the creator from notifications (they don't need to be notified about their own dive)
-        creator_id = dive.user_id
-        if creator_id:
-            users = [user for user in users if user.id != creator_id]
-        
-        notification_count = 0
-        for user in users:
-            preference = db.query(NotificationPreference).filter(
-                NotificationPreference.user_id == user.id,
-                NotificationPreference.category == 'new_dives'
-            ).first()
-            
-            if not preference:
-                continue
-            
-            link_url = f"/dives/{dive_id}"
-            notification = self.create_notification(
-                user_id=user.id,
-                category='new_dives',
-                title=f"New Dive: {dive.name or 'Untitled Dive'}",
-                message=f"A new dive has been logged.",
-                link_url=link_url,
-                entity_type='dive',
-                entity_id=dive_id,
-                db=db
-            )
-            
-            if notification:
-                notification_count += 1
-                if preference.enable_email and preference.frequency == 'immediate':
-                    self._queue_email_notification(notification, user, 'new_dive', db)
-                
-                # Queue push notification if enabled
-                if preference.enable_push:
-                    self._queue_push_notifications(notification, user, db)
-        
-        return notification_count
+        content = FanoutContent(
+            category='new_dives',
+            title=f"New Dive: {dive.name or 'Untitled Dive'}",
+            message="A new dive has been logged.",
+            link_url=f"/dives/{dive_id}",
+            entity_type='dive',
+            entity_id=dive_id,
+            template_name='new_dive'
+        )
+        return self._fan_out(content, user_prefs, exclude_user_id=dive.user_id, db=db)
     
-    async def notify_users_for_new_diving_center(self, center_id: int, db: Session) -> int:
-        """Notify users about a new diving center."""
+    def fan_out_new_diving_center(self, center_id: int, db: Session) -> Optional[FanoutStats]:
+        """Notify subscribed users about a new diving center."""
         center = db.query(DivingCenter).filter(DivingCenter.id == center_id).first()
         if not center:
             logger.error(f"Diving center {center_id} not found")
-            return 0
-        
-        # Get center location
-        entity_location = None
-        if center.location:
-            from sqlalchemy import text
-            result = db.execute(
-                text("SELECT ST_Y(location) as lat, ST_X(location) as lng FROM diving_centers WHERE id = :id"),
-                {'id': center_id}
-            ).first()
-            if result:
-                entity_location = {'lat': float(result.lat), 'lng': float(result.lng)}
+            return None
         
-        users = self._get_users_to_notify(
+        user_prefs = self._get_users_to_notify(
             category='new_diving_centers',
-            entity_location=entity_location,
+            entity_location=self._get_entity_location('diving_center', center_id, db),
             entity_country=center.country,
             entity_region=center.region,
             db=db
         )
         
-        # Exclude the owner from notifications (they don't need to be notified about their own center)
-        owner_id = center.owner_id
-        if owner_id:
-            users = [user for user in users if user.id != owner_id]
-        
-        notification_count = 0
-        for user in users:
-            preference = db.query(NotificationPreference).filter(
-                NotificationPreference.user_id == user.id,
-                NotificationPreference.category == 'new_diving_centers'
-            ).first()
-            
-            if not preference:
-                continue
-            
-            link_url = f"/diving-centers/{center_id}"
-            notification = self.create_notification(
-                user_id=user.id,
-                category='new_diving_centers',
-                title=f"New Diving Center: {center.name}",
-                message=f"A new diving center '{center.name}' has been added.",
-                link_url=link_url,
-                entity_type='diving_center',
-                entity_id=center_id,
-                db=db
-            )
-            
-            if notification:
-                notification_count += 1
-                if preference.enable_email and preference.frequency == 'immediate':
-                    self._queue_email_notification(notification, user, 'new_diving_center', db)
-        
-        return notification_count
+        content = FanoutContent(
+            category='new_diving_centers',
+            title=f"New Diving Center: {center.name}",
+            message=f"A new diving center '{center.name}' has been added.",
+            link_url=f"/diving-centers/{center_id}",
+            entity_type='diving_center',
+            entity_id=center_id,
+            template_name='new_diving_center'
+        )
+        return self._fan_out(content, user_prefs, exclude_user_id=center.owner_id, db=db)
     
-    async def notify_users_for_new_dive_trip(self, trip_id: int, db: Session) -> int:
-        """Notify users about a new dive trip."""
+    def fan_out_new_dive_trip(self, trip_id: int, db: Session) -> Optional[FanoutStats]:
+        """Notify subscribed users about a new dive trip."""
         trip = db.query(ParsedDiveTrip).filter(ParsedDiveTrip.id == trip_id).first()
         if not trip:
             logger.error(f"Dive trip {trip_id} not found")
-            return 0
-        
-        # Get center location
-        entity_location = None
-        if trip.diving_center_id:
-            from sqlalchemy import text
-            result = db.execute(
-                text("SELECT ST_Y(location) as lat, ST_X(location) as lng FROM diving_centers WHERE id = :id"),
-                {'id': trip.diving_center_id}
-            ).first()
-            if result:
-                entity_location = {'lat': float(result.lat), 'lng': float(result.lng)}
+            return None
         
-        users = self._get_users_to_notify(
+        user_prefs = self._get_users_to_notify(
             category='new_dive_trips',
-            entity_location=entity_location,
+            entity_location=self._get_entity_location('dive_trip', trip_id, db),
             db=db
         )
         
-        # Exclude the diving center owner from notifications (they don't need to be notified about their own trips)
+        # The diving center owner doesn't need to be notified about their own trips
+        owner_id = None
         if trip.diving_center_id:
             diving_center = db.query(DivingCenter).filter(DivingCenter.id == trip.diving_center_id).first()
-            if diving_center and diving_center.owner_id:
-                users = [user for user in users if user.id != diving_center.owner_id]
+            owner_id = diving_center.owner_id if diving_center else None
         
-        notification_count = 0
-        for user in users:
-            preference = db.query(NotificationPreference).filter(
-                NotificationPreference.user_id == user.id,
-                NotificationPreference.category == 'new_dive_trips'
-            ).first()
-            
-            if not preference:
-                continue
-            
-            link_url = f"/dive-trips/{trip_id}"
-            notification = self.create_notification(
-                user_id=user.id,
-                category='new_dive_trips',
-                title=f"New Dive Trip: {getattr(trip, 'title', None) or f'Trip on {trip.trip_date}'}",
-                message=f"A new dive trip has been posted.",
-                link_url=link_url,
-                entity_type='dive_trip',
-                entity_id=trip_id,
-                db=db
-            )
-            
-            if notification:
-                notification_count += 1
-                if preference.enable_email and preference.frequency == 'immediate':
-                    self._queue_email_notification(notification, user, 'new_dive_trip', db)
+        content = FanoutContent(
+            category='new_dive_trips',
+            title=f"New Dive Trip: {getattr(trip, 'title', None) or f'Trip on {trip.trip_date}'}",
+            message="A new dive trip has been posted.",
+            link_url=f"/dive-trips/{trip_id}",
+            entity_type='dive_trip',
+            entity_id=trip_id,
+            template_name='new_dive_trip'
+        )
+        return self._fan_out(content, user_prefs, exclude_user_id=owner_id, db=db)
+    
+    async def notify_users_for_new_dive_site(self, dive_site_id: int, db: Session) -> int:
+        """
+        Notify users about a new dive site.
         
-        return notification_count
-
+        Args:
+            dive_site_id: Dive site ID
+            db: Database session
+        
+        Returns:
+            Number of users notified
+        """
+        stats = self.fan_out_new_dive_site(dive_site_id, db)
+        return stats.recipients if stats else 0
+    
+    async def notify_users_for_new_dive(self, dive_id: int, db: Session) -> int:
+        """Notify users about a new dive."""
+        stats = self.fan_out_new_dive(dive_id, db)
+        return stats.recipients if stats else 0
+    
+    async def notify_users_for_new_diving_center(self, center_id: int, db: Session) -> int:
+        """Notify users about a new diving center."""
+        stats = self.fan_out_new_diving_center(center_id, db)
+        return stats.recipients if stats else 0
+    
+    async def notify_users_for_new_dive_trip(self, trip_id: int, db: Session) -> int:
+        """Notify users about a new dive trip."""
+        stats = self.fan_out_new_dive_trip(trip_id, db)
+        return stats.recipients if stats else 0
+    
     async def notify_chat_message(self, room_id: str, sender_id: int, message_id: int, db: Session) -> int:
         """
         Notify chat room members about a new message.
@@ -1137,4 +1088,32 @@ class NotificationService:
                     self._queue_email_notification(notification, admin, 'admin_alert', db)
         
         logger.info(f"Created {notification_count} admin notifications for diving center claim {diving_center_id}")
-        return notification_count
\ No newline at end of file
+        return notification_count
+
+
+_NEW_CONTENT_FAN_OUTS = {
+    'dive_site': NotificationService.fan_out_new_dive_site,
+    'dive': NotificationService.fan_out_new_dive,
+    'diving_center': NotificationService.fan_out_new_diving_center,
+    'dive_trip': NotificationService.fan_out_new_dive_trip,
+}
+
+
+def send_new_content_notifications(entity_type: str, entity_id: int) -> Optional[FanoutStats]:
+    """
+    Background task notifying subscribers about new content.
+    
+    Synchronous on purpose: Starlette runs it in the threadpool after the
+    response is sent, so the fan-out neither delays the request nor blocks
+    the event loop. Uses its own database session.
+    """
+    from app.database import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        return _NEW_CONTENT_FAN_OUTS[entity_type](NotificationService(), entity_id, db)
+    except Exception as e:
+        logger.error(f"Failed to send notifications for new {entity_type} {entity_id}: {e}", exc_info=True)
+        return None
+    finally:
+        db.close()
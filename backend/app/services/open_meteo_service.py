@@ -8,14 +8,26 @@ Uses 3-tier caching:
 1. In-memory cache (fastest, lost on restart)
 2. Database cache (persistent, shared across instances)
 3. Open-Meteo API (source of truth)
+
+Both cache tiers hold whole forecast runs (the hourly wind and marine arrays of
+a 0.1° cell over a multi-day window), so any hour in the window is served by
+slicing the cached arrays instead of refetching.
+
+Concurrent cache misses for the same forecast run are coalesced: one request
+fetches while the others wait on it, in-process via an in-flight registry and
+across workers via a short-lived "fetching" lease row in the database cache.
 """
 
+import asyncio
+import httpx
 import requests
 import math
 import random
+import threading
+import time
 from collections import defaultdict
-from typing import Optional, Dict, List, Tuple
-from datetime import datetime, timedelta, timezone
+from typing import Optional, Dict, List, Set, Tuple
+from datetime import date, datetime, timedelta, timezone
 import logging
 from decimal import Decimal
 
@@ -25,15 +37,41 @@ logger = logging.getLogger(__name__)
 OPEN_METEO_BASE_URL = "https://api.open-meteo.com/v1/forecast"
 OPEN_METEO_MARINE_URL = "https://marine-api.open-meteo.com/v1/marine"
 
+# Hourly variables requested from the forecast and marine APIs
+_WIND_HOURLY_FIELDS = ("wind_speed_10m", "wind_direction_10m", "wind_gusts_10m")
+_MARINE_HOURLY_FIELDS = (
+    "wave_height", "wave_direction", "wave_period",
+    "swell_wave_height", "swell_wave_direction", "swell_wave_period",
+    "sea_surface_temperature", "sea_level_height_msl",
+)
+
+# Days of hourly data fetched (and cached) per forecast run: the requested day
+# plus the +2 day window the time slider can reach
+_forecast_window_days = 3
+
+# Locations per multi-location API call
+_batch_size = 50
+# Upper bound on concurrent upstream requests (and pooled connections) for async grid fetches
+_max_concurrent_requests = 8
+# Lifetime of a "fetching" lease row: other workers wait at most this long for
+# the lease holder's forecast run before fetching it themselves
+_fetch_lease_seconds = 15
+_lease_poll_interval_seconds = 0.25
+# Shared async HTTP client, see _get_async_client()
+_async_client: Optional[httpx.AsyncClient] = None
+_async_client_loop: Optional[asyncio.AbstractEventLoop] = None
+
 # Cache for wind data (in-memory dictionary)
+# Entries are whole forecast runs (~72 hourly values per variable) per 0.1° cell;
+# individual hours are served by slicing the cached arrays.
 _wind_cache: Dict[str, Dict] = {}
+# Entries are written from request threads (asyncio.to_thread) and the event loop
+_wind_cache_lock = threading.Lock()
 _cache_ttl_seconds = 15 * 60  # 15 minutes (fallback for old cache entries)
-# Increased cache size to accommodate zoom 12-13 usage patterns
-# Single viewport at zoom 13: ~480 entries
-# Typical session (panning + time exploration): ~1100-1600 entries
-# Buffer: ~500-1000 entries
-# Memory cost: ~875 KB (negligible)
-_max_cache_size = 2500  # Maximum number of cache entries
+# Single viewport: at most 100 grid points, usually far fewer 0.1° cells
+# Typical session (panning + time exploration): a few hundred cells
+# Memory cost: ~25 KB per forecast run
+_max_cache_size = 1000  # Maximum number of cache entries
 
 
 def _generate_cache_key(latitude: float, longitude: float, bounds: Optional[Dict] = None, target_datetime: Optional[datetime] = None) -> str:
@@ -119,6 +157,10 @@ def _is_cache_valid(cache_entry: Dict, target_datetime: Optional[datetime] = Non
     if 'timestamp' not in cache_entry:
         return False
 
+    # Forecast runs carry an explicit expiry
+    if cache_entry.get('expires_at') is not None:
+        return datetime.now() < cache_entry['expires_at']
+
     # Get target_datetime from cache entry or parameter
     entry_target_datetime = cache_entry.get('target_datetime')
     if entry_target_datetime is None:
@@ -141,40 +183,61 @@ def _is_cache_valid(cache_entry: Dict, target_datetime: Optional[datetime] = Non
 
 def _cleanup_cache():
     """Remove expired entries and limit cache size."""
-    global _wind_cache
-
-    # Remove expired entries using dynamic TTL
-    expired_keys = [
-        key for key, entry in _wind_cache.items()
-        if not _is_cache_valid(entry)
-    ]
-    for key in expired_keys:
-        del _wind_cache[key]
-
-    # Limit cache size (LRU: remove oldest entries)
-    if len(_wind_cache) > _max_cache_size:
-        # Sort by timestamp and remove oldest
-        sorted_entries = sorted(
-            _wind_cache.items(),
-            key=lambda x: x[1].get('timestamp', datetime.min)
-        )
-        entries_to_remove = len(_wind_cache) - _max_cache_size
-        for key, _ in sorted_entries[:entries_to_remove]:
+    with _wind_cache_lock:
+        # Remove expired entries using dynamic TTL
+        expired_keys = [
+            key for key, entry in _wind_cache.items()
+            if not _is_cache_valid(entry)
+        ]
+        for key in expired_keys:
             del _wind_cache[key]
 
+        # Limit cache size (LRU: remove oldest entries)
+        if len(_wind_cache) > _max_cache_size:
+            # Sort by timestamp and remove oldest
+            sorted_entries = sorted(
+                _wind_cache.items(),
+                key=lambda x: x[1].get('timestamp', datetime.min)
+            )
+            entries_to_remove = len(_wind_cache) - _max_cache_size
+            for key, _ in sorted_entries[:entries_to_remove]:
+                del _wind_cache[key]
+
+
+def _get_memory_entry(cache_key: str) -> Optional[Dict]:
+    """In-memory cache entry (Tier 1) for a key, valid or not."""
+    with _wind_cache_lock:
+        return _wind_cache.get(cache_key)
+
+
+def _open_database_cache_session():
+    """Session for a series of Tier 2 lookups, or None if the database is unavailable."""
+    try:
+        # Import here to avoid circular dependencies
+        from app.database import SessionLocal
+        return SessionLocal()
+    except Exception as e:
+        logger.warning(f"[DB CACHE] Error opening database cache session: {e}")
+        return None
+
 
-def _get_from_database_cache(cache_key: str, latitude: float, longitude: float, target_datetime: Optional[datetime]) -> Optional[Dict]:
+def _get_from_database_cache(cache_key: str, latitude: float, longitude: float, target_datetime: Optional[datetime], db=None) -> Optional[Dict]:
     """
     Retrieve wind data from database cache (Tier 2 cache).
 
+    Pass db to run several lookups on one session (the caller closes it);
+    otherwise a session is opened for this lookup.
+
     Returns None if not found or expired.
     """
+    owns_session = db is None
     try:
         # Import here to avoid circular dependencies
         from app.database import SessionLocal
         from app.models import WindDataCache
 
-        db = SessionLocal()
+        if owns_session:
+            db = SessionLocal()
         try:
             # Calculate rounded coordinates (matching cache key generation)
             rounded_lat = round(latitude * 10) / 10
@@ -233,10 +296,13 @@ def _get_from_database_cache(cache_key: str, latitude: float, longitude: float,
             return None
 
         finally:
-            db.close()
+            if owns_session:
+                db.close()
     except Exception as e:
         # Log error but don't fail - fall back to API
         logger.warning(f"[DB CACHE] Error reading from database cache: {e}")
+        if not owns_session:
+            db.rollback()
         return None
 
 
@@ -406,6 +472,9 @@ def _store_batch_in_database_cache(entries: List[Dict]):
             # The cache keys were missing from the query due to a bug in how they were constructed
             cache_keys = []
             for entry in entries:
+                if entry.get('cache_key'):
+                    cache_keys.append(entry['cache_key'])
+                    continue
                 # We must recalculate the cache key exactly as it's generated when stored
                 rounded_lat = round(entry['latitude'] * 10) / 10
                 rounded_lon = round(entry['longitude'] * 10) / 10
@@ -573,6 +642,399 @@ def _create_grid_points(bounds: Dict, zoom_level: Optional[int] = None) -> List[
     return points
 
 
+def _generate_forecast_cache_key(latitude: float, longitude: float, run_date: date) -> str:
+    """
+    Generate the cache key of a forecast run.
+
+    A run holds the full hourly arrays for one 0.1° cell, starting at run_date
+    and spanning _forecast_window_days days.
+    """
+    rounded_lat = round(latitude * 10) / 10
+    rounded_lon = round(longitude * 10) / 10
+    return f"wind-forecast-{rounded_lat}-{rounded_lon}-{run_date.isoformat()}"
+
+
+def _forecast_run_dates(target_datetime: datetime) -> List[date]:
+    """Start dates of the forecast runs whose window can contain target_datetime (newest first)."""
+    target_date = target_datetime.date()
+    return [target_date - timedelta(days=offset) for offset in range(_forecast_window_days)]
+
+
+def _forecast_date_range(target_datetime: datetime) -> Tuple[str, str]:
+    """start_date/end_date parameters for a forecast run starting on the target's date."""
+    start = target_datetime.date()
+    end = start + timedelta(days=_forecast_window_days - 1)
+    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+
+
+def _build_hourly_forecast(hourly: Dict, marine_hourly: Dict) -> Dict:
+    """Collect the hourly wind and marine arrays of one location into a forecast run."""
+    forecast = {"time": list(hourly.get("time", []))}
+    for field in _WIND_HOURLY_FIELDS:
+        forecast[field] = list(hourly.get(field) or [])
+    for field in _MARINE_HOURLY_FIELDS:
+        forecast[field] = list(marine_hourly.get(field) or [])
+    return forecast
+
+
+def _slice_hourly_forecast(forecast: Dict, target_datetime: datetime, exact: bool = True) -> Optional[Dict]:
+    """
+    Extract the wind data of a single hour from a forecast run.
+
+    Args:
+        forecast: Forecast run as built by _build_hourly_forecast
+        target_datetime: Requested datetime (rounded down to the hour)
+        exact: If False and the hour is not in the run, fall back to the first
+               available hour (how a fresh API response has always been handled)
+
+    Returns:
+        Dictionary with wind, marine and timestamp fields, or None if the run
+        does not cover the requested hour
+    """
+    times = forecast.get("time") or []
+    target_time_str = target_datetime.replace(minute=0, second=0, microsecond=0).strftime("%Y-%m-%dT%H:00")
+
+    try:
+        hour_index = times.index(target_time_str)
+    except ValueError:
+        if exact or not times:
+            return None
+        hour_index = 0
+        logger.warning(f"Exact hour {target_time_str} not found in forecast, using {times[0]}")
+
+    try:
+        timestamp = datetime.fromisoformat(times[hour_index])
+    except (TypeError, ValueError):
+        timestamp = target_datetime
+
+    wind_data = {}
+    for field in _WIND_HOURLY_FIELDS:
+        values = forecast.get(field) or []
+        wind_data[field] = values[hour_index] if hour_index < len(values) else None
+    wind_data["timestamp"] = timestamp
+    for field in _MARINE_HOURLY_FIELDS:
+        values = forecast.get(field) or []
+        wind_data[field] = values[hour_index] if hour_index < len(values) else None
+    return wind_data
+
+
+def _store_forecast_in_memory(cache_key: str, forecast: Dict):
+    """Store a forecast run in the in-memory cache (Tier 1)."""
+    now = datetime.now()
+    entry = {
+        "data": forecast,
+        "timestamp": now,
+        "expires_at": now + _calculate_cache_ttl(None, now)
+    }
+    with _wind_cache_lock:
+        _wind_cache[cache_key] = entry
+
+
+def _get_from_memory_forecast(latitude: float, longitude: float, target_datetime: datetime, allow_expired: bool = False) -> Optional[Dict]:
+    """Serve one hour from any in-memory forecast run of the cell that covers target_datetime."""
+    for run_date in _forecast_run_dates(target_datetime):
+        entry = _get_memory_entry(_generate_forecast_cache_key(latitude, longitude, run_date))
+        if entry is None or not (allow_expired or _is_cache_valid(entry)):
+            continue
+        wind_data = _slice_hourly_forecast(entry["data"], target_datetime)
+        if wind_data:
+            return wind_data
+    return None
+
+
+def _forecast_database_entry(cache_key: str, latitude: float, longitude: float, forecast: Dict) -> Dict:
+    """
+    Build a database cache entry for a forecast run.
+
+    Runs are stored without target_datetime, so they get the 1 hour TTL of
+    _calculate_cache_ttl(None, ...) and never match per-hour location lookups.
+    """
+    return {
+        "cache_key": cache_key,
+        "latitude": latitude,
+        "longitude": longitude,
+        "target_datetime": None,
+        "wind_data": forecast
+    }
+
+
+class _InFlightRegistry:
+    """
+    Per-key registry of upstream fetches in progress (singleflight).
+
+    The first caller to claim a key becomes the leader and fetches; concurrent
+    callers for the same key get the leader's event and wait for it instead of
+    issuing a duplicate request.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._events: Dict[str, threading.Event] = {}
+
+    def claim(self, key: str) -> Tuple[bool, threading.Event]:
+        """Return (is_leader, event) for key."""
+        with self._lock:
+            event = self._events.get(key)
+            if event is not None:
+                return False, event
+            event = threading.Event()
+            self._events[key] = event
+            return True, event
+
+    def release(self, key: str):
+        """Mark the leader's fetch for key as finished and wake up waiters."""
+        with self._lock:
+            event = self._events.pop(key, None)
+        if event is not None:
+            event.set()
+
+
+_inflight_fetches = _InFlightRegistry()
+
+# Upstream fetch and request coalescing counters (see get_wind_fetch_stats)
+_fetch_stats: Dict[str, int] = defaultdict(int)
+_fetch_stats_lock = threading.Lock()
+
+
+def _record_fetch_stat(name: str, count: int = 1):
+    with _fetch_stats_lock:
+        _fetch_stats[name] += count
+
+
+def get_wind_fetch_stats() -> Dict[str, int]:
+    """
+    Counters for Open-Meteo fetches in this worker.
+
+    - upstream_fetches: forecast runs fetched from Open-Meteo
+    - coalesced_hits: requests served by another in-process request's fetch
+    - cross_worker_coalesced_hits: requests served by another worker's fetch (DB lease)
+    - lease_wait_timeouts: lease waits that gave up and fetched themselves
+    """
+    with _fetch_stats_lock:
+        stats = {
+            "upstream_fetches": 0,
+            "coalesced_hits": 0,
+            "cross_worker_coalesced_hits": 0,
+            "lease_wait_timeouts": 0,
+        }
+        stats.update(_fetch_stats)
+    return stats
+
+
+def _lease_cache_key(run_key: str) -> str:
+    """WindDataCache key of the "fetching" lease row for a forecast run."""
+    return f"{run_key}-fetching"
+
+
+def _acquire_fetch_leases(cells: List[Tuple[str, float, float]]) -> Set[str]:
+    """
+    Claim short "fetching" lease rows in the database cache for forecast runs.
+
+    Makes concurrent cache misses coalesce across uvicorn workers: only the
+    worker holding the lease fetches a run, others wait for its cache row.
+
+    Args:
+        cells: (run_key, latitude, longitude) per forecast run
+
+    Returns:
+        Run keys whose lease was acquired. On database errors all keys are
+        returned so fetching is never blocked by the cache.
+    """
+    if not cells:
+        return set()
+
+    try:
+        # Import here to avoid circular dependencies
+        from sqlalchemy.exc import IntegrityError
+        from app.database import SessionLocal
+        from app.models import WindDataCache
+
+        db = SessionLocal()
+        try:
+            now_utc = datetime.utcnow()
+
+            # Leases of crashed or stalled workers expire and can be re-claimed
+            db.query(WindDataCache).filter(
+                WindDataCache.cache_key.in_([_lease_cache_key(run_key) for run_key, _, _ in cells]),
+                WindDataCache.expires_at <= now_utc
+            ).delete(synchronize_session=False)
+
+            acquired = set()
+            for run_key, latitude, longitude in cells:
+                try:
+                    with db.begin_nested():
+                        db.add(WindDataCache(
+                            cache_key=_lease_cache_key(run_key),
+                            latitude=Decimal(str(round(latitude * 10) / 10)),
+                            longitude=Decimal(str(round(longitude * 10) / 10)),
+                            target_datetime=None,
+                            wind_data={"status": "fetching"},
+                            expires_at=now_utc + timedelta(seconds=_fetch_lease_seconds)
+                        ))
+                    acquired.add(run_key)
+                except IntegrityError:
+                    # Another worker is fetching this run
+                    pass
+
+            db.commit()
+            return acquired
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    except Exception as e:
+        logger.warning(f"[DB CACHE] Error acquiring fetch leases: {e}")
+        return {run_key for run_key, _, _ in cells}
+
+
+def _release_fetch_leases(run_keys: List[str]):
+    """Delete "fetching" lease rows once the runs are stored (or the fetch failed)."""
+    if not run_keys:
+        return
+
+    try:
+        # Import here to avoid circular dependencies
+        from app.database import SessionLocal
+        from app.models import WindDataCache
+
+        db = SessionLocal()
+        try:
+            db.query(WindDataCache).filter(
+                WindDataCache.cache_key.in_([_lease_cache_key(run_key) for run_key in run_keys])
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+    except Exception as e:
+        # Leases expire on their own after _fetch_lease_seconds
+        logger.warning(f"[DB CACHE] Error releasing fetch leases: {e}")
+
+
+def _wait_for_database_forecasts(run_keys: List[str], timeout: Optional[float] = None) -> Dict[str, Dict]:
+    """Poll the database cache until the given runs are stored by their lease holder, or timeout."""
+    timeout = _fetch_lease_seconds if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    found: Dict[str, Dict] = {}
+    pending = list(run_keys)
+
+    while pending:
+        found.update(_get_batch_from_database_cache(pending))
+        pending = [run_key for run_key in pending if run_key not in found]
+        if not pending or time.monotonic() >= deadline:
+            break
+        time.sleep(_lease_poll_interval_seconds)
+
+    return found
+
+
+def _fetch_forecast_run(latitude: float, longitude: float, target_datetime: datetime, run_key: str) -> Optional[Dict]:
+    """
+    Fetch one forecast run (wind + marine hourly arrays) from Open-Meteo.
+
+    The run covers the whole forecast window starting at the requested date,
+    so every other hour the time slider can reach is served from it.
+
+    Raises:
+        requests.exceptions.RequestException: If the forecast request fails
+    """
+    start_date, end_date = _forecast_date_range(target_datetime)
+    params = {
+        "latitude": latitude,
+        "longitude": longitude,
+        "hourly": ",".join(_WIND_HOURLY_FIELDS),
+        "start_date": start_date,
+        "end_date": end_date,
+        "wind_speed_unit": "ms",  # Request wind speed in m/s
+        "timezone": "auto"
+    }
+
+    logger.info(f"[API CALL] Fetching wind data from Open-Meteo API for key {run_key} ({start_date} to {end_date})")
+    _record_fetch_stat("upstream_fetches")
+    response = requests.get(OPEN_METEO_BASE_URL, params=params, timeout=10)
+    response.raise_for_status()
+    data = response.json()
+    logger.info(f"[API SUCCESS] Successfully fetched wind data from Open-Meteo API for key {run_key}")
+
+    # Fetch Marine Data (Waves, Swell, SST, Tides)
+    marine_hourly = {}
+    try:
+        marine_params = {
+            "latitude": latitude,
+            "longitude": longitude,
+            "hourly": ",".join(_MARINE_HOURLY_FIELDS),
+            "start_date": start_date,
+            "end_date": end_date,
+            "timezone": "auto"
+        }
+        # Use a shorter timeout for marine data to not block the main request too long
+        marine_response = requests.get(OPEN_METEO_MARINE_URL, params=marine_params, timeout=5)
+        if marine_response.status_code == 200:
+            marine_data = marine_response.json()
+            if "hourly" in marine_data:
+                marine_hourly = marine_data["hourly"]
+                logger.info(f"[MARINE API SUCCESS] Successfully fetched marine data for key {run_key}")
+        else:
+            logger.warning(f"[MARINE API ERROR] Failed to fetch marine data: Status {marine_response.status_code}")
+    except Exception as e:
+        logger.warning(f"[MARINE API ERROR] Failed to fetch marine data: {e}")
+
+    if "hourly" not in data:
+        logger.warning(f"No wind data in Open-Meteo response for key {run_key} at {target_datetime}")
+        return None
+
+    forecast = _build_hourly_forecast(data["hourly"], marine_hourly)
+    if not forecast["time"]:
+        logger.warning(f"No hourly data available for key {run_key}")
+        return None
+
+    # Cache the whole run once (memory + database) instead of one entry per hour
+    _store_forecast_in_memory(run_key, forecast)
+    logger.info(f"[CACHE STORE] Cached {len(forecast['time'])} hours of forecast data for key {run_key}")
+    _store_batch_in_database_cache([_forecast_database_entry(run_key, latitude, longitude, forecast)])
+    _cleanup_cache()
+
+    return forecast
+
+
+def _fetch_forecast_run_coalesced(latitude: float, longitude: float, target_datetime: datetime, run_key: str) -> Optional[Dict]:
+    """
+    Fetch a forecast run at most once across concurrent requests.
+
+    Requests in this process wait on the leader's in-flight fetch; requests in
+    other workers wait on its "fetching" lease row. A waiter whose leader fails
+    or times out fetches the run itself.
+    """
+    is_leader, event = _inflight_fetches.claim(run_key)
+    if not is_leader:
+        event.wait(_fetch_lease_seconds)
+        entry = _get_memory_entry(run_key)
+        if entry:
+            _record_fetch_stat("coalesced_hits")
+            return entry["data"]
+        return _fetch_forecast_run(latitude, longitude, target_datetime, run_key)
+
+    try:
+        if run_key not in _acquire_fetch_leases([(run_key, latitude, longitude)]):
+            forecast = _wait_for_database_forecasts([run_key]).get(run_key)
+            if forecast:
+                _record_fetch_stat("cross_worker_coalesced_hits")
+                _store_forecast_in_memory(run_key, forecast)
+                return forecast
+            _record_fetch_stat("lease_wait_timeouts")
+            return _fetch_forecast_run(latitude, longitude, target_datetime, run_key)
+
+        try:
+            return _fetch_forecast_run(latitude, longitude, target_datetime, run_key)
+        finally:
+            _release_fetch_leases([run_key])
+    finally:
+        _inflight_fetches.release(run_key)
+
+
 def fetch_wind_data_single_point(latitude: float, longitude: float, target_datetime: Optional[datetime] = None, skip_validation: bool = False) -> Optional[Dict]:
     """
     Fetch wind data for a single point.
@@ -603,310 +1065,61 @@ def fetch_wind_data_single_point(latitude: float, longitude: float, target_datet
             logger.warning(f"Requested datetime {target_datetime} is in the past, using current time")
             target_datetime = datetime.now()
 
-    cache_key = _generate_cache_key(latitude, longitude, target_datetime=target_datetime)
-
-    # Check cache - first try exact hour match
-    if cache_key in _wind_cache and _is_cache_valid(_wind_cache[cache_key], target_datetime):
-        #logger.info(f"[CACHE HIT] Serving wind data from cache for key {cache_key} at {target_datetime} (exact match)")
-        return _wind_cache[cache_key].get('data')
+    cell_key = _generate_cache_key(latitude, longitude)
 
-    # Log cache key for debugging (only at debug level to avoid spam)
-    logger.debug(f"[CACHE LOOKUP] Checking cache for key: {cache_key} ")
+    # Tier 1: in-memory forecast runs covering the requested hour
+    wind_data = _get_from_memory_forecast(latitude, longitude, target_datetime)
+    if wind_data:
+        return wind_data
 
-    # OPTIMIZATION: If exact hour not found, check if ANY hour from the same date is cached
-    # When Open-Meteo returns 24 hours, we cache all hours, so if ANY hour from that date is cached,
-    # the requested hour should also be cached (unless there was an error during caching)
-    if target_datetime:
-        target_date = target_datetime.date()
-        # Check a few representative hours (00:00, 12:00, and the requested hour's date) to quickly find if data exists
-        # This is more efficient than checking all 24 hours
-        check_hours = [0, 12]  # Check midnight and noon as representatives
-        if target_datetime.hour not in check_hours:
-            check_hours.append(target_datetime.hour)  # Also check the requested hour itself
-
-        for hour in check_hours:
-            check_datetime = target_datetime.replace(hour=hour, minute=0, second=0, microsecond=0)
-            # Use _generate_cache_key to ensure consistent key format
-            check_cache_key = _generate_cache_key(latitude, longitude, target_datetime=check_datetime)
-
-            logger.debug(f"[CACHE LOOKUP] Checking for cached hour {hour:02d} with key: {check_cache_key}")
-
-            if check_cache_key in _wind_cache:
-                if _is_cache_valid(_wind_cache[check_cache_key], check_datetime):
-                    # Found cached data for this date! Since we cache all 24 hours when fetching any hour,
-                    # the requested hour should also be cached. Let's verify the exact hour exists.
-                    #logger.info(f"[CACHE LOOKUP] Found cached data for {target_date} hour {hour:02d}, checking if requested hour {target_datetime.hour:02d} is also cached...")
-
-                    # The exact hour should be in cache - check one more time (in case of race condition)
-                    if cache_key in _wind_cache and _is_cache_valid(_wind_cache[cache_key], target_datetime):
-                        logger.info(f"[CACHE HIT] Serving wind data from cache for key {cache_key} at {target_datetime} (found via date lookup, originally cached for hour {hour:02d})")
-                        return _wind_cache[cache_key].get('data')
-                    else:
-                        # This should not happen - if we cached hour {hour}, we should have cached all 24 hours
-                        # Log detailed information for debugging
-                        rounded_lat = round(latitude * 10) / 10
-                        rounded_lon = round(longitude * 10) / 10
-                        matching_keys = [k for k in _wind_cache.keys() if k.startswith(f'wind-{rounded_lat}-{rounded_lon}')]
-                        logger.warning(
-                            f"[CACHE INCONSISTENCY] Found cached data for {target_date} hour {hour:02d} "
-                            f"but requested hour {target_datetime.hour:02d} (cache_key: {cache_key}) is not in cache. "
-                            f"This suggests the 24-hour caching did not work correctly. "
-                            f"Available cache keys for this key {cache_key}: {matching_keys[:10]}"
-                        )
-                        # Fall through to make API call (which will cache all 24 hours again)
-                        break
-                else:
-                    logger.debug(f"[CACHE LOOKUP] Found cached hour {hour:02d} but it's expired (key: {check_cache_key})")
-            else:
-                logger.debug(f"[CACHE LOOKUP] Hour {hour:02d} not in cache (key: {check_cache_key})")
-
-    # Tier 2: Check database cache (if in-memory cache missed)
-    db_cache_data = _get_from_database_cache(cache_key, latitude, longitude, target_datetime)
-    if db_cache_data:
-        #logger.info(f"[DB CACHE HIT] Serving wind data from database cache for key {cache_key} at {target_datetime}")
-        # Also store in in-memory cache for faster subsequent access
-        _wind_cache[cache_key] = {
-            'data': db_cache_data,
-            'timestamp': datetime.now(),
-            'target_datetime': target_datetime  # Store for TTL calculation
-        }
-        return db_cache_data
+    # Tier 2: Check database cache (if in-memory cache missed), one session for all candidate runs
+    db = _open_database_cache_session()
+    try:
+        for run_date in _forecast_run_dates(target_datetime):
+            run_key = _generate_forecast_cache_key(latitude, longitude, run_date)
+            forecast = _get_from_database_cache(run_key, latitude, longitude, None, db)
+            if not forecast:
+                continue
+            wind_data = _slice_hourly_forecast(forecast, target_datetime)
+            if wind_data:
+                # Also store in in-memory cache for faster subsequent access
+                _store_forecast_in_memory(run_key, forecast)
+                return wind_data
+    finally:
+        if db is not None:
+            db.close()
 
     # Cache miss - need to fetch from Open-Meteo API
-    logger.info(f"[CACHE MISS] Wind data not in cache (memory or database) for key {cache_key} at {target_datetime}. Fetching from Open-Meteo API.")
+    logger.info(f"[CACHE MISS] Wind data not in cache (memory or database) for key {cell_key} at {target_datetime}. Fetching from Open-Meteo API.")
 
     try:
-        # OPTIMIZATION: Always use hourly forecast API (not "current") to get 24 hours of data
-        # This enables bulk caching of all 24 hours from a single API call
-        # The hourly API works for both current and future times, and always returns 24 hours
-        time_diff = (target_datetime - datetime.now()).total_seconds()
-
-        # Use hourly forecast for all requests (returns 24 hours, enables bulk caching)
-        start_date = target_datetime.strftime("%Y-%m-%d")
-        end_date = target_datetime.strftime("%Y-%m-%d")
-        logger.info(f"[API TYPE] Using 'hourly' forecast API for key {cache_key} at {target_datetime} (time_diff: {time_diff:.0f}s) - will cache all 24 hours")
-        params = {
-            "latitude": latitude,
-            "longitude": longitude,
-            "hourly": "wind_speed_10m,wind_direction_10m,wind_gusts_10m",
-            "start_date": start_date,
-            "end_date": end_date,
-            "wind_speed_unit": "ms",  # Request wind speed in m/s
-            "timezone": "auto"
-        }
-
-        logger.info(f"[API CALL] Fetching wind data from Open-Meteo API for key {cache_key} at {target_datetime}")
-        response = requests.get(OPEN_METEO_BASE_URL, params=params, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        logger.info(f"[API SUCCESS] Successfully fetched wind data from Open-Meteo API for key {cache_key} at {target_datetime}")
-
-        # Fetch Marine Data (Waves, Swell, SST, Tides)
-        marine_hourly = {}
-        try:
-            marine_params = {
-                "latitude": latitude,
-                "longitude": longitude,
-                "hourly": "wave_height,wave_direction,wave_period,swell_wave_height,swell_wave_direction,swell_wave_period,sea_surface_temperature,sea_level_height_msl",
-                "start_date": start_date,
-                "end_date": end_date,
-                "timezone": "auto"
-            }
-            # Use a shorter timeout for marine data to not block the main request too long
-            marine_response = requests.get(OPEN_METEO_MARINE_URL, params=marine_params, timeout=5)
-            if marine_response.status_code == 200:
-                marine_data = marine_response.json()
-                if "hourly" in marine_data:
-                    marine_hourly = marine_data["hourly"]
-                    logger.info(f"[MARINE API SUCCESS] Successfully fetched marine data for key {cache_key}")
-            else:
-                logger.warning(f"[MARINE API ERROR] Failed to fetch marine data: Status {marine_response.status_code}")
-        except Exception as e:
-            logger.warning(f"[MARINE API ERROR] Failed to fetch marine data: {e}")
-
-        wind_data = None
-
-        # Parse hourly forecast data (we always use hourly API now for 24-hour caching)
-        if "hourly" in data:
-            hourly = data["hourly"]
-            times = hourly.get("time", [])
-            target_hour = target_datetime.replace(minute=0, second=0, microsecond=0)
-
-            # Find the closest hour in the forecast
-            target_time_str = target_hour.strftime("%Y-%m-%dT%H:00")
-
-            try:
-                hour_index = times.index(target_time_str)
-            except ValueError:
-                # If exact hour not found, use the first available hour
-                if times:
-                    hour_index = 0
-                    logger.warning(f"Exact hour {target_time_str} not found in forecast, using {times[0]}")
-                else:
-                    logger.warning(f"No hourly data available for key {cache_key}")
-                    return None
-
-            # Wind speed is already in m/s due to wind_speed_unit=ms parameter
-            wind_data = {
-                "wind_speed_10m": hourly.get("wind_speed_10m", [None])[hour_index] if hour_index < len(hourly.get("wind_speed_10m", [])) else None,  # m/s
-                "wind_direction_10m": hourly.get("wind_direction_10m", [None])[hour_index] if hour_index < len(hourly.get("wind_direction_10m", [])) else None,  # degrees
-                "wind_gusts_10m": hourly.get("wind_gusts_10m", [None])[hour_index] if hour_index < len(hourly.get("wind_gusts_10m", [])) else None,  # m/s
-                "timestamp": target_datetime,
-                # Add Marine Data
-                "wave_height": marine_hourly.get("wave_height", [None])[hour_index] if hour_index < len(marine_hourly.get("wave_height", [])) else None,
-                "wave_direction": marine_hourly.get("wave_direction", [None])[hour_index] if hour_index < len(marine_hourly.get("wave_direction", [])) else None,
-                "wave_period": marine_hourly.get("wave_period", [None])[hour_index] if hour_index < len(marine_hourly.get("wave_period", [])) else None,
-                "swell_wave_height": marine_hourly.get("swell_wave_height", [None])[hour_index] if hour_index < len(marine_hourly.get("swell_wave_height", [])) else None,
-                "swell_wave_direction": marine_hourly.get("swell_wave_direction", [None])[hour_index] if hour_index < len(marine_hourly.get("swell_wave_direction", [])) else None,
-                "swell_wave_period": marine_hourly.get("swell_wave_period", [None])[hour_index] if hour_index < len(marine_hourly.get("swell_wave_period", [])) else None,
-                "sea_surface_temperature": marine_hourly.get("sea_surface_temperature", [None])[hour_index] if hour_index < len(marine_hourly.get("sea_surface_temperature", [])) else None,
-                "sea_level_height_msl": marine_hourly.get("sea_level_height_msl", [None])[hour_index] if hour_index < len(marine_hourly.get("sea_level_height_msl", [])) else None
-            }
-
-            # OPTIMIZATION #10: Cache all 24 hours from forecast response
-            # Open-Meteo returns 24 hours of data, so cache all hours to avoid refetching
-            if times and len(times) > 0:
-                # Extract date from first time entry (format: YYYY-MM-DDTHH:00)
-                first_time = times[0]
-                forecast_date = first_time.split('T')[0]  # Get YYYY-MM-DD
-
-                # Cache each hour from the forecast response
-                wind_speeds = hourly.get("wind_speed_10m", [])
-                wind_directions = hourly.get("wind_direction_10m", [])
-                wind_gusts = hourly.get("wind_gusts_10m", [])
-                
-                # Marine data lists
-                wave_heights = marine_hourly.get("wave_height", [])
-                wave_directions = marine_hourly.get("wave_direction", [])
-                wave_periods = marine_hourly.get("wave_period", [])
-                swell_heights = marine_hourly.get("swell_wave_height", [])
-                swell_directions = marine_hourly.get("swell_wave_direction", [])
-                swell_periods = marine_hourly.get("swell_wave_period", [])
-                ssts = marine_hourly.get("sea_surface_temperature", [])
-                sea_levels = marine_hourly.get("sea_level_height_msl", [])
-
-                for idx, time_str in enumerate(times):
-                    if idx < len(wind_speeds) and idx < len(wind_directions) and idx < len(wind_gusts):
-                        # Parse the hour from time string (YYYY-MM-DDTHH:00)
-                        try:
-                            hour_datetime = datetime.fromisoformat(time_str)
-                            hour_cache_key = _generate_cache_key(latitude, longitude, target_datetime=hour_datetime)
-                            
-                            # Prepare complete data object
-                            data_obj = {
-                                "wind_speed_10m": wind_speeds[idx],
-                                "wind_direction_10m": wind_directions[idx],
-                                "wind_gusts_10m": wind_gusts[idx],
-                                "timestamp": hour_datetime,
-                                # Add marine data if available for this index
-                                "wave_height": wave_heights[idx] if idx < len(wave_heights) else None,
-                                "wave_direction": wave_directions[idx] if idx < len(wave_directions) else None,
-                                "wave_period": wave_periods[idx] if idx < len(wave_periods) else None,
-                                "swell_wave_height": swell_heights[idx] if idx < len(swell_heights) else None,
-                                "swell_wave_direction": swell_directions[idx] if idx < len(swell_directions) else None,
-                                "swell_wave_period": swell_periods[idx] if idx < len(swell_periods) else None,
-                                "sea_surface_temperature": ssts[idx] if idx < len(ssts) else None,
-                                "sea_level_height_msl": sea_levels[idx] if idx < len(sea_levels) else None
-                            }
-
-                            # Always cache (even if already cached) to ensure all hours are available
-                            # This ensures that if we fetch hour 05:00, all 24 hours are cached and available
-                            _wind_cache[hour_cache_key] = {
-                                "data": data_obj,
-                                "timestamp": datetime.now(),
-                                "target_datetime": hour_datetime  # Store for TTL calculation
-                            }
-                        except (ValueError, IndexError) as e:
-                            logger.debug(f"Could not parse/cache hour {time_str}: {e}")
-                            continue
-
-                logger.info(f"[CACHE STORE] Cached {len(times)} hours of forecast data for key {cache_key} on {forecast_date} (from Open-Meteo API response)")
-
-                # OPTIMIZATION: Store all 24 hours in database cache as well
-                # This enables persistent caching across server restarts
-                batch_entries = []
-                for idx, time_str in enumerate(times):
-                    if idx < len(wind_speeds) and idx < len(wind_directions) and idx < len(wind_gusts):
-                        try:
-                            hour_datetime = datetime.fromisoformat(time_str)
-                            hour_cache_key = _generate_cache_key(latitude, longitude, target_datetime=hour_datetime)
-                            hour_wind_data = {
-                                "wind_speed_10m": wind_speeds[idx],
-                                "wind_direction_10m": wind_directions[idx],
-                                "wind_gusts_10m": wind_gusts[idx],
-                                "timestamp": hour_datetime,
-                                # Add marine data if available for this index
-                                "wave_height": wave_heights[idx] if idx < len(wave_heights) else None,
-                                "wave_direction": wave_directions[idx] if idx < len(wave_directions) else None,
-                                "wave_period": wave_periods[idx] if idx < len(wave_periods) else None,
-                                "swell_wave_height": swell_heights[idx] if idx < len(swell_heights) else None,
-                                "swell_wave_direction": swell_directions[idx] if idx < len(swell_directions) else None,
-                                "swell_wave_period": swell_periods[idx] if idx < len(swell_periods) else None,
-                                "sea_surface_temperature": ssts[idx] if idx < len(ssts) else None,
-                                "sea_level_height_msl": sea_levels[idx] if idx < len(sea_levels) else None
-                            }
-
-                            batch_entries.append({
-                                "cache_key": hour_cache_key,
-                                "latitude": latitude,
-                                "longitude": longitude,
-                                "target_datetime": hour_datetime,
-                                "wind_data": hour_wind_data
-                            })
-                        except (ValueError, IndexError) as e:
-                            logger.debug(f"Could not prepare hour {time_str} for database cache: {e}")
-                            continue
+        run_key = _generate_forecast_cache_key(latitude, longitude, target_datetime.date())
+        forecast = _fetch_forecast_run_coalesced(latitude, longitude, target_datetime, run_key)
+        if forecast is None:
+            return None
 
-                # Store all collected entries in one batch transaction
-                if batch_entries:
-                    _store_batch_in_database_cache(batch_entries)
+        wind_data = _slice_hourly_forecast(forecast, target_datetime, exact=False)
         if not wind_data:
-            logger.warning(f"No wind data in Open-Meteo response for key {cache_key} at {target_datetime}")
+            logger.warning(f"No hourly data available for key {run_key}")
             return None
 
-        # Cache the result (also cached above for forecast data, but ensure it's here for current data)
-        if cache_key not in _wind_cache:
-            _wind_cache[cache_key] = {
-                "data": wind_data,
-                "timestamp": datetime.now(),
-                "target_datetime": target_datetime  # Store for TTL calculation
-            }
-            logger.info(f"[CACHE STORE] Stored wind data in in-memory cache for key {cache_key} at {target_datetime}")
-
-        # Also store in database cache (non-blocking, errors are logged but don't fail)
-        _store_in_database_cache(cache_key, latitude, longitude, target_datetime, wind_data)
-
-        _cleanup_cache()
-
         return wind_data
 
     except requests.exceptions.RequestException as e:
-        logger.error(f"Error fetching wind data from Open-Meteo for key {cache_key} at {target_datetime}: {e}")
+        logger.error(f"Error fetching wind data from Open-Meteo for key {cell_key} at {target_datetime}: {e}")
         # Return cached data even if expired
-        if cache_key in _wind_cache:
-            logger.info(f"[CACHE HIT - EXPIRED] Returning expired cached data for key {cache_key} at {target_datetime} (API call failed)")
-            return _wind_cache[cache_key].get('data')
+        wind_data = _get_from_memory_forecast(latitude, longitude, target_datetime, allow_expired=True)
+        if wind_data:
+            logger.info(f"[CACHE HIT - EXPIRED] Returning expired cached data for key {cell_key} at {target_datetime} (API call failed)")
+            return wind_data
         return None
     except Exception as e:
         logger.error(f"Unexpected error fetching wind data: {e}", exc_info=True)
         return None
 
 
-def fetch_wind_data_grid(bounds: Dict, zoom_level: Optional[int] = None, target_datetime: Optional[datetime] = None, jitter_factor: int = 5) -> List[Dict]:
-    """
-    Fetch wind data for a grid of points within the given bounds.
-
-    Args:
-        bounds: Dictionary with 'north', 'south', 'east', 'west' keys
-        zoom_level: Current map zoom level (affects grid density)
-        target_datetime: Optional datetime for forecast (defaults to current time)
-        jitter_factor: Number of jittered variations to create for each grid point (default: 5)
-
-    Returns:
-        List of dictionaries with lat, lon, wind_speed_10m, wind_direction_10m, wind_gusts_10m
-        Each grid point is expanded into multiple points with small random jitter for visual density.
-    """
-    # Validate datetime once before processing all grid points to avoid duplicate warnings
+def _validate_grid_datetime(target_datetime: Optional[datetime]) -> datetime:
+    """Clamp a grid request datetime to the supported window (now - 1h .. now + 2 days)."""
     validated_datetime = target_datetime
     if validated_datetime is None:
         validated_datetime = datetime.now()
@@ -921,190 +1134,220 @@ def fetch_wind_data_grid(bounds: Dict, zoom_level: Optional[int] = None, target_
         if validated_datetime < datetime.now() - timedelta(hours=1):
             logger.warning(f"Requested datetime {validated_datetime} is in the past, using current time")
             validated_datetime = datetime.now()
+    return validated_datetime
 
-    grid_points = _create_grid_points(bounds, zoom_level)
-    wind_data_points = []
 
-    logger.info(f"Fetching wind data for {len(grid_points)} grid points at {validated_datetime or 'current time'}")
+def _group_points_by_cell(grid_points: List[Tuple[float, float]]) -> Dict[str, List[Tuple[float, float]]]:
+    """
+    Group grid points by cache key (0.1° grid cell).
 
-    # OPTIMIZATION #3: Group grid points by cache key (0.1° grid cell) before API calls
-    # This reduces API calls by reusing cached data or making one call per cache cell
-    from collections import defaultdict
+    OPTIMIZATION #3: reduces API calls by reusing cached data or making one call per cache cell.
+    """
     points_by_cache_key = defaultdict(list)
-    
     for lat, lon in grid_points:
-        # Generate cache key for this point (rounded to 0.1°)
-        cache_key = _generate_cache_key(lat, lon, target_datetime=validated_datetime)
-        points_by_cache_key[cache_key].append((lat, lon))
-    
+        points_by_cache_key[_generate_cache_key(lat, lon)].append((lat, lon))
+
     logger.debug(f"Grouped {len(grid_points)} grid points into {len(points_by_cache_key)} cache cells")
-    
-    # 1. Identify missing keys from L1 (Memory) Cache
+    return points_by_cache_key
+
+
+def _resolve_cells_from_cache(points_by_cache_key: Dict[str, List[Tuple[float, float]]], validated_datetime: datetime) -> Tuple[Dict[str, Dict], List[str]]:
+    """
+    Resolve grid cells from L1 (memory) and L2 (database) forecast runs.
+
+    Returns:
+        (wind data per cell for the requested hour, cache keys of cells missing from both tiers)
+    """
+    wind_data_by_cache_key: Dict[str, Dict] = {}
+
+    # 1. Identify missing cells from L1 (Memory) Cache
     missing_from_l1 = []
-    for cache_key in points_by_cache_key.keys():
-        if cache_key in _wind_cache and _is_cache_valid(_wind_cache[cache_key], validated_datetime):
-            # Cache hit L1
-            pass
+    for cache_key, points_in_cell in points_by_cache_key.items():
+        lat, lon = points_in_cell[0]
+        wind_data = _get_from_memory_forecast(lat, lon, validated_datetime)
+        if wind_data:
+            wind_data_by_cache_key[cache_key] = wind_data
         else:
             missing_from_l1.append(cache_key)
-            
-    # 2. Check L2 (DB) Cache for missing items (Batch)
+
+    # 2. Check L2 (DB) Cache for missing cells (Batch, all candidate runs in one query)
     missing_from_l2 = []
     if missing_from_l1:
-        db_cache_hits = _get_batch_from_database_cache(missing_from_l1)
+        run_dates = _forecast_run_dates(validated_datetime)
+        run_keys_by_cache_key = {
+            cache_key: [
+                _generate_forecast_cache_key(*points_by_cache_key[cache_key][0], run_date)
+                for run_date in run_dates
+            ]
+            for cache_key in missing_from_l1
+        }
+        db_cache_hits = _get_batch_from_database_cache(
+            [run_key for run_keys in run_keys_by_cache_key.values() for run_key in run_keys]
+        )
         for cache_key in missing_from_l1:
-            if cache_key in db_cache_hits:
-                # Cache hit L2 - promote to L1
-                _wind_cache[cache_key] = {
-                    'data': db_cache_hits[cache_key],
-                    'timestamp': datetime.now(),
-                    'target_datetime': validated_datetime
-                }
+            for run_key in run_keys_by_cache_key[cache_key]:
+                forecast = db_cache_hits.get(run_key)
+                wind_data = _slice_hourly_forecast(forecast, validated_datetime) if forecast else None
+                if wind_data:
+                    # Cache hit L2 - promote to L1
+                    _store_forecast_in_memory(run_key, forecast)
+                    wind_data_by_cache_key[cache_key] = wind_data
+                    break
             else:
                 missing_from_l2.append(cache_key)
-    
-    # 3. Batch Fetch from API for items missing from both caches
-    if missing_from_l2:
-        logger.info(f"Batch fetching {len(missing_from_l2)} locations from Open-Meteo")
-        
-        # Group missing keys by location to prepare API call
-        # We need representative lat/lon for each missing cache key
-        locations_to_fetch = []
-        for cache_key in missing_from_l2:
-            lat, lon = points_by_cache_key[cache_key][0]
-            locations_to_fetch.append((lat, lon, cache_key))
-            
-        # Chunk into batches (Open-Meteo limit is high but let's be safe, e.g., 50 locations)
-        batch_size = 50
-        
-        for i in range(0, len(locations_to_fetch), batch_size):
-            chunk = locations_to_fetch[i:i + batch_size]
-            lats = [str(x[0]) for x in chunk]
-            lons = [str(x[1]) for x in chunk]
-            
-            try:
-                start_date = validated_datetime.strftime("%Y-%m-%d")
-                end_date = validated_datetime.strftime("%Y-%m-%d")
-                
-                params = {
-                    "latitude": ",".join(lats),
-                    "longitude": ",".join(lons),
-                    "hourly": "wind_speed_10m,wind_direction_10m,wind_gusts_10m",
-                    "start_date": start_date,
-                    "end_date": end_date,
-                    "wind_speed_unit": "ms",
-                    "timezone": "auto"
-                }
-
-                response = requests.get(OPEN_METEO_BASE_URL, params=params, timeout=8)
-                response.raise_for_status()
-                
-                # Response is list of objects if multiple locations, or single object if one location
-                response_data = response.json()
-                if not isinstance(response_data, list):
-                    response_data = [response_data]
 
-                # Batch Fetch Marine Data
-                marine_response_data = []
-                try:
-                    marine_params = {
-                        "latitude": ",".join(lats),
-                        "longitude": ",".join(lons),
-                        "hourly": "wave_height,wave_direction,wave_period,swell_wave_height,swell_wave_direction,swell_wave_period,sea_surface_temperature,sea_level_height_msl",
-                        "start_date": start_date,
-                        "end_date": end_date,
-                        "timezone": "auto"
-                    }
-                    marine_resp = requests.get(OPEN_METEO_MARINE_URL, params=marine_params, timeout=5)
-                    if marine_resp.status_code == 200:
-                        data = marine_resp.json()
-                        if not isinstance(data, list):
-                            data = [data]
-                        marine_response_data = data
-                        logger.info(f"[MARINE BATCH] Successfully fetched marine data for {len(data)} locations")
-                    else:
-                        logger.warning(f"[MARINE BATCH ERROR] Failed with status {marine_resp.status_code}")
-                except Exception as e:
-                    logger.warning(f"[MARINE BATCH ERROR] Exception: {e}")
-                
-                # Collect all new entries for batch DB insert
-                all_new_db_entries = []
-                
-                for idx, location_data in enumerate(response_data):
-                    req_lat, req_lon, req_key = chunk[idx]
-                    
-                    # Get corresponding marine data
-                    marine_loc_data = {}
-                    if idx < len(marine_response_data):
-                        marine_loc_data = marine_response_data[idx].get("hourly", {})
-
-                    if "hourly" in location_data:
-                        hourly = location_data["hourly"]
-                        times = hourly.get("time", [])
-                        
-                        # Store all 24 hours in L1 and prepare for L2
-                        wind_speeds = hourly.get("wind_speed_10m", [])
-                        wind_directions = hourly.get("wind_direction_10m", [])
-                        wind_gusts = hourly.get("wind_gusts_10m", [])
-                        
-                        # Marine lists
-                        wave_heights = marine_loc_data.get("wave_height", [])
-                        wave_directions = marine_loc_data.get("wave_direction", [])
-                        wave_periods = marine_loc_data.get("wave_period", [])
-                        swell_heights = marine_loc_data.get("swell_wave_height", [])
-                        swell_directions = marine_loc_data.get("swell_wave_direction", [])
-                        swell_periods = marine_loc_data.get("swell_wave_period", [])
-                        ssts = marine_loc_data.get("sea_surface_temperature", [])
-                        sea_levels = marine_loc_data.get("sea_level_height_msl", [])
-
-                        for time_idx, time_str in enumerate(times):
-                            if time_idx < len(wind_speeds):
-                                try:
-                                    hour_dt = datetime.fromisoformat(time_str)
-                                    hour_key = _generate_cache_key(req_lat, req_lon, target_datetime=hour_dt)
-                                    
-                                    wind_entry = {
-                                        "wind_speed_10m": wind_speeds[time_idx],
-                                        "wind_direction_10m": wind_directions[time_idx],
-                                        "wind_gusts_10m": wind_gusts[time_idx],
-                                        "timestamp": hour_dt,
-                                        # Add marine data
-                                        "wave_height": wave_heights[time_idx] if time_idx < len(wave_heights) else None,
-                                        "wave_direction": wave_directions[time_idx] if time_idx < len(wave_directions) else None,
-                                        "wave_period": wave_periods[time_idx] if time_idx < len(wave_periods) else None,
-                                        "swell_wave_height": swell_heights[time_idx] if time_idx < len(swell_heights) else None,
-                                        "swell_wave_direction": swell_directions[time_idx] if time_idx < len(swell_directions) else None,
-                                        "swell_wave_period": swell_periods[time_idx] if time_idx < len(swell_periods) else None,
-                                        "sea_surface_temperature": ssts[time_idx] if time_idx < len(ssts) else None,
-                                        "sea_level_height_msl": sea_levels[time_idx] if time_idx < len(sea_levels) else None
-                                    }
-                                    
-                                    # Update L1
-                                    _wind_cache[hour_key] = {
-                                        "data": wind_entry,
-                                        "timestamp": datetime.now(),
-                                        "target_datetime": hour_dt
-                                    }
-                                    
-                                    # Collect for L2
-                                    all_new_db_entries.append({
-                                        "cache_key": hour_key,
-                                        "latitude": req_lat,
-                                        "longitude": req_lon,
-                                        "target_datetime": hour_dt,
-                                        "wind_data": wind_entry
-                                    })
-                                except Exception:
-                                    continue
-                                    
-                # Batch store in DB
-                if all_new_db_entries:
-                    _store_batch_in_database_cache(all_new_db_entries)
-                    
-            except Exception as e:
-                logger.error(f"Error in batch fetch: {e}")
-                # Continue to next batch, some points will be missing
-    
+    return wind_data_by_cache_key, missing_from_l2
+
+
+def _chunk_missing_cells(points_by_cache_key: Dict[str, List[Tuple[float, float]]], missing: List[str]) -> List[List[Tuple[float, float, str]]]:
+    """Split missing cells into (lat, lon, cache_key) chunks of _batch_size locations per API call."""
+    # We need a representative lat/lon for each missing cell
+    locations_to_fetch = []
+    for cache_key in missing:
+        lat, lon = points_by_cache_key[cache_key][0]
+        locations_to_fetch.append((lat, lon, cache_key))
+    return [locations_to_fetch[i:i + _batch_size] for i in range(0, len(locations_to_fetch), _batch_size)]
+
+
+def _chunk_request_params(chunk: List[Tuple[float, float, str]], start_date: str, end_date: str) -> Tuple[Dict, Dict]:
+    """Forecast and marine API parameters for a multi-location chunk."""
+    lats = ",".join(str(x[0]) for x in chunk)
+    lons = ",".join(str(x[1]) for x in chunk)
+    params = {
+        "latitude": lats,
+        "longitude": lons,
+        "hourly": ",".join(_WIND_HOURLY_FIELDS),
+        "start_date": start_date,
+        "end_date": end_date,
+        "wind_speed_unit": "ms",
+        "timezone": "auto"
+    }
+    marine_params = {
+        "latitude": lats,
+        "longitude": lons,
+        "hourly": ",".join(_MARINE_HOURLY_FIELDS),
+        "start_date": start_date,
+        "end_date": end_date,
+        "timezone": "auto"
+    }
+    return params, marine_params
+
+
+def _store_chunk_forecasts(chunk: List[Tuple[float, float, str]], response_data: List[Dict], marine_response_data: List[Dict], validated_datetime: datetime, wind_data_by_cache_key: Dict[str, Dict]) -> List[Dict]:
+    """
+    Cache one forecast run per location of a fetched chunk (L1) and slice the requested hour.
+
+    Returns the database cache entries to store in one batch.
+    """
+    run_date = validated_datetime.date()
+    db_entries = []
+
+    for idx, location_data in enumerate(response_data[:len(chunk)]):
+        req_lat, req_lon, req_key = chunk[idx]
+
+        # Get corresponding marine data
+        marine_loc_data = {}
+        if idx < len(marine_response_data):
+            marine_loc_data = marine_response_data[idx].get("hourly", {})
+
+        if "hourly" not in location_data:
+            continue
+
+        forecast = _build_hourly_forecast(location_data["hourly"], marine_loc_data)
+        wind_data = _slice_hourly_forecast(forecast, validated_datetime, exact=False)
+        if not wind_data:
+            continue
+
+        run_key = _generate_forecast_cache_key(req_lat, req_lon, run_date)
+        _store_forecast_in_memory(run_key, forecast)
+        wind_data_by_cache_key[req_key] = wind_data
+        db_entries.append(_forecast_database_entry(run_key, req_lat, req_lon, forecast))
+
+    _record_fetch_stat("upstream_fetches", len(db_entries))
+    return db_entries
+
+
+def _claim_grid_cells(points_by_cache_key: Dict[str, List[Tuple[float, float]]], missing: List[str], validated_datetime: datetime) -> Dict:
+    """
+    Claim missing grid cells so each forecast run is fetched by one request only.
+
+    Returns a dict with:
+        fetch: cell keys this request fetches from Open-Meteo
+        local_waits: {cell key: (run key, event)} being fetched by another request in this process
+        remote_waits: {cell key: run key} being fetched by another worker (lease held)
+        claimed: run keys claimed in the in-process registry
+        leased: run keys whose database lease this request holds
+    """
+    run_date = validated_datetime.date()
+    claims = {"fetch": [], "local_waits": {}, "remote_waits": {}, "claimed": [], "leased": []}
+
+    leader_cells = []
+    for cache_key in missing:
+        lat, lon = points_by_cache_key[cache_key][0]
+        run_key = _generate_forecast_cache_key(lat, lon, run_date)
+        is_leader, event = _inflight_fetches.claim(run_key)
+        if is_leader:
+            claims["claimed"].append(run_key)
+            leader_cells.append((cache_key, run_key, lat, lon))
+        else:
+            claims["local_waits"][cache_key] = (run_key, event)
+
+    if leader_cells:
+        leased = _acquire_fetch_leases([(run_key, lat, lon) for _, run_key, lat, lon in leader_cells])
+        for cache_key, run_key, _, _ in leader_cells:
+            if run_key in leased:
+                claims["fetch"].append(cache_key)
+                claims["leased"].append(run_key)
+            else:
+                claims["remote_waits"][cache_key] = run_key
+
+    return claims
+
+
+def _release_grid_claims(claims: Dict):
+    """Release database leases and in-process claims taken by _claim_grid_cells."""
+    _release_fetch_leases(claims["leased"])
+    for run_key in claims["claimed"]:
+        _inflight_fetches.release(run_key)
+
+
+def _collect_coalesced_cells(claims: Dict, validated_datetime: datetime, wind_data_by_cache_key: Dict[str, Dict]):
+    """
+    Wait for cells fetched by other requests and slice the requested hour.
+
+    Cells whose leader failed or timed out stay missing and go through the
+    single-point fallback.
+    """
+    for cache_key, (run_key, event) in claims["local_waits"].items():
+        event.wait(_fetch_lease_seconds)
+        entry = _get_memory_entry(run_key)
+        wind_data = _slice_hourly_forecast(entry["data"], validated_datetime, exact=False) if entry else None
+        if wind_data:
+            _record_fetch_stat("coalesced_hits")
+            wind_data_by_cache_key[cache_key] = wind_data
+
+    remote_waits = claims["remote_waits"]
+    if remote_waits:
+        forecasts = _wait_for_database_forecasts(list(remote_waits.values()))
+        for cache_key, run_key in remote_waits.items():
+            forecast = forecasts.get(run_key)
+            wind_data = _slice_hourly_forecast(forecast, validated_datetime, exact=False) if forecast else None
+            if wind_data:
+                _record_fetch_stat("cross_worker_coalesced_hits")
+                _store_forecast_in_memory(run_key, forecast)
+                wind_data_by_cache_key[cache_key] = wind_data
+            else:
+                _record_fetch_stat("lease_wait_timeouts")
+
+
+def _expand_grid_points(bounds: Dict, zoom_level: Optional[int], points_by_cache_key: Dict[str, List[Tuple[float, float]]], wind_data_by_cache_key: Dict[str, Dict], jitter_factor: int) -> List[Dict]:
+    """
+    Build the response points for resolved cells.
+
+    Each grid point is expanded into multiple points with small random jitter for visual density.
+    """
+    wind_data_points = []
+
     # Calculate jitter range based on grid spacing (small fraction of spacing)
     if zoom_level is None:
         zoom_level = 15
@@ -1140,15 +1383,7 @@ def fetch_wind_data_grid(bounds: Dict, zoom_level: Optional[int] = None, target_
     
     # Process points grouped by cache key
     for cache_key, points_in_cell in points_by_cache_key.items():
-        # Retrieve data from cache (it should be there now if fetch succeeded)
-        wind_data = None
-        if cache_key in _wind_cache:
-             wind_data = _wind_cache[cache_key].get('data')
-        
-        # Fallback to single point fetch if still missing (e.g. batch fetch failed)
-        if not wind_data:
-             representative_lat, representative_lon = points_in_cell[0]
-             wind_data = fetch_wind_data_single_point(representative_lat, representative_lon, validated_datetime, skip_validation=True)
+        wind_data = wind_data_by_cache_key.get(cache_key)
         
         if wind_data:
             # Apply the same wind data to all points in this cache cell
@@ -1220,18 +1455,271 @@ def fetch_wind_data_grid(bounds: Dict, zoom_level: Optional[int] = None, target_
                         )
     
     # More accurate log message
-    expected_total = len(grid_points) * jitter_factor
+    base_count = sum(len(points_in_cell) for points_in_cell in points_by_cache_key.values())
+    expected_total = base_count * jitter_factor
     logger.info(
         f"Successfully fetched wind data for {len(wind_data_points)} points "
-        f"({len(grid_points)} base points + {total_jittered_success}/{total_jittered_attempts} jittered variations, "
+        f"({base_count} base points + {total_jittered_success}/{total_jittered_attempts} jittered variations, "
         f"expected ~{expected_total} total)"
     )
     return wind_data_points
 
-def fetch_wind_data_batch(locations: List[Tuple[float, float]], target_datetime: Optional[datetime] = None) -> Dict[Tuple[float, float], Optional[Dict]]:
+
+def _fetch_grid_chunks(chunks: List[List[Tuple[float, float, str]]], start_date: str, end_date: str, validated_datetime: datetime, wind_data_by_cache_key: Dict[str, Dict]):
+    """Fetch and cache chunks of grid cells sequentially (sync grid path)."""
+    for chunk in chunks:
+        params, marine_params = _chunk_request_params(chunk, start_date, end_date)
+        try:
+            response = requests.get(OPEN_METEO_BASE_URL, params=params, timeout=8)
+            response.raise_for_status()
+
+            # Response is list of objects if multiple locations, or single object if one location
+            response_data = response.json()
+            if not isinstance(response_data, list):
+                response_data = [response_data]
+
+            # Batch Fetch Marine Data
+            marine_response_data = []
+            try:
+                marine_resp = requests.get(OPEN_METEO_MARINE_URL, params=marine_params, timeout=5)
+                if marine_resp.status_code == 200:
+                    data = marine_resp.json()
+                    if not isinstance(data, list):
+                        data = [data]
+                    marine_response_data = data
+                    logger.info(f"[MARINE BATCH] Successfully fetched marine data for {len(data)} locations")
+                else:
+                    logger.warning(f"[MARINE BATCH ERROR] Failed with status {marine_resp.status_code}")
+            except Exception as e:
+                logger.warning(f"[MARINE BATCH ERROR] Exception: {e}")
+
+            db_entries = _store_chunk_forecasts(chunk, response_data, marine_response_data, validated_datetime, wind_data_by_cache_key)
+            # Batch store in DB
+            if db_entries:
+                _store_batch_in_database_cache(db_entries)
+
+        except Exception as e:
+            logger.error(f"Error in batch fetch: {e}")
+            # Continue to next batch, some points will be missing
+
+
+def _fetch_cells(points_by_cache_key: Dict[str, List[Tuple[float, float]]], validated_datetime: datetime, max_fetch_cells: Optional[int] = None) -> Dict[str, Optional[Dict]]:
+    """
+    Resolve wind data for 0.1° cells: cache tiers first, then batched (coalesced)
+    Open-Meteo requests for missing cells, then single-point fallbacks.
+
+    Args:
+        max_fetch_cells: Fetch at most this many missing cells, in batches only
+            (no single-point fallbacks); the others are left unavailable
+
+    Returns:
+        Mapping of cell cache key -> wind data (None if unavailable)
+    """
+    wind_data_by_cache_key, missing = _resolve_cells_from_cache(points_by_cache_key, validated_datetime)
+    if max_fetch_cells is not None and len(missing) > max_fetch_cells:
+        logger.info(f"Fetching {max_fetch_cells} of {len(missing)} missing cells, the others stay unavailable")
+        missing = missing[:max_fetch_cells]
+
+    # Batch fetch from API for cells missing from both caches (unless another request is fetching them)
+    claims = _claim_grid_cells(points_by_cache_key, missing, validated_datetime) if missing else None
+    if claims:
+        try:
+            if claims["fetch"]:
+                logger.info(f"Batch fetching {len(claims['fetch'])} locations from Open-Meteo")
+                start_date, end_date = _forecast_date_range(validated_datetime)
+                _fetch_grid_chunks(_chunk_missing_cells(points_by_cache_key, claims["fetch"]), start_date, end_date, validated_datetime, wind_data_by_cache_key)
+                _cleanup_cache()
+        finally:
+            _release_grid_claims(claims)
+
+        _collect_coalesced_cells(claims, validated_datetime, wind_data_by_cache_key)
+
+    if max_fetch_cells is not None:
+        return wind_data_by_cache_key
+
+    # Fallback to single point fetch if still missing (e.g. batch fetch failed)
+    for cache_key, points_in_cell in points_by_cache_key.items():
+        if not wind_data_by_cache_key.get(cache_key):
+            representative_lat, representative_lon = points_in_cell[0]
+            wind_data_by_cache_key[cache_key] = fetch_wind_data_single_point(representative_lat, representative_lon, validated_datetime, skip_validation=True)
+
+    return wind_data_by_cache_key
+
+
+def fetch_wind_data_grid(bounds: Dict, zoom_level: Optional[int] = None, target_datetime: Optional[datetime] = None, jitter_factor: int = 5) -> List[Dict]:
+    """
+    Fetch wind data for a grid of points within the given bounds.
+
+    Blocking variant for sync callers; async handlers should use
+    fetch_wind_data_grid_async, which fetches all chunks concurrently.
+
+    Args:
+        bounds: Dictionary with 'north', 'south', 'east', 'west' keys
+        zoom_level: Current map zoom level (affects grid density)
+        target_datetime: Optional datetime for forecast (defaults to current time)
+        jitter_factor: Number of jittered variations to create for each grid point (default: 5)
+
+    Returns:
+        List of dictionaries with lat, lon, wind_speed_10m, wind_direction_10m, wind_gusts_10m
+        Each grid point is expanded into multiple points with small random jitter for visual density.
+    """
+    # Validate datetime once before processing all grid points to avoid duplicate warnings
+    validated_datetime = _validate_grid_datetime(target_datetime)
+
+    grid_points = _create_grid_points(bounds, zoom_level)
+    logger.info(f"Fetching wind data for {len(grid_points)} grid points at {validated_datetime or 'current time'}")
+
+    points_by_cache_key = _group_points_by_cell(grid_points)
+    wind_data_by_cache_key = _fetch_cells(points_by_cache_key, validated_datetime)
+
+    return _expand_grid_points(bounds, zoom_level, points_by_cache_key, wind_data_by_cache_key, jitter_factor)
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """
+    Shared async HTTP client (connection pool) for Open-Meteo requests.
+
+    An AsyncClient is bound to the event loop that first uses it, so a new one is
+    created if the running loop changed (e.g. between test clients).
+    """
+    global _async_client, _async_client_loop
+
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _async_client.is_closed or _async_client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=_max_concurrent_requests,
+                max_keepalive_connections=_max_concurrent_requests
+            )
+        )
+        _async_client_loop = loop
+    return _async_client
+
+
+async def close_async_client():
+    """Close the shared async HTTP client (called on application shutdown)."""
+    global _async_client, _async_client_loop
+
+    if _async_client is not None and not _async_client.is_closed:
+        await _async_client.aclose()
+    _async_client = None
+    _async_client_loop = None
+
+
+async def _fetch_chunk_async(client: httpx.AsyncClient, semaphore: asyncio.Semaphore, chunk: List[Tuple[float, float, str]], start_date: str, end_date: str) -> Tuple[Optional[List[Dict]], List[Dict]]:
+    """
+    Fetch forecast and marine data for one chunk; both requests run concurrently.
+
+    Returns:
+        (forecast response per location or None on failure, marine response per location)
+    """
+    params, marine_params = _chunk_request_params(chunk, start_date, end_date)
+
+    async def _get(url: str, request_params: Dict, timeout: float) -> httpx.Response:
+        async with semaphore:
+            return await client.get(url, params=request_params, timeout=timeout)
+
+    response, marine_resp = await asyncio.gather(
+        _get(OPEN_METEO_BASE_URL, params, 8),
+        _get(OPEN_METEO_MARINE_URL, marine_params, 5),
+        return_exceptions=True
+    )
+
+    try:
+        if isinstance(response, Exception):
+            raise response
+        response.raise_for_status()
+        response_data = response.json()
+        if not isinstance(response_data, list):
+            response_data = [response_data]
+    except Exception as e:
+        logger.error(f"Error in batch fetch: {e}")
+        return None, []
+
+    marine_response_data = []
+    if isinstance(marine_resp, Exception):
+        logger.warning(f"[MARINE BATCH ERROR] Exception: {marine_resp}")
+    elif marine_resp.status_code == 200:
+        try:
+            data = marine_resp.json()
+            marine_response_data = data if isinstance(data, list) else [data]
+            logger.info(f"[MARINE BATCH] Successfully fetched marine data for {len(marine_response_data)} locations")
+        except ValueError as e:
+            logger.warning(f"[MARINE BATCH ERROR] Exception: {e}")
+    else:
+        logger.warning(f"[MARINE BATCH ERROR] Failed with status {marine_resp.status_code}")
+
+    return response_data, marine_response_data
+
+
+async def fetch_wind_data_grid_async(bounds: Dict, zoom_level: Optional[int] = None, target_datetime: Optional[datetime] = None, jitter_factor: int = 5) -> List[Dict]:
+    """
+    Async variant of fetch_wind_data_grid for use inside FastAPI handlers.
+
+    Forecast and marine requests for all missing chunks run concurrently on the
+    shared connection pool, bounded by _max_concurrent_requests, so a cold grid
+    costs about one upstream round trip instead of one per chunk. Database cache
+    access and single-point fallbacks run in worker threads to keep the event
+    loop free.
+    """
+    validated_datetime = _validate_grid_datetime(target_datetime)
+
+    grid_points = _create_grid_points(bounds, zoom_level)
+    logger.info(f"Fetching wind data for {len(grid_points)} grid points at {validated_datetime or 'current time'}")
+
+    points_by_cache_key = _group_points_by_cell(grid_points)
+    wind_data_by_cache_key, missing = await asyncio.to_thread(_resolve_cells_from_cache, points_by_cache_key, validated_datetime)
+
+    claims = await asyncio.to_thread(_claim_grid_cells, points_by_cache_key, missing, validated_datetime) if missing else None
+    if claims:
+        try:
+            if claims["fetch"]:
+                logger.info(f"Batch fetching {len(claims['fetch'])} locations from Open-Meteo")
+                start_date, end_date = _forecast_date_range(validated_datetime)
+                chunks = _chunk_missing_cells(points_by_cache_key, claims["fetch"])
+
+                client = _get_async_client()
+                semaphore = asyncio.Semaphore(_max_concurrent_requests)
+                results = await asyncio.gather(*(
+                    _fetch_chunk_async(client, semaphore, chunk, start_date, end_date) for chunk in chunks
+                ))
+
+                db_entries = []
+                for chunk, (response_data, marine_response_data) in zip(chunks, results):
+                    if response_data is not None:
+                        db_entries.extend(_store_chunk_forecasts(chunk, response_data, marine_response_data, validated_datetime, wind_data_by_cache_key))
+                if db_entries:
+                    await asyncio.to_thread(_store_batch_in_database_cache, db_entries)
+
+                _cleanup_cache()
+        finally:
+            await asyncio.to_thread(_release_grid_claims, claims)
+
+        await asyncio.to_thread(_collect_coalesced_cells, claims, validated_datetime, wind_data_by_cache_key)
+
+    # Fallback to single point fetch if still missing (e.g. a chunk failed)
+    still_missing = [cache_key for cache_key in points_by_cache_key if not wind_data_by_cache_key.get(cache_key)]
+    if still_missing:
+        fallbacks = await asyncio.gather(*(
+            asyncio.to_thread(fetch_wind_data_single_point, *points_by_cache_key[cache_key][0], validated_datetime, True)
+            for cache_key in still_missing
+        ))
+        wind_data_by_cache_key.update(zip(still_missing, fallbacks))
+
+    return _expand_grid_points(bounds, zoom_level, points_by_cache_key, wind_data_by_cache_key, jitter_factor)
+
+
+def fetch_wind_data_batch(locations: List[Tuple[float, float]], target_datetime: Optional[datetime] = None, max_fetch_cells: Optional[int] = None) -> Dict[Tuple[float, float], Optional[Dict]]:
     """
     Fetch wind data for multiple locations efficiently.
-    Groups coordinates by 0.1° grid cell to minimize API calls.
+    Groups coordinates by 0.1° grid cell and fetches missing cells in multi-location
+    batches (same path as the map grid) to minimize API calls.
+
+    Args:
+        locations: (lat, lon) pairs
+        target_datetime: Forecast time (defaults to now)
+        max_fetch_cells: Bound on the cells fetched from Open-Meteo; locations
+            in cells beyond it map to None (see _fetch_cells)
     
     Returns:
         Mapping of (lat, lon) -> wind_data dictionary
@@ -1239,29 +1727,14 @@ def fetch_wind_data_batch(locations: List[Tuple[float, float]], target_datetime:
     if not locations:
         return {}
 
-    # Default to current time if not specified
-    if target_datetime is None:
-        target_datetime = datetime.now()
+    validated_datetime = _validate_grid_datetime(target_datetime)
 
-    results = {}
-    
-    # 1. Group locations by cache cell (0.1°)
-    cell_to_locations = defaultdict(list)
-    for lat, lon in locations:
-        cache_key = _generate_cache_key(lat, lon, target_datetime=target_datetime)
-        cell_to_locations[cache_key].append((lat, lon))
-    
-    # 2. Process each unique cell
-    for cache_key, points in cell_to_locations.items():
-        # Representative point for this cell
-        rep_lat, rep_lon = points[0]
-        
-        # Use existing single point fetch (which handles Tier 1 and Tier 2 caching)
-        wind_data = fetch_wind_data_single_point(rep_lat, rep_lon, target_datetime)
-        
-        # Apply result to all original locations in this cell
-        for point in points:
-            results[point] = wind_data
-            
-    return results
+    points_by_cache_key = _group_points_by_cell(locations)
+    wind_data_by_cache_key = _fetch_cells(points_by_cache_key, validated_datetime, max_fetch_cells)
 
+    # Apply each cell's result to all original locations in it
+    return {
+        point: wind_data_by_cache_key.get(cache_key)
+        for cache_key, points in points_by_cache_key.items()
+        for point in points
+    }
@@ -0,0 +1,149 @@
+"""
+Personal Access Token verification cache.
+
+PATs are stored as bcrypt hashes (12 rounds), so verifying one costs a few
+hundred milliseconds of CPU. Scripts authenticating every request with the
+same PAT made that the dominant cost of the API. Two things are kept in
+process memory instead:
+
+- a bounded TTL cache of tokens that already passed the bcrypt check, keyed
+  by HMAC-SHA256 of the full token under a per-process random key (the raw
+  token is never kept). A hit still loads the PAT row by primary key and
+  re-checks is_active, expiry and the stored hash, so revocation and expiry
+  take effect immediately; only the bcrypt verification is skipped.
+- pending last_used_at timestamps, written in one bulk UPDATE by a
+  background flusher instead of a commit per request.
+"""
+
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Dict, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+from app.models import PersonalAccessToken
+
+logger = logging.getLogger(__name__)
+
+PAT_CACHE_TTL_SECONDS = int(os.getenv("PAT_CACHE_TTL_SECONDS", "300"))
+PAT_CACHE_MAX_ENTRIES = int(os.getenv("PAT_CACHE_MAX_ENTRIES", "1024"))
+LAST_USED_FLUSH_INTERVAL_SECONDS = int(os.getenv("PAT_LAST_USED_FLUSH_INTERVAL_SECONDS", "30"))
+
+# Process-local HMAC key: cache keys are useless outside this process
+_CACHE_KEY_SECRET = secrets.token_bytes(32)
+
+
+@dataclass(frozen=True)
+class VerifiedPat:
+    """A token that passed the bcrypt check, and the row it matched."""
+    pat_id: int
+    token_hash: str
+
+
+_lock = threading.Lock()
+_verified: TTLCache = TTLCache(maxsize=PAT_CACHE_MAX_ENTRIES, ttl=PAT_CACHE_TTL_SECONDS)
+_pending_last_used: Dict[int, datetime] = {}
+
+
+def pat_cache_key(token: str) -> str:
+    """Keyed hash of the full token, used as the cache key."""
+    return hmac.new(_CACHE_KEY_SECRET, token.encode("utf-8"), hashlib.sha256).hexdigest()
+
+
+def get_verified_pat(token: str) -> Optional[VerifiedPat]:
+    with _lock:
+        return _verified.get(pat_cache_key(token))
+
+
+def remember_verified_pat(token: str, pat: PersonalAccessToken) -> None:
+    with _lock:
+        _verified[pat_cache_key(token)] = VerifiedPat(pat_id=pat.id, token_hash=pat.token_hash)
+
+
+def forget_verified_pat(token: str) -> None:
+    with _lock:
+        _verified.pop(pat_cache_key(token), None)
+
+
+def invalidate_pat(pat_id: int) -> None:
+    """Drop every cached verification of a PAT (called on revoke)."""
+    with _lock:
+        for key in [k for k, v in _verified.items() if v.pat_id == pat_id]:
+            del _verified[key]
+        _pending_last_used.pop(pat_id, None)
+
+
+def clear_pat_cache() -> None:
+    with _lock:
+        _verified.clear()
+        _pending_last_used.clear()
+
+
+def record_pat_use(pat_id: int, used_at: datetime) -> None:
+    """Queue a last_used_at update; the latest timestamp per PAT wins."""
+    with _lock:
+        _pending_last_used[pat_id] = used_at
+
+
+def flush_pat_last_used(db: Optional[Session] = None) -> int:
+    """
+    Write pending last_used_at timestamps in one bulk UPDATE.
+
+    Returns:
+        Number of pending timestamps written
+    """
+    with _lock:
+        if not _pending_last_used:
+            return 0
+        pending = dict(_pending_last_used)
+        _pending_last_used.clear()
+
+    owns_session = db is None
+    if owns_session:
+        from app.database import SessionLocal
+        db = SessionLocal()
+    try:
+        # Core executemany: rows deleted meanwhile (revoked PATs) are simply not matched
+        table = PersonalAccessToken.__table__
+        db.execute(
+            update(table).where(table.c.id == bindparam("pat_id")).values(last_used_at=bindparam("used_at")),
+            [{"pat_id": pat_id, "used_at": used_at} for pat_id, used_at in pending.items()],
+        )
+        db.commit()
+        return len(pending)
+    except Exception:
+        db.rollback()
+        # Keep the timestamps for the next flush unless newer ones arrived meanwhile
+        with _lock:
+            for pat_id, used_at in pending.items():
+                _pending_last_used.setdefault(pat_id, used_at)
+        raise
+    finally:
+        if owns_session:
+            db.close()
+
+
+async def run_pat_last_used_flusher(interval_seconds: int = LAST_USED_FLUSH_INTERVAL_SECONDS):
+    """Flush pending last_used_at updates every interval_seconds until cancelled."""
+    try:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(flush_pat_last_used)
+            except Exception as e:
+                logger.error(f"[PAT] Failed to flush last_used_at updates: {e}", exc_info=True)
+    finally:
+        # Write what is left on shutdown
+        try:
+            await asyncio.to_thread(flush_pat_last_used)
+        except Exception as e:
+            logger.error(f"[PAT] Failed to flush last_used_at updates on shutdown: {e}", exc_info=True)
@@ -0,0 +1,119 @@
+"""
+Derived Dive Profile Artifacts
+
+Reading a dive profile means downloading the stored file, parsing it (XML goes
+through DiveProfileParser) and, when the dive notes carry gradient factors,
+re-running the Bühlmann calculation for ceilings, tissue saturation and the
+tissue heatmap. The result only depends on the stored profile and the GF
+values, so it is written back as a derived artifact next to the profile and
+later reads are served from that single object. The artifact also carries the
+precomputed resolution levels used to serve downsampled profiles to charts.
+
+An artifact carries a format version and a fingerprint of its inputs (profile
+path and sample count, GF values). A mismatch on either is treated as a miss,
+so changing the GF text or replacing the profile recomputes the artifact on the
+next read. Bump PROFILE_ARTIFACT_VERSION whenever the parser or deco output
+changes shape or values.
+"""
+
+import hashlib
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+from app.utils import parse_gf_from_text
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ARTIFACT_VERSION = 3
+PROFILE_ARTIFACT_SUFFIX = ".derived.json"
+
+
+def profile_artifact_path(profile_path: str) -> str:
+    """Path of the derived artifact stored next to a profile."""
+    return f"{profile_path}{PROFILE_ARTIFACT_SUFFIX}"
+
+
+def profile_artifact_fingerprint(dive) -> str:
+    """Fingerprint of everything the derived profile depends on."""
+    gf_low, gf_high = parse_gf_from_text(dive.dive_information)
+    inputs = [
+        PROFILE_ARTIFACT_VERSION,
+        dive.profile_xml_path,
+        dive.profile_sample_count,
+        gf_low,
+        gf_high,
+    ]
+    return hashlib.sha256(orjson.dumps(inputs)).hexdigest()
+
+
+def load_profile_artifact_with_levels(storage, dive) -> Optional[Tuple[Dict[str, Any], Dict[str, List[int]]]]:
+    """
+    Return the derived profile data and its resolution levels for a dive, or
+    None when there is no usable artifact (missing, unreadable, other version
+    or stale inputs).
+    """
+    try:
+        content = storage.download_profile(dive.user_id, profile_artifact_path(dive.profile_xml_path))
+        if not content:
+            return None
+        artifact = orjson.loads(content)
+    except Exception as e:
+        logger.warning(f"Failed to read profile artifact for dive {dive.id}: {e}")
+        return None
+
+    if not isinstance(artifact, dict):
+        return None
+    if artifact.get("version") != PROFILE_ARTIFACT_VERSION:
+        return None
+    if artifact.get("fingerprint") != profile_artifact_fingerprint(dive):
+        return None
+    profile_data = artifact.get("profile")
+    if not isinstance(profile_data, dict):
+        return None
+    levels = artifact.get("levels")
+    return profile_data, levels if isinstance(levels, dict) else {}
+
+
+def load_profile_artifact(storage, dive) -> Optional[Dict[str, Any]]:
+    """Return the derived profile data for a dive, or None when there is no usable artifact."""
+    loaded = load_profile_artifact_with_levels(storage, dive)
+    return loaded[0] if loaded else None
+
+
+def store_profile_artifact(
+    storage,
+    dive,
+    profile_data: Dict[str, Any],
+    levels: Optional[Dict[str, List[int]]] = None
+) -> bool:
+    """
+    Write the derived profile data, and its resolution levels, next to the
+    dive's profile.
+
+    Failures are logged and swallowed: the artifact is only an optimization.
+    """
+    artifact = {
+        "version": PROFILE_ARTIFACT_VERSION,
+        "fingerprint": profile_artifact_fingerprint(dive),
+        "profile": profile_data,
+        "levels": levels or {},
+    }
+    try:
+        storage.upload_profile_artifact(profile_artifact_path(dive.profile_xml_path), orjson.dumps(artifact))
+        return True
+    except Exception as e:
+        logger.warning(f"Failed to store profile artifact for dive {dive.id}: {e}")
+        return False
+
+
+def delete_profile_artifact(storage, user_id: int, profile_path: Optional[str]) -> bool:
+    """Remove the derived artifact of a profile that is being replaced or deleted."""
+    if not profile_path:
+        return False
+    try:
+        return bool(storage.delete_profile(user_id, profile_artifact_path(profile_path)))
+    except Exception as e:
+        logger.warning(f"Failed to delete profile artifact for {profile_path}: {e}")
+        return False
@@ -0,0 +1,189 @@
+"""
+Dive Profile Downsampling
+
+Charts on small screens cannot show more than a few hundred points, yet a
+dive computer logs a sample every few seconds. This module reduces a profile
+to a target number of samples with Largest-Triangle-Three-Buckets (LTTB) over
+(time, depth), which keeps the visual shape of the curve, while always keeping
+the samples a chart must not lose:
+
+- the first and last sample
+- the deepest sample
+- samples where the diver enters or leaves decompression, and the deepest
+  stop of the dive
+- the sample nearest to each event (gas switches, alarms, ...)
+
+Resolution levels are computed once per profile (see build_resolution_levels)
+and persisted with the derived profile artifact, so serving a downsampled
+profile is only a lookup.
+"""
+
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Points per precomputed resolution level, each twice the previous so a
+# request is always served within a factor of two of the requested size
+RESOLUTION_LEVELS = (250, 500, 1000, 2000)
+
+# Named resolutions accepted by the profile endpoint (None means full resolution)
+NAMED_RESOLUTIONS = {"low": 250, "medium": 1000, "full": None}
+
+# Smallest max_points accepted; below that the pinned samples crowd out the shape
+MIN_POINTS = 10
+
+
+def _lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Indices of the samples LTTB keeps to draw (x, y) with `threshold` points."""
+    n = len(x)
+    if threshold >= n:
+        return np.arange(n)
+    if threshold < 3:
+        return np.array([0, n - 1])
+
+    # Bucket boundaries for the samples between the first and the last one
+    edges = (np.arange(threshold - 1) * ((n - 2) / (threshold - 2))).astype(np.int64) + 1
+    edges[-1] = n - 1
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        # Average of the next bucket (the last sample for the final bucket)
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def _pinned_indices(profile_data: Dict[str, Any], times: np.ndarray, depths: np.ndarray) -> Dict[str, List[int]]:
+    """Samples to keep whatever the resolution, grouped by priority."""
+    samples = profile_data.get("samples") or []
+    n = len(samples)
+
+    essential = {0, n - 1, int(np.argmax(depths))}
+    event_samples = set()
+    events = profile_data.get("events") or []
+    event_times = [e.get("time_minutes") for e in events if isinstance(e.get("time_minutes"), (int, float))]
+    if event_times:
+        positions = np.clip(np.searchsorted(times, event_times), 0, n - 1)
+        # Pick the closer of the two neighbours
+        previous = np.clip(positions - 1, 0, n - 1)
+        closer = np.abs(times[previous] - event_times) < np.abs(times[positions] - event_times)
+        event_samples.update(np.where(closer, previous, positions).tolist())
+
+    in_deco = np.array([bool(s.get("in_deco")) for s in samples])
+    deco = set((np.flatnonzero(np.diff(in_deco.astype(np.int8))) + 1).tolist())
+    stop_depths = np.array([s.get("stopdepth") or 0 for s in samples], dtype=float)
+    if stop_depths.any():
+        deco.add(int(np.argmax(stop_depths)))
+
+    return {
+        "essential": sorted(essential),
+        "events": sorted(event_samples - essential),
+        "deco": sorted(deco - essential - event_samples),
+    }
+
+
+def _thin(indices: List[int], budget: int) -> List[int]:
+    """At most `budget` of the indices, spread evenly over the list."""
+    if budget >= len(indices):
+        return indices
+    if budget <= 0:
+        return []
+    return [indices[i] for i in np.linspace(0, len(indices) - 1, budget).astype(int)]
+
+
+def downsample_indices(profile_data: Dict[str, Any], max_points: int) -> List[int]:
+    """
+    Sorted indices of the samples to keep so the profile has at most
+    max_points samples (all of them if it already fits).
+    """
+    samples = profile_data.get("samples") or []
+    n = len(samples)
+    if n <= max_points:
+        return list(range(n))
+
+    times = np.array([s.get("time_minutes", i) for i, s in enumerate(samples)], dtype=float)
+    depths = np.array([s.get("depth") or 0 for s in samples], dtype=float)
+
+    pinned = _pinned_indices(profile_data, times, depths)
+    # First, last and deepest always fit (max_points >= MIN_POINTS); events
+    # take what is left, thinned evenly if there are more than that
+    keep = set(pinned["essential"])
+    keep.update(_thin(pinned["events"], max_points - len(keep)))
+    # Deco transitions may take up to half the budget, thinned evenly if needed
+    keep.update(_thin(pinned["deco"], max_points // 2 - len(keep)))
+
+    shape = _lttb_indices(times, depths, max_points - len(keep))
+    for index in shape.tolist():
+        if len(keep) >= max_points:
+            break
+        keep.add(index)
+    return sorted(keep)
+
+
+def apply_indices(profile_data: Dict[str, Any], indices: List[int]) -> Dict[str, Any]:
+    """
+    Profile restricted to the given samples. Per-sample data (the tissue
+    heatmap) is reduced alongside; everything else is shared with the input.
+    """
+    samples = profile_data.get("samples") or []
+    result = dict(profile_data)
+    result["samples"] = [samples[i] for i in indices]
+
+    heatmap = profile_data.get("tissue_heatmap")
+    if heatmap and len(heatmap) == len(samples):
+        result["tissue_heatmap"] = [heatmap[i] for i in indices]
+
+    result["resolution"] = {
+        "downsampled": len(indices) < len(samples),
+        "points": len(indices),
+        "total_points": len(samples),
+    }
+    return result
+
+
+def build_resolution_levels(profile_data: Dict[str, Any]) -> Dict[str, List[int]]:
+    """
+    Precompute the sample indices of every resolution level smaller than the
+    profile, keyed by the level's point count (as a string, for JSON storage).
+    """
+    sample_count = len(profile_data.get("samples") or [])
+    return {
+        str(points): downsample_indices(profile_data, points)
+        for points in RESOLUTION_LEVELS
+        if points < sample_count
+    }
+
+
+def downsample_profile(
+    profile_data: Dict[str, Any],
+    max_points: Optional[int],
+    levels: Optional[Dict[str, List[int]]] = None
+) -> Dict[str, Any]:
+    """
+    Serve a profile with at most max_points samples.
+
+    Uses the largest precomputed level that fits; profiles without a fitting
+    level are downsampled on the fly. max_points=None or a profile that
+    already fits returns the profile unchanged.
+    """
+    samples = profile_data.get("samples") or []
+    if max_points is None or len(samples) <= max_points:
+        return profile_data
+
+    fitting = [int(points) for points in (levels or {}) if int(points) <= max_points]
+    if fitting:
+        indices = levels[str(max(fitting))]
+    else:
+        indices = downsample_indices(profile_data, max_points)
+    return apply_indices(profile_data, indices)
@@ -0,0 +1,276 @@
+"""
+Columnar Dive Profile Format
+
+Stored profiles used to be indented JSON with one dict per sample, repeating
+every key name per sample. This module defines a compact, versioned binary
+format for the same profile dicts:
+
+    magic (4 bytes, b"DPCF") | version (1 byte) | codec (1 byte) | compressed body
+
+The body is a JSON manifest (profile metadata plus one descriptor per sample
+channel) followed by the channel arrays. Each sample key becomes a channel:
+
+- numbers are stored as integers when a fixed scale (10, 100, 60, ...)
+  represents every value exactly, delta-encoded, else as float64
+- booleans are stored as int8
+- strings and anything else stay in the manifest as JSON lists
+- samples missing a key are recorded in a packed presence bitmap
+
+Encoding is lossless: decode_profile returns dicts equal to the input. The
+body is compressed with zstd when the zstandard package is installed, and
+with deflate (zlib) otherwise.
+"""
+
+import logging
+import struct
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import orjson
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+COLUMNAR_PROFILE_EXTENSION = ".dpc"
+FORMAT_MAGIC = b"DPCF"
+FORMAT_VERSION = 1
+
+CODEC_ZLIB = 0
+CODEC_ZSTD = 1
+
+_HEADER = struct.Struct("<4sBB")
+_MANIFEST_LENGTH = struct.Struct("<I")
+
+# Scales tried for numeric channels: decimal resolutions, and seconds/tenths of
+# seconds for values in minutes
+_SCALES = (1, 10, 100, 1000, 60, 600, 3600)
+
+
+def is_columnar_profile(content: bytes) -> bool:
+    """Whether stored profile content is in the columnar format."""
+    return content[:len(FORMAT_MAGIC)] == FORMAT_MAGIC
+
+
+def _numeric_encoding(values: np.ndarray) -> Tuple[Optional[int], np.ndarray]:
+    """Smallest scale that represents every value exactly, and the scaled integers."""
+    if not np.isfinite(values).all():
+        return None, values
+    for scale in _SCALES:
+        scaled = np.round(values * scale)
+        if np.abs(scaled).max(initial=0) >= 2 ** 53:
+            break
+        if np.array_equal(scaled / scale, values):
+            return scale, scaled.astype(np.int64)
+    return None, values
+
+
+def _classify(values: List[Any]) -> str:
+    if all(isinstance(v, bool) for v in values):
+        return "bool"
+    if all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+        return "num"
+    return "json"
+
+
+def _encode_channel(key: str, values: List[Any], present: Optional[np.ndarray], blobs: List[bytes], offset: int) -> Tuple[Dict[str, Any], int]:
+    channel: Dict[str, Any] = {"key": key}
+    if present is not None:
+        mask = np.packbits(present).tobytes()
+        channel["mask"] = [offset, len(mask)]
+        blobs.append(mask)
+        offset += len(mask)
+
+    kind = _classify(values)
+    channel["type"] = kind
+    if kind == "json":
+        channel["values"] = values
+        return channel, offset
+
+    if kind == "bool":
+        data = np.array(values, dtype=np.int8).tobytes()
+    else:
+        array = np.array(values, dtype=np.float64)
+        channel["int"] = all(isinstance(v, int) for v in values)
+        scale, scaled = _numeric_encoding(array)
+        if scale is None:
+            data = array.tobytes()
+            channel["dtype"] = "<f8"
+        else:
+            deltas = np.diff(scaled, prepend=0)
+            dtype = "<i4" if np.abs(deltas).max(initial=0) < 2 ** 31 else "<i8"
+            data = deltas.astype(dtype).tobytes()
+            channel["dtype"] = dtype
+            channel["scale"] = scale
+            channel["delta"] = True
+
+    channel["data"] = [offset, len(data)]
+    blobs.append(data)
+    return channel, offset + len(data)
+
+
+def encode_profile(profile_data: Dict[str, Any], codec: Optional[int] = None) -> bytes:
+    """
+    Encode a profile dict (samples plus metadata) into the columnar format.
+
+    Args:
+        profile_data: Profile as produced by the parsers/importers
+        codec: CODEC_ZSTD or CODEC_ZLIB; defaults to zstd when available
+
+    Returns:
+        Encoded profile bytes
+    """
+    if codec is None:
+        codec = CODEC_ZSTD if ZSTD_AVAILABLE else CODEC_ZLIB
+
+    samples = profile_data.get("samples") or []
+    keys: Dict[str, None] = {}
+    for sample in samples:
+        keys.update(dict.fromkeys(sample))
+
+    channels = []
+    blobs: List[bytes] = []
+    offset = 0
+    for key in keys:
+        present = np.fromiter((key in sample for sample in samples), dtype=bool, count=len(samples))
+        if present.all():
+            values = [sample[key] for sample in samples]
+            present = None
+        else:
+            values = [sample[key] for sample in samples if key in sample]
+        channel, offset = _encode_channel(key, values, present, blobs, offset)
+        channels.append(channel)
+
+    manifest = orjson.dumps({
+        "meta": {k: v for k, v in profile_data.items() if k != "samples"},
+        "has_samples": "samples" in profile_data,
+        "count": len(samples),
+        "channels": channels,
+    })
+    body = _MANIFEST_LENGTH.pack(len(manifest)) + manifest + b"".join(blobs)
+
+    if codec == CODEC_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd compression requires the zstandard package")
+        compressed = zstandard.ZstdCompressor(level=10).compress(body)
+    elif codec == CODEC_ZLIB:
+        compressed = zlib.compress(body, 9)
+    else:
+        raise ValueError(f"Unknown profile codec: {codec}")
+
+    return _HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, codec) + compressed
+
+
+def _read_body(content: bytes) -> Tuple[Dict[str, Any], memoryview]:
+    if len(content) < _HEADER.size or not is_columnar_profile(content):
+        raise ValueError("Not a columnar dive profile")
+    _, version, codec = _HEADER.unpack_from(content)
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar profile version: {version}")
+
+    compressed = content[_HEADER.size:]
+    if codec == CODEC_ZSTD:
+        if not ZSTD_AVAILABLE:
+            raise ValueError("zstd compressed profile requires the zstandard package")
+        body = zstandard.ZstdDecompressor().decompress(compressed)
+    elif codec == CODEC_ZLIB:
+        body = zlib.decompress(compressed)
+    else:
+        raise ValueError(f"Unknown profile codec: {codec}")
+
+    (manifest_length,) = _MANIFEST_LENGTH.unpack_from(body)
+    manifest_end = _MANIFEST_LENGTH.size + manifest_length
+    manifest = orjson.loads(body[_MANIFEST_LENGTH.size:manifest_end])
+    return manifest, memoryview(body)[manifest_end:]
+
+
+def _channel_values(channel: Dict[str, Any], blob: memoryview):
+    """Values of the samples that carry the channel: a NumPy array, or a list for JSON channels."""
+    if channel["type"] == "json":
+        return channel["values"]
+
+    start, length = channel["data"]
+    if channel["type"] == "bool":
+        return np.frombuffer(blob[start:start + length], dtype=np.int8).astype(bool)
+
+    values = np.frombuffer(blob[start:start + length], dtype=channel["dtype"])
+    if "scale" in channel:
+        values = np.cumsum(values, dtype=np.int64)
+        return values if channel["scale"] == 1 and channel.get("int") else values / channel["scale"]
+    return values
+
+
+def _channel_mask(channel: Dict[str, Any], blob: memoryview, count: int) -> Optional[np.ndarray]:
+    if "mask" not in channel:
+        return None
+    start, length = channel["mask"]
+    return np.unpackbits(np.frombuffer(blob[start:start + length], dtype=np.uint8), count=count).astype(bool)
+
+
+def decode_profile_columns(content: bytes) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """
+    Decode a columnar profile without building per-sample dicts.
+
+    Returns:
+        (profile metadata without samples, {channel key: values per sample}),
+        where numeric channels are float arrays with NaN for samples missing
+        the key. Boolean and JSON channels are returned as object arrays.
+    """
+    manifest, blob = _read_body(content)
+    count = manifest["count"]
+    columns = {}
+    for channel in manifest["channels"]:
+        values = _channel_values(channel, blob)
+        mask = _channel_mask(channel, blob, count)
+        if channel["type"] == "num":
+            column = np.full(count, np.nan)
+        else:
+            column = np.full(count, None, dtype=object)
+            values = np.array(values, dtype=object) if channel["type"] == "json" else values.astype(object)
+        if mask is None:
+            column[:] = values
+        else:
+            column[mask] = values
+        columns[channel["key"]] = column
+    return manifest["meta"], columns
+
+
+def decode_profile(content: bytes) -> Dict[str, Any]:
+    """Decode a columnar profile back into the profile dict it was encoded from."""
+    manifest, blob = _read_body(content)
+    count = manifest["count"]
+
+    samples: List[Dict[str, Any]] = [{} for _ in range(count)]
+    for channel in manifest["channels"]:
+        key = channel["key"]
+        values = _channel_values(channel, blob)
+        if not isinstance(values, list):
+            values = values.tolist()
+        mask = _channel_mask(channel, blob, count)
+        targets = samples if mask is None else [samples[i] for i in np.flatnonzero(mask)]
+        for sample, value in zip(targets, values):
+            sample[key] = value
+
+    profile_data = dict(manifest["meta"])
+    if manifest.get("has_samples", True):
+        profile_data["samples"] = samples
+    return profile_data
+
+
+def load_profile_data(file_path: str, content: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Turn stored profile content into a profile dict, whatever its storage format:
+    columnar, JSON (imported profiles) or Subsurface XML (uploaded profiles).
+    """
+    if is_columnar_profile(content):
+        return decode_profile(content)
+    if file_path.endswith('.json'):
+        return orjson.loads(content)
+
+    from app.services.dive_profile_parser import DiveProfileParser
+    return DiveProfileParser().parse_xml_stream(content)
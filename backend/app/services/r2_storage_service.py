@@ -11,6 +11,8 @@ from typing import Optional, List
 from datetime import datetime
 import json
 
+from app.services.profile_format import COLUMNAR_PROFILE_EXTENSION, encode_profile, load_profile_data
+
 try:
     import boto3
     from botocore.exceptions import ClientError, NoCredentialsError
@@ -198,6 +200,80 @@ class R2StorageService:
             logger.warning(f"R2 download failed, falling back to local: {e}")
             return self._download_local(user_id, file_path)
     
+    def upload_profile_data(self, user_id: int, filename: str, profile_data: dict) -> str:
+        """
+        Store a parsed profile in the columnar profile format.
+
+        Args:
+            user_id: User ID for path organization
+            filename: Name of the file to store; the extension is replaced
+            profile_data: Profile dict (samples plus metadata)
+
+        Returns:
+            str: Path where file was stored (R2 key or local path)
+        """
+        stem = os.path.splitext(os.path.basename(filename))[0]
+        return self.upload_profile(user_id, f"{stem}{COLUMNAR_PROFILE_EXTENSION}", encode_profile(profile_data))
+
+    def download_profile_data(self, user_id: int, file_path: str) -> Optional[dict]:
+        """
+        Download a stored profile and decode it, whatever its storage format
+        (columnar, JSON or Subsurface XML).
+
+        Returns:
+            dict: Profile data or None if not found
+        """
+        content = self.download_profile(user_id, file_path)
+        if not content:
+            return None
+        return load_profile_data(file_path, content)
+
+    def upload_profile_artifact(self, artifact_path: str, content: bytes) -> str:
+        """
+        Store a derived profile artifact at an exact path next to its profile.
+
+        Unlike upload_profile, the path is not regenerated, so the artifact can be
+        found again from the profile path alone. Artifacts are read and removed
+        with download_profile and delete_profile.
+
+        Args:
+            artifact_path: Artifact path (R2 key or local path), derived from the profile path
+            content: Artifact content as bytes
+
+        Returns:
+            str: Path where the artifact was stored
+        """
+        if not self.r2_available or not artifact_path.startswith('user_'):
+            return self._upload_artifact_local(artifact_path, content)
+
+        try:
+            self.s3_client.put_object(
+                Bucket=os.getenv('R2_BUCKET_NAME'),
+                Key=artifact_path,
+                Body=content,
+                ContentType='application/json'
+            )
+            logger.info(f"Successfully uploaded profile artifact to R2: {artifact_path}")
+            return artifact_path
+        except Exception as e:
+            logger.warning(f"R2 artifact upload failed, falling back to local: {e}")
+            return self._upload_artifact_local(artifact_path, content)
+
+    def _upload_artifact_local(self, artifact_path: str, content: bytes) -> str:
+        """Store a derived profile artifact on the local filesystem."""
+        if artifact_path.startswith('user_'):
+            local_path = os.path.join(self.local_storage_base, artifact_path)
+        else:
+            local_path = artifact_path
+
+        self._ensure_local_directory(local_path)
+
+        with open(local_path, 'wb') as f:
+            f.write(content)
+
+        logger.info(f"Successfully uploaded profile artifact to local storage: {local_path}")
+        return artifact_path
+
     def _download_local(self, user_id: int, file_path: str) -> Optional[bytes]:
         """Download profile from local filesystem."""
         # Handle both R2-style paths and local paths
@@ -0,0 +1,294 @@
+"""
+Dive Site Search Index
+
+Process-local trigram index over dive site names, aliases, regions, countries,
+tag names and descriptions. Used by the fuzzy search path to shortlist
+candidate sites without loading and scoring the whole catalog on every request.
+
+The index is built lazily on first use and kept up to date incrementally:
+a session ``after_flush`` hook collects touched dive sites, which are marked
+dirty once the transaction commits and reloaded (in one batch) on the next
+lookup. A periodic full rebuild picks up writes made by other workers or via
+bulk queries that bypass the ORM.
+"""
+
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from app.models import AvailableTag, DiveSite, DiveSiteAlias, DiveSiteTag
+from app.services.index_invalidation import mark_dirty_on_commit
+
+logger = logging.getLogger(__name__)
+
+# Full rebuild interval (seconds) to converge with writes from other workers
+_REBUILD_INTERVAL_SECONDS = 10 * 60
+# Default number of candidates handed to full scoring
+DEFAULT_CANDIDATE_LIMIT = 200
+
+
+def _word_trigrams(word: str) -> Set[str]:
+    """Trigrams of a single word, padded like pg_trgm ("  w", " wo", ..., "rd ")."""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def text_trigrams(text: Optional[str]) -> Set[str]:
+    """Lowercased, word-padded trigram set for a piece of text."""
+    if not text:
+        return set()
+    grams: Set[str] = set()
+    for word in text.lower().split():
+        grams |= _word_trigrams(word)
+    return grams
+
+
+class DiveSiteSearchIndex:
+    """In-memory trigram index of searchable dive site fields."""
+
+    def __init__(self, rebuild_interval: int = _REBUILD_INTERVAL_SECONDS):
+        self._lock = threading.RLock()
+        # Serializes full rebuilds, so concurrent lookups share a single one
+        self._build_lock = threading.Lock()
+        self._rebuild_interval = rebuild_interval
+        # Name, alias, region, country and tag trigrams
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        self._site_grams: Dict[int, Set[str]] = {}
+        # Description trigrams, kept apart so long descriptions do not weigh on ranking
+        self._description_postings: Dict[str, Set[int]] = defaultdict(set)
+        self._site_description_grams: Dict[int, Set[str]] = {}
+        self._site_meta: Dict[int, Dict] = {}
+        self._dirty_ids: Set[int] = set()
+        self._built_at: Optional[float] = None
+        self._stale = True
+
+    # --- Maintenance -----------------------------------------------------
+
+    def mark_dirty(self, site_ids: Iterable[int]) -> None:
+        """Schedule dive sites for reload on the next lookup."""
+        with self._lock:
+            self._dirty_ids.update(i for i in site_ids if i is not None)
+
+    def mark_stale(self) -> None:
+        """Force a full rebuild on the next lookup (e.g. after a tag rename)."""
+        with self._lock:
+            self._stale = True
+
+    def clear(self) -> None:
+        with self._lock:
+            self._postings = defaultdict(set)
+            self._site_grams = {}
+            self._description_postings = defaultdict(set)
+            self._site_description_grams = {}
+            self._site_meta = {}
+            self._dirty_ids = set()
+            self._built_at = None
+            self._stale = True
+
+    @property
+    def is_built(self) -> bool:
+        return self._built_at is not None
+
+    def _needs_rebuild(self) -> bool:
+        if self._stale or self._built_at is None:
+            return True
+        return (time.monotonic() - self._built_at) > self._rebuild_interval
+
+    def _load_documents(self, db: Session, site_ids: Optional[List[int]] = None) -> Dict[int, Dict]:
+        """Fetch indexed fields for the given sites (or all sites) in three queries."""
+        site_query = db.query(
+            DiveSite.id, DiveSite.name, DiveSite.country, DiveSite.region, DiveSite.description,
+            DiveSite.status, DiveSite.deleted_at
+        )
+        alias_query = db.query(DiveSiteAlias.dive_site_id, DiveSiteAlias.alias)
+        tag_query = db.query(DiveSiteTag.dive_site_id, AvailableTag.name).join(
+            AvailableTag, AvailableTag.id == DiveSiteTag.tag_id
+        )
+        if site_ids is not None:
+            site_query = site_query.filter(DiveSite.id.in_(site_ids))
+            alias_query = alias_query.filter(DiveSiteAlias.dive_site_id.in_(site_ids))
+            tag_query = tag_query.filter(DiveSiteTag.dive_site_id.in_(site_ids))
+
+        docs: Dict[int, Dict] = {}
+        for site_id, name, country, region, description, site_status, deleted_at in site_query.all():
+            docs[site_id] = {
+                'fields': [name, country, region],
+                'description': description,
+                'status': site_status,
+                'deleted': deleted_at is not None,
+            }
+        for site_id, alias in alias_query.all():
+            if site_id in docs:
+                docs[site_id]['fields'].append(alias)
+        for site_id, tag_name in tag_query.all():
+            if site_id in docs:
+                docs[site_id]['fields'].append(tag_name)
+        return docs
+
+    def _remove(self, site_id: int) -> None:
+        for postings, site_grams in (
+            (self._postings, self._site_grams),
+            (self._description_postings, self._site_description_grams),
+        ):
+            for gram in site_grams.pop(site_id, ()):
+                bucket = postings.get(gram)
+                if bucket is not None:
+                    bucket.discard(site_id)
+                    if not bucket:
+                        del postings[gram]
+        self._site_meta.pop(site_id, None)
+
+    def _add(self, site_id: int, doc: Dict) -> None:
+        grams: Set[str] = set()
+        for value in doc['fields']:
+            grams |= text_trigrams(value)
+        description_grams = text_trigrams(doc['description'])
+        self._site_grams[site_id] = grams
+        self._site_description_grams[site_id] = description_grams
+        self._site_meta[site_id] = {'status': doc['status'], 'deleted': doc['deleted']}
+        for gram in grams:
+            self._postings[gram].add(site_id)
+        for gram in description_grams:
+            self._description_postings[gram].add(site_id)
+
+    def rebuild(self, db: Session) -> None:
+        """Rebuild the whole index from the database."""
+        with self._build_lock:
+            self._rebuild(db)
+
+    def _rebuild(self, db: Session) -> None:
+        started = time.perf_counter()
+        with self._lock:
+            pending = set(self._dirty_ids)
+            # A tag change while loading keeps the index stale
+            self._stale = False
+        try:
+            docs = self._load_documents(db)
+        except Exception:
+            self.mark_stale()
+            raise
+        with self._lock:
+            self._postings = defaultdict(set)
+            self._site_grams = {}
+            self._description_postings = defaultdict(set)
+            self._site_description_grams = {}
+            self._site_meta = {}
+            for site_id, doc in docs.items():
+                self._add(site_id, doc)
+            # Sites marked dirty while loading may be newer than what was read
+            self._dirty_ids -= pending
+            self._built_at = time.monotonic()
+        logger.info(
+            f"Dive site search index rebuilt: {len(docs)} sites, "
+            f"{len(self._postings)} trigrams in {(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    def refresh(self, db: Session, site_ids: Iterable[int]) -> None:
+        """Reload the given sites; sites no longer in the database are dropped."""
+        site_ids = list(set(site_ids))
+        if not site_ids:
+            return
+        docs = self._load_documents(db, site_ids)
+        with self._lock:
+            for site_id in site_ids:
+                self._remove(site_id)
+                if site_id in docs:
+                    self._add(site_id, docs[site_id])
+
+    def ensure_ready(self, db: Session) -> None:
+        """Build the index if cold or expired, and apply pending incremental updates."""
+        if self._needs_rebuild():
+            with self._build_lock:
+                # Another lookup may have rebuilt the index while this one waited
+                if self._needs_rebuild():
+                    self._rebuild(db)
+        with self._lock:
+            dirty = self._dirty_ids
+            self._dirty_ids = set()
+        if dirty:
+            self.refresh(db, dirty)
+
+    # --- Lookup ----------------------------------------------------------
+
+    def candidates(
+        self,
+        query: str,
+        limit: int = DEFAULT_CANDIDATE_LIMIT,
+        exclude_ids: Optional[Set[int]] = None,
+        status: Optional[str] = None,
+        include_deleted: bool = False,
+    ) -> List[int]:
+        """
+        Return up to ``limit`` site IDs ranked by trigram similarity with the query.
+
+        Sites are ranked by the Dice similarity of their name, alias, region,
+        country and tag trigrams; sites matching only in their description
+        come after all of those, by description overlap.
+
+        Args:
+            query: Raw search string
+            limit: Maximum number of candidate IDs to return
+            exclude_ids: Site IDs to skip (e.g. exact results already returned)
+            status: Only return sites with this status (None = any status)
+            include_deleted: Whether to include soft-deleted sites
+        """
+        query_grams = text_trigrams(query)
+        if not query_grams:
+            return []
+
+        with self._lock:
+            hits: Dict[int, int] = defaultdict(int)
+            description_hits: Dict[int, int] = defaultdict(int)
+            for gram in query_grams:
+                for site_id in self._postings.get(gram, ()):
+                    hits[site_id] += 1
+                for site_id in self._description_postings.get(gram, ()):
+                    description_hits[site_id] += 1
+
+            ranked = []
+            for site_id in hits.keys() | description_hits.keys():
+                if exclude_ids and site_id in exclude_ids:
+                    continue
+                meta = self._site_meta[site_id]
+                if meta['deleted'] and not include_deleted:
+                    continue
+                if status is not None and meta['status'] != status:
+                    continue
+                # Dice similarity keeps long documents from dominating
+                shared = hits.get(site_id, 0)
+                dice = 2.0 * shared / (len(query_grams) + len(self._site_grams[site_id]))
+                ranked.append((dice, description_hits.get(site_id, 0), site_id))
+
+        ranked.sort(reverse=True)
+        return [site_id for _, _, site_id in ranked[:limit]]
+
+
+dive_site_search_index = DiveSiteSearchIndex()
+
+
+@event.listens_for(Session, "after_flush")
+def _track_dive_site_changes(session, flush_context):
+    """Mark dive sites touched by this flush as dirty in the search index, on commit."""
+    touched: Set[int] = set()
+    tags_changed = False
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, DiveSite):
+            touched.add(obj.id)
+        elif isinstance(obj, (DiveSiteAlias, DiveSiteTag)):
+            touched.add(obj.dive_site_id)
+        elif isinstance(obj, AvailableTag) and obj not in session.new:
+            tags_changed = True
+    if touched:
+        mark_dirty_on_commit(session, dive_site_search_index.mark_dirty, touched)
+    if tags_changed:
+        mark_dirty_on_commit(session, _mark_tags_stale, ())
+
+
+def _mark_tags_stale(_site_ids: Iterable[int]) -> None:
+    # A renamed or deleted tag touches every site carrying it
+    dive_site_search_index.mark_stale()
@@ -0,0 +1,76 @@
+"""
+Radius queries that can use the SPATIAL index on `location`.
+
+MySQL cannot use a spatial index for `ST_Distance_Sphere(location, point) <= r`,
+so that predicate alone scans the whole table. The helpers here add an
+`MBRContains(envelope, location)` pre-filter on a lat/lng box around the
+circle; the exact distance check and ordering then only run on the rows inside
+the box.
+"""
+
+import math
+from typing import Dict, List, Tuple
+
+# ST_Distance_Sphere's default earth radius, in meters
+EARTH_RADIUS_M = 6370986
+
+# (min_lng, min_lat, max_lng, max_lat)
+Envelope = Tuple[float, float, float, float]
+
+
+def radius_envelopes(lat: float, lng: float, radius_m: float) -> List[Envelope]:
+    """
+    Lat/lng boxes covering every point within radius_m of (lat, lng).
+
+    Usually a single box. A circle crossing the antimeridian is split into one
+    box on each side, and one reaching a pole covers all longitudes (as two
+    halves, since a geographic polygon cannot span 360 degrees).
+    """
+    # Small margin so rounding never excludes a point on the circle
+    angular_radius = radius_m / EARTH_RADIUS_M + 1e-9
+    center_lat = math.radians(lat)
+    min_lat = max(math.degrees(center_lat - angular_radius), -90.0)
+    max_lat = min(math.degrees(center_lat + angular_radius), 90.0)
+
+    if min_lat <= -90.0 or max_lat >= 90.0:
+        return [(-180.0, min_lat, 0.0, max_lat), (0.0, min_lat, 180.0, max_lat)]
+
+    delta_lng = math.asin(min(1.0, math.sin(angular_radius) / math.cos(center_lat)))
+    min_lng = lng - math.degrees(delta_lng)
+    max_lng = lng + math.degrees(delta_lng)
+    if max_lng - min_lng >= 180.0:
+        return [(-180.0, min_lat, 0.0, max_lat), (0.0, min_lat, 180.0, max_lat)]
+    if min_lng < -180.0:
+        return [(min_lng + 360.0, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lng, max_lat)]
+    if max_lng > 180.0:
+        return [(min_lng, min_lat, 180.0, max_lat), (-180.0, min_lat, max_lng - 360.0, max_lat)]
+    return [(min_lng, min_lat, max_lng, max_lat)]
+
+
+def envelope_wkt(envelope: Envelope) -> str:
+    """WKT polygon for an envelope, in long-lat axis order."""
+    min_lng, min_lat, max_lng, max_lat = envelope
+    ring = [
+        (min_lng, min_lat), (max_lng, min_lat), (max_lng, max_lat), (min_lng, max_lat), (min_lng, min_lat)
+    ]
+    return "POLYGON((" + ", ".join(f"{x!r} {y!r}" for x, y in ring) + "))"
+
+
+def radius_prefilter(column: str, lat: float, lng: float, radius_m: float, param: str = "envelope") -> Tuple[str, Dict[str, str]]:
+    """
+    SQL condition and bind parameters restricting `column` (a POINT with SRID
+    4326) to the envelope of the circle, for use in a raw `text()` query.
+
+    The condition is a cheap, index-backed superset of the circle; keep the
+    exact `ST_Distance_Sphere` check alongside it.
+    """
+    conditions = []
+    params = {}
+    for i, envelope in enumerate(radius_envelopes(lat, lng, radius_m)):
+        name = f"{param}_{i}"
+        # Explicit axis order: SRID 4326 WKT is lat-long by default, POINT(lng, lat) is not
+        conditions.append(f"MBRContains(ST_GeomFromText(:{name}, 4326, 'axis-order=long-lat'), {column})")
+        params[name] = envelope_wkt(envelope)
+    if len(conditions) == 1:
+        return conditions[0], params
+    return "(" + " OR ".join(conditions) + ")", params
@@ -8,7 +8,7 @@ Automatically detects AWS credentials and falls back gracefully when unavailable
 import os
 import orjson
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 
 try:
     import boto3
@@ -118,6 +118,20 @@ class SQSService:
         """
         Send multiple email notification tasks to SQS queue in batch.
         
+        Args:
+            tasks: List of task dictionaries (see queue_batch_email_tasks)
+            delay_seconds: Optional delay before processing (0-900 seconds)
+        
+        Returns:
+            Number of successfully sent messages
+        """
+        return len(tasks) - len(self.queue_batch_email_tasks(tasks, delay_seconds))
+
+    def queue_batch_email_tasks(self, tasks: list[Dict[str, Any]], delay_seconds: int = 0) -> List[int]:
+        """
+        Send multiple email notification tasks to SQS queue in batch, reporting
+        which ones could not be queued.
+        
         Args:
             tasks: List of task dictionaries, each with:
                 - 'notification_id': ID of the notification record
@@ -128,18 +142,18 @@ class SQSService:
             delay_seconds: Optional delay before processing (0-900 seconds)
         
         Returns:
-            Number of successfully sent messages
+            Indexes (into tasks) of the messages that were not sent
         """
         if not self.sqs_available or not self.sqs_client:
             logger.warning("SQS not available - cannot queue email tasks")
-            return 0
+            return list(range(len(tasks)))
         
         if not tasks:
-            return 0
+            return []
         
         # SQS batch limit is 10 messages
         batch_size = 10
-        success_count = 0
+        failed: List[int] = []
         
         for i in range(0, len(tasks), batch_size):
             batch = tasks[i:i + batch_size]
@@ -170,18 +184,19 @@ class SQSService:
                     Entries=entries
                 )
                 
-                success_count += len(response.get('Successful', []))
-                
                 if response.get('Failed'):
                     logger.warning(f"Some messages failed in batch: {response['Failed']}")
+                    failed.extend(int(entry['Id']) for entry in response['Failed'])
                     
             except ClientError as e:
                 logger.error(f"AWS SQS batch error: {e}")
+                failed.extend(range(i, i + len(batch)))
             except Exception as e:
                 logger.error(f"Unexpected error sending batch to SQS: {e}")
+                failed.extend(range(i, i + len(batch)))
         
-        logger.info(f"Queued {success_count}/{len(tasks)} email tasks")
-        return success_count
+        logger.info(f"Queued {len(tasks) - len(failed)}/{len(tasks)} email tasks")
+        return failed
 
     def send_push_task(
         self,
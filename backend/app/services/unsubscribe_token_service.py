@@ -10,7 +10,9 @@ import secrets
 import logging
 import json
 from datetime import datetime, timedelta, timezone
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
 
 from app.models import User, UnsubscribeToken
@@ -85,6 +87,62 @@ class UnsubscribeTokenService:
         logger.info(f"Created unsubscribe token for user {user_id}")
         return unsubscribe_token
     
+    def get_or_create_unsubscribe_tokens(self, user_ids: List[int], db: Session) -> Dict[int, str]:
+        """
+        Get or create valid tokens for many users with one lookup query.
+        
+        Expired tokens are replaced and missing ones created in one bulk insert.
+        
+        Args:
+            user_ids: User IDs to get/create tokens for
+            db: Database session
+            
+        Returns:
+            Dict mapping user ID to token string
+        """
+        if not user_ids:
+            return {}
+        
+        now = datetime.now(timezone.utc)
+        tokens: Dict[int, str] = {}
+        expired_ids = []
+        for existing_token in db.query(UnsubscribeToken).filter(UnsubscribeToken.user_id.in_(user_ids)):
+            # Ensure expires_at is timezone-aware (database may return naive datetime)
+            expires_at = existing_token.expires_at
+            if expires_at.tzinfo is None:
+                expires_at = expires_at.replace(tzinfo=timezone.utc)
+            if expires_at > now:
+                tokens[existing_token.user_id] = existing_token.token
+            else:
+                expired_ids.append(existing_token.id)
+        
+        missing = [user_id for user_id in dict.fromkeys(user_ids) if user_id not in tokens]
+        if not missing:
+            return tokens
+        
+        expires_at = now + timedelta(days=self.token_expiry_days)
+        new_tokens = {user_id: self.generate_unsubscribe_token() for user_id in missing}
+        try:
+            if expired_ids:
+                db.query(UnsubscribeToken).filter(
+                    UnsubscribeToken.id.in_(expired_ids)
+                ).delete(synchronize_session=False)
+            db.execute(insert(UnsubscribeToken), [
+                {'user_id': user_id, 'token': token, 'expires_at': expires_at}
+                for user_id, token in new_tokens.items()
+            ])
+            db.commit()
+        except IntegrityError:
+            # Another request created some of these tokens meanwhile
+            db.rollback()
+            for user_id in missing:
+                tokens[user_id] = self.get_or_create_unsubscribe_token(user_id, db).token
+            return tokens
+        
+        tokens.update(new_tokens)
+        logger.info(f"Created {len(new_tokens)} unsubscribe tokens")
+        return tokens
+    
     def validate_token(self, token: str, db: Session) -> Optional[UnsubscribeToken]:
         """
         Validate an unsubscribe token.
@@ -0,0 +1,95 @@
+"""
+User identity snapshots for authentication.
+
+Resolving the user of a JWT means a users table lookup by username. Code that
+only needs to know who the caller is and which roles they have (the rate
+limiter's admin exemption) reads a small immutable snapshot from a short TTL
+cache instead, keyed by username.
+
+Snapshots are dropped when a transaction that updated or deleted a User row
+through the ORM in this process commits (profile edits, disabling, role
+changes), and expire after
+USER_SNAPSHOT_TTL_SECONDS otherwise, which bounds staleness for changes made by
+other workers.
+"""
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Iterable, Optional
+
+from cachetools import TTLCache
+from sqlalchemy import event
+from sqlalchemy.orm import object_session
+
+from app.models import User
+from app.services.index_invalidation import mark_dirty_on_commit
+
+USER_SNAPSHOT_TTL_SECONDS = int(os.getenv("USER_SNAPSHOT_TTL_SECONDS", "60"))
+USER_SNAPSHOT_MAX_ENTRIES = int(os.getenv("USER_SNAPSHOT_MAX_ENTRIES", "2048"))
+
+
+@dataclass(frozen=True)
+class UserSnapshot:
+    """The identity and roles of a user at the time it was cached."""
+    id: int
+    username: str
+    enabled: bool
+    is_admin: bool
+    is_moderator: bool
+
+    @classmethod
+    def from_user(cls, user: User) -> "UserSnapshot":
+        return cls(
+            id=user.id,
+            username=user.username,
+            enabled=bool(user.enabled),
+            is_admin=bool(user.is_admin),
+            is_moderator=bool(user.is_moderator),
+        )
+
+
+_lock = threading.Lock()
+_snapshots: TTLCache = TTLCache(maxsize=USER_SNAPSHOT_MAX_ENTRIES, ttl=USER_SNAPSHOT_TTL_SECONDS)
+
+
+def get_user_snapshot(username: str) -> Optional[UserSnapshot]:
+    with _lock:
+        return _snapshots.get(username)
+
+
+def remember_user_snapshot(user: User) -> UserSnapshot:
+    snapshot = UserSnapshot.from_user(user)
+    with _lock:
+        _snapshots[snapshot.username] = snapshot
+    return snapshot
+
+
+def invalidate_user_snapshot(user_id: int) -> None:
+    """Drop the cached snapshot of a user, whatever username it was cached under."""
+    invalidate_user_snapshots([user_id])
+
+
+def invalidate_user_snapshots(user_ids: Iterable[int]) -> None:
+    """Drop the cached snapshots of several users."""
+    user_ids = set(user_ids)
+    with _lock:
+        for username in [k for k, v in _snapshots.items() if v.id in user_ids]:
+            del _snapshots[username]
+
+
+def clear_user_snapshots() -> None:
+    with _lock:
+        _snapshots.clear()
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_on_change(mapper, connection, target):
+    # At flush time another request could re-cache the old row before the
+    # commit, and a rollback would have nothing to invalidate
+    session = object_session(target)
+    if session is None:
+        invalidate_user_snapshot(target.id)
+    else:
+        mark_dirty_on_commit(session, invalidate_user_snapshots, [target.id])
@@ -0,0 +1,121 @@
+"""
+Write-behind view counters.
+
+Every detail view of a dive site, diving center, route, dive, list, trip or
+organization used to run its own "UPDATE ... SET view_count = view_count + 1"
+and commit, taking a pool connection and a row lock per view; popular rows
+became a point of lock contention.
+
+Views are now accumulated in process memory as deltas per (model, id) and
+written by a background flusher every VIEW_COUNT_FLUSH_INTERVAL_SECONDS, one
+UPDATE per model with a CASE over the ids. Deltas of a failed flush are put
+back and retried, and the flusher drains what is left on shutdown, so counts
+stay exact; they are only late by up to one flush interval.
+"""
+
+import asyncio
+import logging
+import os
+import threading
+from collections import defaultdict
+from typing import Dict, Optional, Type
+
+from sqlalchemy import case, update
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+VIEW_COUNT_FLUSH_INTERVAL_SECONDS = int(os.getenv("VIEW_COUNT_FLUSH_INTERVAL_SECONDS", "10"))
+
+# Ids per UPDATE statement, keeps the CASE expression and IN list bounded
+_FLUSH_BATCH_SIZE = 500
+
+_lock = threading.Lock()
+_pending: Dict[Type, Dict[int, int]] = defaultdict(lambda: defaultdict(int))
+
+
+def record_view(model_class, item_id: int, count: int = 1) -> None:
+    """Count a view of an item; written to the database by the next flush."""
+    with _lock:
+        _pending[model_class][item_id] += count
+
+
+def pending_view_counts() -> Dict[Type, Dict[int, int]]:
+    """Copy of the deltas not written yet."""
+    with _lock:
+        return {model: dict(deltas) for model, deltas in _pending.items() if deltas}
+
+
+def clear_view_counts() -> None:
+    """Discard the deltas not written yet."""
+    with _lock:
+        _pending.clear()
+
+
+def _restore(model_class, deltas: Dict[int, int]) -> None:
+    with _lock:
+        for item_id, delta in deltas.items():
+            _pending[model_class][item_id] += delta
+
+
+def _apply_deltas(db: Session, model_class, deltas: Dict[int, int]) -> None:
+    table = model_class.__table__
+    values = {"view_count": table.c.view_count + case(deltas, value=table.c.id, else_=0)}
+    # Views are not edits: keep updated_at as it is
+    if "updated_at" in table.c:
+        values["updated_at"] = table.c.updated_at
+    db.execute(update(table).where(table.c.id.in_(list(deltas))).values(**values))
+
+
+def flush_view_counts(db: Optional[Session] = None) -> int:
+    """
+    Write accumulated view count deltas.
+
+    Returns:
+        Number of views flushed
+    """
+    with _lock:
+        batches = {model: dict(deltas) for model, deltas in _pending.items() if deltas}
+        _pending.clear()
+    if not batches:
+        return 0
+
+    owns_session = db is None
+    if owns_session:
+        from app.database import SessionLocal
+        db = SessionLocal()
+
+    written = 0
+    try:
+        for model_class, deltas in batches.items():
+            ids = sorted(deltas)
+            for start in range(0, len(ids), _FLUSH_BATCH_SIZE):
+                chunk = {item_id: deltas[item_id] for item_id in ids[start:start + _FLUSH_BATCH_SIZE]}
+                try:
+                    _apply_deltas(db, model_class, chunk)
+                    db.commit()
+                    written += sum(chunk.values())
+                except Exception as e:
+                    db.rollback()
+                    _restore(model_class, chunk)
+                    logger.error(f"Failed to flush view counts for {model_class.__name__}: {e}")
+    finally:
+        if owns_session:
+            db.close()
+    return written
+
+
+async def run_view_count_flusher(interval_seconds: int = VIEW_COUNT_FLUSH_INTERVAL_SECONDS):
+    """Flush view counts every interval_seconds until cancelled, then drain."""
+    try:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await asyncio.to_thread(flush_view_counts)
+            except Exception as e:
+                logger.error(f"[VIEW COUNTS] Flush failed: {e}", exc_info=True)
+    finally:
+        try:
+            await asyncio.to_thread(flush_view_counts)
+        except Exception as e:
+            logger.error(f"[VIEW COUNTS] Final flush failed: {e}", exc_info=True)
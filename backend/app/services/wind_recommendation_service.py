@@ -3,11 +3,17 @@ Wind Recommendation Service
 
 Service to calculate dive site suitability based on wind conditions.
 Considers both wind direction and wind speed to provide safety recommendations.
+
+calculate_wind_suitability evaluates one site and explains the result;
+calculate_wind_suitability_batch evaluates many sites at once with NumPy and
+only returns suitability codes, for filters that don't need the reasoning.
 """
 
-from typing import Optional, Dict, Literal
+from typing import Optional, Dict, Literal, Union, Sequence
 import math
 
+import numpy as np
+
 # Wind speed thresholds (in m/s)
 WIND_SPEED_GOOD_THRESHOLD = 6.2  # ~12 knots - safe for diving below this threshold
 WIND_SPEED_CAUTION_THRESHOLD = 7.7  # ~15 knots
@@ -24,6 +30,11 @@ WAVE_PERIOD_SURGE = 8.0  # seconds
 KNOTS_TO_MS = 0.514444  # 1 knot = 0.514444 m/s
 KMH_TO_MS = 0.277778  # 1 km/h = 0.277778 m/s
 
+# Suitability codes returned by calculate_wind_suitability_batch, ordered by severity
+# (index into SUITABILITY_LEVELS, same ranking the single-site combination uses)
+SUITABILITY_LEVELS = ("unknown", "good", "caution", "difficult", "avoid")
+SUITABILITY_CODES = {level: code for code, level in enumerate(SUITABILITY_LEVELS)}
+
 
 def normalize_wind_speed(wind_speed: float, unit: str = "m/s") -> float:
     """
@@ -314,3 +325,96 @@ def calculate_wind_suitability(
         "wind_speed_category": wind_speed_category
     }
 
+
+ArrayLike = Union[float, Sequence[Optional[float]], np.ndarray, None]
+
+
+def _as_float_array(values: ArrayLike) -> np.ndarray:
+    """Convert a scalar/sequence (None = missing) to a float array with NaN for missing values."""
+    if values is None:
+        return np.array(np.nan)
+    return np.asarray(values, dtype=np.float64)
+
+
+def calculate_wind_suitability_batch(
+    wind_direction: ArrayLike,
+    wind_speed: ArrayLike,
+    shore_direction: ArrayLike,
+    wind_gusts: ArrayLike = None,
+    wind_speed_unit: str = "m/s",
+    wave_height: ArrayLike = None,
+    wave_period: ArrayLike = None
+) -> np.ndarray:
+    """
+    Vectorized suitability for many dive sites in one pass.
+
+    Applies the same rules as calculate_wind_suitability but skips building the
+    reasoning text; call calculate_wind_suitability for the sites that are
+    actually shown to get their explanation.
+
+    Arguments are scalars or 1-D arrays broadcast against each other (e.g. one
+    forecast for all sites, or one forecast per site). Missing values are NaN
+    or None.
+
+    Returns:
+        int8 array of suitability codes (indexes into SUITABILITY_LEVELS).
+        Sites without wind direction or speed are "unknown".
+    """
+    direction, speed, shore, gusts, height, period = np.broadcast_arrays(
+        np.atleast_1d(_as_float_array(wind_direction)),
+        normalize_wind_speed(_as_float_array(wind_speed), wind_speed_unit),
+        _as_float_array(shore_direction),
+        normalize_wind_speed(_as_float_array(wind_gusts), wind_speed_unit),
+        _as_float_array(wave_height),
+        _as_float_array(wave_period),
+    )
+
+    unknown, good, caution, difficult, avoid = range(len(SUITABILITY_LEVELS))
+
+    # --- Wind suitability ---
+    with np.errstate(invalid="ignore"):
+        angle_diff = np.abs(direction - shore)
+        angle_diff = np.where(angle_diff > 180, 360 - angle_diff, angle_diff)
+        unfavorable = angle_diff <= 45
+        somewhat_unfavorable = (angle_diff > 45) & (angle_diff <= 90)
+
+        very_strong = speed >= WIND_SPEED_DIFFICULT_THRESHOLD
+        strong = (speed >= WIND_SPEED_CAUTION_THRESHOLD) & ~very_strong
+        moderate = (speed >= WIND_SPEED_GOOD_THRESHOLD) & (speed < WIND_SPEED_CAUTION_THRESHOLD)
+        strong_gusts = gusts > WIND_GUST_UPGRADE_THRESHOLD
+
+    wind = np.select(
+        [
+            very_strong,
+            strong & unfavorable,
+            strong,
+            moderate & (unfavorable | somewhat_unfavorable),
+            moderate,
+            unfavorable,
+        ],
+        [avoid, avoid, difficult, caution, good, caution],
+        default=good
+    ).astype(np.int8)
+    # Strong gusts upgrade good -> caution -> difficult -> avoid
+    wind = np.where(strong_gusts & (wind >= good) & (wind < avoid), wind + 1, wind)
+
+    # Without a shore direction only wind speed (and gusts) can be judged
+    no_shore = np.isnan(shore)
+    wind = np.where(no_shore, np.select([very_strong, strong_gusts], [avoid, caution], default=unknown), wind)
+
+    # --- Marine suitability ---
+    with np.errstate(invalid="ignore"):
+        marine = np.select(
+            [height >= WAVE_HEIGHT_AVOID, height >= WAVE_HEIGHT_DIFFICULT, height >= WAVE_HEIGHT_CAUTION],
+            [avoid, difficult, caution],
+            default=good
+        )
+        surge = period >= WAVE_PERIOD_SURGE
+        marine = np.where(surge & (marine == good) & (height >= 0.3), caution, marine)
+        marine = np.where(surge & (marine == caution) & (height >= WAVE_HEIGHT_CAUTION), difficult, marine)
+
+    # Worst case wins; sites without usable wind data stay unknown
+    codes = np.maximum(wind, marine).astype(np.int8)
+    codes[np.isnan(speed) | np.isnan(direction)] = unknown
+    return codes
+
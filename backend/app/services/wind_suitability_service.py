@@ -0,0 +1,259 @@
+"""
+Wind Suitability Materialization
+
+Precomputes wind suitability per dive site and forecast hour into
+dive_site_wind_suitability, so the dive site list can filter and paginate on
+wind suitability with a SQL join instead of loading every matching site and
+evaluating it per request.
+
+A background refresher (started from the application lifespan) keeps the
+current hour, the next few hours and any hour recently requested by the list
+endpoint materialized. Wind data comes from the open_meteo_service caches;
+cells that are not cached are fetched in batches, at most
+_MAX_FETCH_CELLS_PER_HOUR per hour and pass, and sites still without wind data
+are stored as "unknown".
+
+The list endpoint only serves an hour from the table when it is complete:
+fresh, with a row for every listed site and no "unknown" row. Otherwise it
+evaluates wind suitability live, which fetches the missing wind data.
+
+Rows are upserted, so workers refreshing the same hour concurrently do not
+conflict on the (dive_site_id, forecast_hour) key.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import case, func
+from sqlalchemy.dialects import mysql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models import DiveSite, DiveSiteWindSuitability
+from app.services.open_meteo_service import fetch_wind_data_batch
+from app.services.wind_recommendation_service import SUITABILITY_LEVELS, calculate_wind_suitability_batch
+
+logger = logging.getLogger(__name__)
+
+# How often the refresher runs; rows older than _MAX_ROW_AGE are ignored by the list endpoint
+REFRESH_INTERVAL_SECONDS = 15 * 60
+_MAX_ROW_AGE = timedelta(seconds=2 * REFRESH_INTERVAL_SECONDS)
+# Hours after the current one that are always kept materialized
+_LOOKAHEAD_HOURS = 3
+# Requested hours stay on the refresh list for this long after the last request
+_REQUESTED_HOUR_RETENTION_SECONDS = 60 * 60
+# Rows for hours older than this are purged
+_HISTORY_HOURS = 2
+_INSERT_CHUNK_SIZE = 1000
+# Uncached 0.1° cells fetched from Open-Meteo per hour refresh (50 cells per request)
+_MAX_FETCH_CELLS_PER_HOUR = 500
+
+# How often the refresher checks for newly requested hours between full passes
+_TICK_SECONDS = 30
+
+# forecast hour -> time.monotonic() of the last list request for it (this worker)
+_requested_hours: Dict[datetime, float] = {}
+_requested_hours_lock = threading.Lock()
+# Set when a list request asked for an hour that is not materialized yet
+_refresh_wanted = threading.Event()
+
+
+def forecast_hour(target_datetime: Optional[datetime] = None) -> datetime:
+    """Round a target datetime down to its (naive) forecast hour; defaults to now."""
+    return (target_datetime or datetime.now()).replace(minute=0, second=0, microsecond=0, tzinfo=None)
+
+
+def note_forecast_hour_requested(hour: datetime):
+    """Ask the refresher to materialize an hour the list endpoint could not serve from the table."""
+    with _requested_hours_lock:
+        _requested_hours[hour] = time.monotonic()
+    _refresh_wanted.set()
+
+
+def _listed_sites(db: Session):
+    """Query of the sites that get a row: approved, not archived, with coordinates."""
+    return db.query(
+        DiveSite.id, DiveSite.latitude, DiveSite.longitude, DiveSite.shore_direction
+    ).filter(
+        DiveSite.status == 'approved',
+        DiveSite.deleted_at.is_(None),
+        DiveSite.latitude.isnot(None),
+        DiveSite.longitude.isnot(None)
+    )
+
+
+def _is_hour_complete(db: Session, hour: datetime, max_age: timedelta) -> bool:
+    """
+    Whether every row of the hour was computed within max_age, every listed
+    site has one and none is "unknown".
+    """
+    oldest, rows, unknown = db.query(
+        func.min(DiveSiteWindSuitability.computed_at),
+        func.count(DiveSiteWindSuitability.dive_site_id),
+        func.sum(case((DiveSiteWindSuitability.suitability == "unknown", 1), else_=0))
+    ).filter(
+        DiveSiteWindSuitability.forecast_hour == hour
+    ).one()
+    if oldest is None or oldest.replace(tzinfo=None) < datetime.utcnow() - max_age:
+        return False
+    if unknown:
+        return False
+    return rows >= _listed_sites(db).count()
+
+
+def is_forecast_hour_materialized(db: Session, hour: datetime) -> bool:
+    """Whether the table holds a fresh and complete set of rows for the given forecast hour."""
+    return _is_hour_complete(db, hour, _MAX_ROW_AGE)
+
+
+def refresh_forecast_hour(db: Session, hour: datetime) -> int:
+    """
+    Recompute suitability of all approved dive sites with coordinates for one forecast hour.
+
+    Upserts the hour's rows and drops rows of sites that are no longer listed,
+    in one transaction. Up to _MAX_FETCH_CELLS_PER_HOUR uncached cells are
+    fetched; sites still without wind data are stored as "unknown".
+
+    Returns:
+        Number of rows written
+    """
+    started = time.perf_counter()
+    sites = _listed_sites(db).order_by(DiveSite.id).all()
+
+    locations = [(float(lat), float(lon)) for _, lat, lon, _ in sites]
+    wind_by_location = fetch_wind_data_batch(locations, hour, max_fetch_cells=_MAX_FETCH_CELLS_PER_HOUR)
+
+    wind_rows = [wind_by_location.get(location) or {} for location in locations]
+    codes = calculate_wind_suitability_batch(
+        wind_direction=[wind.get("wind_direction_10m") for wind in wind_rows],
+        wind_speed=[wind.get("wind_speed_10m") for wind in wind_rows],
+        shore_direction=[float(shore) if shore else None for _, _, _, shore in sites],
+        wind_gusts=[wind.get("wind_gusts_10m") for wind in wind_rows],
+        wave_height=[wind.get("wave_height") for wind in wind_rows],
+        wave_period=[wind.get("wave_period") for wind in wind_rows]
+    ).tolist() if sites else []
+
+    # Whole seconds: the column drops sub-second precision, and the stale-row delete compares against it
+    computed_at = datetime.utcnow().replace(microsecond=0)
+    rows = [
+        {
+            "dive_site_id": site_id,
+            "forecast_hour": hour,
+            "suitability": SUITABILITY_LEVELS[code],
+            "computed_at": computed_at,
+        }
+        for (site_id, _, _, _), code in zip(sites, codes)
+    ]
+
+    try:
+        upsert = _upsert_statement(db)
+        for i in range(0, len(rows), _INSERT_CHUNK_SIZE):
+            db.execute(upsert, rows[i:i + _INSERT_CHUNK_SIZE])
+        # Rows this pass did not write belong to sites that left the list
+        db.query(DiveSiteWindSuitability).filter(
+            DiveSiteWindSuitability.forecast_hour == hour,
+            DiveSiteWindSuitability.computed_at < computed_at
+        ).delete(synchronize_session=False)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(f"[WIND SUITABILITY] Materialized {len(rows)} sites for {hour.isoformat()} in {(time.perf_counter() - started) * 1000:.0f}ms")
+    return len(rows)
+
+
+def _upsert_statement(db: Session):
+    """INSERT of suitability rows that overwrites an existing row for the same site and hour."""
+    table = DiveSiteWindSuitability.__table__
+    if db.get_bind().dialect.name == 'mysql':
+        stmt = mysql.insert(table)
+        return stmt.on_duplicate_key_update(
+            suitability=stmt.inserted.suitability,
+            computed_at=stmt.inserted.computed_at
+        )
+    stmt = sqlite.insert(table)
+    return stmt.on_conflict_do_update(
+        index_elements=[table.c.dive_site_id, table.c.forecast_hour],
+        set_={"suitability": stmt.excluded.suitability, "computed_at": stmt.excluded.computed_at}
+    )
+
+
+def _hours_due(now: datetime) -> List[datetime]:
+    """Current hour, lookahead hours and recently requested hours within the forecast window."""
+    current = forecast_hour(now)
+    hours = {current + timedelta(hours=h) for h in range(_LOOKAHEAD_HOURS + 1)}
+
+    cutoff = time.monotonic() - _REQUESTED_HOUR_RETENTION_SECONDS
+    latest = current + timedelta(days=2, hours=1)
+    with _requested_hours_lock:
+        for hour, requested_at in list(_requested_hours.items()):
+            if requested_at < cutoff or hour < current or hour > latest:
+                del _requested_hours[hour]
+            else:
+                hours.add(hour)
+    return sorted(hours)
+
+
+def refresh_due_hours(db: Session) -> int:
+    """
+    One refresher pass: purge old hours and materialize hours that are due.
+
+    Hours refreshed recently (e.g. by another worker) are skipped, unless
+    they are incomplete (see is_forecast_hour_materialized).
+
+    Returns:
+        Number of forecast hours refreshed
+    """
+    now = datetime.now()
+    try:
+        db.query(DiveSiteWindSuitability).filter(
+            DiveSiteWindSuitability.forecast_hour < forecast_hour(now) - timedelta(hours=_HISTORY_HOURS)
+        ).delete(synchronize_session=False)
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"[WIND SUITABILITY] Failed to purge old rows: {e}")
+
+    refresh_interval = timedelta(seconds=REFRESH_INTERVAL_SECONDS)
+    refreshed = 0
+    for hour in _hours_due(now):
+        if _is_hour_complete(db, hour, refresh_interval):
+            continue
+        try:
+            refresh_forecast_hour(db, hour)
+            refreshed += 1
+        except Exception as e:
+            logger.error(f"[WIND SUITABILITY] Failed to refresh {hour.isoformat()}: {e}", exc_info=True)
+    return refreshed
+
+
+def _run_refresh_pass():
+    from app.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        refresh_due_hours(db)
+    finally:
+        db.close()
+
+
+async def run_wind_suitability_refresher(interval_seconds: int = REFRESH_INTERVAL_SECONDS):
+    """
+    Refresh materialized suitability every interval_seconds until cancelled
+    (application shutdown), and early when the list endpoint requests an hour
+    that is not materialized yet.
+    """
+    last_pass = None
+    while True:
+        if last_pass is None or _refresh_wanted.is_set() or time.monotonic() - last_pass >= interval_seconds:
+            _refresh_wanted.clear()
+            last_pass = time.monotonic()
+            try:
+                await asyncio.to_thread(_run_refresh_pass)
+            except Exception as e:
+                logger.error(f"[WIND SUITABILITY] Refresh pass failed: {e}", exc_info=True)
+        await asyncio.sleep(_TICK_SECONDS)
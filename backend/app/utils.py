@@ -51,24 +51,13 @@ def is_diving_center_reviews_enabled(db: Session) -> bool:
         # If value is not a valid boolean, default to enabled
         return True
 
-def increment_view_count(db: Session, model_class, item_id: int):
+def increment_view_count(model_class, item_id: int):
     """
-    Background task to increment view count without blocking the API response.
-    Expects the database session to be managed correctly by FastAPI's dependency injection.
+    Count a view of an item without blocking the API response.
+    Views are buffered and written in batches (see app.services.view_counter).
     """
-    try:
-        db.query(model_class).filter(model_class.id == item_id).update(
-            {
-                model_class.view_count: model_class.view_count + 1,
-                model_class.updated_at: model_class.updated_at
-            },
-            synchronize_session=False
-        )
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        import logging
-        logging.error(f"Failed to increment view count for {model_class.__name__} {item_id}: {e}")
+    from app.services.view_counter import record_view
+    record_view(model_class, item_id)
 
 
 def get_client_ip(request: Request) -> str:
@@ -339,8 +328,14 @@ def format_ip_for_logging(client_ip: str, include_private: bool = False) -> str:
 
 # Unified search scoring utilities for fuzzy search across all content types
 import difflib
+from dataclasses import dataclass
 from typing import Optional, List
 
+try:
+    from rapidfuzz import fuzz as _rapidfuzz
+except ImportError:  # Optional C backend for similarity upper bounds
+    _rapidfuzz = None
+
 
 # Unified typo tolerance settings
 UNIFIED_TYPO_TOLERANCE = {
@@ -366,6 +361,9 @@ def calculate_unified_phrase_aware_score(
     
     This function provides consistent scoring logic across dive sites, diving centers,
     dives, and dive trips, ensuring a uniform user experience.
+
+    For scoring many candidates against the same query, build a QueryScorer once
+    and reuse it instead of calling this function in a loop.
     
     Args:
         query: The search query string
@@ -379,95 +377,172 @@ def calculate_unified_phrase_aware_score(
     Returns:
         Float score between 0.0 and 1.0, where higher is more relevant
     """
-    query_lower = query.lower()
-    name_lower = primary_name.lower()
-    desc_lower = (description or "").lower()
-    country_lower = (country or "").lower()
-    region_lower = (region or "").lower()
-    city_lower = (city or "").lower()
-    
-    # 1. Exact phrase match (highest priority)
-    if query_lower in name_lower:
-        return 1.0
-    
-    # 2. Word-by-word matching across all fields (with unified typo tolerance)
-    query_words = query_lower.split()
-    name_words = name_lower.split()
-    city_words = city_lower.split()
-    region_words = region_lower.split()
-    country_words = country_lower.split()
-    
-    # Count how many query words appear in any relevant field (with fuzzy matching)
-    matching_words = 0
-    for query_word in query_words:
-        # Check for exact substring match first in any field
-        if (any(query_word in name_word for name_word in name_words) or
-            any(query_word in city_word for city_word in city_words) or
-            any(query_word in region_word for region_word in region_words) or
-            any(query_word in country_word for country_word in country_words)):
-            matching_words += 1
-        else:
-            # Check for fuzzy similarity using unified threshold across all fields
-            found_match = False
-            # Check name field
-            for name_word in name_words:
-                if difflib.SequenceMatcher(None, query_word, name_word).ratio() >= UNIFIED_TYPO_TOLERANCE['word_similarity']:
-                    matching_words += 1
-                    found_match = True
-                    break
-            
-            # Check city field if no match found in name
-            if not found_match:
-                for city_word in city_words:
-                    if difflib.SequenceMatcher(None, query_word, city_word).ratio() >= UNIFIED_TYPO_TOLERANCE['word_similarity']:
-                        matching_words += 1
-                        found_match = True
-                        break
-            
-            # Check region field if no match found yet
-            if not found_match:
-                for region_word in region_words:
-                    if difflib.SequenceMatcher(None, query_word, region_word).ratio() >= UNIFIED_TYPO_TOLERANCE['word_similarity']:
-                        matching_words += 1
-                        found_match = True
-                        break
-            
-            # Check country field if no match found yet
-            if not found_match:
-                for country_word in country_words:
-                    if difflib.SequenceMatcher(None, query_word, country_word).ratio() >= UNIFIED_TYPO_TOLERANCE['word_similarity']:
-                        matching_words += 1
-                        break
-    
-    word_match_ratio = matching_words / len(query_words)
-    
-    # 3. Consecutive word bonus (for "blue hole" in "bluehole reef")
-    consecutive_bonus = 0.0
-    if len(query_words) > 1:
-        # Check if words appear consecutively (even if concatenated)
-        query_phrase = ''.join(query_words)
-        if query_phrase in name_lower.replace(' ', ''):
-            consecutive_bonus = 0.3
+    return QueryScorer(query).score(
+        primary_name, description, country, region, city, tags, additional_fields
+    )
+
+
+@dataclass(frozen=True)
+class ScoringCandidate:
+    """Lowercased and tokenized fields of one search candidate."""
+    name_lower: str
+    name_words: List[str]
+    name_no_spaces: str
+    desc_lower: str
+    country_lower: str
+    country_words: List[str]
+    region_lower: str
+    region_words: List[str]
+    city_lower: str
+    city_words: List[str]
+    tags_lower: List[str]
+    additional_lower: List[str]
+
+    @classmethod
+    def build(
+        cls,
+        primary_name: str,
+        description: Optional[str] = None,
+        country: Optional[str] = None,
+        region: Optional[str] = None,
+        city: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        additional_fields: Optional[dict] = None
+    ) -> "ScoringCandidate":
+        name_lower = primary_name.lower()
+        country_lower = (country or "").lower()
+        region_lower = (region or "").lower()
+        city_lower = (city or "").lower()
+        return cls(
+            name_lower=name_lower,
+            name_words=name_lower.split(),
+            name_no_spaces=name_lower.replace(' ', ''),
+            desc_lower=(description or "").lower(),
+            country_lower=country_lower,
+            country_words=country_lower.split(),
+            region_lower=region_lower,
+            region_words=region_lower.split(),
+            city_lower=city_lower,
+            city_words=city_lower.split(),
+            tags_lower=[tag.lower() for tag in tags] if tags else [],
+            additional_lower=[
+                str(value).lower() for value in (additional_fields or {}).values() if value
+            ],
+        )
+
+
+class QueryScorer:
+    """
+    Compiled form of calculate_unified_phrase_aware_score for one query.
+
+    The query is lowercased and tokenized once, and word similarity ratios are
+    memoized across candidates, so scoring a batch of candidates avoids redundant
+    string work and SequenceMatcher construction. Threshold checks are pruned with
+    cheap upper bounds (rapidfuzz's Indel ratio when available, otherwise difflib's
+    quick ratios) before the exact difflib ratio is computed, so scores are
+    identical to the original implementation.
+    """
+
+    def __init__(self, query: str):
+        self.query_lower = query.lower()
+        self.query_words = self.query_lower.split()
+        self.query_phrase = ''.join(self.query_words)
+        self._matcher = difflib.SequenceMatcher(None)
+        self._ratios: Dict[Tuple[str, str], float] = {}
+
+    def _ratio(self, a: str, b: str) -> float:
+        """Exact difflib ratio of (a, b), memoized."""
+        key = (a, b)
+        ratio = self._ratios.get(key)
+        if ratio is None:
+            self._matcher.set_seqs(a, b)
+            ratio = self._matcher.ratio()
+            self._ratios[key] = ratio
+        return ratio
+
+    def _ratio_at_least(self, a: str, b: str, threshold: float) -> bool:
+        """Whether difflib ratio(a, b) >= threshold, skipping exact work when impossible."""
+        ratio = self._ratios.get((a, b))
+        if ratio is not None:
+            return ratio >= threshold
+        # Length bound: matches can never exceed the shorter string
+        if 2.0 * min(len(a), len(b)) < threshold * (len(a) + len(b)) - 1e-9:
+            return False
+        # SequenceMatcher matches form a common subsequence, so the LCS-based Indel
+        # ratio (or difflib's multiset quick_ratio) is an upper bound
+        if _rapidfuzz is not None:
+            if _rapidfuzz.ratio(a, b) < threshold * 100 - 1e-6:
+                return False
         else:
-            # Check for fuzzy similarity of concatenated phrase
-            name_no_spaces = name_lower.replace(' ', '')
-            if difflib.SequenceMatcher(None, query_phrase, name_no_spaces).ratio() >= UNIFIED_TYPO_TOLERANCE['phrase_similarity']:
+            self._matcher.set_seqs(a, b)
+            if self._matcher.quick_ratio() < threshold:
+                return False
+        return self._ratio(a, b) >= threshold
+
+    def score(
+        self,
+        primary_name: str,
+        description: Optional[str] = None,
+        country: Optional[str] = None,
+        region: Optional[str] = None,
+        city: Optional[str] = None,
+        tags: Optional[List[str]] = None,
+        additional_fields: Optional[dict] = None
+    ) -> float:
+        """Score a single candidate given as raw fields."""
+        return self.score_candidate(ScoringCandidate.build(
+            primary_name, description, country, region, city, tags, additional_fields
+        ))
+
+    def score_batch(self, candidates: List[ScoringCandidate]) -> List[float]:
+        """Score pre-tokenized candidates, returning scores in input order."""
+        return [self.score_candidate(candidate) for candidate in candidates]
+
+    def score_candidate(self, candidate: ScoringCandidate) -> float:
+        """Score a pre-tokenized candidate (see calculate_unified_phrase_aware_score)."""
+        query_lower = self.query_lower
+        query_words = self.query_words
+        name_lower = candidate.name_lower
+        name_words = candidate.name_words
+        word_threshold = UNIFIED_TYPO_TOLERANCE['word_similarity']
+
+        # 1. Exact phrase match (highest priority)
+        if query_lower in name_lower:
+            return 1.0
+
+        # 2. Word-by-word matching across all fields (with unified typo tolerance)
+        field_words = (name_words, candidate.city_words, candidate.region_words, candidate.country_words)
+        matching_words = 0
+        for query_word in query_words:
+            # Check for exact substring match first in any field
+            if any(query_word in word for words in field_words for word in words):
+                matching_words += 1
+            # Otherwise check fuzzy similarity in name, city, region, country order
+            elif any(self._ratio_at_least(query_word, word, word_threshold) for words in field_words for word in words):
+                matching_words += 1
+
+        word_match_ratio = matching_words / len(query_words)
+
+        # 3. Consecutive word bonus (for "blue hole" in "bluehole reef")
+        consecutive_bonus = 0.0
+        if len(query_words) > 1:
+            if self.query_phrase in candidate.name_no_spaces:
+                consecutive_bonus = 0.3
+            elif self._ratio_at_least(self.query_phrase, candidate.name_no_spaces, UNIFIED_TYPO_TOLERANCE['phrase_similarity']):
                 consecutive_bonus = 0.2
-    
-    # 4. Geographic field matching (country, region, and city)
-    geographic_bonus = 0.0
-    if country_lower and query_lower in country_lower:
-        geographic_bonus += 0.2
-    if region_lower and query_lower in region_lower:
-        geographic_bonus += 0.2
-    if city_lower and query_lower in city_lower:
-        geographic_bonus += 0.2
-    
-    # 5. Tag matching (high priority for specialized searches)
-    tag_bonus = 0.0
-    if tags:
-        for tag in tags:
-            tag_lower = tag.lower()
+
+        # 4. Geographic field matching (country, region, and city)
+        geographic_bonus = 0.0
+        if candidate.country_lower and query_lower in candidate.country_lower:
+            geographic_bonus += 0.2
+        if candidate.region_lower and query_lower in candidate.region_lower:
+            geographic_bonus += 0.2
+        if candidate.city_lower and query_lower in candidate.city_lower:
+            geographic_bonus += 0.2
+
+        # 5. Tag matching (high priority for specialized searches)
+        tag_bonus = 0.0
+        for tag_lower in candidate.tags_lower:
             if query_lower in tag_lower:
                 tag_bonus += 0.3  # High bonus for tag matches
                 break
@@ -476,36 +551,71 @@ def calculate_unified_phrase_aware_score(
                 if query_word in tag_lower:
                     tag_bonus += 0.2
                     break
-    
-    # 6. Traditional similarity for edge cases
-    similarity_score = difflib.SequenceMatcher(None, query_lower, name_lower).ratio()
-    
-    # 7. Weighted final score (unified across all content types)
-    final_score = (
-        word_match_ratio * 0.5 +      # Word matching (50%)
-        consecutive_bonus +            # Consecutive bonus
-        geographic_bonus +             # Geographic bonus
-        tag_bonus +                    # Tag bonus
-        similarity_score * 0.2 +      # Traditional similarity (20%)
-        (0.1 if query_lower in desc_lower else 0.0)  # Description bonus (10%)
-    )
-    
-    # 7. Special case: if it's a single word and has high similarity to any name word, boost the score
-    if len(query_words) == 1 and len(name_words) > 0:
-        best_word_similarity = max(
-            difflib.SequenceMatcher(None, query_words[0], name_word).ratio()
-            for name_word in name_words
+
+        # 6. Traditional similarity for edge cases
+        similarity_score = self._ratio(query_lower, name_lower)
+
+        # 7. Weighted final score (unified across all content types)
+        final_score = (
+            word_match_ratio * 0.5 +      # Word matching (50%)
+            consecutive_bonus +            # Consecutive bonus
+            geographic_bonus +             # Geographic bonus
+            tag_bonus +                    # Tag bonus
+            similarity_score * 0.2 +      # Traditional similarity (20%)
+            (0.1 if query_lower in candidate.desc_lower else 0.0)  # Description bonus (10%)
         )
-        if best_word_similarity >= UNIFIED_TYPO_TOLERANCE['single_word']:
-            final_score = max(final_score, best_word_similarity * 0.8)
-    
-    # 8. Additional fields bonus (for content-specific fields)
-    if additional_fields:
-        for field_name, field_value in additional_fields.items():
-            if field_value and query_lower in str(field_value).lower():
+
+        # 7. Special case: if it's a single word and has high similarity to any name word, boost the score
+        # Only words that can reach the threshold need an exact ratio
+        if len(query_words) == 1 and len(name_words) > 0:
+            single_threshold = UNIFIED_TYPO_TOLERANCE['single_word']
+            close_ratios = [
+                self._ratio(query_words[0], name_word)
+                for name_word in name_words
+                if self._ratio_at_least(query_words[0], name_word, single_threshold)
+            ]
+            if close_ratios:
+                final_score = max(final_score, max(close_ratios) * 0.8)
+
+        # 8. Additional fields bonus (for content-specific fields)
+        for value_lower in candidate.additional_lower:
+            if query_lower in value_lower:
                 final_score += 0.05  # Small bonus for additional field matches
-    
-    return min(final_score, 1.0)
+
+        return min(final_score, 1.0)
+
+
+def load_tag_names_map(db: Session, owner_column, owner_ids) -> Dict[int, List[str]]:
+    """
+    Fetch tag names for many tagged objects in a single query.
+
+    Replaces per-object ``db.query(AvailableTag).join(...)`` lookups in fuzzy
+    scoring loops, which otherwise issue one query per candidate.
+
+    Args:
+        db: Database session
+        owner_column: Owner foreign key on a tag link model
+            (e.g. ``DiveSiteTag.dive_site_id`` or ``DiveTag.dive_id``)
+        owner_ids: IDs of the objects to fetch tags for
+
+    Returns:
+        Dict mapping owner ID to a list of tag names (owners without tags are omitted)
+    """
+    from app.models import AvailableTag
+
+    owner_ids = list({owner_id for owner_id in owner_ids if owner_id is not None})
+    if not owner_ids:
+        return {}
+
+    link_model = owner_column.class_
+    rows = db.query(owner_column, AvailableTag.name).join(
+        AvailableTag, AvailableTag.id == link_model.tag_id
+    ).filter(owner_column.in_(owner_ids)).order_by(AvailableTag.name.asc()).all()
+
+    tag_map: Dict[int, List[str]] = {}
+    for owner_id, tag_name in rows:
+        tag_map.setdefault(owner_id, []).append(tag_name)
+    return tag_map
 
 
 def classify_match_type(score: float) -> str:
@@ -128,6 +128,14 @@ def client(db_session):
     except Exception:
         pass  # Ignore if reset fails
 
+    # Drop identities and view counts buffered by earlier tests (ids are not reused across tests)
+    from app.services.pat_verification_cache import clear_pat_cache
+    from app.services.user_identity_cache import clear_user_snapshots
+    from app.services.view_counter import clear_view_counts
+    clear_pat_cache()
+    clear_user_snapshots()
+    clear_view_counts()
+
     app.dependency_overrides[get_db] = override_get_db
 
     # Initialize fastapi-cache for tests
@@ -449,7 +457,7 @@ def test_route_analytics(db_session, test_user, test_route):
 
 
 def pytest_collection_modifyitems(config, items):
-    """Automatically skip spatial tests when using SQLite."""
+    """Automatically skip spatial tests when using SQLite, and benchmarks unless asked for."""
     import os
     database_url = os.getenv("DATABASE_URL", "sqlite:///./test.db")
     is_sqlite = database_url.startswith("sqlite")
@@ -460,6 +468,13 @@ def pytest_collection_modifyitems(config, items):
             if "spatial" in item.keywords:
                 item.add_marker(skip_spatial)
 
+    # Wall-clock comparisons are noisy on shared CI runners
+    if os.getenv("RUN_BENCHMARKS") != "1":
+        skip_benchmark = pytest.mark.skip(reason="Benchmark - set RUN_BENCHMARKS=1 to run")
+        for item in items:
+            if "benchmark" in item.keywords:
+                item.add_marker(skip_benchmark)
+
 
 @pytest.fixture
 def test_dive_with_route(db_session, test_user, test_dive_site, test_route):
@@ -0,0 +1,30 @@
+"""add dive site wind suitability
+
+Revision ID: 0093
+Revises: 0092
+Create Date: 2026-10-16 10:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0093'
+down_revision = '0092'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        'dive_site_wind_suitability',
+        sa.Column('dive_site_id', sa.Integer(), nullable=False),
+        sa.Column('forecast_hour', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('suitability', sa.String(length=20), nullable=False),
+        sa.Column('computed_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['dive_site_id'], ['dive_sites.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('dive_site_id', 'forecast_hour')
+    )
+    op.create_index('idx_wind_suitability_hour_suitability', 'dive_site_wind_suitability', ['forecast_hour', 'suitability'], unique=False)
+    op.create_index('ix_dive_site_wind_suitability_computed_at', 'dive_site_wind_suitability', ['computed_at'], unique=False)
+
+def downgrade():
+    op.drop_table('dive_site_wind_suitability')
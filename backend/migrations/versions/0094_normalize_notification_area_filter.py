@@ -0,0 +1,96 @@
+"""normalize notification preference area filter
+
+Revision ID: 0094
+Revises: 0093
+Create Date: 2026-10-16 14:00:00.000000
+"""
+import json
+import math
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0094'
+down_revision = '0093'
+branch_labels = None
+depends_on = None
+
+EARTH_RADIUS_KM = 6371
+
+AREA_COLUMNS = (
+    'area_country', 'area_region', 'area_center_lat', 'area_center_lng', 'area_radius_km',
+    'area_min_lat', 'area_max_lat', 'area_min_lng', 'area_max_lng',
+)
+
+
+def _area_columns(area_filter):
+    # Same normalization as app.models.area_filter_columns, frozen for this migration
+    values = dict.fromkeys(AREA_COLUMNS)
+    if isinstance(area_filter, str):
+        area_filter = json.loads(area_filter)
+    if not area_filter:
+        return values
+    values['area_country'] = area_filter.get('country') or None
+    values['area_region'] = area_filter.get('region') or None
+    try:
+        radius_km = float(area_filter.get('radius_km') or 0)
+        center_lat = float(area_filter['center_lat'])
+        center_lng = float(area_filter['center_lng'])
+    except (KeyError, TypeError, ValueError):
+        return values
+    if radius_km <= 0:
+        return values
+
+    angular_radius = radius_km / EARTH_RADIUS_KM + 1e-9
+    lat = math.radians(center_lat)
+    min_lat, max_lat = lat - angular_radius, lat + angular_radius
+    min_lng = max_lng = None
+    if min_lat > -math.pi / 2 and max_lat < math.pi / 2:
+        delta_lng = math.asin(min(1.0, math.sin(angular_radius) / math.cos(lat)))
+        lng = math.radians(center_lng)
+        if lng - delta_lng >= -math.pi and lng + delta_lng <= math.pi:
+            min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    values.update(
+        area_center_lat=center_lat,
+        area_center_lng=center_lng,
+        area_radius_km=radius_km,
+        area_min_lat=max(math.degrees(min_lat), -90.0),
+        area_max_lat=min(math.degrees(max_lat), 90.0),
+        area_min_lng=math.degrees(min_lng) if min_lng is not None else -180.0,
+        area_max_lng=math.degrees(max_lng) if max_lng is not None else 180.0,
+    )
+    return values
+
+
+def upgrade():
+    op.add_column('notification_preferences', sa.Column('area_country', sa.String(length=100), nullable=True))
+    op.add_column('notification_preferences', sa.Column('area_region', sa.String(length=100), nullable=True))
+    for column in AREA_COLUMNS[2:]:
+        op.add_column('notification_preferences', sa.Column(column, sa.Float(), nullable=True))
+    op.create_index(
+        'idx_notification_pref_area_country', 'notification_preferences',
+        ['category', 'area_country', 'area_region'], unique=False
+    )
+    op.create_index(
+        'idx_notification_pref_area_bbox', 'notification_preferences',
+        ['category', 'area_min_lat', 'area_max_lat'], unique=False
+    )
+
+    # Data migration: derive the columns from the existing JSON filters
+    bind = op.get_bind()
+    rows = bind.execute(sa.text(
+        "SELECT id, area_filter FROM notification_preferences WHERE area_filter IS NOT NULL"
+    )).fetchall()
+    assignments = ", ".join(f"{column} = :{column}" for column in AREA_COLUMNS)
+    update = sa.text(f"UPDATE notification_preferences SET {assignments} WHERE id = :id")
+    params = [{'id': row.id, **_area_columns(row.area_filter)} for row in rows]
+    if params:
+        bind.execute(update, params)
+
+
+def downgrade():
+    op.drop_index('idx_notification_pref_area_bbox', table_name='notification_preferences')
+    op.drop_index('idx_notification_pref_area_country', table_name='notification_preferences')
+    for column in reversed(AREA_COLUMNS):
+        op.drop_column('notification_preferences', column)
@@ -0,0 +1,19 @@
+"""add chat messages room/created_at index
+
+Revision ID: 0095
+Revises: 0094
+Create Date: 2026-10-16 15:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0095'
+down_revision = '0094'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_index('idx_chat_messages_room_created', 'user_chat_messages', ['room_id', 'created_at'], unique=False)
+
+def downgrade():
+    op.drop_index('idx_chat_messages_room_created', table_name='user_chat_messages')
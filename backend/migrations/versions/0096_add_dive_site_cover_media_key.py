@@ -0,0 +1,61 @@
+"""add dive site cover media key
+
+Revision ID: 0096
+Revises: 0095
+Create Date: 2026-10-16 16:00:00.000000
+"""
+import json
+from collections import defaultdict
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = '0096'
+down_revision = '0095'
+branch_labels = None
+depends_on = None
+
+
+def _cover_key(keys, media_order):
+    # Same rule as app.services.cover_media_service.select_cover_key, frozen for this migration
+    keys = set(keys)
+    if isinstance(media_order, str):
+        media_order = json.loads(media_order)
+    for key in media_order or []:
+        if key in keys:
+            return key
+    return min(keys) if keys else None
+
+
+def upgrade():
+    op.add_column('dive_sites', sa.Column('cover_media_key', sa.String(length=32), nullable=True))
+
+    # Data migration: pick the cover of every site that has media
+    bind = op.get_bind()
+    keys = defaultdict(list)
+    for row in bind.execute(sa.text("SELECT dive_site_id, id FROM site_media")):
+        keys[row.dive_site_id].append(f"site_{row.id}")
+    for row in bind.execute(sa.text(
+        "SELECT d.dive_site_id, dm.id FROM dive_media dm "
+        "JOIN dives d ON d.id = dm.dive_id WHERE d.dive_site_id IS NOT NULL"
+    )):
+        keys[row.dive_site_id].append(f"dive_{row.id}")
+    if not keys:
+        return
+
+    orders = {
+        row.id: row.media_order
+        for row in bind.execute(sa.text("SELECT id, media_order FROM dive_sites WHERE media_order IS NOT NULL"))
+    }
+    update = sa.text(
+        "UPDATE dive_sites SET cover_media_key = :cover_media_key, updated_at = updated_at WHERE id = :id"
+    )
+    bind.execute(update, [
+        {'id': site_id, 'cover_media_key': _cover_key(site_keys, orders.get(site_id))}
+        for site_id, site_keys in keys.items()
+    ])
+
+
+def downgrade():
+    op.drop_column('dive_sites', 'cover_media_key')
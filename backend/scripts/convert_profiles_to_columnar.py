@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""
+Script to convert stored JSON dive profiles to the columnar profile format.
+
+Imported dive profiles used to be stored as indented JSON. This script scans
+the database for dives whose profile is still a .json object, re-encodes the
+profile with app.services.profile_format, uploads it as a .dpc object, points
+the dive at the new object and removes the old JSON object and its derived
+artifact. Subsurface XML profiles are left untouched.
+
+Usage:
+    python backend/scripts/convert_profiles_to_columnar.py [--dry-run] [--keep-json] [--limit N]
+
+Environment Variables:
+    R2_BUCKET_NAME, R2_ACCESS_KEY_ID, etc. must be set (standard backend env).
+"""
+
+import os
+import sys
+import logging
+import argparse
+from datetime import datetime
+
+import orjson
+
+# Add backend directory to path to allow imports
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.database import SessionLocal
+from app.models import Dive
+from app.services.r2_storage_service import r2_storage
+from app.services.profile_artifact_service import delete_profile_artifact
+from app.services.profile_format import decode_profile, encode_profile
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s',
+    datefmt='%H:%M:%S'
+)
+logger = logging.getLogger(__name__)
+
+def get_timestamp():
+    return datetime.now().strftime("%H:%M:%S")
+
+class ProfileConverter:
+    def __init__(self, dry_run: bool = False, keep_json: bool = False, limit: int = 0):
+        self.dry_run = dry_run
+        self.keep_json = keep_json
+        self.limit = limit
+        self.db = SessionLocal()
+        self.success_count = 0
+        self.fail_count = 0
+        self.bytes_before = 0
+        self.bytes_after = 0
+
+    def convert_dive(self, dive: Dive):
+        """Convert the JSON profile of a single dive."""
+        old_path = dive.profile_xml_path
+        logger.info(f"[{get_timestamp()}] 📈 Converting profile of dive ID {dive.id}: {old_path}")
+
+        try:
+            content = r2_storage.download_profile(dive.user_id, old_path)
+            if not content:
+                logger.error(f"   ❌ Failed to download profile: {old_path}")
+                self.fail_count += 1
+                return
+
+            profile_data = orjson.loads(content)
+            encoded = encode_profile(profile_data)
+            # Never replace a profile with something that does not read back identically
+            if decode_profile(encoded) != profile_data:
+                logger.error("   ❌ Columnar round trip does not match the JSON profile, skipping")
+                self.fail_count += 1
+                return
+
+            self.bytes_before += len(content)
+            self.bytes_after += len(encoded)
+            logger.info(f"   {len(content)} -> {len(encoded)} bytes")
+
+            if self.dry_run:
+                self.success_count += 1
+                return
+
+            new_path = r2_storage.upload_profile_data(dive.user_id, os.path.basename(old_path), profile_data)
+            dive.profile_xml_path = new_path
+            self.db.commit()
+
+            delete_profile_artifact(r2_storage, dive.user_id, old_path)
+            if not self.keep_json:
+                r2_storage.delete_profile(dive.user_id, old_path)
+
+            logger.info(f"   ✅ Stored as {new_path}")
+            self.success_count += 1
+
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"   ❌ Unexpected error: {e}")
+            self.fail_count += 1
+
+    def run(self):
+        logger.info(f"[{get_timestamp()}] 🚀 Starting profile conversion (Dry Run: {self.dry_run})...")
+
+        query = self.db.query(Dive).filter(Dive.profile_xml_path.like('%.json')).order_by(Dive.id)
+        if self.limit > 0:
+            query = query.limit(self.limit)
+        dives = query.all()
+        logger.info(f"[{get_timestamp()}] 📊 Found {len(dives)} JSON profiles to convert")
+
+        for dive in dives:
+            self.convert_dive(dive)
+
+        logger.info("-" * 40)
+        logger.info(f"[{get_timestamp()}] 🎉 Finished")
+        logger.info(f"   Success: {self.success_count}")
+        logger.info(f"   Failed:  {self.fail_count}")
+        if self.bytes_after:
+            logger.info(
+                f"   Size:    {self.bytes_before} -> {self.bytes_after} bytes "
+                f"({self.bytes_before / self.bytes_after:.1f}x smaller)"
+            )
+        self.db.close()
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert stored JSON dive profiles to the columnar format")
+    parser.add_argument("--dry-run", action="store_true", help="Only report the size reduction")
+    parser.add_argument("--keep-json", action="store_true", help="Keep the original JSON objects")
+    parser.add_argument("--limit", type=int, default=0, help="Limit number of profiles to convert")
+
+    args = parser.parse_args()
+
+    converter = ProfileConverter(dry_run=args.dry_run, keep_json=args.keep_json, limit=args.limit)
+    converter.run()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+"""
+Tests for the buddy chat event bus and its database polling backend.
+"""
+
+import asyncio
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+import pytest
+from cryptography.fernet import Fernet
+from sqlalchemy.orm import sessionmaker
+
+from app.models import UserChatMessage, UserChatRoom, UserChatRoomMember
+from app.services.chat_events import (
+    ChatEventBus,
+    DatabasePollingChatEventBackend,
+    format_sse,
+)
+from app.services.encryption_service import encrypt_message, encrypt_room_dek, generate_room_dek
+
+
+def _message(message_id=1, sender_id=1, is_edited=False, updated_at="2026-01-01T10:00:00"):
+    return {
+        "type": "message",
+        "key": f"message:{message_id}:{updated_at}",
+        "room_id": "room-1",
+        "message": {"id": message_id, "sender_id": sender_id, "is_edited": is_edited, "content": "hi"},
+    }
+
+
+def _drain(queue):
+    frames = []
+    while not queue.empty():
+        frames.append(queue.get_nowait())
+    return frames
+
+
+class TestChatEventBus:
+    def test_routes_messages_and_unread_deltas(self):
+        async def scenario():
+            bus = ChatEventBus()
+            sender, recipient, stranger = bus.subscribe(1), bus.subscribe(2), bus.subscribe(3)
+
+            bus.publish(_message(sender_id=1), {1, 2})
+
+            assert [f["type"] for f in _drain(sender)] == ["message"]
+            assert _drain(recipient)[1] == {"type": "unread", "room_id": "room-1", "delta": 1}
+            assert _drain(stranger) == []
+
+        asyncio.run(scenario())
+
+    def test_duplicate_events_are_dropped(self):
+        async def scenario():
+            bus = ChatEventBus()
+            queue = bus.subscribe(2)
+            bus.publish(_message(), {2})
+            bus.publish(_message(), {2}, forward=False)
+            assert len(_drain(queue)) == 2
+
+            # An edit has a new updated_at, and no unread delta
+            bus.publish(_message(is_edited=True, updated_at="2026-01-01T10:05:00"), {2})
+            assert [f["type"] for f in _drain(queue)] == ["message"]
+
+        asyncio.run(scenario())
+
+    def test_read_marker_resets_only_the_readers_count(self):
+        async def scenario():
+            bus = ChatEventBus()
+            reader, other = bus.subscribe(1), bus.subscribe(2)
+            bus.publish({"type": "read", "key": "read:room-1:1:t", "room_id": "room-1", "user_id": 1}, {1, 2})
+            assert _drain(reader) == [{"type": "unread", "room_id": "room-1", "count": 0}]
+            assert _drain(other) == []
+
+        asyncio.run(scenario())
+
+    def test_slow_client_is_told_to_resync(self):
+        async def scenario():
+            bus = ChatEventBus()
+            queue = bus.subscribe(1)
+            for i in range(150):
+                bus.publish(_message(message_id=i, sender_id=1), {1})
+            frames = _drain(queue)
+            assert {"type": "resync"} in frames
+            assert len(frames) < 100
+
+        asyncio.run(scenario())
+
+    def test_publish_from_worker_thread(self):
+        async def scenario():
+            bus = ChatEventBus()
+            queue = bus.subscribe(2)
+            thread = threading.Thread(target=bus.publish, args=(_message(), {2}))
+            thread.start()
+            thread.join()
+            frame = await asyncio.wait_for(queue.get(), timeout=1)
+            assert frame["type"] == "message"
+
+        asyncio.run(scenario())
+
+    def test_unsubscribe(self):
+        async def scenario():
+            bus = ChatEventBus()
+            queue = bus.subscribe(1)
+            assert bus.has_subscribers()
+            bus.unsubscribe(1, queue)
+            assert not bus.has_subscribers()
+
+        asyncio.run(scenario())
+
+    def test_format_sse(self):
+        frame = format_sse({"type": "unread", "room_id": "r", "delta": 1})
+        assert frame.startswith("event: unread\ndata: {")
+        assert frame.endswith("\n\n")
+
+
+@pytest.fixture
+def master_key():
+    key = Fernet.generate_key().decode('utf-8')
+    original_getenv = os.getenv
+
+    def mock_getenv(k, default=None):
+        if k == "CHAT_MASTER_KEY":
+            return key
+        return original_getenv(k, default)
+
+    with mock.patch("os.getenv", side_effect=mock_getenv):
+        yield key
+
+
+class TestDatabasePollingBackend:
+    def test_poll_reads_messages_and_read_markers(self, db_session, test_user, test_user_other, master_key):
+        encrypted_dek = encrypt_room_dek(generate_room_dek())
+        room = UserChatRoom(is_group=False, encrypted_dek=encrypted_dek)
+        db_session.add(room)
+        db_session.flush()
+        an_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+        db_session.add_all([
+            UserChatRoomMember(room_id=room.id, user_id=test_user.id, last_read_at=an_hour_ago),
+            UserChatRoomMember(room_id=room.id, user_id=test_user_other.id, last_read_at=an_hour_ago),
+            UserChatMessage(room_id=room.id, sender_id=test_user_other.id, content=encrypt_message("ahoy", encrypted_dek)),
+        ])
+        db_session.commit()
+
+        backend = DatabasePollingChatEventBackend(session_factory=sessionmaker(bind=db_session.connection()))
+        start = datetime.now(timezone.utc) - timedelta(minutes=5)
+        cursor = ((start, 0), (start, "", 0))
+        events, next_cursor = backend.poll(cursor)
+
+        assert len(events) == 1
+        event, recipients = events[0]
+        assert event["type"] == "message"
+        assert event["message"]["content"] == "ahoy"
+        assert recipients == {test_user.id, test_user_other.id}
+        message_position, read_position = next_cursor
+        assert message_position != cursor[0]
+        assert read_position != cursor[1]
+
+        # The member reads the room
+        db_session.query(UserChatRoomMember).filter(UserChatRoomMember.user_id == test_user.id).update(
+            {"last_read_at": datetime.now(timezone.utc)}, synchronize_session=False
+        )
+        db_session.commit()
+
+        events, _ = backend.poll(next_cursor)
+        reads = [(e, r) for e, r in events if e["type"] == "read"]
+        assert reads == [(reads[0][0], {test_user.id})]
+        assert reads[0][0]["user_id"] == test_user.id
+
+    def test_poll_skips_members_who_joined_later_and_keeps_stream_positions(
+        self, db_session, test_user, test_user_other, test_admin_user, master_key, monkeypatch
+    ):
+        encrypted_dek = encrypt_room_dek(generate_room_dek())
+        room = UserChatRoom(is_group=True, encrypted_dek=encrypted_dek)
+        db_session.add(room)
+        db_session.flush()
+        now = datetime.now(timezone.utc)
+        db_session.add_all([
+            UserChatRoomMember(
+                room_id=room.id, user_id=test_user.id, joined_at=now - timedelta(hours=2),
+                last_read_at=now - timedelta(hours=2)
+            ),
+            UserChatRoomMember(
+                room_id=room.id, user_id=test_user_other.id, joined_at=now - timedelta(hours=2),
+                last_read_at=now - timedelta(hours=2)
+            ),
+            # Joined after the message was sent
+            UserChatRoomMember(
+                room_id=room.id, user_id=test_admin_user.id, joined_at=now - timedelta(minutes=1),
+                last_read_at=now - timedelta(minutes=1)
+            ),
+            UserChatMessage(
+                room_id=room.id, sender_id=test_user.id, content=encrypt_message("old news", encrypted_dek),
+                created_at=now - timedelta(hours=1), updated_at=now - timedelta(seconds=30), is_edited=True
+            ),
+        ])
+        db_session.commit()
+
+        monkeypatch.setattr("app.services.chat_events._POLL_BATCH_SIZE", 1)
+        backend = DatabasePollingChatEventBackend(session_factory=sessionmaker(bind=db_session.connection()))
+        start = now - timedelta(minutes=5)
+        events, (message_position, read_position) = backend.poll(((start, 0), (start, "", 0)))
+
+        messages = [(e, r) for e, r in events if e["type"] == "message"]
+        assert len(messages) == 1
+        assert messages[0][1] == {test_user.id, test_user_other.id}
+        # Each stream advances to its own last row
+        assert message_position[0].replace(tzinfo=None) == (now - timedelta(seconds=30)).replace(tzinfo=None)
+        assert read_position[0].replace(tzinfo=None) == (now - timedelta(minutes=1)).replace(tzinfo=None)
+
+    def test_poll_pages_past_rows_with_the_same_timestamp(
+        self, db_session, test_user, test_user_other, master_key, monkeypatch
+    ):
+        encrypted_dek = encrypt_room_dek(generate_room_dek())
+        room = UserChatRoom(is_group=False, encrypted_dek=encrypted_dek)
+        db_session.add(room)
+        db_session.flush()
+        sent_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db_session.add_all([
+            UserChatMessage(
+                room_id=room.id, sender_id=test_user.id, content=encrypt_message(f"message {i}", encrypted_dek),
+                created_at=sent_at, updated_at=sent_at
+            )
+            for i in range(3)
+        ])
+        db_session.commit()
+
+        monkeypatch.setattr("app.services.chat_events._POLL_BATCH_SIZE", 2)
+        backend = DatabasePollingChatEventBackend(session_factory=sessionmaker(bind=db_session.connection()))
+        start = sent_at - timedelta(minutes=5)
+        cursor = ((start, 0), (start, "", 0))
+        contents = []
+        for _ in range(3):
+            events, cursor = backend.poll(cursor)
+            contents += [e["message"]["content"] for e, _ in events if e["type"] == "message"]
+        assert contents == ["message 0", "message 1", "message 2"]
@@ -0,0 +1,106 @@
+"""
+Tests for the denormalized dive site cover media.
+"""
+
+from app.models import Dive, DiveMedia, DiveSite, MediaType, SiteMedia
+from app.services.cover_media_service import refresh_cover_media, select_cover_key
+
+
+class TestSelectCoverKey:
+    def test_no_media(self):
+        assert select_cover_key([], ["site_1"]) is None
+
+    def test_media_order_wins(self):
+        assert select_cover_key(["site_1", "dive_2", "site_3"], ["site_3", "site_1"]) == "site_3"
+
+    def test_stale_order_keys_are_skipped(self):
+        assert select_cover_key(["site_1", "dive_2"], ["site_9", "site_1"]) == "site_1"
+
+    def test_falls_back_to_gallery_order(self):
+        # Same fallback as GET /dive-sites/{id}/media: remaining keys sorted
+        assert select_cover_key(["site_1", "dive_2"], None) == "dive_2"
+        assert select_cover_key(["site_1", "site_2"], []) == "site_1"
+
+
+def _cover(db_session, site_id):
+    db_session.expire_all()
+    return db_session.get(DiveSite, site_id).cover_media_key
+
+
+class TestCoverMaintenance:
+    def test_cover_follows_media_changes(self, db_session, test_dive_site, test_dive):
+        site_id = test_dive_site.id
+        assert _cover(db_session, site_id) is None
+
+        site_media = SiteMedia(dive_site_id=site_id, media_type=MediaType.photo, url="http://example.com/site.jpg")
+        db_session.add(site_media)
+        db_session.commit()
+        assert _cover(db_session, site_id) == f"site_{site_media.id}"
+
+        dive_media = DiveMedia(dive_id=test_dive.id, media_type=MediaType.photo, url="http://example.com/dive.jpg")
+        db_session.add(dive_media)
+        db_session.commit()
+        assert _cover(db_session, site_id) == f"dive_{dive_media.id}"
+
+        site = db_session.get(DiveSite, site_id)
+        site.media_order = [f"site_{site_media.id}", f"dive_{dive_media.id}"]
+        db_session.commit()
+        assert _cover(db_session, site_id) == f"site_{site_media.id}"
+
+        db_session.delete(site_media)
+        db_session.commit()
+        assert _cover(db_session, site_id) == f"dive_{dive_media.id}"
+
+        # Unlinking the dive from the site takes its media along
+        db_session.get(Dive, test_dive.id).dive_site_id = None
+        db_session.commit()
+        assert _cover(db_session, site_id) is None
+
+    def test_refresh_after_bulk_delete(self, db_session, test_dive_site):
+        site_media = SiteMedia(
+            dive_site_id=test_dive_site.id, media_type=MediaType.photo, url="http://example.com/site.jpg"
+        )
+        db_session.add(site_media)
+        db_session.commit()
+
+        db_session.query(SiteMedia).filter(SiteMedia.id == site_media.id).delete()
+        refresh_cover_media(db_session, [test_dive_site.id])
+        db_session.commit()
+        assert _cover(db_session, test_dive_site.id) is None
+
+
+class TestCoverInListings:
+    def test_thumbnail_follows_media_order(self, client, admin_headers, test_dive_site):
+        site_id = test_dive_site.id
+        media_ids = []
+        for name in ("first", "second"):
+            response = client.post(
+                f"/api/v1/dive-sites/{site_id}/media",
+                json={"media_type": "photo", "url": f"http://example.com/{name}.jpg"},
+                headers=admin_headers
+            )
+            assert response.status_code == 200
+            media_ids.append(response.json()["id"])
+
+        def listed_thumbnail():
+            response = client.get(f"/api/v1/dive-sites/?dive_site_id={site_id}&detail_level=basic")
+            assert response.status_code == 200
+            site, = response.json()["items"]
+            return site["thumbnail"], site["thumbnail_id"], site["thumbnail_source"]
+
+        # Deterministic without an explicit order
+        cover_id = int(select_cover_key([f"site_{media_id}" for media_id in media_ids], None)[len("site_"):])
+        cover_name = "first" if cover_id == media_ids[0] else "second"
+        assert listed_thumbnail() == (f"http://example.com/{cover_name}.jpg", cover_id, "site_media")
+        assert listed_thumbnail() == (f"http://example.com/{cover_name}.jpg", cover_id, "site_media")
+
+        response = client.put(
+            f"/api/v1/dive-sites/{site_id}/media/order",
+            json={"order": [f"site_{media_ids[1]}", f"site_{media_ids[0]}"]},
+            headers=admin_headers
+        )
+        assert response.status_code == 200
+        assert listed_thumbnail() == ("http://example.com/second.jpg", media_ids[1], "site_media")
+
+        response = client.get(f"/api/v1/dive-sites/{site_id}")
+        assert response.json()["thumbnail_id"] == media_ids[1]
@@ -199,7 +199,7 @@ class TestDiveProfileAPI:
             
             with patch('app.services.dive_profile_parser.DiveProfileParser') as mock_parser:
                 mock_parser_instance = MagicMock()
-                mock_parser_instance.parse_xml_file.return_value = {
+                mock_parser_instance.parse_xml_stream.return_value = {
                     "samples": [{"time_minutes": 0, "depth": 0}],
                     "calculated_max_depth": 20,
                     "calculated_duration_minutes": 5
@@ -421,21 +421,36 @@ class TestDiveProfileAPI:
         from app.routers.dives.imports.common import save_dive_profile_data
         
         with patch('app.routers.dives.imports.common.r2_storage') as mock_r2:
-            mock_r2.upload_profile.return_value = "user_1/2025/09/test_profile.json"
+            mock_r2.upload_profile_data.return_value = "user_1/2025/09/test_profile.dpc"
             
             save_dive_profile_data(test_dive, sample_profile_data, db_session)
             
-            assert test_dive.profile_xml_path == "user_1/2025/09/test_profile.json"
+            mock_r2.upload_profile_data.assert_called_once()
+            assert mock_r2.upload_profile_data.call_args[0][2] == sample_profile_data
+            assert test_dive.profile_xml_path == "user_1/2025/09/test_profile.dpc"
             assert test_dive.profile_sample_count == 6
             assert test_dive.profile_max_depth == 20
             assert test_dive.profile_duration_minutes == 5
 
+    def test_save_dive_profile_data_replaces_json_profile(self, client, auth_headers, test_dive, sample_profile_data, db_session):
+        """Test that re-saving a JSON profile in the columnar format removes the JSON object."""
+        from app.routers.dives.imports.common import save_dive_profile_data
+
+        test_dive.profile_xml_path = "user_1/2025/09/test_profile.json"
+        with patch('app.routers.dives.imports.common.r2_storage') as mock_r2:
+            mock_r2.upload_profile_data.return_value = "user_1/2025/09/test_profile.dpc"
+
+            save_dive_profile_data(test_dive, sample_profile_data, db_session)
+
+            mock_r2.delete_profile.assert_any_call(test_dive.user_id, "user_1/2025/09/test_profile.json")
+            assert test_dive.profile_xml_path == "user_1/2025/09/test_profile.dpc"
+
     def test_save_dive_profile_data_error(self, client, auth_headers, test_dive, sample_profile_data):
         """Test saving dive profile data with error."""
         from app.routers.dives.imports.common import save_dive_profile_data
         
         with patch('app.routers.dives.imports.common.r2_storage') as mock_r2:
-            mock_r2.upload_profile.side_effect = Exception("Storage error")
+            mock_r2.upload_profile_data.side_effect = Exception("Storage error")
             
             with pytest.raises(Exception):
                 save_dive_profile_data(test_dive, sample_profile_data, test_dive.__class__.query.session)
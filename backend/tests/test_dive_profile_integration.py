@@ -314,7 +314,7 @@ class TestDiveProfileIntegration:
         
         with patch('app.services.dive_profile_parser.DiveProfileParser') as mock_parser:
             mock_parser_instance = MagicMock()
-            mock_parser_instance.parse_xml_file.return_value = None
+            mock_parser_instance.parse_xml_stream.return_value = None
             mock_parser.return_value = mock_parser_instance
             
             response = client.post(f"/api/v1/dives/{test_dive.id}/profile", 
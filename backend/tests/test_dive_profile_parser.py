@@ -1,11 +1,15 @@
 import pytest
 import tempfile
+import io
+import math
 import os
+import time
+import tracemalloc
 from unittest.mock import patch, mock_open
 from xml.etree.ElementTree import Element
 import xml.etree.ElementTree as ET
 
-from app.services.dive_profile_parser import DiveProfileParser
+from app.services.dive_profile_parser import DiveProfileParser, ProfileSampleColumns
 
 
 class TestDiveProfileParser:
@@ -438,3 +442,100 @@ class TestDiveProfileParser:
         assert result['calculated_duration_minutes'] == 2
         assert result['temperature_range']['min'] == 0
         assert result['temperature_range']['max'] == 0
+
+    def test_parse_xml_stream_matches_tree_parser(self, parser, sample_xml_content):
+        """Streaming parse produces the same result as the element tree parser."""
+        content = sample_xml_content.encode('utf-8')
+
+        assert parser.parse_xml_stream(content) == parser.parse_xml_content(sample_xml_content)
+        assert parser.parse_xml_stream(io.BytesIO(content)) == parser.parse_xml_content(sample_xml_content)
+
+    def test_parse_xml_stream_does_not_touch_disk(self, parser, sample_xml_content):
+        """Streaming parse works on bytes without temporary files."""
+        with patch('tempfile.NamedTemporaryFile', side_effect=AssertionError("temp file used")), \
+                patch('builtins.open', side_effect=AssertionError("file opened")):
+            result = parser.parse_xml_stream(sample_xml_content.encode('utf-8'))
+
+        assert result['sample_count'] == 10
+
+    def test_parse_xml_stream_divelog_first_dive_and_divecomputer(self, parser):
+        """Only the first dive's first divecomputer contributes samples."""
+        content = b"""<divelog program='subsurface' version='3'>
+            <settings><divecomputerid model='x' deviceid='1' /></settings>
+            <divesites><site uuid='1' name='Reef' /></divesites>
+            <dives>
+                <dive number='7'>
+                    <buddy>Alex</buddy>
+                    <divecomputer model='Perdix'>
+                        <sample time='0:10 min' depth='2.0 m' pressure='200.0 bar' />
+                        <event time='0:10 min' type='25' name='gaschange' cylinder='0' />
+                        <sample time='0:20 min' depth='4.0 m' />
+                    </divecomputer>
+                    <divecomputer model='Backup'>
+                        <sample time='0:10 min' depth='9.0 m' />
+                    </divecomputer>
+                </dive>
+                <dive number='8'>
+                    <divecomputer><sample time='0:10 min' depth='30.0 m' /></divecomputer>
+                </dive>
+            </dives>
+        </divelog>"""
+
+        result = parser.parse_xml_stream(content)
+
+        assert result == parser.parse_xml_content(content.decode('utf-8'))
+        assert result['dive_number'] == '7'
+        assert result['buddy'] == 'Alex'
+        assert [s['depth'] for s in result['samples']] == [2.0, 4.0]
+        assert len(result['events']) == 1
+
+    def test_parse_xml_stream_columnar(self, parser, sample_xml_content):
+        """Columnar mode keeps samples in arrays with NaN for missing values."""
+        result = parser.parse_xml_stream(sample_xml_content.encode('utf-8'), columnar=True)
+        columns = result['samples']
+
+        assert isinstance(columns, ProfileSampleColumns)
+        assert len(columns) == 10
+        assert list(columns['depth'][:3]) == [2.7, 4.0, 3.8]
+        assert columns['ndl_minutes'][1] == 99.0
+        assert math.isnan(columns['ndl_minutes'][0])
+        assert columns['stopdepth'][7] == 3.0
+        assert columns.to_samples() == parser.parse_xml_content(sample_xml_content)['samples']
+        assert result['calculated_max_depth'] == 45.6
+        assert result['temperature_range'] == {'min': 33.0, 'max': 34.0}
+
+    def test_parse_xml_stream_errors(self, parser):
+        """Malformed XML and missing dives raise like the tree parser."""
+        with pytest.raises(ET.ParseError):
+            parser.parse_xml_stream(b"invalid xml")
+        with pytest.raises(ValueError):
+            parser.parse_xml_stream(b"<dives></dives>")
+        with pytest.raises(ValueError):
+            parser.parse_xml_stream(b"<logbook><dive /></logbook>")
+
+    def test_parse_xml_stream_large_log_memory_and_time(self, parser):
+        """A large multi-dive log parses faster and with far less memory when streamed."""
+        samples = "\n".join(
+            f"<sample time='{i // 60}:{i % 60:02d} min' depth='{(i % 400) / 10:.1f} m' temp='20.0 C' />"
+            for i in range(20000)
+        )
+        dive = f"<dive number='1'><divecomputer model='Perdix'>{samples}</divecomputer></dive>"
+        content = f"<divelog><dives>{dive * 3}</dives></divelog>".encode('utf-8')
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        expected = parser.parse_xml_content(content.decode('utf-8'))
+        tree_seconds = time.perf_counter() - started
+        tree_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        tracemalloc.start()
+        started = time.perf_counter()
+        result = parser.parse_xml_stream(content)
+        stream_seconds = time.perf_counter() - started
+        stream_peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        assert result == expected
+        assert stream_peak < tree_peak / 2
+        assert stream_seconds < tree_seconds
@@ -403,6 +403,128 @@ class TestDiveSitesFuzzySearch:
         assert (end_time - start_time) < 2.0  # Should complete within 2 seconds even with more data
 
 
+class TestFuzzySearchTagPreloading:
+    """Tag lookups in fuzzy scoring must not issue one query per site."""
+
+    @staticmethod
+    def _create_tagged_sites(db_session, count, tag):
+        sites = []
+        for i in range(count):
+            site = DiveSite(name=f"Octopus Garden {i}", latitude=10.0, longitude=20.0, country="Greece")
+            db_session.add(site)
+            sites.append(site)
+        db_session.flush()
+        for site in sites:
+            db_session.add(DiveSiteTag(dive_site_id=site.id, tag_id=tag.id))
+        db_session.commit()
+        return sites
+
+    @staticmethod
+    def _count_fuzzy_queries(db_session, exact_results):
+        from sqlalchemy import event
+        from app.routers.dive_sites import search_dive_sites_with_fuzzy
+
+        # Warm the search index so only scoring queries are counted
+        search_dive_sites_with_fuzzy("octopus", exact_results, db_session)
+
+        statements = []
+
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        try:
+            results = search_dive_sites_with_fuzzy("octopus", exact_results, db_session)
+        finally:
+            event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        return len(statements), results
+
+    def test_query_count_is_constant_in_result_size(self, db_session):
+        tag = AvailableTag(name="Octopus Spotting")
+        db_session.add(tag)
+        db_session.commit()
+
+        # All sites come back as fuzzy candidates (no exact results)
+        self._create_tagged_sites(db_session, 2, tag)
+        small_count, small_results = self._count_fuzzy_queries(db_session, [])
+
+        self._create_tagged_sites(db_session, 8, tag)
+        large_count, large_results = self._count_fuzzy_queries(db_session, [])
+
+        assert len(large_results) > len(small_results)
+        assert large_count <= small_count
+
+    def test_load_tag_names_map(self, db_session, test_dive_site):
+        from app.utils import load_tag_names_map
+
+        tags = [AvailableTag(name="Wall"), AvailableTag(name="Cave")]
+        db_session.add_all(tags)
+        db_session.flush()
+        for tag in tags:
+            db_session.add(DiveSiteTag(dive_site_id=test_dive_site.id, tag_id=tag.id))
+        db_session.commit()
+
+        tag_map = load_tag_names_map(db_session, DiveSiteTag.dive_site_id, [test_dive_site.id, 999999])
+        assert tag_map == {test_dive_site.id: ["Cave", "Wall"]}
+        assert load_tag_names_map(db_session, DiveSiteTag.dive_site_id, []) == {}
+
+
+class TestDivesFuzzySearchTagPreloading:
+    """Returned fuzzy dive matches must not lazy-load their tags one by one."""
+
+    @staticmethod
+    def _create_tagged_dives(db_session, user, count, tag, offset):
+        from datetime import date
+        from app.models import Dive, DiveTag
+
+        for i in range(offset, offset + count):
+            site = DiveSite(name=f"Octopus Garden {i}", latitude=10.0, longitude=20.0, country="Greece")
+            db_session.add(site)
+            db_session.flush()
+            dive = Dive(user_id=user.id, dive_site_id=site.id, name=f"Dive {i}", dive_date=date(2024, 1, 15))
+            db_session.add(dive)
+            db_session.flush()
+            db_session.add(DiveTag(dive_id=dive.id, tag_id=tag.id))
+        db_session.commit()
+
+    @staticmethod
+    def _count_queries(db_session):
+        from sqlalchemy import event
+        from app.routers.dives.dives_search import search_dives_with_fuzzy
+
+        db_session.expire_all()
+        statements = []
+
+        def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        engine = db_session.get_bind()
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        try:
+            results = search_dives_with_fuzzy("octopus", [], db_session)
+            # As the dives list endpoint serializes them
+            tags = [[t.tag.name for t in result['dive'].tags if t.tag] for result in results]
+        finally:
+            event.remove(engine, "before_cursor_execute", _before_cursor_execute)
+        return len(statements), tags
+
+    def test_query_count_is_constant_in_result_size(self, db_session, test_user):
+        tag = AvailableTag(name="Octopus Spotting")
+        db_session.add(tag)
+        db_session.commit()
+
+        self._create_tagged_dives(db_session, test_user, 2, tag, offset=0)
+        small_count, small_tags = self._count_queries(db_session)
+
+        self._create_tagged_dives(db_session, test_user, 6, tag, offset=2)
+        large_count, large_tags = self._count_queries(db_session)
+
+        assert small_tags == [["Octopus Spotting"]] * 2
+        assert large_tags == [["Octopus Spotting"]] * 8
+        assert large_count <= small_count
+
+
 class TestUnifiedTypoTolerance:
     """Test the unified typo tolerance settings."""
 
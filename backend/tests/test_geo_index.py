@@ -0,0 +1,211 @@
+"""
+Tests for the in-memory dive site / diving center geo index.
+"""
+
+import math
+import random
+import threading
+import time
+
+import pytest
+from fastapi import status
+from sqlalchemy import insert
+
+from app.models import DiveSite, DivingCenter
+from app.services.geo_index_service import GeoPointIndex, dive_site_geo_index, diving_center_geo_index
+from app.services.index_invalidation import mark_dirty_on_commit
+from app.services.spatial_query import EARTH_RADIUS_M
+
+
+def _distance_m(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_M * math.asin(math.sqrt(a))
+
+
+def _index_of(points, has_status=True):
+    """Index filled directly from (id, lat, lng, status, deleted_at) rows."""
+    index = GeoPointIndex(DiveSite, has_status=has_status)
+    for row in points:
+        index._add(row)
+    index._built_at = time.monotonic()
+    return index
+
+
+def _random_points(count, seed=3):
+    rng = random.Random(seed)
+    points = [(i, rng.uniform(-70, 70), rng.uniform(-180, 180), 'approved', None) for i in range(count)]
+    # A dense cluster, and one straddling the antimeridian
+    points += [(count + i, 37.9 + rng.gauss(0, 0.2), 23.7 + rng.gauss(0, 0.2), 'approved', None) for i in range(2000)]
+    points += [
+        (count + 2000 + i, -16.5 + rng.gauss(0, 0.3), (179.9 + rng.gauss(0, 0.3) + 180) % 360 - 180, 'approved', None)
+        for i in range(500)
+    ]
+    return points
+
+
+class TestGeoPointIndex:
+    @pytest.mark.parametrize("lat,lng,radius_m", [
+        (37.9, 23.7, 50),
+        (37.9, 23.7, 5000),
+        (38.2, 24.0, 50000),
+        (-16.5, 179.95, 100000),
+        (-16.5, -179.95, 30000),
+        (89.9, 0.0, 200000),
+    ])
+    def test_within_matches_brute_force(self, lat, lng, radius_m):
+        points = _random_points(20000)
+        index = _index_of(points)
+
+        expected = sorted(
+            (_distance_m(lat, lng, p_lat, p_lng), point_id)
+            for point_id, p_lat, p_lng, _, _ in points
+            if _distance_m(lat, lng, p_lat, p_lng) <= radius_m
+        )
+        actual = index.within(lat, lng, radius_m)
+
+        assert [point_id for point_id, _ in actual] == [point_id for _, point_id in expected]
+        for (_, distance), (expected_distance, _) in zip(actual, expected):
+            assert distance == pytest.approx(expected_distance, abs=1e-6)
+
+    def test_nearest_grows_radius_until_k_found(self):
+        points = _random_points(20000)
+        index = _index_of(points)
+        # Far from the cluster, so the first 2 km ring is empty
+        lat, lng = 10.0, -40.0
+        expected = sorted((_distance_m(lat, lng, p[1], p[2]), p[0]) for p in points)[:5]
+        expected = [point_id for distance, point_id in expected if distance <= 2_000_000]
+
+        assert [point_id for point_id, _ in index.nearest(lat, lng, 5, 2_000_000)] == expected
+        assert len(index.nearest(lat, lng, 5, 1000)) < 5
+
+    def test_filters(self):
+        index = _index_of([
+            (1, 36.0, 25.0, 'approved', None),
+            (2, 36.0, 25.001, 'pending', None),
+            (3, 36.0, 25.002, 'approved', '2026-01-01'),
+            (4, 36.0, 25.003, 'approved', None),
+        ])
+        assert [i for i, _ in index.within(36.0, 25.0, 1000)] == [1, 2, 4]
+        assert [i for i, _ in index.within(36.0, 25.0, 1000, status='approved')] == [1, 4]
+        assert [i for i, _ in index.within(36.0, 25.0, 1000, include_deleted=True)] == [1, 2, 3, 4]
+        assert [i for i, _ in index.within(36.0, 25.0, 1000, exclude_ids={1}, limit=1)] == [2]
+
+    def test_missing_coordinates_are_skipped(self):
+        index = _index_of([(1, None, 25.0, 'approved', None), (2, 36.0, 25.0, 'approved', None)])
+        assert [i for i, _ in index.within(36.0, 25.0, 100)] == [2]
+
+    def test_cold_index_is_not_ready(self, db_session):
+        index = GeoPointIndex(DiveSite, has_status=True)
+        assert not index.ready(db_session)
+
+    def test_concurrent_builds_run_once(self, monkeypatch):
+        index = GeoPointIndex(DiveSite, has_status=True)
+        loads = []
+
+        def slow_load(db, ids=None):
+            loads.append(ids)
+            time.sleep(0.05)
+            return [(1, 36.0, 25.0, 'approved', None)]
+
+        monkeypatch.setattr(index, "_load", slow_load)
+        # A request warming the index while the background refresher runs
+        threads = [threading.Thread(target=index.warm, args=(None,)),
+                   threading.Thread(target=index.rebuild_if_expired, args=(None,))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert loads == [None]
+        assert index.is_built
+
+    @pytest.mark.benchmark
+    def test_benchmark_small_radius_lookup(self):
+        """A proximity-check sized lookup over 100k sites should be far cheaper than a scan."""
+        points = _random_points(100_000)
+        index = _index_of(points)
+
+        started = time.perf_counter()
+        for _ in range(100):
+            index.within(37.9, 23.7, 50, limit=5, status='approved')
+        lookup_seconds = (time.perf_counter() - started) / 100
+
+        started = time.perf_counter()
+        [p[0] for p in points if _distance_m(37.9, 23.7, p[1], p[2]) <= 50]
+        scan_seconds = time.perf_counter() - started
+
+        assert lookup_seconds < scan_seconds / 100
+
+
+def _insert_site(db_session, name, lat, lng, site_status='approved'):
+    # Core insert: the ORM location hook needs MySQL spatial functions
+    result = db_session.execute(insert(DiveSite).values(
+        name=name, latitude=lat, longitude=lng, status=site_status, location='', view_count=0
+    ))
+    db_session.commit()
+    return result.inserted_primary_key[0]
+
+
+@pytest.fixture
+def warm_geo_indexes(db_session):
+    yield lambda: (dive_site_geo_index.rebuild(db_session), diving_center_geo_index.rebuild(db_session))
+    dive_site_geo_index.clear()
+    diving_center_geo_index.clear()
+
+
+class TestGeoIndexQueries:
+    def test_rebuild_and_refresh_from_database(self, db_session, warm_geo_indexes):
+        site_id = _insert_site(db_session, "Indexed Reef", 37.98, 23.72)
+        warm_geo_indexes()
+        assert dive_site_geo_index.ready(db_session)
+        assert [i for i, _ in dive_site_geo_index.within(37.98, 23.72, 10)] == [site_id]
+
+        # A write outside the ORM is picked up once the row is marked dirty
+        db_session.query(DiveSite).filter(DiveSite.id == site_id).update(
+            {"status": "rejected"}, synchronize_session=False
+        )
+        db_session.commit()
+        dive_site_geo_index.mark_dirty([site_id])
+        assert dive_site_geo_index.ready(db_session)
+        assert dive_site_geo_index.within(37.98, 23.72, 10, status='approved') == []
+
+    def test_hook_ids_are_published_on_commit(self, db_session):
+        index = GeoPointIndex(DiveSite, has_status=True)
+
+        # Another session's lookup before the commit must not consume the ids
+        mark_dirty_on_commit(db_session, index.mark_dirty, [1])
+        db_session.flush()
+        assert index._dirty_ids == set()
+        db_session.commit()
+        assert index._dirty_ids == {1}
+
+        # Flush hooks always run inside a transaction
+        db_session.connection()
+        mark_dirty_on_commit(db_session, index.mark_dirty, [2])
+        db_session.rollback()
+        db_session.commit()
+        assert index._dirty_ids == {1}
+
+    def test_check_proximity_uses_index(self, client, db_session, warm_geo_indexes):
+        near_id = _insert_site(db_session, "Near Site", 37.98375, 23.72750)
+        _insert_site(db_session, "Far Site", 37.99380, 23.73750)
+        _insert_site(db_session, "Pending Site", 37.98376, 23.72751, site_status='pending')
+        warm_geo_indexes()
+
+        response = client.get("/api/v1/dive-sites/check-proximity?lat=37.98385&lng=23.72755&radius_m=50")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [site["id"] for site in data] == [near_id]
+        assert data[0]["distance_m"] == pytest.approx(11.9, abs=0.5)
+
+    def test_nearby_diving_centers_without_mysql(self, client, db_session, warm_geo_indexes):
+        result = db_session.execute(insert(DivingCenter).values(
+            name="Index Divers", latitude=37.60, longitude=26.24, location='', view_count=0
+        ))
+        db_session.commit()
+        warm_geo_indexes()
+
+        response = client.get("/api/v1/diving-centers/nearby?lat=37.57722&lng=26.23544&radius_km=5")
+        assert response.status_code == status.HTTP_200_OK
+        assert [c["id"] for c in response.json()] == [result.inserted_primary_key[0]]
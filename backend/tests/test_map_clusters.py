@@ -0,0 +1,167 @@
+"""
+Tests for the map cluster pyramid and the dive site clusters endpoint.
+"""
+
+import random
+import time
+from collections import defaultdict
+
+import pytest
+from fastapi import status
+from sqlalchemy import insert
+
+from app.models import DiveSite
+from app.services.geo_index_service import dive_site_geo_index
+from app.services.map_clusters import ClusterPyramid, MAX_CLUSTER_ZOOM, _cell, mercator
+
+
+def _random_points(count, seed=5):
+    rng = random.Random(seed)
+    points = [(i, rng.uniform(-70, 70), rng.uniform(-180, 180)) for i in range(count)]
+    # A dense region, as around popular dive spots
+    points += [(count + i, 27.2 + rng.gauss(0, 0.5), 33.9 + rng.gauss(0, 0.5)) for i in range(500)]
+    return points
+
+
+def _brute_force(points, zoom):
+    """cell -> (count, lowest id) computed from scratch."""
+    cells = defaultdict(list)
+    for point_id, lat, lng in points:
+        cells[_cell(*mercator(lat, lng), zoom)].append(point_id)
+    return {cell: (len(ids), min(ids)) for cell, ids in cells.items()}
+
+
+def _by_cell(clusters, zoom):
+    return {
+        _cell(*mercator(c["latitude"], c["longitude"]), zoom): (c["count"], c["id"])
+        for c in clusters
+    }
+
+
+class TestClusterPyramid:
+    @pytest.mark.parametrize("zoom", [0, 3, 6, MAX_CLUSTER_ZOOM])
+    def test_clusters_match_brute_force(self, zoom):
+        points = _random_points(5000)
+        pyramid = ClusterPyramid()
+        for point in points:
+            pyramid.add(*point)
+
+        clusters = pyramid.clusters(zoom)
+        assert sum(c["count"] for c in clusters) == len(points)
+        assert _by_cell(clusters, zoom) == _brute_force(points, zoom)
+
+    def test_remove_updates_counts_and_representative(self):
+        points = _random_points(2000)
+        pyramid = ClusterPyramid()
+        for point in points:
+            pyramid.add(*point)
+
+        removed = set(range(0, len(points), 3))
+        for point_id in removed:
+            pyramid.remove(point_id)
+        remaining = [p for p in points if p[0] not in removed]
+
+        assert len(pyramid) == len(remaining)
+        for zoom in (0, 4, MAX_CLUSTER_ZOOM):
+            assert _by_cell(pyramid.clusters(zoom), zoom) == _brute_force(remaining, zoom)
+
+    def test_moving_a_point(self):
+        pyramid = ClusterPyramid()
+        pyramid.add(1, 36.0, 25.0)
+        pyramid.add(1, -33.9, 18.4)
+        clusters = pyramid.clusters(5)
+        assert len(clusters) == 1
+        assert clusters[0]["latitude"] == pytest.approx(-33.9, abs=1e-6)
+        assert clusters[0]["longitude"] == pytest.approx(18.4, abs=1e-6)
+
+    def test_centroid_of_cluster(self):
+        pyramid = ClusterPyramid()
+        pyramid.add(7, 36.0, 25.0)
+        pyramid.add(3, 36.01, 25.01)
+        cluster, = pyramid.clusters(0)
+        assert cluster["count"] == 2 and cluster["id"] == 3
+        assert cluster["latitude"] == pytest.approx(36.005, abs=1e-3)
+        assert cluster["longitude"] == pytest.approx(25.005, abs=1e-6)
+
+    def test_bounds_filter_and_antimeridian(self):
+        pyramid = ClusterPyramid()
+        pyramid.add(1, -16.5, 179.5)
+        pyramid.add(2, -16.5, -179.5)
+        pyramid.add(3, 36.0, 25.0)
+
+        # West greater than east: the viewport wraps around the antimeridian
+        ids = {c["id"] for c in pyramid.clusters(8, west=179.0, south=-17.0, east=-179.0, north=-16.0)}
+        assert ids == {1, 2}
+        ids = {c["id"] for c in pyramid.clusters(8, west=20.0, south=30.0, east=30.0, north=40.0)}
+        assert ids == {3}
+
+    @pytest.mark.benchmark
+    def test_benchmark_clusters_100k_sites(self):
+        """World view clusters over 100k sites should be far cheaper than clustering from scratch."""
+        points = _random_points(100_000)
+        pyramid = ClusterPyramid()
+        for point in points:
+            pyramid.add(*point)
+
+        started = time.perf_counter()
+        for _ in range(10):
+            clusters = pyramid.clusters(3)
+        request_seconds = (time.perf_counter() - started) / 10
+
+        started = time.perf_counter()
+        _brute_force(points, 3)
+        scratch_seconds = time.perf_counter() - started
+
+        assert len(clusters) < 5000
+        assert request_seconds < scratch_seconds / 10
+
+
+def _insert_site(db_session, name, lat, lng, site_status='approved'):
+    # Core insert: the ORM location hook needs MySQL spatial functions
+    db_session.execute(insert(DiveSite).values(
+        name=name, latitude=lat, longitude=lng, status=site_status, location='', view_count=0
+    ))
+    db_session.commit()
+
+
+@pytest.fixture
+def cluster_sites(db_session):
+    _insert_site(db_session, "Reef A", 36.000, 25.000)
+    _insert_site(db_session, "Reef B", 36.001, 25.001)
+    _insert_site(db_session, "Wreck C", -33.9, 18.4)
+    _insert_site(db_session, "Pending D", 36.002, 25.002, site_status='pending')
+    yield
+    dive_site_geo_index.clear()
+
+
+class TestDiveSiteClustersEndpoint:
+    @pytest.mark.parametrize("warm", [False, True])
+    def test_clusters(self, client, db_session, cluster_sites, warm):
+        if warm:
+            dive_site_geo_index.rebuild(db_session)
+
+        response = client.get("/api/v1/dive-sites/clusters?zoom=4")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["zoom"] == 4
+        assert data["total"] == 3
+        assert sorted(c["count"] for c in data["clusters"]) == [1, 2]
+        # The first request warms the index
+        assert dive_site_geo_index.is_built
+
+        # A lone site carries its popup details; an aggregate does not
+        lone, = [c for c in data["clusters"] if c["count"] == 1]
+        assert lone["name"] == "Wreck C"
+        assert "average_rating" in lone
+        aggregate, = [c for c in data["clusters"] if c["count"] == 2]
+        assert aggregate.get("name") is None
+
+        response = client.get("/api/v1/dive-sites/clusters?zoom=4&north=40&south=30&east=30&west=20")
+        assert response.json()["total"] == 2
+
+    def test_invalid_bounds(self, client, cluster_sites):
+        response = client.get("/api/v1/dive-sites/clusters?zoom=4&north=10&south=20")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+        response = client.get(f"/api/v1/dive-sites/clusters?zoom={MAX_CLUSTER_ZOOM + 1}")
+        assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
@@ -0,0 +1,189 @@
+"""
+Tests for the compact dive site map points endpoint and its encodings.
+"""
+
+import json
+import random
+import time
+
+import pytest
+from fastapi import status
+from sqlalchemy import insert
+
+from app.models import DiveSite
+from app.schemas import DiveSiteListResponse
+from app.services.geo_index_service import GeoPointIndex, catalog_points, dive_site_geo_index
+from app.services.map_points import (
+    decode_points_binary, encode_points_binary, encode_points_json, etag_matches, points_etag
+)
+
+
+def _random_rows(count, seed=11):
+    rng = random.Random(seed)
+    return [(i + 1, round(rng.uniform(-70, 70), 8), round(rng.uniform(-180, 180), 8)) for i in range(count)]
+
+
+def _index_of(rows):
+    index = GeoPointIndex(DiveSite, has_status=True)
+    for item_id, lat, lng in rows:
+        index._add((item_id, lat, lng, 'approved', None))
+    index._built_at = time.monotonic()
+    return index
+
+
+def _minimal_list_body(rows):
+    """Body of the minimal dive site list response for the same points."""
+    items = [{"id": item_id, "latitude": float(lat), "longitude": float(lng)} for item_id, lat, lng in rows]
+    return DiveSiteListResponse(
+        items=items, total=len(items), page=1, page_size=len(items),
+        total_pages=1, has_next_page=False, has_prev_page=False
+    ).model_dump_json(exclude_none=True).encode()
+
+
+class TestEncodings:
+    def test_binary_round_trip(self):
+        rows = _random_rows(1000)
+        ids, latitudes, longitudes = (list(column) for column in zip(*rows))
+        decoded_ids, decoded_latitudes, decoded_longitudes = decode_points_binary(
+            encode_points_binary(ids, latitudes, longitudes)
+        )
+        assert decoded_ids.tolist() == ids
+        # float32: within about a meter
+        assert max(abs(a - b) for a, b in zip(decoded_latitudes, latitudes)) < 1e-5
+        assert max(abs(a - b) for a, b in zip(decoded_longitudes, longitudes)) < 1e-5
+
+    def test_empty(self):
+        ids, _, _ = decode_points_binary(encode_points_binary([], [], []))
+        assert len(ids) == 0
+        assert json.loads(encode_points_json("0", [], [], []))["count"] == 0
+
+    def test_etag_matching(self):
+        etag = points_etag("00ff", "json", -180.0, -90.0, 180.0, 90.0)
+        assert etag.startswith('"') and etag.endswith('"')
+        assert etag != points_etag("00ff", "binary", -180.0, -90.0, 180.0, 90.0)
+        assert etag != points_etag("00ff", "json", -180.0, -90.0, 180.0, 80.0)
+        assert etag_matches(etag, etag)
+        assert etag_matches(f'"other", W/{etag}', etag)
+        assert etag_matches("*", etag)
+        assert not etag_matches(None, etag)
+        assert not etag_matches('"other"', etag)
+
+
+class TestCatalogVersion:
+    def test_index_matches_cold_path(self):
+        rows = _random_rows(5000)
+        index = _index_of(reversed(rows))
+        bounds = (20.0, 30.0, 40.0, 45.0)
+        assert index.points(*bounds) == catalog_points(rows, *bounds)
+        assert index.catalog_version == catalog_points(rows)[0]
+
+    def test_version_follows_changes(self):
+        rows = _random_rows(100)
+        index = _index_of(rows)
+        version = index.catalog_version
+
+        index._remove(5)
+        assert index.catalog_version != version
+        index._add((5, rows[4][1], rows[4][2], 'approved', None))
+        assert index.catalog_version == version
+
+        # A pending site is not part of the public catalog
+        index._add((1000, 10.0, 10.0, 'pending', None))
+        assert index.catalog_version == version
+        index._add((5, rows[4][1] + 0.001, rows[4][2], 'approved', None))
+        assert index.catalog_version != version
+
+    def test_antimeridian_bounds(self):
+        index = _index_of([(1, -16.5, 179.5), (2, -16.5, -179.5), (3, -16.5, 0.0)])
+        _, ids, _, _ = index.points(west=179.0, south=-17.0, east=-179.0, north=-16.0)
+        assert ids == [1, 2]
+
+    def test_payload_sizes_10k_points(self):
+        """Column arrays should be much smaller than the minimal list response."""
+        rows = _random_rows(10_000)
+        list_body = _minimal_list_body(rows)
+        version, ids, latitudes, longitudes = _index_of(rows).points()
+
+        assert len(encode_points_json(version, ids, latitudes, longitudes)) < len(list_body) * 0.7
+        assert len(encode_points_binary(ids, latitudes, longitudes)) == 4 + 12 * len(rows)
+
+    @pytest.mark.benchmark
+    def test_benchmark_10k_points(self):
+        """Column arrays should be much cheaper to build than the minimal list response."""
+        rows = _random_rows(10_000)
+
+        started = time.perf_counter()
+        _minimal_list_body(rows)
+        list_seconds = time.perf_counter() - started
+
+        index = _index_of(rows)
+        started = time.perf_counter()
+        version, ids, latitudes, longitudes = index.points()
+        encode_points_json(version, ids, latitudes, longitudes)
+        json_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        version, ids, latitudes, longitudes = index.points()
+        encode_points_binary(ids, latitudes, longitudes)
+        binary_seconds = time.perf_counter() - started
+
+        assert json_seconds < list_seconds and binary_seconds < list_seconds
+
+
+def _insert_site(db_session, name, lat, lng, site_status='approved'):
+    # Core insert: the ORM location hook needs MySQL spatial functions
+    result = db_session.execute(insert(DiveSite).values(
+        name=name, latitude=lat, longitude=lng, status=site_status, location='', view_count=0
+    ))
+    db_session.commit()
+    return result.inserted_primary_key[0]
+
+
+@pytest.fixture
+def point_sites(db_session):
+    ids = [
+        _insert_site(db_session, "Reef A", 36.0, 25.0),
+        _insert_site(db_session, "Wreck B", -33.9, 18.4),
+    ]
+    _insert_site(db_session, "Pending C", 36.1, 25.1, site_status='pending')
+    yield ids
+    dive_site_geo_index.clear()
+
+
+class TestDiveSitePointsEndpoint:
+    @pytest.mark.parametrize("warm", [False, True])
+    def test_points_and_not_modified(self, client, db_session, point_sites, warm):
+        if warm:
+            dive_site_geo_index.rebuild(db_session)
+
+        response = client.get("/api/v1/dive-sites/points")
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["ids"] == point_sites
+        assert data["latitudes"] == [36.0, -33.9]
+        etag = response.headers["etag"]
+
+        response = client.get("/api/v1/dive-sites/points", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_304_NOT_MODIFIED
+        assert response.content == b""
+
+        # Bounds are part of the representation
+        response = client.get("/api/v1/dive-sites/points?south=0", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json()["ids"] == point_sites[:1]
+
+    def test_binary(self, client, point_sites):
+        response = client.get("/api/v1/dive-sites/points?encoding=binary")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.headers["content-type"] == "application/vnd.divemap.points"
+        ids, latitudes, _ = decode_points_binary(response.content)
+        assert ids.tolist() == point_sites
+        assert latitudes[0] == pytest.approx(36.0)
+
+    def test_etag_changes_with_catalog(self, client, db_session, point_sites):
+        etag = client.get("/api/v1/dive-sites/points").headers["etag"]
+        _insert_site(db_session, "New Reef", 10.0, 10.0)
+
+        response = client.get("/api/v1/dive-sites/points", headers={"If-None-Match": etag})
+        assert response.status_code == status.HTTP_200_OK
+        assert len(response.json()["ids"]) == 3
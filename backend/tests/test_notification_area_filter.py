@@ -0,0 +1,119 @@
+"""
+Tests for the normalized notification area filter and the SQL pre-filter.
+"""
+
+import math
+import random
+
+import pytest
+
+from app.models import NotificationPreference, User, area_bounding_box, area_filter_columns
+from app.services.notification_service import NotificationService, calculate_distance
+
+
+def _destination(lat, lng, bearing_deg, distance_km):
+    """Point reached from (lat, lng) after distance_km along a bearing."""
+    d = distance_km / 6371
+    lat1, lng1, bearing = math.radians(lat), math.radians(lng), math.radians(bearing_deg)
+    lat2 = math.asin(math.sin(lat1) * math.cos(d) + math.cos(lat1) * math.sin(d) * math.cos(bearing))
+    lng2 = lng1 + math.atan2(
+        math.sin(bearing) * math.sin(d) * math.cos(lat1),
+        math.cos(d) - math.sin(lat1) * math.sin(lat2)
+    )
+    return math.degrees(lat2), (math.degrees(lng2) + 180) % 360 - 180
+
+
+class TestAreaBoundingBox:
+    @pytest.mark.parametrize("center_lat,center_lng,radius_km", [
+        (36.0, 25.0, 50),
+        (-33.9, 18.4, 500),
+        (64.1, -21.9, 2000),
+        (0.0, 179.5, 100),
+        (89.0, 10.0, 300),
+    ])
+    def test_contains_every_point_within_radius(self, center_lat, center_lng, radius_km):
+        box = area_bounding_box(center_lat, center_lng, radius_km)
+        rng = random.Random(42)
+        for i in range(2000):
+            # Every tenth point on the circle itself, the others inside it
+            distance = radius_km if i % 10 == 0 else radius_km * rng.random()
+            lat, lng = _destination(center_lat, center_lng, rng.uniform(0, 360), distance)
+            assert calculate_distance(center_lat, center_lng, lat, lng) <= radius_km + 1e-6
+            assert box['area_min_lat'] <= lat <= box['area_max_lat']
+            assert box['area_min_lng'] <= lng <= box['area_max_lng']
+
+    def test_antimeridian_spans_all_longitudes(self):
+        box = area_bounding_box(0.0, 179.5, 100)
+        assert (box['area_min_lng'], box['area_max_lng']) == (-180.0, 180.0)
+
+    def test_box_is_tight_away_from_poles(self):
+        box = area_bounding_box(36.0, 25.0, 50)
+        assert box['area_max_lat'] - box['area_min_lat'] == pytest.approx(0.9, abs=0.01)
+        assert box['area_max_lng'] - box['area_min_lng'] == pytest.approx(1.11, abs=0.01)
+
+
+class TestAreaFilterColumns:
+    def test_empty_filter(self):
+        assert set(area_filter_columns(None).values()) == {None}
+        assert set(area_filter_columns({}).values()) == {None}
+
+    def test_country_and_region(self):
+        values = area_filter_columns({'country': 'Greece', 'region': ''})
+        assert values['area_country'] == 'Greece'
+        assert values['area_region'] is None
+        assert values['area_min_lat'] is None
+
+    def test_radius_needs_center(self):
+        assert area_filter_columns({'radius_km': 50})['area_radius_km'] is None
+        values = area_filter_columns({'radius_km': 50, 'center_lat': 36.0, 'center_lng': 25.0})
+        assert values['area_radius_km'] == 50
+        assert values['area_min_lat'] < 36.0 < values['area_max_lat']
+
+
+def _preference(db_session, name, area_filter):
+    user = User(username=name, email=f"{name}@example.com", password_hash="x", enabled=True)
+    db_session.add(user)
+    db_session.flush()
+    preference = NotificationPreference(
+        user_id=user.id, category='new_dive_sites', enable_website=True, area_filter=area_filter
+    )
+    db_session.add(preference)
+    db_session.commit()
+    return user, preference
+
+
+class TestUsersToNotify:
+    def test_columns_follow_area_filter(self, db_session):
+        _, preference = _preference(db_session, "mover", {'country': 'Greece'})
+        assert preference.area_country == 'Greece'
+
+        preference.area_filter = {'radius_km': 20, 'center_lat': 36.0, 'center_lng': 25.0}
+        db_session.commit()
+        db_session.refresh(preference)
+        assert preference.area_country is None
+        assert preference.area_radius_km == 20
+        assert preference.area_min_lat < 36.0
+
+    def test_only_matching_areas_are_selected(self, db_session):
+        everywhere, _ = _preference(db_session, "everywhere", None)
+        greece, _ = _preference(db_session, "greece", {'country': 'Greece'})
+        _preference(db_session, "egypt", {'country': 'Egypt'})
+        nearby, _ = _preference(db_session, "nearby", {'radius_km': 50, 'center_lat': 36.1, 'center_lng': 25.1})
+        _preference(db_session, "faraway", {'radius_km': 50, 'center_lat': 27.0, 'center_lng': 34.0})
+        # Inside the bounding box corner but outside the circle
+        _preference(db_session, "corner", {'radius_km': 50, 'center_lat': 35.6, 'center_lng': 24.45})
+
+        service = NotificationService()
+        conditions = service._area_prefilter({'lat': 36.0, 'lng': 25.0}, 'Greece', None)
+        candidates = db_session.query(User.username).join(
+            NotificationPreference, User.id == NotificationPreference.user_id
+        ).filter(NotificationPreference.category == 'new_dive_sites', *conditions).all()
+        assert {c.username for c in candidates} == {"everywhere", "greece", "nearby", "corner"}
+
+        users = service._get_users_to_notify(
+            category='new_dive_sites',
+            entity_location={'lat': 36.0, 'lng': 25.0},
+            entity_country='Greece',
+            db=db_session
+        )
+        assert {u.id for u, _ in users} == {everywhere.id, greece.id, nearby.id}
@@ -0,0 +1,185 @@
+"""
+Tests for the bulk new-content notification fan-out.
+"""
+
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from app.models import Notification, NotificationPreference, PushSubscription, UnsubscribeToken, User
+from app.services.notification_fanout import FanoutContent, FanoutRecipient, NotificationFanout
+from app.services.notification_service import NotificationService
+from app.services.unsubscribe_token_service import unsubscribe_token_service
+
+
+def _subscriber(db_session, name, category="new_dive_sites", website=True, email=False, push=False):
+    user = User(
+        username=name,
+        email=f"{name}@example.com",
+        password_hash="x",
+        enabled=True,
+    )
+    db_session.add(user)
+    db_session.flush()
+    db_session.add(NotificationPreference(
+        user_id=user.id,
+        category=category,
+        enable_website=website,
+        enable_email=email,
+        enable_push=push,
+        frequency="immediate",
+    ))
+    if push:
+        db_session.add(PushSubscription(
+            user_id=user.id,
+            endpoint=f"https://push.example.com/{name}",
+            p256dh="key",
+            auth="secret",
+        ))
+    db_session.commit()
+    return user
+
+
+@pytest.fixture
+def service(monkeypatch):
+    monkeypatch.delenv("FORCE_DIRECT_EMAIL", raising=False)
+    service = NotificationService()
+    service.sqs_service = MagicMock(sqs_available=True)
+    service.sqs_service.queue_batch_email_tasks.return_value = []
+    service.sqs_service.send_push_tasks.side_effect = lambda tasks: len(tasks)
+    return service
+
+
+class TestNewDiveSiteFanout:
+    def test_notifies_all_channels_in_bulk(self, db_session, service, test_dive_site):
+        users = [_subscriber(db_session, f"diver{i}", email=True, push=True) for i in range(3)]
+        website_only = _subscriber(db_session, "quiet", website=True)
+
+        stats = service.fan_out_new_dive_site(test_dive_site.id, db_session)
+
+        assert stats.recipients == 4
+        assert stats.notifications_created == 4
+        assert stats.emails_queued == 3
+        assert stats.push_queued == 3
+
+        rows = db_session.query(Notification).filter(Notification.entity_id == test_dive_site.id).all()
+        assert sorted(n.user_id for n in rows) == sorted([u.id for u in users] + [website_only.id])
+
+        # One SQS call per channel for the whole chunk, across users
+        email_tasks = service.sqs_service.queue_batch_email_tasks.call_args[0][0]
+        assert service.sqs_service.queue_batch_email_tasks.call_count == 1
+        ids_by_user = {n.user_id: n.id for n in rows}
+        assert {t["user_id"]: t["notification_id"] for t in email_tasks} == {u.id: ids_by_user[u.id] for u in users}
+        assert all(t["unsubscribe_token"] for t in email_tasks)
+        assert email_tasks[0]["notification"]["site_tags"] == []
+
+        push_tasks = service.sqs_service.send_push_tasks.call_args[0][0]
+        assert service.sqs_service.send_push_tasks.call_count == 1
+        assert len(push_tasks) == 3
+        assert push_tasks[0]["payload"]["tag"] == "new_dive_sites"
+        assert push_tasks[0]["payload"]["url"] == f"/dive-sites/{test_dive_site.id}"
+
+    def test_creator_and_opted_out_users(self, db_session, service, test_dive_site):
+        creator = _subscriber(db_session, "creator", email=True)
+        opted_out = _subscriber(db_session, "optedout", email=True)
+        opted_out.email_notifications_opted_out = True
+        test_dive_site.created_by = creator.id
+        db_session.commit()
+
+        stats = service.fan_out_new_dive_site(test_dive_site.id, db_session)
+
+        assert stats.recipients == 1
+        assert stats.emails_queued == 0
+        service.sqs_service.queue_batch_email_tasks.assert_not_called()
+        assert db_session.query(Notification).filter(Notification.user_id == creator.id).count() == 0
+
+    def test_chunks_map_notification_ids(self, db_session, service, test_dive_site):
+        users = [_subscriber(db_session, f"chunk{i}", email=True) for i in range(5)]
+        fanout = NotificationFanout(service.sqs_service, service.email_service, chunk_size=2)
+        content = FanoutContent(
+            category="new_dive_sites", title="t", message="m", link_url="/x",
+            entity_type="dive_site", entity_id=test_dive_site.id, template_name="new_dive_site"
+        )
+        recipients = [
+            FanoutRecipient(user_id=u.id, email=u.email, website=True, email_enabled=True, push=False)
+            for u in users
+        ]
+
+        stats = fanout.run(content, recipients, db_session)
+
+        assert stats.chunks == 3
+        assert stats.notifications_created == 5
+        assert service.sqs_service.queue_batch_email_tasks.call_count == 3
+        queued = {
+            task["user_id"]: task["notification_id"]
+            for call in service.sqs_service.queue_batch_email_tasks.call_args_list
+            for task in call[0][0]
+        }
+        stored = dict(db_session.query(Notification.user_id, Notification.id).filter(
+            Notification.entity_id == test_dive_site.id
+        ).all())
+        assert queued == stored
+
+    def test_direct_email_fallback_marks_rows(self, db_session, service, test_dive_site, monkeypatch):
+        user = _subscriber(db_session, "direct", email=True)
+        monkeypatch.setenv("FORCE_DIRECT_EMAIL", "true")
+
+        with patch.object(service.email_service, "send_notification_email", return_value=True) as send:
+            stats = service.fan_out_new_dive_site(test_dive_site.id, db_session)
+
+        assert send.call_count == 1
+        assert stats.emails_sent_directly == 1
+        notification = db_session.query(Notification).filter(Notification.user_id == user.id).one()
+        assert notification.email_sent
+
+    def test_failed_sqs_entries_are_sent_directly(self, db_session, service, test_dive_site):
+        queued_user = _subscriber(db_session, "queued", email=True)
+        rejected_user = _subscriber(db_session, "rejected", email=True)
+        service.sqs_service.queue_batch_email_tasks.side_effect = lambda tasks: [
+            i for i, task in enumerate(tasks) if task["user_id"] == rejected_user.id
+        ]
+
+        with patch.object(service.email_service, "send_notification_email", return_value=True) as send:
+            stats = service.fan_out_new_dive_site(test_dive_site.id, db_session)
+
+        assert stats.emails_queued == 1
+        assert stats.emails_sent_directly == 1
+        assert [call.kwargs["user_id"] for call in send.call_args_list] == [rejected_user.id]
+        sent = dict(db_session.query(Notification.user_id, Notification.email_sent).filter(
+            Notification.entity_id == test_dive_site.id
+        ).all())
+        assert sent == {queued_user.id: False, rejected_user.id: True}
+
+
+class TestNewDiveFanout:
+    def test_dive_subscribers_are_notified(self, db_session, service, test_dive):
+        subscriber = _subscriber(db_session, "buddy", category="new_dives", push=True)
+
+        stats = service.fan_out_new_dive(test_dive.id, db_session)
+
+        assert stats.recipients == 1
+        assert stats.push_queued == 1
+        notification = db_session.query(Notification).filter(Notification.user_id == subscriber.id).one()
+        assert notification.link_url == f"/dives/{test_dive.id}"
+
+
+class TestBulkUnsubscribeTokens:
+    def test_reuses_replaces_and_creates(self, db_session, test_user, test_admin_user):
+        valid = unsubscribe_token_service.get_or_create_unsubscribe_token(test_user.id, db_session).token
+        expired = UnsubscribeToken(
+            user_id=test_admin_user.id,
+            token="expired-token",
+            expires_at=datetime.now(timezone.utc) - timedelta(days=1),
+        )
+        db_session.add(expired)
+        newcomer = _subscriber(db_session, "newcomer")
+
+        tokens = unsubscribe_token_service.get_or_create_unsubscribe_tokens(
+            [test_user.id, test_admin_user.id, newcomer.id], db_session
+        )
+
+        assert tokens[test_user.id] == valid
+        assert tokens[test_admin_user.id] != "expired-token"
+        assert newcomer.id in tokens
+        assert db_session.query(UnsubscribeToken).count() == 3
@@ -4,6 +4,14 @@ Tests for Open-Meteo Weather Service
 Tests grid point generation, jitter factor functionality, and wind data fetching.
 """
 
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
 import pytest
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
@@ -12,7 +20,9 @@ from freezegun import freeze_time
 from app.services.open_meteo_service import (
     _create_grid_points,
     fetch_wind_data_grid,
+    fetch_wind_data_grid_async,
     fetch_wind_data_single_point,
+    get_wind_fetch_stats,
 )
 
 
@@ -830,9 +840,9 @@ class Test24HourBulkCaching:
     @patch('app.services.open_meteo_service.requests.get')
     @freeze_time('2025-12-07 12:00:00')
     def test_fetch_wind_data_single_point_caches_all_24_hours(self, mock_get, mock_db_cache, monkeypatch):
-        """Test that fetching one hour caches all 24 hours."""
+        """Test that fetching one hour caches the whole forecast run."""
         import app.services.open_meteo_service as oms
-        from app.services.open_meteo_service import _generate_cache_key
+        from app.services.open_meteo_service import _generate_forecast_cache_key, _slice_hourly_forecast
         monkeypatch.setattr(oms, '_wind_cache', {})
         mock_db_cache.return_value = None  # Mock database cache to return None
         
@@ -851,12 +861,14 @@ class Test24HourBulkCaching:
         # Should be 2 calls (Wind + Marine)
         assert mock_get.call_count == 2
         
-        # Verify all 24 hours are cached
+        # Verify the run is cached once and every hour can be sliced from it
+        run_key = _generate_forecast_cache_key(lat, lon, base_date.date())
+        assert list(oms._wind_cache.keys()) == [run_key]
+        forecast = oms._wind_cache[run_key]['data']
         for hour in range(24):
             hour_dt = base_date.replace(hour=hour, minute=0, second=0, microsecond=0)
-            cache_key = _generate_cache_key(lat, lon, target_datetime=hour_dt)
-            assert cache_key in oms._wind_cache, f"Hour {hour:02d} not cached"
-            cached_data = oms._wind_cache[cache_key]['data']
+            cached_data = _slice_hourly_forecast(forecast, hour_dt)
+            assert cached_data is not None, f"Hour {hour:02d} not cached"
             assert cached_data['wind_speed_10m'] == (5.0 + (hour % 5))
             assert cached_data['timestamp'].hour == hour
 
@@ -902,7 +914,7 @@ class Test24HourBulkCaching:
     def test_24_hour_cache_with_forecast_data(self, mock_get, mock_db_cache, monkeypatch):
         """Test 24-hour caching with future forecast data."""
         import app.services.open_meteo_service as oms
-        from app.services.open_meteo_service import _generate_cache_key
+        from app.services.open_meteo_service import _generate_forecast_cache_key, _slice_hourly_forecast
         monkeypatch.setattr(oms, '_wind_cache', {})
         mock_db_cache.return_value = None  # Mock database cache to return None
         
@@ -922,11 +934,11 @@ class Test24HourBulkCaching:
         # Should be 2 calls (Wind + Marine)
         assert mock_get.call_count == 2
         
-        # Verify all 24 hours for tomorrow are cached
+        # Verify all 24 hours for tomorrow are covered by the cached run
+        forecast = oms._wind_cache[_generate_forecast_cache_key(lat, lon, future_date.date())]['data']
         for hour in range(24):
             hour_dt = future_date.replace(hour=hour, minute=0, second=0, microsecond=0)
-            cache_key = _generate_cache_key(lat, lon, target_datetime=hour_dt)
-            assert cache_key in oms._wind_cache, f"Hour {hour:02d} not cached for future date"
+            assert _slice_hourly_forecast(forecast, hour_dt) is not None, f"Hour {hour:02d} not cached for future date"
         
         # Fetch different hours from same date (should use cache)
         result2 = fetch_wind_data_single_point(lat, lon, future_date.replace(hour=18))
@@ -1062,43 +1074,39 @@ class TestSmartCacheLookup:
     @patch('app.services.open_meteo_service._get_from_database_cache')
     @patch('app.services.open_meteo_service.requests.get')
     @freeze_time('2025-12-07 12:00:00')
-    def test_cache_inconsistency_detection_and_warning(self, mock_get, mock_db_cache, monkeypatch, caplog):
-        """Test cache inconsistency detection and warning."""
+    def test_cached_run_not_covering_hour_triggers_refetch(self, mock_get, mock_db_cache, monkeypatch):
+        """Test that a cached run missing the requested hour is not used."""
         import app.services.open_meteo_service as oms
-        from app.services.open_meteo_service import _generate_cache_key
+        from app.services.open_meteo_service import (
+            _build_hourly_forecast,
+            _generate_forecast_cache_key,
+            _store_forecast_in_memory,
+        )
         monkeypatch.setattr(oms, '_wind_cache', {})
         mock_db_cache.return_value = None  # Mock database cache to return None
-        
+
         base_date = datetime(2025, 12, 7, 0, 0, 0)
-        
-        # Manually cache only hour 00:00 (simulate partial cache failure)
         lat, lon = 37.111, 24.111
-        cache_key_00 = _generate_cache_key(lat, lon, target_datetime=base_date.replace(hour=0))
-        oms._wind_cache[cache_key_00] = {
-            'data': {
-                'wind_speed_10m': 5.0,
-                'wind_direction_10m': 180.0,
-                'wind_gusts_10m': 6.0,
-                'timestamp': base_date.replace(hour=0)
-            },
-            'timestamp': datetime.now()
-        }
-        
-        # Mock API response for refetch
+
+        # Cached run for today that only holds hour 00:00 (e.g. truncated upstream response)
+        partial = self._create_hourly_response(base_date)['hourly']
+        partial = {key: values[:1] for key, values in partial.items()}
+        _store_forecast_in_memory(
+            _generate_forecast_cache_key(lat, lon, base_date.date()),
+            _build_hourly_forecast(partial, {})
+        )
+
         mock_response = MagicMock()
         mock_response.status_code = 200
         mock_response.json.return_value = self._create_hourly_response(base_date)
         mock_get.return_value = mock_response
-        
-        # Request hour 12:00 (should detect inconsistency and refetch)
-        with caplog.at_level('WARNING'):
-            result = fetch_wind_data_single_point(lat, lon, base_date.replace(hour=12))
-        
-        # Should have logged warning about cache inconsistency
-        assert '[CACHE INCONSISTENCY]' in caplog.text
-        # Should have made API call to refetch and cache all 24 hours (2 calls: Wind + Marine)
+
+        result = fetch_wind_data_single_point(lat, lon, base_date.replace(hour=12))
+
+        # Should have made API call to refetch the run (2 calls: Wind + Marine)
         assert mock_get.call_count == 2
         assert result is not None
+        assert result['timestamp'].hour == 12
 
 
 class TestGridPointGrouping:
@@ -1277,6 +1285,36 @@ class TestGridPointGrouping:
         assert len(result2) > 0
 
 
+    @freeze_time('2025-12-07 12:00:00')
+    def test_batch_fetch_is_bounded(self, monkeypatch):
+        """With max_fetch_cells, only that many uncached cells are fetched and there is no single-point fallback."""
+        import app.services.open_meteo_service as oms
+        fetched_cells = []
+
+        def fetch_chunks(chunks, start_date, end_date, validated_datetime, wind_data_by_cache_key):
+            for chunk in chunks:
+                for _, _, cache_key in chunk:
+                    fetched_cells.append(cache_key)
+                    wind_data_by_cache_key[cache_key] = {"wind_speed_10m": 5.0, "wind_direction_10m": 270.0}
+
+        monkeypatch.setattr(oms, '_resolve_cells_from_cache', lambda points, dt: ({}, list(points)))
+        monkeypatch.setattr(oms, '_claim_grid_cells', lambda points, missing, dt: {
+            "fetch": list(missing), "local_waits": {}, "remote_waits": {}, "claimed": [], "leased": []
+        })
+        monkeypatch.setattr(oms, '_release_grid_claims', lambda claims: None)
+        monkeypatch.setattr(oms, '_fetch_grid_chunks', fetch_chunks)
+        single_point = MagicMock(return_value=None)
+        monkeypatch.setattr(oms, 'fetch_wind_data_single_point', single_point)
+
+        locations = [(37.7, 24.0), (37.9, 24.2), (38.1, 24.4)]
+        result = oms.fetch_wind_data_batch(locations, datetime(2025, 12, 7, 15, 0, 0), max_fetch_cells=2)
+
+        assert len(fetched_cells) == 2
+        assert sum(1 for wind in result.values() if wind) == 2
+        assert set(result) == set(locations)
+        single_point.assert_not_called()
+
+
 class TestSkipValidation:
     """Test skip_validation parameter functionality."""
 
@@ -1752,24 +1790,20 @@ class TestEdgeCases:
     def test_cache_lookup_with_expired_entries(self, mock_get, mock_db_cache, monkeypatch):
         """Test cache lookup with expired entries."""
         import app.services.open_meteo_service as oms
-        from app.services.open_meteo_service import _generate_cache_key
+        from app.services.open_meteo_service import _build_hourly_forecast, _generate_forecast_cache_key
         monkeypatch.setattr(oms, '_wind_cache', {})
         monkeypatch.setattr(oms, '_cache_ttl_seconds', 900)  # 15 minutes
         mock_db_cache.return_value = None  # Mock database cache to return None
         
         base_date = datetime(2025, 12, 7, 12, 0, 0)  # Use current time (frozen) instead of past
         
-        # Manually add expired cache entry
+        # Manually add expired forecast run
         lat, lon = 37.999, 24.999
-        cache_key = _generate_cache_key(lat, lon, target_datetime=base_date)
+        cache_key = _generate_forecast_cache_key(lat, lon, base_date.date())
         oms._wind_cache[cache_key] = {
-            'data': {
-                'wind_speed_10m': 5.0,
-                'wind_direction_10m': 180.0,
-                'wind_gusts_10m': 6.0,
-                'timestamp': base_date
-            },
-            'timestamp': datetime.now() - timedelta(hours=1)  # Expired
+            'data': _build_hourly_forecast(self._create_hourly_response(base_date)['hourly'], {}),
+            'timestamp': datetime.now() - timedelta(hours=2),
+            'expires_at': datetime.now() - timedelta(hours=1)  # Expired
         }
         
         # Mock API response for refetch
@@ -1823,3 +1857,373 @@ class TestEdgeCases:
         # Should use cache (hour 06:00 was cached when fetching hour 12:00)
         assert mock_get.call_count == 0
 
+
+
+class TestForecastRunCaching:
+    """Test caching of full hourly forecast runs per 0.1° cell."""
+
+    def _create_run_response(self, start: datetime, hours: int = 72):
+        """Helper to create a multi-day hourly API response starting at midnight."""
+        times = [(start + timedelta(hours=h)).strftime('%Y-%m-%dT%H:00') for h in range(hours)]
+        return {
+            'hourly': {
+                'time': times,
+                'wind_speed_10m': [float(h) for h in range(hours)],
+                'wind_direction_10m': [180.0] * hours,
+                'wind_gusts_10m': [float(h) + 1.0 for h in range(hours)]
+            }
+        }
+
+    def test_slice_hourly_forecast(self):
+        """Test slicing wind and marine values for one hour."""
+        from app.services.open_meteo_service import _build_hourly_forecast, _slice_hourly_forecast
+
+        start = datetime(2025, 12, 7, 0, 0, 0)
+        forecast = _build_hourly_forecast(
+            self._create_run_response(start)['hourly'],
+            {'wave_height': [0.5, 0.6, 0.7]}
+        )
+
+        result = _slice_hourly_forecast(forecast, datetime(2025, 12, 7, 2, 30, 0))
+        assert result['wind_speed_10m'] == 2.0
+        assert result['wind_gusts_10m'] == 3.0
+        assert result['wave_height'] == 0.7
+        assert result['swell_wave_height'] is None
+        assert result['timestamp'] == datetime(2025, 12, 7, 2, 0, 0)
+
+        # Hour outside the run: no exact match, fallback only when requested
+        outside = datetime(2025, 12, 11, 0, 0, 0)
+        assert _slice_hourly_forecast(forecast, outside) is None
+        assert _slice_hourly_forecast(forecast, outside, exact=False)['wind_speed_10m'] == 0.0
+
+    @patch('app.services.open_meteo_service._store_batch_in_database_cache')
+    @patch('app.services.open_meteo_service._get_from_database_cache')
+    @patch('app.services.open_meteo_service.requests.get')
+    @freeze_time('2025-12-07 06:00:00')
+    def test_slider_across_48_hours_uses_one_run(self, mock_get, mock_db_cache, mock_db_store, monkeypatch):
+        """Test that scrubbing 48 hours makes one API round trip and one DB row."""
+        import app.services.open_meteo_service as oms
+        from app.services.open_meteo_service import _generate_forecast_cache_key
+        monkeypatch.setattr(oms, '_wind_cache', {})
+        mock_db_cache.return_value = None
+
+        start = datetime(2025, 12, 7, 0, 0, 0)
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = self._create_run_response(start)
+        mock_get.return_value = mock_response
+
+        lat, lon = 37.321, 24.321
+        for hour in range(6, 54):
+            result = fetch_wind_data_single_point(lat, lon, start + timedelta(hours=hour))
+            assert result is not None
+            assert result['wind_speed_10m'] == float(hour)
+
+        # Wind + Marine for the whole window, requested once
+        assert mock_get.call_count == 2
+        params = mock_get.call_args_list[0].kwargs['params']
+        assert params['start_date'] == '2025-12-07'
+        assert params['end_date'] == '2025-12-09'
+
+        # One database row holding the whole run
+        assert mock_db_store.call_count == 1
+        entries = mock_db_store.call_args.args[0]
+        assert len(entries) == 1
+        assert entries[0]['cache_key'] == _generate_forecast_cache_key(lat, lon, start.date())
+        assert len(entries[0]['wind_data']['time']) == 72
+
+    @patch('app.services.open_meteo_service._get_from_database_cache')
+    @patch('app.services.open_meteo_service.requests.get')
+    @freeze_time('2025-12-07 06:00:00')
+    def test_database_run_is_sliced_and_promoted(self, mock_get, mock_db_cache, monkeypatch):
+        """Test that a forecast run from the database serves other hours from memory."""
+        import app.services.open_meteo_service as oms
+        from app.services.open_meteo_service import _build_hourly_forecast, _generate_forecast_cache_key
+        monkeypatch.setattr(oms, '_wind_cache', {})
+
+        start = datetime(2025, 12, 7, 0, 0, 0)
+        lat, lon = 37.654, 24.654
+        run_key = _generate_forecast_cache_key(lat, lon, start.date())
+        forecast = _build_hourly_forecast(self._create_run_response(start)['hourly'], {})
+        mock_db_cache.side_effect = lambda key, *args: forecast if key == run_key else None
+
+        # Tomorrow is served from the run that started today
+        result = fetch_wind_data_single_point(lat, lon, datetime(2025, 12, 8, 9, 0, 0))
+        assert result['wind_speed_10m'] == 33.0
+        assert run_key in oms._wind_cache
+
+        mock_db_cache.reset_mock()
+        result = fetch_wind_data_single_point(lat, lon, datetime(2025, 12, 8, 15, 0, 0))
+        assert result['wind_speed_10m'] == 39.0
+        assert mock_db_cache.call_count == 0
+        assert mock_get.call_count == 0
+
+    @patch('app.services.open_meteo_service._open_database_cache_session')
+    @patch('app.services.open_meteo_service._get_from_database_cache')
+    @patch('app.services.open_meteo_service.requests.get')
+    @freeze_time('2025-12-07 06:00:00')
+    def test_database_runs_share_one_session(self, mock_get, mock_db_cache, mock_session, monkeypatch):
+        """Test that the candidate runs of a single point are looked up on one session."""
+        import app.services.open_meteo_service as oms
+        from app.services.open_meteo_service import _build_hourly_forecast, _generate_forecast_cache_key
+        monkeypatch.setattr(oms, '_wind_cache', {})
+
+        start = datetime(2025, 12, 6, 0, 0, 0)
+        lat, lon = 37.987, 24.987
+        run_key = _generate_forecast_cache_key(lat, lon, start.date())
+        forecast = _build_hourly_forecast(self._create_run_response(start)['hourly'], {})
+        mock_db_cache.side_effect = lambda key, *args: forecast if key == run_key else None
+
+        result = fetch_wind_data_single_point(lat, lon, datetime(2025, 12, 7, 9, 0, 0))
+        assert result['wind_speed_10m'] == 33.0
+        assert mock_db_cache.call_count == 2
+        db = mock_session.return_value
+        assert all(call.args[-1] is db for call in mock_db_cache.call_args_list)
+        db.close.assert_called_once()
+        assert mock_get.call_count == 0
+
+    def test_cleanup_while_storing_from_threads(self, monkeypatch):
+        """Test that cleanup can run while other threads store forecast runs."""
+        import app.services.open_meteo_service as oms
+        monkeypatch.setattr(oms, '_wind_cache', {})
+        monkeypatch.setattr(oms, '_max_cache_size', 50)
+
+        def store(worker):
+            for i in range(500):
+                oms._store_forecast_in_memory(f"wind-forecast-{worker}-{i}", {"time": []})
+
+        def cleanup():
+            for _ in range(200):
+                oms._cleanup_cache()
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            futures = [pool.submit(store, worker) for worker in range(4)] + [pool.submit(cleanup)]
+            for future in futures:
+                future.result()
+
+        oms._cleanup_cache()
+        assert len(oms._wind_cache) <= 50
+
+    @patch('app.services.open_meteo_service._store_batch_in_database_cache')
+    @patch('app.services.open_meteo_service._get_batch_from_database_cache')
+    @patch('app.services.open_meteo_service.requests.get')
+    @freeze_time('2025-12-07 06:00:00')
+    def test_grid_hours_served_from_cached_runs(self, mock_get, mock_batch_db_cache, mock_db_store, monkeypatch):
+        """Test that grid requests for later hours reuse the cached runs."""
+        import app.services.open_meteo_service as oms
+        monkeypatch.setattr(oms, '_wind_cache', {})
+        mock_batch_db_cache.return_value = {}
+
+        start = datetime(2025, 12, 7, 0, 0, 0)
+        mock_response = MagicMock()
+        mock_response.status_code = 200
+        mock_response.json.return_value = self._create_run_response(start)
+        mock_get.return_value = mock_response
+
+        bounds = {'north': 37.75, 'south': 37.70, 'east': 24.75, 'west': 24.70}
+
+        first = fetch_wind_data_grid(bounds, zoom_level=15, target_datetime=start.replace(hour=9), jitter_factor=1)
+        calls_after_first = mock_get.call_count
+        assert first and all(point['wind_speed_10m'] == 9.0 for point in first)
+
+        later = fetch_wind_data_grid(bounds, zoom_level=15, target_datetime=datetime(2025, 12, 8, 20, 0, 0), jitter_factor=1)
+        assert later and all(point['wind_speed_10m'] == 44.0 for point in later)
+        assert mock_get.call_count == calls_after_first
+
+
+STUB_DELAY_SECONDS = 0.2
+
+
+class _SlowOpenMeteoHandler(BaseHTTPRequestHandler):
+    """Stub Open-Meteo endpoint answering multi-location requests after a fixed delay."""
+
+    def do_GET(self):
+        time.sleep(STUB_DELAY_SECONDS)
+        self.server.request_count += 1
+        query = parse_qs(urlparse(self.path).query)
+        start = datetime.strptime(query['start_date'][0], '%Y-%m-%d')
+        times = [(start + timedelta(hours=h)).strftime('%Y-%m-%dT%H:00') for h in range(72)]
+        if self.path.startswith('/marine'):
+            hourly = {'time': times, 'wave_height': [1.0] * 72}
+        else:
+            hourly = {
+                'time': times,
+                'wind_speed_10m': [4.0] * 72,
+                'wind_direction_10m': [90.0] * 72,
+                'wind_gusts_10m': [6.0] * 72
+            }
+        locations = len(query['latitude'][0].split(','))
+        # Like Open-Meteo, a single location is answered with an object, not a list
+        payload = [{'hourly': hourly} for _ in range(locations)] if locations > 1 else {'hourly': hourly}
+        body = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class _StubServer(ThreadingHTTPServer):
+    # The default listen backlog (5) drops concurrent connects, adding SYN retry delays
+    request_queue_size = 128
+
+
+@pytest.fixture
+def slow_open_meteo(monkeypatch):
+    """Point the service at a local stub server with a fixed per-request latency."""
+    import app.services.open_meteo_service as oms
+
+    server = _StubServer(('127.0.0.1', 0), _SlowOpenMeteoHandler)
+    server.request_count = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(oms, 'OPEN_METEO_BASE_URL', f"{base_url}/forecast")
+    monkeypatch.setattr(oms, 'OPEN_METEO_MARINE_URL', f"{base_url}/marine")
+    monkeypatch.setattr(oms, '_wind_cache', {})
+    monkeypatch.setattr(oms, '_get_from_database_cache', lambda *args: None)
+    monkeypatch.setattr(oms, '_get_batch_from_database_cache', lambda keys: {})
+    monkeypatch.setattr(oms, '_store_batch_in_database_cache', lambda entries: None)
+    monkeypatch.setattr(oms, '_acquire_fetch_leases', lambda cells: {run_key for run_key, _, _ in cells})
+    monkeypatch.setattr(oms, '_release_fetch_leases', lambda run_keys: None)
+    monkeypatch.setattr(oms, '_fetch_stats', defaultdict(int))
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class TestAsyncGridFetching:
+    """Test concurrent upstream fetching for grid requests."""
+
+    async def test_chunks_fetched_concurrently(self, slow_open_meteo, monkeypatch):
+        """Wall time should be close to one round trip, not the sum of all of them."""
+        import app.services.open_meteo_service as oms
+        monkeypatch.setattr(oms, '_batch_size', 10)
+        monkeypatch.setattr(oms, '_max_concurrent_requests', 32)
+        await oms.close_async_client()
+
+        # Zoom 10 spacing (0.2°) puts each of the 100 grid points in its own cell
+        bounds = {'north': 39.0, 'south': 37.0, 'east': 26.0, 'west': 24.0}
+
+        started = time.perf_counter()
+        result = await fetch_wind_data_grid_async(bounds, zoom_level=10, jitter_factor=1)
+        elapsed = time.perf_counter() - started
+        await oms.close_async_client()
+
+        # 10 chunks x (forecast + marine)
+        assert slow_open_meteo.request_count == 20
+        assert len(result) == 100
+        assert all(point['wind_speed_10m'] == 4.0 and point['wave_height'] == 1.0 for point in result)
+        sequential = slow_open_meteo.request_count * STUB_DELAY_SECONDS
+        assert elapsed < STUB_DELAY_SECONDS * 4
+        assert elapsed < sequential / 4
+
+    async def test_concurrency_is_bounded(self, slow_open_meteo, monkeypatch):
+        """The semaphore caps in-flight upstream requests."""
+        import app.services.open_meteo_service as oms
+        monkeypatch.setattr(oms, '_batch_size', 10)
+        monkeypatch.setattr(oms, '_max_concurrent_requests', 2)
+        await oms.close_async_client()
+
+        bounds = {'north': 39.0, 'south': 37.0, 'east': 26.0, 'west': 24.0}
+
+        started = time.perf_counter()
+        await fetch_wind_data_grid_async(bounds, zoom_level=10, jitter_factor=1)
+        elapsed = time.perf_counter() - started
+        await oms.close_async_client()
+
+        # 20 requests, 2 at a time => at least 10 sequential round trips
+        assert elapsed >= STUB_DELAY_SECONDS * 10 * 0.9
+
+    def test_sync_grid_still_available(self, slow_open_meteo):
+        """The blocking variant returns the same points for sync callers."""
+        bounds = {'north': 37.75, 'south': 37.70, 'east': 24.75, 'west': 24.70}
+        result = fetch_wind_data_grid(bounds, zoom_level=15, jitter_factor=1)
+
+        assert slow_open_meteo.request_count == 2
+        assert result and all(point['wind_speed_10m'] == 4.0 for point in result)
+
+
+class TestRequestCoalescing:
+    """Test that concurrent misses for the same forecast run share one upstream fetch."""
+
+    def test_concurrent_single_point_requests_share_one_fetch(self, slow_open_meteo):
+        """Threads asking for the same cell and hour wait on the first one's fetch."""
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            results = list(pool.map(lambda _: fetch_wind_data_single_point(37.7, 24.0), range(8)))
+
+        # One forecast + one marine request for all eight callers
+        assert slow_open_meteo.request_count == 2
+        assert all(result and result['wind_speed_10m'] == 4.0 for result in results)
+        stats = get_wind_fetch_stats()
+        assert stats['upstream_fetches'] == 1
+        assert stats['coalesced_hits'] == 7
+
+    async def test_concurrent_grid_requests_share_fetches(self, slow_open_meteo):
+        """Overlapping map requests fetch each cell once."""
+        import asyncio
+        import app.services.open_meteo_service as oms
+        await oms.close_async_client()
+
+        bounds = {'north': 38.0, 'south': 37.0, 'east': 25.0, 'west': 24.0}
+        first, second = await asyncio.gather(
+            fetch_wind_data_grid_async(bounds, zoom_level=10, jitter_factor=1),
+            fetch_wind_data_grid_async(bounds, zoom_level=10, jitter_factor=1),
+        )
+        await oms.close_async_client()
+
+        assert len(first) == len(second) > 0
+        assert all(point['wind_speed_10m'] == 4.0 for point in first + second)
+        # Every cell is fetched by one of the two requests and waited on by the other
+        stats = get_wind_fetch_stats()
+        assert stats['upstream_fetches'] == len(first)
+        assert stats['coalesced_hits'] == len(first)
+
+    def test_lease_held_by_other_worker_waits_for_database_row(self, slow_open_meteo, monkeypatch):
+        """Without the lease, the run is read from the database once the other worker stores it."""
+        import app.services.open_meteo_service as oms
+
+        now = datetime.now().replace(minute=0, second=0, microsecond=0)
+        forecast = {
+            'time': [(now + timedelta(hours=h)).strftime('%Y-%m-%dT%H:00') for h in range(3)],
+            'wind_speed_10m': [9.0, 9.0, 9.0],
+            'wind_direction_10m': [180.0, 180.0, 180.0],
+            'wind_gusts_10m': [12.0, 12.0, 12.0],
+        }
+        polls = []
+
+        def database_rows(keys):
+            # Other worker's fetch lands on the second poll
+            polls.append(keys)
+            return {key: forecast for key in keys} if len(polls) > 1 else {}
+
+        monkeypatch.setattr(oms, '_acquire_fetch_leases', lambda cells: set())
+        monkeypatch.setattr(oms, '_get_batch_from_database_cache', database_rows)
+        monkeypatch.setattr(oms, '_lease_poll_interval_seconds', 0.01)
+
+        result = fetch_wind_data_single_point(37.7, 24.0)
+
+        assert result['wind_speed_10m'] == 9.0
+        assert slow_open_meteo.request_count == 0
+        stats = get_wind_fetch_stats()
+        assert stats['cross_worker_coalesced_hits'] == 1
+        assert stats['upstream_fetches'] == 0
+
+    def test_lease_wait_timeout_fetches_itself(self, slow_open_meteo, monkeypatch):
+        """A stalled lease holder does not block the request for longer than the lease."""
+        import app.services.open_meteo_service as oms
+        monkeypatch.setattr(oms, '_acquire_fetch_leases', lambda cells: set())
+        monkeypatch.setattr(oms, '_fetch_lease_seconds', 0.05)
+        monkeypatch.setattr(oms, '_lease_poll_interval_seconds', 0.01)
+
+        result = fetch_wind_data_single_point(37.7, 24.0)
+
+        assert result['wind_speed_10m'] == 4.0
+        assert slow_open_meteo.request_count == 2
+        assert get_wind_fetch_stats()['lease_wait_timeouts'] == 1
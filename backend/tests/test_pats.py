@@ -1,4 +1,5 @@
 import pytest
+from unittest.mock import patch
 from fastapi import status
 from app.models import User, PersonalAccessToken
 from datetime import datetime, timezone, timedelta
@@ -59,7 +60,9 @@ class TestPATs:
         data = response.json()
         assert data["username"] == test_user.username
         
-        # 3. Verify last_used_at was updated
+        # 3. Verify last_used_at was updated (written in batches)
+        from app.services.pat_verification_cache import flush_pat_last_used
+        flush_pat_last_used(db_session)
         db_session.refresh(pat)
         assert pat.last_used_at is not None
 
@@ -223,3 +226,83 @@ class TestPATs:
         # Verify in DB
         db_session.refresh(test_user)
         assert test_user.name == new_name
+
+
+class TestPATVerificationCache:
+    """Verified PATs skip bcrypt on later requests but stay revocable."""
+
+    RAW_TOKEN = "dm_pat_cachedtoken_abcdefghijklmnop"
+
+    @pytest.fixture(autouse=True)
+    def empty_cache(self):
+        from app.services.pat_verification_cache import clear_pat_cache
+        clear_pat_cache()
+        yield
+        clear_pat_cache()
+
+    @pytest.fixture
+    def pat(self, test_user, db_session):
+        from app.auth import get_password_hash
+        pat = PersonalAccessToken(
+            user_id=test_user.id,
+            name="Cached PAT",
+            token_prefix=self.RAW_TOKEN[7:][:12],
+            token_hash=get_password_hash(self.RAW_TOKEN),
+            is_active=True
+        )
+        db_session.add(pat)
+        db_session.commit()
+        return pat
+
+    def _me(self, client, token=None):
+        return client.get("/api/v1/auth/me", headers={"Authorization": f"Bearer {token or self.RAW_TOKEN}"})
+
+    def test_bcrypt_runs_once(self, client, pat):
+        from app import auth
+        with patch.object(auth, "verify_password", wraps=auth.verify_password) as mock_verify:
+            for _ in range(3):
+                assert self._me(client).status_code == status.HTTP_200_OK
+
+        assert mock_verify.call_count == 1
+
+    def test_wrong_token_with_same_prefix_is_rejected(self, client, pat):
+        assert self._me(client).status_code == status.HTTP_200_OK
+        assert self._me(client, self.RAW_TOKEN + "x").status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_revoke_via_api_invalidates(self, client, pat):
+        login_response = client.post("/api/v1/auth/login", json={
+            "username": "testuser",
+            "password": "TestPass123!"
+        })
+        headers = {"Authorization": f"Bearer {login_response.json()['access_token']}"}
+        assert self._me(client).status_code == status.HTTP_200_OK
+
+        del_resp = client.delete(f"/api/v1/users/me/tokens/{pat.id}", headers=headers)
+
+        assert del_resp.status_code == status.HTTP_200_OK
+        assert self._me(client).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_deactivated_or_expired_cached_token_is_rejected(self, client, pat, db_session):
+        assert self._me(client).status_code == status.HTTP_200_OK
+
+        pat.expires_at = datetime.now(timezone.utc) - timedelta(minutes=1)
+        db_session.commit()
+        assert self._me(client).status_code == status.HTTP_401_UNAUTHORIZED
+
+        pat.expires_at = None
+        pat.is_active = False
+        db_session.commit()
+        assert self._me(client).status_code == status.HTTP_401_UNAUTHORIZED
+
+    def test_last_used_at_is_batched(self, client, pat, db_session):
+        from app.services.pat_verification_cache import flush_pat_last_used
+
+        for _ in range(3):
+            assert self._me(client).status_code == status.HTTP_200_OK
+        db_session.refresh(pat)
+        assert pat.last_used_at is None
+
+        assert flush_pat_last_used(db_session) == 1
+        db_session.refresh(pat)
+        assert pat.last_used_at is not None
+        assert flush_pat_last_used(db_session) == 0
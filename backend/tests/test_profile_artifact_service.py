@@ -0,0 +1,173 @@
+"""
+Tests for derived dive profile artifacts (parsed profile plus deco backfill
+persisted next to the stored profile).
+"""
+
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import orjson
+import pytest
+
+from app.services.profile_artifact_service import (
+    PROFILE_ARTIFACT_VERSION,
+    delete_profile_artifact,
+    load_profile_artifact,
+    profile_artifact_fingerprint,
+    profile_artifact_path,
+    store_profile_artifact,
+)
+
+
+class FakeProfileStorage:
+    """Dict-backed stand-in for R2StorageService profile methods."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+        self.downloads = []
+
+    def download_profile(self, user_id, file_path):
+        self.downloads.append(file_path)
+        return self.objects.get(file_path)
+
+    def upload_profile_artifact(self, artifact_path, content):
+        self.objects[artifact_path] = content
+        return artifact_path
+
+    def upload_profile(self, user_id, filename, content):
+        path = f"user_{user_id}/dive_profiles/2025/01/{filename}"
+        self.objects[path] = content
+        return path
+
+    def delete_profile(self, user_id, file_path):
+        return self.objects.pop(file_path, None) is not None
+
+
+PROFILE_PATH = "user_1/dive_profiles/2025/01/dive_1_profile.json"
+PROFILE = {"samples": [{"time_minutes": 0, "depth": 0}, {"time_minutes": 1, "depth": 10}]}
+
+
+def _dive(**overrides):
+    values = dict(
+        id=1,
+        user_id=1,
+        profile_xml_path=PROFILE_PATH,
+        profile_sample_count=2,
+        dive_information="Planned on GF 30/70",
+    )
+    values.update(overrides)
+    return SimpleNamespace(**values)
+
+
+class TestProfileArtifact:
+    def test_round_trip(self):
+        storage = FakeProfileStorage()
+        dive = _dive()
+
+        assert store_profile_artifact(storage, dive, PROFILE)
+
+        assert profile_artifact_path(PROFILE_PATH) in storage.objects
+        assert load_profile_artifact(storage, dive) == PROFILE
+
+    def test_missing_artifact_is_a_miss(self):
+        assert load_profile_artifact(FakeProfileStorage(), _dive()) is None
+
+    @pytest.mark.parametrize("overrides", [
+        {"dive_information": "Planned on GF 40/85"},
+        {"dive_information": None},
+        {"profile_xml_path": "user_1/dive_profiles/2025/02/dive_1_profile.json"},
+        {"profile_sample_count": 3},
+    ])
+    def test_changed_inputs_invalidate(self, overrides):
+        storage = FakeProfileStorage()
+        store_profile_artifact(storage, _dive(), PROFILE)
+
+        changed = _dive(**overrides)
+        if changed.profile_xml_path != PROFILE_PATH:
+            storage.objects[profile_artifact_path(changed.profile_xml_path)] = storage.objects[profile_artifact_path(PROFILE_PATH)]
+
+        assert load_profile_artifact(storage, changed) is None
+
+    def test_unrelated_notes_change_keeps_artifact(self):
+        storage = FakeProfileStorage()
+        store_profile_artifact(storage, _dive(), PROFILE)
+
+        assert load_profile_artifact(storage, _dive(dive_information="Nice reef. GF 30/70")) == PROFILE
+
+    def test_other_version_is_a_miss(self):
+        storage = FakeProfileStorage()
+        dive = _dive()
+        storage.objects[profile_artifact_path(PROFILE_PATH)] = orjson.dumps({
+            "version": PROFILE_ARTIFACT_VERSION + 1,
+            "fingerprint": profile_artifact_fingerprint(dive),
+            "profile": PROFILE,
+        })
+
+        assert load_profile_artifact(storage, dive) is None
+
+    def test_unreadable_artifact_is_a_miss(self):
+        storage = FakeProfileStorage({profile_artifact_path(PROFILE_PATH): b"not json"})
+
+        assert load_profile_artifact(storage, _dive()) is None
+
+    def test_delete(self):
+        storage = FakeProfileStorage()
+        store_profile_artifact(storage, _dive(), PROFILE)
+
+        assert delete_profile_artifact(storage, 1, PROFILE_PATH)
+        assert storage.objects == {}
+        assert not delete_profile_artifact(storage, 1, None)
+
+
+class TestGetDiveProfileUsesArtifact:
+    @pytest.fixture
+    def profiled_dive(self, test_dive, db_session):
+        test_dive.profile_xml_path = PROFILE_PATH
+        test_dive.profile_sample_count = 2
+        test_dive.dive_information = "GF 30/70"
+        db_session.commit()
+        return test_dive
+
+    def test_second_read_is_served_from_artifact(self, client, auth_headers, profiled_dive):
+        storage = FakeProfileStorage({PROFILE_PATH: orjson.dumps(PROFILE)})
+
+        with patch('app.routers.dives.dives_profiles.r2_storage', storage), \
+                patch('app.services.deco_service.calculate_deco_ceiling') as mock_deco:
+            mock_deco.return_value = ([0.0, 3.0], [10.0] * 16, [[1.0] * 16, [2.0] * 16])
+
+            first = client.get(f"/api/v1/dives/{profiled_dive.id}/profile", headers=auth_headers)
+            storage.downloads.clear()
+            second = client.get(f"/api/v1/dives/{profiled_dive.id}/profile", headers=auth_headers)
+
+        assert first.status_code == 200
+        assert second.json() == first.json()
+        assert second.json()["tissue_heatmap"] == [[1.0] * 16, [2.0] * 16]
+        assert mock_deco.call_count == 1
+        assert storage.downloads == [profile_artifact_path(PROFILE_PATH)]
+
+    def test_gf_change_recomputes(self, client, auth_headers, profiled_dive, db_session):
+        storage = FakeProfileStorage({PROFILE_PATH: orjson.dumps(PROFILE)})
+
+        with patch('app.routers.dives.dives_profiles.r2_storage', storage), \
+                patch('app.services.deco_service.calculate_deco_ceiling') as mock_deco:
+            mock_deco.return_value = ([0.0, 3.0], [10.0] * 16, [[1.0] * 16, [2.0] * 16])
+            client.get(f"/api/v1/dives/{profiled_dive.id}/profile", headers=auth_headers)
+
+            profiled_dive.dive_information = "GF 50/80"
+            db_session.commit()
+            client.get(f"/api/v1/dives/{profiled_dive.id}/profile", headers=auth_headers)
+
+        assert mock_deco.call_count == 2
+        assert mock_deco.call_args.kwargs["gf_low"] == 50
+
+    def test_profile_delete_removes_artifact(self, client, auth_headers, profiled_dive):
+        storage = FakeProfileStorage({PROFILE_PATH: orjson.dumps(PROFILE)})
+
+        with patch('app.routers.dives.dives_profiles.r2_storage', storage):
+            client.get(f"/api/v1/dives/{profiled_dive.id}/profile", headers=auth_headers)
+            assert profile_artifact_path(PROFILE_PATH) in storage.objects
+
+            response = client.delete(f"/api/v1/dives/{profiled_dive.id}/profile", headers=auth_headers)
+
+        assert response.status_code == 200
+        assert storage.objects == {}
@@ -0,0 +1,220 @@
+"""
+Tests for downsampled dive profiles served to charts.
+"""
+
+import math
+import time
+from unittest.mock import patch
+
+import numpy as np
+import orjson
+import pytest
+
+from app.services.profile_downsampling import (
+    RESOLUTION_LEVELS,
+    _lttb_indices,
+    build_resolution_levels,
+    downsample_indices,
+    downsample_profile,
+)
+
+PROFILE_PATH = "user_1/dive_profiles/2025/01/dive_1_profile.json"
+
+
+def _deco_dive(sample_count=20000):
+    """Square-ish 60 m dive logged every second, with a deco phase and events."""
+    samples = []
+    for i in range(sample_count):
+        progress = i / (sample_count - 1)
+        depth = 60 * min(1.0, 8 * progress, 8 * (1 - progress)) + 0.3 * math.sin(i / 7)
+        samples.append({
+            "time": f"{i // 60}:{i % 60:02d} min",
+            "time_minutes": i / 60,
+            "depth": round(max(depth, 0.0), 2),
+            "temperature": 18.0,
+            "in_deco": 0.8 < progress < 0.95,
+            "stopdepth": 6.0 if 0.8 < progress < 0.95 else 0,
+        })
+    # A single deeper spike that LTTB alone is free to drop
+    samples[sample_count // 3]["depth"] = 63.5
+    return {
+        "samples": samples,
+        "events": [
+            {"time_minutes": samples[sample_count // 2]["time_minutes"], "name": "gaschange", "cylinder": 1},
+            {"time_minutes": samples[sample_count * 24 // 25]["time_minutes"] + 0.001, "name": "ascent"},
+        ],
+        "tissue_heatmap": [[i % 100] * 16 for i in range(sample_count)],
+        "calculated_max_depth": 63.5,
+        "sample_count": sample_count,
+    }
+
+
+class TestLttb:
+    def test_keeps_endpoints_and_count(self):
+        x = [float(i) for i in range(1000)]
+        y = [math.sin(i / 50) for i in range(1000)]
+        indices = _lttb_indices(np.array(x), np.array(y), 100)
+
+        assert len(indices) == 100
+        assert indices[0] == 0 and indices[-1] == 999
+        assert list(indices) == sorted(set(indices.tolist()))
+
+    def test_small_input_is_untouched(self):
+        assert _lttb_indices(np.arange(5.0), np.arange(5.0), 10).tolist() == [0, 1, 2, 3, 4]
+
+
+class TestDownsampleIndices:
+    def test_respects_max_points(self):
+        profile = _deco_dive(5000)
+        for max_points in (10, 250, 1000):
+            indices = downsample_indices(profile, max_points)
+            assert len(indices) <= max_points
+            assert indices == sorted(set(indices))
+
+    def test_keeps_max_depth_and_endpoints(self):
+        profile = _deco_dive(5000)
+        indices = downsample_indices(profile, 100)
+        depths = [profile["samples"][i]["depth"] for i in indices]
+
+        assert max(depths) == 63.5
+        assert indices[0] == 0 and indices[-1] == 4999
+
+    def test_keeps_deco_transitions_and_events(self):
+        profile = _deco_dive(5000)
+        samples = profile["samples"]
+        indices = set(downsample_indices(profile, 100))
+
+        first_deco = next(i for i, s in enumerate(samples) if s["in_deco"])
+        last_deco = max(i for i, s in enumerate(samples) if s["in_deco"])
+        assert first_deco in indices
+        assert last_deco + 1 in indices
+        assert 2500 in indices
+        assert 4800 in indices
+
+    def test_more_events_than_max_points(self):
+        profile = _deco_dive(5000)
+        profile["events"] = [{"time_minutes": i / 60, "name": "alarm"} for i in range(5, 5000, 19)]
+        assert len(profile["events"]) > 250
+
+        for max_points in (10, 50, 250):
+            indices = downsample_indices(profile, max_points)
+            assert len(indices) <= max_points
+            assert indices[0] == 0 and indices[-1] == 4999
+            assert 5000 // 3 in indices
+            # Events spread over the whole dive, not just its start
+            assert indices[-2] > 4000
+
+    def test_profile_that_fits_is_kept_whole(self):
+        profile = _deco_dive(50)
+        assert downsample_indices(profile, 100) == list(range(50))
+
+
+class TestDownsampleProfile:
+    def test_no_max_points_returns_full_profile(self):
+        profile = _deco_dive(500)
+        assert downsample_profile(profile, None) is profile
+        assert downsample_profile(profile, 1000) is profile
+
+    def test_heatmap_follows_samples(self):
+        profile = _deco_dive(3000)
+        result = downsample_profile(profile, 300)
+
+        assert len(result["tissue_heatmap"]) == len(result["samples"])
+        assert result["resolution"] == {"downsampled": True, "points": len(result["samples"]), "total_points": 3000}
+        assert "resolution" not in profile
+        assert len(profile["samples"]) == 3000
+
+    def test_uses_largest_fitting_level(self):
+        profile = _deco_dive(3000)
+        levels = build_resolution_levels(profile)
+
+        assert sorted(levels, key=int) == [str(p) for p in RESOLUTION_LEVELS if p < 3000]
+        result = downsample_profile(profile, 800, levels)
+        assert result["samples"] == [profile["samples"][i] for i in levels["500"]]
+
+    def test_below_smallest_level_downsamples_on_the_fly(self):
+        profile = _deco_dive(3000)
+        result = downsample_profile(profile, 100, build_resolution_levels(profile))
+        assert len(result["samples"]) <= 100
+
+
+class TestDownsampleBenchmark:
+    def test_payload_size(self):
+        """A mobile chart payload is a fraction of the full profile."""
+        profile = _deco_dive(20000)
+        payload = orjson.dumps(downsample_profile(profile, 500, build_resolution_levels(profile)))
+        assert len(orjson.dumps(profile)) / len(payload) >= 20
+
+    @pytest.mark.benchmark
+    def test_serving_time(self):
+        """Serving from precomputed levels should be far cheaper than downsampling per request."""
+        profile = _deco_dive(20000)
+        levels = build_resolution_levels(profile)
+
+        start = time.perf_counter()
+        for _ in range(5):
+            orjson.dumps(downsample_profile(profile, 500))
+        on_the_fly_seconds = (time.perf_counter() - start) / 5
+
+        start = time.perf_counter()
+        for _ in range(20):
+            orjson.dumps(downsample_profile(profile, 500, levels))
+        serve_seconds = (time.perf_counter() - start) / 20
+
+        assert serve_seconds < on_the_fly_seconds / 3
+
+
+class FakeProfileStorage:
+    """Dict-backed stand-in for R2StorageService profile methods."""
+
+    def __init__(self, objects=None):
+        self.objects = dict(objects or {})
+
+    def download_profile(self, user_id, file_path):
+        return self.objects.get(file_path)
+
+    def upload_profile_artifact(self, artifact_path, content):
+        self.objects[artifact_path] = content
+        return artifact_path
+
+    def delete_profile(self, user_id, file_path):
+        return self.objects.pop(file_path, None) is not None
+
+
+class TestGetDiveProfileDownsampled:
+    @pytest.fixture
+    def profiled_dive(self, test_dive, db_session):
+        test_dive.profile_xml_path = PROFILE_PATH
+        test_dive.profile_sample_count = 3000
+        db_session.commit()
+        return test_dive
+
+    def _get(self, client, auth_headers, dive, params=""):
+        return client.get(f"/api/v1/dives/{dive.id}/profile{params}", headers=auth_headers)
+
+    def test_max_points(self, client, auth_headers, profiled_dive):
+        storage = FakeProfileStorage({PROFILE_PATH: orjson.dumps(_deco_dive(3000))})
+
+        with patch('app.routers.dives.dives_profiles.r2_storage', storage):
+            first = self._get(client, auth_headers, profiled_dive, "?max_points=500")
+            second = self._get(client, auth_headers, profiled_dive, "?max_points=500")
+            full = self._get(client, auth_headers, profiled_dive)
+
+        assert first.status_code == 200
+        assert len(first.json()["samples"]) <= 500
+        assert first.json()["resolution"]["total_points"] == 3000
+        assert second.json() == first.json()
+        assert len(full.json()["samples"]) == 3000
+        assert "resolution" not in full.json()
+
+    def test_named_resolution(self, client, auth_headers, profiled_dive):
+        storage = FakeProfileStorage({PROFILE_PATH: orjson.dumps(_deco_dive(3000))})
+
+        with patch('app.routers.dives.dives_profiles.r2_storage', storage):
+            low = self._get(client, auth_headers, profiled_dive, "?resolution=low")
+            full = self._get(client, auth_headers, profiled_dive, "?resolution=full")
+            invalid = self._get(client, auth_headers, profiled_dive, "?resolution=tiny")
+
+        assert len(low.json()["samples"]) <= 250
+        assert len(full.json()["samples"]) == 3000
+        assert invalid.status_code == 422
@@ -0,0 +1,140 @@
+"""
+Tests for the columnar dive profile storage format.
+"""
+
+import math
+
+import numpy as np
+import orjson
+import pytest
+
+from app.services.profile_format import (
+    CODEC_ZLIB,
+    CODEC_ZSTD,
+    ZSTD_AVAILABLE,
+    decode_profile,
+    decode_profile_columns,
+    encode_profile,
+    is_columnar_profile,
+    load_profile_data,
+)
+
+
+def _imported_profile(sample_count=2000):
+    """Profile shaped like the ones produced by the dive importers."""
+    samples = []
+    for i in range(sample_count):
+        minutes = i * 10 / 60
+        sample = {
+            "time": f"{i * 10 // 60}:{i * 10 % 60:02d} min",
+            "time_minutes": minutes,
+            "depth": round(20 * math.sin(math.pi * i / sample_count), 1),
+            "temperature": 24.0 if i % 2 else 23.5,
+        }
+        if i % 6 == 0:
+            sample["pressure"] = 200 - i // 20
+        if i % 30 == 0:
+            sample["ndl_minutes"] = 99
+            sample["in_deco"] = False
+        samples.append(sample)
+    return {
+        "samples": samples,
+        "events": [{"time_minutes": 1.5, "name": "gaschange", "cylinder": 1}],
+        "calculated_max_depth": 20.0,
+        "calculated_duration_minutes": samples[-1]["time_minutes"],
+        "sample_count": sample_count,
+        "temperature_range": {"min": 23.5, "max": 24.0},
+    }
+
+
+class TestRoundTrip:
+    def test_imported_profile_round_trips(self):
+        profile = _imported_profile()
+        assert decode_profile(encode_profile(profile)) == profile
+
+    @pytest.mark.parametrize("codec", [CODEC_ZLIB, CODEC_ZSTD])
+    def test_codecs(self, codec):
+        if codec == CODEC_ZSTD and not ZSTD_AVAILABLE:
+            pytest.skip("zstandard not installed")
+        profile = _imported_profile(100)
+        content = encode_profile(profile, codec=codec)
+        assert content[5] == codec
+        assert decode_profile(content) == profile
+
+    def test_value_types_are_preserved(self):
+        profile = {"samples": [
+            {"depth": 1, "ceiling": 0.1234567, "flag": True, "note": "a", "nested": {"x": [1]}},
+            {"depth": 2.5, "ceiling": 1e-9, "flag": False, "note": None, "nested": None},
+            {"depth": -3, "ceiling": 123456.789, "flag": True},
+        ]}
+        decoded = decode_profile(encode_profile(profile))
+        assert decoded == profile
+        assert isinstance(decoded["samples"][0]["depth"], float)
+        assert decoded["samples"][0]["flag"] is True
+
+    def test_integer_channels_stay_integers(self):
+        profile = {"samples": [{"pressure": p} for p in (200, 199, 150)]}
+        decoded = decode_profile(encode_profile(profile))
+        assert [type(s["pressure"]) for s in decoded["samples"]] == [int, int, int]
+
+    def test_non_finite_values(self):
+        profile = {"samples": [{"depth": 1.0}, {"depth": float("inf")}]}
+        decoded = decode_profile(encode_profile(profile))
+        assert decoded["samples"][1]["depth"] == float("inf")
+
+    def test_profile_without_samples(self):
+        profile = {"calculated_max_depth": 0}
+        assert decode_profile(encode_profile(profile)) == profile
+        profile = {"samples": []}
+        assert decode_profile(encode_profile(profile)) == profile
+
+    def test_rejects_other_content(self):
+        with pytest.raises(ValueError):
+            decode_profile(b'{"samples": []}')
+
+
+class TestCompactness:
+    def test_much_smaller_than_indented_json(self):
+        profile = _imported_profile(10000)
+        json_size = len(orjson.dumps(profile, option=orjson.OPT_INDENT_2))
+        columnar_size = len(encode_profile(profile, codec=CODEC_ZLIB))
+        assert json_size / columnar_size >= 5
+
+
+class TestColumns:
+    def test_decode_columns(self):
+        profile = _imported_profile(60)
+        meta, columns = decode_profile_columns(encode_profile(profile))
+
+        assert "samples" not in meta
+        assert meta["sample_count"] == 60
+        np.testing.assert_array_equal(columns["depth"], [s["depth"] for s in profile["samples"]])
+        assert np.isnan(columns["pressure"][1])
+        assert columns["pressure"][6] == profile["samples"][6]["pressure"]
+        assert columns["in_deco"][0] is False
+        assert columns["in_deco"][1] is None
+        assert columns["time"][7] == "1:10 min"
+
+
+class TestLoadProfileData:
+    def test_columnar(self):
+        profile = _imported_profile(10)
+        assert load_profile_data("user_1/p.dpc", encode_profile(profile)) == profile
+
+    def test_legacy_json(self):
+        profile = _imported_profile(10)
+        assert load_profile_data("user_1/p.json", orjson.dumps(profile)) == profile
+
+    def test_subsurface_xml(self):
+        xml = b"""<divelog program='subsurface' version='3'><dives>
+<dive number='1' date='2024-01-01' time='10:00:00' duration='1:00 min'>
+<divecomputer model='Test'>
+<sample time='0:00 min' depth='0.0 m' />
+<sample time='0:30 min' depth='5.0 m' />
+</divecomputer></dive></dives></divelog>"""
+        profile = load_profile_data("user_1/p.xml", xml)
+        assert [s["depth"] for s in profile["samples"]] == [0.0, 5.0]
+
+    def test_is_columnar_profile(self):
+        assert is_columnar_profile(encode_profile({"samples": []}))
+        assert not is_columnar_profile(b"<divelog/>")
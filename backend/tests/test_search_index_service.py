@@ -0,0 +1,130 @@
+import pytest
+from datetime import datetime, timezone
+
+from app.models import DiveSite, DiveSiteAlias, AvailableTag, DiveSiteTag
+from app.services.search_index_service import (
+    DiveSiteSearchIndex,
+    dive_site_search_index,
+    text_trigrams,
+)
+
+
+def _make_site(db_session, name, **kwargs):
+    site = DiveSite(name=name, latitude=10.0, longitude=20.0, **kwargs)
+    db_session.add(site)
+    db_session.commit()
+    db_session.refresh(site)
+    return site
+
+
+class TestTrigrams:
+    def test_text_trigrams_are_word_padded_and_lowercased(self):
+        grams = text_trigrams("Blue Hole")
+        assert "  b" in grams
+        assert "blu" in grams
+        assert "ue " in grams
+        assert "hol" in grams
+        assert "e h" not in grams  # words are indexed independently
+
+    def test_text_trigrams_empty(self):
+        assert text_trigrams(None) == set()
+        assert text_trigrams("   ") == set()
+
+
+class TestDiveSiteSearchIndex:
+    def test_candidates_tolerate_typos(self, db_session):
+        target = _make_site(db_session, "Nautilus Reef", country="Greece")
+        _make_site(db_session, "Coral Garden", country="Egypt")
+
+        index = DiveSiteSearchIndex()
+        index.rebuild(db_session)
+
+        assert index.candidates("nautalus")[0] == target.id
+
+    def test_candidates_cover_aliases_regions_and_tags(self, db_session):
+        site = _make_site(db_session, "Site One", region="Chalkidiki")
+        db_session.add(DiveSiteAlias(dive_site_id=site.id, alias="Kassandra Wall"))
+        tag = AvailableTag(name="Wreckdive")
+        db_session.add(tag)
+        db_session.flush()
+        db_session.add(DiveSiteTag(dive_site_id=site.id, tag_id=tag.id))
+        db_session.commit()
+
+        index = DiveSiteSearchIndex()
+        index.rebuild(db_session)
+
+        assert site.id in index.candidates("kasandra")
+        assert site.id in index.candidates("chalkidki")
+        assert site.id in index.candidates("wreckdiv")
+
+    def test_candidates_respect_status_deleted_and_exclusions(self, db_session):
+        approved = _make_site(db_session, "Manta Point")
+        pending = _make_site(db_session, "Manta Bay", status="pending")
+        archived = _make_site(db_session, "Manta Cove", deleted_at=datetime.now(timezone.utc))
+
+        index = DiveSiteSearchIndex()
+        index.rebuild(db_session)
+
+        approved_only = index.candidates("manta", status="approved")
+        assert approved_only == [approved.id]
+        assert pending.id in index.candidates("manta", status=None)
+        assert archived.id in index.candidates("manta", status=None, include_deleted=True)
+        assert approved.id not in index.candidates("manta", exclude_ids={approved.id})
+
+    def test_candidates_limit(self, db_session):
+        for i in range(5):
+            _make_site(db_session, f"Anemone City {i}")
+
+        index = DiveSiteSearchIndex()
+        index.rebuild(db_session)
+
+        assert len(index.candidates("anemone", limit=3)) == 3
+
+    def test_incremental_refresh(self, db_session):
+        site = _make_site(db_session, "Old Name")
+        index = DiveSiteSearchIndex()
+        index.rebuild(db_session)
+        assert index.candidates("barracuda") == []
+
+        site.name = "Barracuda Point"
+        db_session.commit()
+        index.mark_dirty([site.id])
+        index.ensure_ready(db_session)
+        assert index.candidates("barracuda") == [site.id]
+
+        db_session.delete(site)
+        db_session.commit()
+        index.mark_dirty([site.id])
+        index.ensure_ready(db_session)
+        assert index.candidates("barracuda") == []
+
+    def test_candidates_rank_by_similarity_then_description(self, db_session):
+        described = _make_site(db_session, "Site Two", description="Home of a resident moray eel")
+        short = _make_site(db_session, "Moray")
+        long = _make_site(db_session, "Moray Garden North Wall Drift")
+
+        index = DiveSiteSearchIndex()
+        index.rebuild(db_session)
+
+        assert index.candidates("moray") == [short.id, long.id, described.id]
+
+    def test_flush_hook_marks_sites_dirty_on_commit(self, db_session):
+        dive_site_search_index.ensure_ready(db_session)
+        site = DiveSite(name="Shark Alley", latitude=10.0, longitude=20.0)
+        db_session.add(site)
+        db_session.flush()
+        assert site.id not in dive_site_search_index._dirty_ids
+
+        db_session.commit()
+        assert site.id in dive_site_search_index._dirty_ids
+        dive_site_search_index.ensure_ready(db_session)
+        assert site.id in dive_site_search_index.candidates("shark aley", status=None)
+
+
+class TestFuzzySearchUsesIndex:
+    def test_typo_search_finds_site_via_index(self, client, db_session):
+        site = _make_site(db_session, "Nautilus Reef")
+
+        response = client.get("/api/v1/dive-sites/?search=nautalus")
+        assert response.status_code == 200
+        assert site.id in [item["id"] for item in response.json()["items"]]
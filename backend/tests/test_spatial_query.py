@@ -0,0 +1,185 @@
+"""
+Tests for the bounding-box pre-filter used by radius queries.
+"""
+
+import math
+import random
+import time
+
+import pytest
+from sqlalchemy import text
+
+from app.services.spatial_query import EARTH_RADIUS_M, envelope_wkt, radius_envelopes, radius_prefilter
+
+
+def _destination(lat, lng, bearing_deg, distance_m):
+    """Point reached from (lat, lng) after distance_m along a bearing."""
+    d = distance_m / EARTH_RADIUS_M
+    lat1, lng1, bearing = math.radians(lat), math.radians(lng), math.radians(bearing_deg)
+    lat2 = math.asin(math.sin(lat1) * math.cos(d) + math.cos(lat1) * math.sin(d) * math.cos(bearing))
+    lng2 = lng1 + math.atan2(
+        math.sin(bearing) * math.sin(d) * math.cos(lat1),
+        math.cos(d) - math.sin(lat1) * math.sin(lat2)
+    )
+    return math.degrees(lat2), (math.degrees(lng2) + 180) % 360 - 180
+
+
+def _in_envelopes(envelopes, lat, lng):
+    return any(
+        min_lng <= lng <= max_lng and min_lat <= lat <= max_lat
+        for min_lng, min_lat, max_lng, max_lat in envelopes
+    )
+
+
+class TestRadiusEnvelopes:
+    @pytest.mark.parametrize("lat,lng,radius_m", [
+        (37.9838, 23.7275, 50),
+        (27.2, 33.9, 50000),
+        (-33.9, 18.4, 100000),
+        (0.0, 179.9, 100000),
+        (-17.0, -179.95, 5000),
+        (89.95, 10.0, 50000),
+        (-89.9, 0.0, 500),
+    ])
+    def test_contains_every_point_within_radius(self, lat, lng, radius_m):
+        envelopes = radius_envelopes(lat, lng, radius_m)
+        rng = random.Random(7)
+        for i in range(2000):
+            # Every tenth point on the circle itself, the others inside it
+            distance = radius_m if i % 10 == 0 else radius_m * rng.random()
+            point_lat, point_lng = _destination(lat, lng, rng.uniform(0, 360), distance)
+            assert _in_envelopes(envelopes, point_lat, point_lng)
+
+    def test_single_box_away_from_edges(self):
+        (min_lng, min_lat, max_lng, max_lat), = radius_envelopes(36.0, 25.0, 50000)
+        assert max_lat - min_lat == pytest.approx(0.9, abs=0.01)
+        assert max_lng - min_lng == pytest.approx(1.11, abs=0.01)
+
+    def test_antimeridian_is_split(self):
+        envelopes = radius_envelopes(0.0, 179.9, 100000)
+        assert len(envelopes) == 2
+        assert envelopes[0][2] == 180.0 and envelopes[1][0] == -180.0
+        assert all(min_lng < max_lng for min_lng, _, max_lng, _ in envelopes)
+
+    def test_pole_covers_all_longitudes(self):
+        envelopes = radius_envelopes(89.95, 10.0, 50000)
+        assert [(e[0], e[2]) for e in envelopes] == [(-180.0, 0.0), (0.0, 180.0)]
+        assert envelopes[0][3] == 90.0
+
+    def test_prefilter_sql(self):
+        condition, params = radius_prefilter("ds.location", 36.0, 25.0, 1000)
+        assert condition == (
+            "MBRContains(ST_GeomFromText(:envelope_0, 4326, 'axis-order=long-lat'), ds.location)"
+        )
+        assert params["envelope_0"].startswith("POLYGON((24.98")
+
+        condition, params = radius_prefilter("location", 0.0, 179.99, 5000, param="box")
+        assert condition.startswith("(MBRContains") and " OR " in condition
+        assert set(params) == {"box_0", "box_1"}
+
+    def test_envelope_wkt_closes_ring(self):
+        assert envelope_wkt((1.0, 2.0, 3.0, 4.0)) == "POLYGON((1.0 2.0, 3.0 2.0, 3.0 4.0, 1.0 4.0, 1.0 2.0))"
+
+
+SITE_COUNT = 100_000
+BENCHMARK_TABLE = "spatial_query_benchmark_sites"
+BENCHMARK_INDEX = "idx_spatial_query_benchmark_location"
+
+
+@pytest.fixture(scope="module")
+def benchmark_sites(db_engine):
+    """
+    100k synthetic sites in a scratch table with a real POINT column and
+    SPATIAL index (create_all declares `location` as TEXT for portability).
+    """
+    rng = random.Random(42)
+    points = [(rng.uniform(-70, 70), rng.uniform(-180, 180)) for _ in range(SITE_COUNT)]
+    # Dense clusters, like popular dive regions, and some sites by the antimeridian
+    for lat, lng in [(37.9, 23.7), (27.2, 33.9), (-16.5, 179.8)]:
+        points += [(lat + rng.gauss(0, 0.3), lng + rng.gauss(0, 0.3)) for _ in range(2000)]
+    points = [(lat, (lng + 180) % 360 - 180) for lat, lng in points]
+
+    with db_engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}"))
+        connection.execute(text(f"""
+            CREATE TABLE {BENCHMARK_TABLE} (
+                id INT AUTO_INCREMENT PRIMARY KEY,
+                location POINT NOT NULL SRID 4326,
+                SPATIAL INDEX {BENCHMARK_INDEX} (location)
+            )
+        """))
+        for start in range(0, len(points), 1000):
+            values = ", ".join(
+                f"(ST_SRID(POINT({lng!r}, {lat!r}), 4326))" for lat, lng in points[start:start + 1000]
+            )
+            connection.execute(text(f"INSERT INTO {BENCHMARK_TABLE} (location) VALUES {values}"))
+        connection.execute(text(f"ANALYZE TABLE {BENCHMARK_TABLE}"))
+    yield db_engine
+    with db_engine.begin() as connection:
+        connection.execute(text(f"DROP TABLE IF EXISTS {BENCHMARK_TABLE}"))
+
+
+def _nearby_sql(lat, lng, radius_m, prefilter=True):
+    condition, params = radius_prefilter("location", lat, lng, radius_m) if prefilter else ("TRUE", {})
+    sql = f"""
+        SELECT id, ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) AS distance_m
+        FROM {BENCHMARK_TABLE}
+        WHERE {condition}
+        AND ST_Distance_Sphere(location, ST_SRID(POINT(:lng, :lat), 4326)) <= :radius_m
+        ORDER BY distance_m ASC, id ASC
+    """
+    return sql, {"lat": lat, "lng": lng, "radius_m": radius_m, **params}
+
+
+QUERY_POINTS = [
+    (37.9, 23.7, 2000),
+    (37.9, 23.7, 5000),
+    (27.2, 33.9, 50000),
+    (-16.5, 179.9, 100000),
+    (-16.5, -179.9, 100000),
+]
+
+
+@pytest.mark.spatial
+class TestSpatialIndexUsage:
+    def _explain(self, connection, sql, params):
+        return connection.execute(text(f"EXPLAIN {sql}"), params).mappings().first()
+
+    def test_prefilter_uses_spatial_index(self, benchmark_sites):
+        with benchmark_sites.connect() as connection:
+            plan = self._explain(connection, *_nearby_sql(37.9, 23.7, 5000))
+            assert plan["key"] == BENCHMARK_INDEX
+            assert plan["type"] == "range"
+            assert plan["rows"] < SITE_COUNT / 10
+
+    def test_distance_predicate_alone_scans_table(self, benchmark_sites):
+        with benchmark_sites.connect() as connection:
+            plan = self._explain(connection, *_nearby_sql(37.9, 23.7, 5000, prefilter=False))
+            assert plan["key"] is None
+            assert plan["type"] == "ALL"
+
+    @pytest.mark.parametrize("lat,lng,radius_m", QUERY_POINTS)
+    def test_same_results_as_full_scan(self, benchmark_sites, lat, lng, radius_m):
+        scan_sql, scan_params = _nearby_sql(lat, lng, radius_m, prefilter=False)
+        index_sql, index_params = _nearby_sql(lat, lng, radius_m)
+        with benchmark_sites.connect() as connection:
+            expected = connection.execute(text(scan_sql), scan_params).fetchall()
+            actual = connection.execute(text(index_sql), index_params).fetchall()
+        assert expected
+        assert [row.id for row in actual] == [row.id for row in expected]
+
+    @pytest.mark.benchmark
+    def test_benchmark_100k_sites(self, benchmark_sites):
+        """The index-backed query should be far cheaper than scanning every site."""
+        def timed(prefilter):
+            started = time.perf_counter()
+            with benchmark_sites.connect() as connection:
+                for lat, lng, radius_m in QUERY_POINTS:
+                    sql, params = _nearby_sql(lat, lng, radius_m, prefilter=prefilter)
+                    connection.execute(text(sql), params).fetchall()
+            return time.perf_counter() - started
+
+        scan_seconds = timed(prefilter=False)
+        index_seconds = timed(prefilter=True)
+
+        assert index_seconds < scan_seconds / 5
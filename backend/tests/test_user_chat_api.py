@@ -257,3 +257,40 @@ def test_leave_dm_should_fail(client, auth_headers, test_user_other, mock_master
         headers=auth_headers
     )
     assert leave_res.status_code == 400
+
+def test_unread_counts_across_rooms(client, auth_headers, db_session, test_user, test_user_other, test_admin_user, mock_master_key):
+    from datetime import datetime, timezone, timedelta
+    from app.routers.user_chat import get_unread_counts
+
+    dm_id = client.post(
+        "/api/v1/user-chat/rooms",
+        headers=auth_headers,
+        json={"is_group": False, "participant_ids": [test_user_other.id]}
+    ).json()["id"]
+    group_id = client.post(
+        "/api/v1/user-chat/rooms",
+        headers=auth_headers,
+        json={"is_group": True, "name": "Reef crew", "participant_ids": [test_user_other.id, test_admin_user.id]}
+    ).json()["id"]
+
+    # Backdate the memberships so the messages below are unread
+    an_hour_ago = datetime.now(timezone.utc) - timedelta(hours=1)
+    db_session.query(UserChatRoomMember).filter(UserChatRoomMember.user_id == test_user.id).update(
+        {"joined_at": an_hour_ago, "last_read_at": an_hour_ago}, synchronize_session=False
+    )
+    now = datetime.now(timezone.utc)
+    messages = [(dm_id, test_user_other.id)] * 2 + [(group_id, test_admin_user.id)] * 3 + [(group_id, test_user.id)]
+    for room_id, sender_id in messages:
+        db_session.add(UserChatMessage(room_id=room_id, sender_id=sender_id, content=b"x", created_at=now))
+    db_session.commit()
+
+    assert get_unread_counts(db_session, test_user.id) == {dm_id: 2, group_id: 3}
+    assert get_unread_counts(db_session, test_user.id, [dm_id]) == {dm_id: 2}
+    assert get_unread_counts(db_session, test_user.id, []) == {}
+
+    rooms = {r["id"]: r for r in client.get("/api/v1/user-chat/rooms", headers=auth_headers).json()}
+    assert rooms[dm_id]["unread_count"] == 2
+    assert rooms[group_id]["unread_count"] == 3
+
+    res = client.get("/api/v1/user-chat/unread-count", headers=auth_headers)
+    assert res.json() == {"unread_count": 5}
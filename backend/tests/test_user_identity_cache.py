@@ -0,0 +1,139 @@
+"""
+Tests for request-scoped JWT identity resolution and the user snapshot cache.
+"""
+
+from contextlib import contextmanager
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import event
+from starlette.requests import Request
+
+from app.auth import create_access_token, resolve_jwt_user, resolve_request_identity
+from app.services.user_identity_cache import (
+    clear_user_snapshots,
+    get_user_snapshot,
+)
+
+
+def _request(token=None):
+    headers = [(b"authorization", f"Bearer {token}".encode())] if token else []
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+@contextmanager
+def count_username_lookups(db_session):
+    """Count SELECTs that look a user up by username."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if "FROM users" in statement and "users.username =" in statement:
+            statements.append(statement)
+
+    engine = db_session.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
+@pytest.fixture(autouse=True)
+def empty_snapshot_cache():
+    clear_user_snapshots()
+    yield
+    clear_user_snapshots()
+
+
+class TestResolveJwtUser:
+    def test_loaded_once_per_request(self, db_session, test_user):
+        token = create_access_token(data={"sub": test_user.username})
+        request = _request(token)
+
+        with count_username_lookups(db_session) as lookups:
+            first = resolve_jwt_user(request, token, db_session)
+            second = resolve_jwt_user(request, token, db_session)
+
+        assert first is second is not None
+        assert first.id == test_user.id
+        assert len(lookups) == 1
+
+    def test_new_request_reloads(self, db_session, test_user):
+        token = create_access_token(data={"sub": test_user.username})
+
+        with count_username_lookups(db_session) as lookups:
+            resolve_jwt_user(_request(token), token, db_session)
+            resolve_jwt_user(_request(token), token, db_session)
+
+        assert len(lookups) == 2
+
+    def test_invalid_token(self, db_session):
+        assert resolve_jwt_user(_request("garbage"), "garbage", db_session) is None
+
+
+class TestResolveRequestIdentity:
+    def test_snapshot_served_from_cache(self, db_session, test_admin_user):
+        token = create_access_token(data={"sub": test_admin_user.username})
+        identity = resolve_request_identity(_request(token), db_session)
+
+        assert identity.id == test_admin_user.id
+        assert identity.is_admin
+
+        with count_username_lookups(db_session) as lookups:
+            cached = resolve_request_identity(_request(token), db_session)
+        assert cached == identity
+        assert lookups == []
+
+    def test_role_change_invalidates_snapshot(self, db_session, test_admin_user):
+        token = create_access_token(data={"sub": test_admin_user.username})
+        resolve_request_identity(_request(token), db_session)
+        assert get_user_snapshot(test_admin_user.username) is not None
+
+        test_admin_user.is_admin = False
+        db_session.commit()
+
+        assert get_user_snapshot(test_admin_user.username) is None
+        assert not resolve_request_identity(_request(token), db_session).is_admin
+
+    def test_snapshot_invalidated_on_commit_only(self, db_session, test_admin_user):
+        token = create_access_token(data={"sub": test_admin_user.username})
+        resolve_request_identity(_request(token), db_session)
+
+        test_admin_user.is_admin = False
+        db_session.flush()
+        assert get_user_snapshot(test_admin_user.username).is_admin
+
+        db_session.rollback()
+        assert get_user_snapshot(test_admin_user.username).is_admin
+
+        test_admin_user.is_moderator = True
+        db_session.flush()
+        db_session.commit()
+        assert get_user_snapshot(test_admin_user.username) is None
+
+    def test_disable_invalidates_snapshot(self, db_session, test_user):
+        token = create_access_token(data={"sub": test_user.username})
+        assert resolve_request_identity(_request(token), db_session).enabled
+
+        test_user.enabled = False
+        db_session.commit()
+
+        assert not resolve_request_identity(_request(token), db_session).enabled
+
+    def test_no_token_or_pat(self, db_session):
+        assert resolve_request_identity(_request(), db_session) is None
+        assert resolve_request_identity(_request("dm_pat_abcdef"), db_session) is None
+
+
+class TestRateLimitedEndpoint:
+    def test_admin_request_looks_user_up_once(self, client, db_session, test_admin_user, admin_headers):
+        with patch('app.limiter.is_localhost_ip', return_value=False), \
+                count_username_lookups(db_session) as lookups:
+            first = client.get("/api/v1/dive-sites/", headers=admin_headers)
+            second = client.get("/api/v1/dive-sites/", headers=admin_headers)
+
+        assert first.status_code == 200
+        assert second.status_code == 200
+        # One lookup per request for the endpoint's current user; the limiter's
+        # admin check is served from the snapshot cache
+        assert len(lookups) <= 2
@@ -1,4 +1,5 @@
 import types
+import pytest
 from fastapi import Request
 
 from app.utils import (
@@ -9,6 +10,8 @@ from app.utils import (
     format_ip_for_logging,
     classify_match_type,
     calculate_unified_phrase_aware_score,
+    QueryScorer,
+    ScoringCandidate,
 )
 
 
@@ -113,3 +116,45 @@ def test_calculate_unified_phrase_aware_score_basic_paths():
     assert s4 > 0.1
 
 
+# Scores produced by the original (pre-QueryScorer) implementation; the compiled
+# scorer must reproduce them exactly.
+SCORER_GOLDEN_CASES = [
+    ("nautalus", ("Nautilus Reef", "A reef", "Greece", "Crete", None, None), 0.7000000000000001),
+    ("blue hole", ("Bluehole Reef", None, "Bahamas", "Caribbean", None, None), 0.9454545454545455),
+    ("blu hol", ("Blue Hole Diving Site", None, None, None, None, ["Wreck Diving"]), 0.6),
+    ("wreck cave", ("Zenobia", "Famous wreck", "Cyprus", "Larnaca", None, ["Wreck", "Cave"]), 0.4470588235294118),
+    ("anavisos", ("Anavissos Reef", None, "Greece", "Attica", "Anavissos", None), 0.7529411764705882),
+    ("corl gardn", ("Coral Garden", "coral gardn", None, "Red Sea", None, None), 0.8818181818181818),
+    ("kassandra", ("Site One", None, "Greece", "Kassandra", None, None), 0.7470588235294118),
+]
+
+
+@pytest.mark.parametrize("use_rapidfuzz", [True, False])
+def test_query_scorer_matches_original_scores(monkeypatch, use_rapidfuzz):
+    import app.utils as utils_module
+    if not use_rapidfuzz:
+        monkeypatch.setattr(utils_module, "_rapidfuzz", None)
+    elif utils_module._rapidfuzz is None:
+        pytest.skip("rapidfuzz not installed")
+
+    for query, fields, expected in SCORER_GOLDEN_CASES:
+        assert QueryScorer(query).score(*fields) == expected
+        assert calculate_unified_phrase_aware_score(query, *fields) == expected
+
+
+def test_query_scorer_batch_reuses_query():
+    scorer = QueryScorer("corl gardn")
+    candidates = [
+        ScoringCandidate.build("Coral Garden", "coral gardn", None, "Red Sea"),
+        ScoringCandidate.build("Garden Reef"),
+        ScoringCandidate.build("Zenobia"),
+    ]
+    scores = scorer.score_batch(candidates)
+    assert scores[0] == 0.8818181818181818
+    assert scores == [
+        calculate_unified_phrase_aware_score("corl gardn", "Coral Garden", "coral gardn", None, "Red Sea"),
+        calculate_unified_phrase_aware_score("corl gardn", "Garden Reef"),
+        calculate_unified_phrase_aware_score("corl gardn", "Zenobia"),
+    ]
+
+
@@ -3,6 +3,7 @@ import time
 from fastapi import status
 from datetime import date
 from app.models import Dive, DiveRoute, DivingOrganization, ParsedDiveTrip, TripStatus, RouteType
+from app.services.view_counter import flush_view_counts
 
 class TestViewCountUpdatedAt:
     """
@@ -21,6 +22,7 @@ class TestViewCountUpdatedAt:
         response = client.get(f"/api/v1/dive-sites/{test_dive_site.id}")
         assert response.status_code == status.HTTP_200_OK
         
+        flush_view_counts(db_session)
         db_session.refresh(test_dive_site)
         assert test_dive_site.view_count == initial_view_count + 1
         assert test_dive_site.updated_at == initial_updated_at
@@ -36,6 +38,7 @@ class TestViewCountUpdatedAt:
         response = client.get(f"/api/v1/diving-centers/{test_diving_center.id}")
         assert response.status_code == status.HTTP_200_OK
         
+        flush_view_counts(db_session)
         db_session.refresh(test_diving_center)
         assert test_diving_center.view_count == initial_view_count + 1
         assert test_diving_center.updated_at == initial_updated_at
@@ -61,6 +64,7 @@ class TestViewCountUpdatedAt:
         response = client.get(f"/api/v1/dives/{dive.id}", headers=auth_headers)
         assert response.status_code == status.HTTP_200_OK
         
+        flush_view_counts(db_session)
         db_session.refresh(dive)
         assert dive.view_count == initial_view_count + 1
         assert dive.updated_at == initial_updated_at
@@ -98,6 +102,7 @@ class TestViewCountUpdatedAt:
         response = client.get(f"/api/v1/dive-routes/{route.id}")
         assert response.status_code == status.HTTP_200_OK
         
+        flush_view_counts(db_session)
         db_session.refresh(route)
         assert route.view_count == initial_view_count + 1
         assert route.updated_at == initial_updated_at
@@ -111,6 +116,7 @@ class TestViewCountUpdatedAt:
         response = client.get(f"/api/v1/diving-organizations/{test_diving_organization.id}")
         assert response.status_code == status.HTTP_200_OK
         
+        flush_view_counts(db_session)
         db_session.refresh(test_diving_organization)
         assert test_diving_organization.view_count == initial_view_count + 1
         assert test_diving_organization.updated_at == initial_updated_at
@@ -133,6 +139,7 @@ class TestViewCountUpdatedAt:
         response = client.get(f"/api/v1/newsletters/trips/{trip.id}", headers=auth_headers)
         assert response.status_code == status.HTTP_200_OK
         
+        flush_view_counts(db_session)
         db_session.refresh(trip)
         assert trip.view_count == initial_view_count + 1
         assert trip.updated_at == initial_updated_at
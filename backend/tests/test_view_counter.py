@@ -0,0 +1,67 @@
+"""
+Tests for buffered write-behind view counters.
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from app.models import DiveSite, DivingCenter
+from app.services.view_counter import (
+    clear_view_counts,
+    flush_view_counts,
+    pending_view_counts,
+    record_view,
+)
+
+
+@pytest.fixture(autouse=True)
+def empty_view_counts():
+    clear_view_counts()
+    yield
+    clear_view_counts()
+
+
+class TestViewCounter:
+    def test_views_are_buffered_until_flush(self, db_session, test_dive_site):
+        for _ in range(3):
+            record_view(DiveSite, test_dive_site.id)
+
+        db_session.refresh(test_dive_site)
+        assert test_dive_site.view_count == 0
+        assert pending_view_counts() == {DiveSite: {test_dive_site.id: 3}}
+
+        assert flush_view_counts(db_session) == 3
+        db_session.refresh(test_dive_site)
+        assert test_dive_site.view_count == 3
+        assert pending_view_counts() == {}
+
+    def test_flush_covers_several_models_and_keeps_updated_at(self, db_session, test_dive_site, test_diving_center):
+        updated_at = test_dive_site.updated_at
+        record_view(DiveSite, test_dive_site.id)
+        record_view(DivingCenter, test_diving_center.id, count=2)
+
+        assert flush_view_counts(db_session) == 3
+        db_session.refresh(test_dive_site)
+        db_session.refresh(test_diving_center)
+        assert test_dive_site.view_count == 1
+        assert test_diving_center.view_count == 2
+        assert test_dive_site.updated_at == updated_at
+
+    def test_failed_flush_keeps_deltas(self, db_session, test_dive_site):
+        record_view(DiveSite, test_dive_site.id)
+
+        with patch("app.services.view_counter._apply_deltas", side_effect=RuntimeError("db down")):
+            assert flush_view_counts(db_session) == 0
+        record_view(DiveSite, test_dive_site.id)
+
+        assert pending_view_counts() == {DiveSite: {test_dive_site.id: 2}}
+        assert flush_view_counts(db_session) == 2
+        db_session.refresh(test_dive_site)
+        assert test_dive_site.view_count == 2
+
+    def test_detail_view_is_counted(self, client, db_session, test_dive_site):
+        response = client.get(f"/api/v1/dive-sites/{test_dive_site.id}")
+
+        assert response.status_code == 200
+        assert pending_view_counts() == {DiveSite: {test_dive_site.id: 1}}
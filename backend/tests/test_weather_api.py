@@ -5,7 +5,7 @@ Tests the /api/v1/weather/wind endpoint including jitter_factor parameter.
 """
 
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import patch, MagicMock, AsyncMock
 from datetime import datetime, timedelta
 from fastapi.testclient import TestClient
 
@@ -20,7 +20,7 @@ class TestWeatherAPI:
         """Create test client."""
         return TestClient(app)
 
-    @patch('app.routers.weather.fetch_wind_data_grid')
+    @patch('app.routers.weather.fetch_wind_data_grid_async', new_callable=AsyncMock)
     def test_get_wind_data_with_jitter_factor(self, mock_fetch_grid, client):
         """Test wind data endpoint with jitter_factor parameter."""
         mock_fetch_grid.return_value = [
@@ -53,12 +53,12 @@ class TestWeatherAPI:
         
         # Verify jitter_factor was passed to service
         mock_fetch_grid.assert_called_once()
-        # Function is called with positional args: fetch_wind_data_grid(bounds, zoom_level, target_datetime, jitter_factor)
+        # Function is called with positional args: fetch_wind_data_grid_async(bounds, zoom_level, target_datetime, jitter_factor)
         call_args = mock_fetch_grid.call_args
         # jitter_factor is 4th positional argument
         assert len(call_args.args) >= 4 and call_args.args[3] == 5
 
-    @patch('app.routers.weather.fetch_wind_data_grid')
+    @patch('app.routers.weather.fetch_wind_data_grid_async', new_callable=AsyncMock)
     def test_get_wind_data_default_jitter_factor(self, mock_fetch_grid, client):
         """Test that default jitter_factor (5) is used when not specified."""
         mock_fetch_grid.return_value = []
@@ -83,7 +83,7 @@ class TestWeatherAPI:
         # The router passes jitter_factor=5 as default when not specified
         # We verify the endpoint works correctly with default value
 
-    @patch('app.routers.weather.fetch_wind_data_grid')
+    @patch('app.routers.weather.fetch_wind_data_grid_async', new_callable=AsyncMock)
     def test_get_wind_data_jitter_factor_max(self, mock_fetch_grid, client):
         """Test jitter_factor at maximum value (10)."""
         mock_fetch_grid.return_value = []
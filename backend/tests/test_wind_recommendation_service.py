@@ -1,5 +1,13 @@
+import time
+
+import numpy as np
 import pytest
-from app.services.wind_recommendation_service import calculate_wind_suitability
+from app.services.wind_recommendation_service import (
+    SUITABILITY_CODES,
+    SUITABILITY_LEVELS,
+    calculate_wind_suitability,
+    calculate_wind_suitability_batch,
+)
 
 class TestWindRecommendationService:
     def test_calculate_wind_suitability_with_marine_data_high_waves(self):
@@ -49,3 +57,116 @@ class TestWindRecommendationService:
             wave_period=None
         )
         assert result["suitability"] == "good"
+
+
+class TestWindSuitabilityBatch:
+    """The vectorized evaluation must agree with calculate_wind_suitability."""
+
+    @staticmethod
+    def _random_conditions(count, seed=42):
+        rng = np.random.default_rng(seed)
+        shore = rng.uniform(0, 360, count)
+        shore[rng.random(count) < 0.2] = np.nan  # sites without shore direction
+        gusts = rng.uniform(0, 20, count)
+        gusts[rng.random(count) < 0.1] = np.nan
+        wave_height = rng.uniform(0, 2.0, count)
+        wave_height[rng.random(count) < 0.2] = np.nan
+        wave_period = rng.uniform(2, 12, count)
+        wave_period[rng.random(count) < 0.2] = np.nan
+        return {
+            "wind_direction": rng.uniform(0, 360, count),
+            "wind_speed": rng.uniform(0, 14, count),
+            "shore_direction": shore,
+            "wind_gusts": gusts,
+            "wave_height": wave_height,
+            "wave_period": wave_period,
+        }
+
+    @staticmethod
+    def _scalar(conditions, i):
+        def value(name):
+            v = conditions[name][i]
+            return None if np.isnan(v) else float(v)
+
+        return calculate_wind_suitability(
+            wind_direction=value("wind_direction"),
+            wind_speed=value("wind_speed"),
+            shore_direction=value("shore_direction"),
+            wind_gusts=value("wind_gusts"),
+            wave_height=value("wave_height"),
+            wave_period=value("wave_period"),
+        )["suitability"]
+
+    def test_batch_matches_single_site_evaluation(self):
+        conditions = self._random_conditions(5000)
+        codes = calculate_wind_suitability_batch(**conditions)
+
+        assert codes.shape == (5000,)
+        for i, code in enumerate(codes.tolist()):
+            assert SUITABILITY_LEVELS[code] == self._scalar(conditions, i), i
+
+    @pytest.mark.parametrize("wind_direction,wind_speed,shore_direction,wind_gusts,wave_height,wave_period", [
+        (180, 2.0, 0, None, 1.6, 5.0),     # high waves override good wind
+        (180, 2.0, 0, None, 0.6, 9.0),     # surge upgrades caution to difficult
+        (180, 2.0, 0, None, 0.4, 9.0),     # surge on small waves -> caution
+        (0, 5.0, 0, None, None, None),     # onshore light wind -> caution
+        (90, 7.0, 0, None, None, None),    # somewhat unfavorable moderate wind
+        (180, 8.0, 0, 14.0, None, None),   # strong gusts upgrade difficult -> avoid
+        (180, 5.0, None, 14.0, None, None),  # no shore, strong gusts
+        (180, 11.0, None, None, None, None),  # no shore, very strong wind
+        (350, 5.0, 10, None, None, None),  # 360° wrap-around
+    ])
+    def test_batch_edge_cases(self, wind_direction, wind_speed, shore_direction, wind_gusts, wave_height, wave_period):
+        expected = calculate_wind_suitability(
+            wind_direction=wind_direction,
+            wind_speed=wind_speed,
+            shore_direction=shore_direction,
+            wind_gusts=wind_gusts,
+            wave_height=wave_height,
+            wave_period=wave_period,
+        )["suitability"]
+        codes = calculate_wind_suitability_batch(
+            wind_direction=wind_direction,
+            wind_speed=wind_speed,
+            shore_direction=[shore_direction],
+            wind_gusts=wind_gusts,
+            wave_height=wave_height,
+            wave_period=wave_period,
+        )
+        assert SUITABILITY_LEVELS[codes[0]] == expected
+
+    def test_batch_broadcasts_one_forecast_over_many_sites(self):
+        codes = calculate_wind_suitability_batch(
+            wind_direction=180, wind_speed=5.0, shore_direction=[0, 180, None]
+        )
+        assert [SUITABILITY_LEVELS[c] for c in codes] == ["good", "caution", "good"]
+
+    def test_batch_missing_wind_is_unknown(self):
+        codes = calculate_wind_suitability_batch(
+            wind_direction=[180, None], wind_speed=[None, 5.0], shore_direction=[0, 0], wave_height=[1.6, 1.6]
+        )
+        assert codes.tolist() == [SUITABILITY_CODES["unknown"]] * 2
+
+    def test_batch_converts_wind_speed_unit(self):
+        codes = calculate_wind_suitability_batch(
+            wind_direction=180, wind_speed=[10.0, 25.0], shore_direction=[0, 0], wind_speed_unit="knots"
+        )
+        assert [SUITABILITY_LEVELS[c] for c in codes] == ["good", "avoid"]
+
+    @pytest.mark.benchmark
+    def test_benchmark_10k_sites(self):
+        """One vectorized pass over 10k sites should be far cheaper than the per-site loop."""
+        count = 10_000
+        conditions = self._random_conditions(count, seed=7)
+
+        started = time.perf_counter()
+        codes = calculate_wind_suitability_batch(**conditions)
+        batch_seconds = time.perf_counter() - started
+
+        started = time.perf_counter()
+        for i in range(count):
+            self._scalar(conditions, i)
+        loop_seconds = time.perf_counter() - started
+
+        assert len(codes) == count
+        assert batch_seconds < loop_seconds / 5
@@ -0,0 +1,199 @@
+"""
+Tests for precomputed wind suitability (dive_site_wind_suitability).
+
+Covers the refresher and the SQL-side wind filter in get_dive_sites.
+"""
+
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+from fastapi import status
+
+from app.models import DiveSite, DiveSiteWindSuitability
+from app.services import wind_suitability_service
+from app.services.wind_suitability_service import (
+    forecast_hour,
+    is_forecast_hour_materialized,
+    refresh_due_hours,
+    refresh_forecast_hour,
+)
+
+
+def _make_sites(db_session):
+    east = DiveSite(name="East Shore", latitude=37.7, longitude=24.0, shore_direction=90.0)
+    west = DiveSite(name="West Shore", latitude=37.8, longitude=24.1, shore_direction=270.0)
+    no_coords = DiveSite(name="No Coordinates")
+    db_session.add_all([east, west, no_coords])
+    db_session.commit()
+    return east, west, no_coords
+
+
+def _materialize(db_session, hour, suitability_by_site, computed_at=None):
+    for site, suitability in suitability_by_site.items():
+        db_session.add(DiveSiteWindSuitability(
+            dive_site_id=site.id,
+            forecast_hour=hour,
+            suitability=suitability,
+            computed_at=computed_at or datetime.utcnow()
+        ))
+    db_session.commit()
+
+
+class TestRefreshForecastHour:
+    @patch('app.services.wind_suitability_service.fetch_wind_data_batch')
+    def test_refresh_writes_one_row_per_site_with_coordinates(self, mock_batch, db_session):
+        east, west, no_coords = _make_sites(db_session)
+        mock_batch.side_effect = lambda locations, hour, max_fetch_cells: {
+            location: {"wind_direction_10m": 270.0, "wind_speed_10m": 5.0} for location in locations
+        }
+        hour = forecast_hour(datetime.now())
+
+        assert refresh_forecast_hour(db_session, hour) == 2
+
+        rows = {row.dive_site_id: row.suitability for row in db_session.query(DiveSiteWindSuitability).all()}
+        assert rows == {east.id: "good", west.id: "caution"}
+        assert is_forecast_hour_materialized(db_session, hour)
+        # Uncached cells are fetched, within a bound
+        assert mock_batch.call_args.kwargs["max_fetch_cells"] == wind_suitability_service._MAX_FETCH_CELLS_PER_HOUR
+
+    @patch('app.services.wind_suitability_service.fetch_wind_data_batch')
+    def test_refresh_replaces_previous_rows_and_marks_missing_wind_unknown(self, mock_batch, db_session):
+        east, west, _ = _make_sites(db_session)
+        hour = forecast_hour(datetime.now())
+        _materialize(db_session, hour, {east: "avoid", west: "avoid"})
+        mock_batch.side_effect = lambda locations, hour, max_fetch_cells: {location: None for location in locations}
+
+        refresh_forecast_hour(db_session, hour)
+
+        rows = {row.dive_site_id: row.suitability for row in db_session.query(DiveSiteWindSuitability).all()}
+        assert rows == {east.id: "unknown", west.id: "unknown"}
+        assert not is_forecast_hour_materialized(db_session, hour)
+
+    @patch('app.services.wind_suitability_service.fetch_wind_data_batch')
+    def test_refresh_skips_unlisted_sites_and_drops_their_rows(self, mock_batch, db_session):
+        east, west, _ = _make_sites(db_session)
+        hour = forecast_hour(datetime.now())
+        _materialize(db_session, hour, {east: "avoid", west: "avoid"}, computed_at=datetime.utcnow() - timedelta(minutes=20))
+        west.status = 'pending'
+        db_session.commit()
+        mock_batch.side_effect = lambda locations, hour, max_fetch_cells: {
+            location: {"wind_direction_10m": 270.0, "wind_speed_10m": 5.0} for location in locations
+        }
+
+        assert refresh_forecast_hour(db_session, hour) == 1
+
+        rows = {row.dive_site_id: row.suitability for row in db_session.query(DiveSiteWindSuitability).all()}
+        assert rows == {east.id: "good"}
+        assert mock_batch.call_args[0][0] == [(37.7, 24.0)]
+
+    def test_stale_rows_are_not_materialized(self, db_session):
+        east, west, _ = _make_sites(db_session)
+        hour = forecast_hour(datetime.now())
+        _materialize(db_session, hour, {east: "good"}, computed_at=datetime.utcnow() - timedelta(hours=2))
+
+        assert not is_forecast_hour_materialized(db_session, hour)
+
+    def test_incomplete_hours_are_not_materialized(self, db_session):
+        east, west, _ = _make_sites(db_session)
+        hour = forecast_hour(datetime.now())
+
+        # A listed site without a row
+        _materialize(db_session, hour, {east: "good"})
+        assert not is_forecast_hour_materialized(db_session, hour)
+
+        _materialize(db_session, hour, {west: "unknown"})
+        assert not is_forecast_hour_materialized(db_session, hour)
+
+    @patch('app.services.wind_suitability_service.refresh_forecast_hour')
+    def test_refresh_due_hours_skips_fresh_hours_and_includes_requested(self, mock_refresh, db_session, monkeypatch):
+        east, west, _ = _make_sites(db_session)
+        monkeypatch.setattr(wind_suitability_service, '_requested_hours', {})
+        current = forecast_hour(datetime.now())
+        requested = current + timedelta(hours=20)
+        _materialize(db_session, current, {east: "good", west: "caution"})
+        # Fresh but incomplete
+        _materialize(db_session, current + timedelta(hours=2), {east: "good", west: "unknown"})
+
+        wind_suitability_service.note_forecast_hour_requested(requested)
+        refresh_due_hours(db_session)
+
+        refreshed = [call.args[1] for call in mock_refresh.call_args_list]
+        assert current not in refreshed
+        assert current + timedelta(hours=1) in refreshed
+        assert current + timedelta(hours=2) in refreshed
+        assert requested in refreshed
+
+
+class TestMaterializedWindFilter:
+    @patch('app.routers.dive_sites.fetch_wind_data_single_point')
+    def test_filter_uses_precomputed_rows(self, mock_fetch_wind, client, db_session):
+        east, west, _ = _make_sites(db_session)
+        _materialize(db_session, forecast_hour(datetime.now()), {east: "good", west: "avoid"})
+
+        response = client.get("/api/v1/dive-sites/", params={"wind_suitability": "good"})
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert [item["name"] for item in data["items"]] == ["East Shore"]
+        assert data["total"] == 1
+        mock_fetch_wind.assert_not_called()
+
+    @patch('app.routers.dive_sites.fetch_wind_data_single_point')
+    def test_filter_include_unknown_covers_sites_without_rows(self, mock_fetch_wind, client, db_session):
+        east, west, _ = _make_sites(db_session)
+        _materialize(db_session, forecast_hour(datetime.now()), {east: "good", west: "avoid"})
+
+        response = client.get(
+            "/api/v1/dive-sites/",
+            params={"wind_suitability": "caution", "include_unknown_wind": True}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        names = {item["name"] for item in response.json()["items"]}
+        assert names == {"East Shore", "No Coordinates"}
+        mock_fetch_wind.assert_not_called()
+
+    @patch('app.routers.dive_sites.fetch_wind_data_single_point')
+    def test_filter_paginates_in_sql(self, mock_fetch_wind, client, db_session):
+        hour = forecast_hour(datetime.now())
+        sites = [DiveSite(name=f"Site {i:02d}", latitude=37.0, longitude=24.0, shore_direction=90.0) for i in range(30)]
+        db_session.add_all(sites)
+        db_session.commit()
+        _materialize(db_session, hour, {site: ("good" if i % 2 == 0 else "avoid") for i, site in enumerate(sites)})
+
+        response = client.get(
+            "/api/v1/dive-sites/",
+            params={"wind_suitability": "good", "page": 2, "page_size": 10, "sort_by": "name"}
+        )
+
+        assert response.status_code == status.HTTP_200_OK
+        data = response.json()
+        assert data["total"] == 15
+        assert [item["name"] for item in data["items"]] == [f"Site {i:02d}" for i in range(20, 30, 2)]
+        mock_fetch_wind.assert_not_called()
+
+    @patch('app.routers.dive_sites.fetch_wind_data_single_point')
+    def test_unknown_rows_fall_back_to_live_wind(self, mock_fetch_wind, client, db_session):
+        east, west, _ = _make_sites(db_session)
+        # West's cell could not be fetched by the refresher
+        _materialize(db_session, forecast_hour(datetime.now()), {east: "avoid", west: "unknown"})
+        mock_fetch_wind.return_value = {"wind_direction_10m": 270.0, "wind_speed_10m": 5.0}
+
+        response = client.get("/api/v1/dive-sites/", params={"wind_suitability": "good"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["name"] for item in response.json()["items"]] == ["East Shore"]
+        assert mock_fetch_wind.called
+
+    @patch('app.routers.dive_sites.fetch_wind_data_single_point')
+    def test_unmaterialized_hour_falls_back_and_requests_refresh(self, mock_fetch_wind, client, db_session, monkeypatch):
+        monkeypatch.setattr(wind_suitability_service, '_requested_hours', {})
+        _make_sites(db_session)
+        mock_fetch_wind.return_value = {"wind_direction_10m": 270.0, "wind_speed_10m": 5.0}
+
+        response = client.get("/api/v1/dive-sites/", params={"wind_suitability": "good"})
+
+        assert response.status_code == status.HTTP_200_OK
+        assert [item["name"] for item in response.json()["items"]] == ["East Shore"]
+        assert mock_fetch_wind.called
+        assert forecast_hour(datetime.now()) in wind_suitability_service._requested_hours
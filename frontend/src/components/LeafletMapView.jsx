@@ -123,6 +123,24 @@ L.Icon.Default.mergeOptions({
   shadowUrl: 'https://cdnjs.cloudflare.com/ajax/libs/leaflet/1.7.1/images/marker-shadow.png',
 });
 
+// Cluster bubble, shared by client-side clusters and the server-side dive site clusters
+const createClusterIcon = childCount => {
+  let c = ' marker-cluster-';
+  if (childCount < 10) {
+    c += 'small';
+  } else if (childCount < 100) {
+    c += 'medium';
+  } else {
+    c += 'large';
+  }
+
+  return L.divIcon({
+    html: `<div><span>${childCount}</span></div>`,
+    className: `marker-cluster${c}`,
+    iconSize: new L.Point(40, 40),
+  });
+};
+
 // Component to handle clustering and auto-fit
 // Component to display real-time map metadata
 const MapMetadata = ({ onMetadataChange }) => {
@@ -359,23 +377,7 @@ const MapContent = ({ markers, selectedEntityType, viewport, onViewportChange, r
         spiderfyOnMaxZoom: true,
         showCoverageOnHover: false,
         zoomToBoundsOnClick: true,
-        iconCreateFunction: cluster => {
-          const childCount = cluster.getChildCount();
-          let c = ' marker-cluster-';
-          if (childCount < 10) {
-            c += 'small';
-          } else if (childCount < 100) {
-            c += 'medium';
-          } else {
-            c += 'large';
-          }
-
-          return L.divIcon({
-            html: `<div><span>${childCount}</span></div>`,
-            className: `marker-cluster${c}`,
-            iconSize: new L.Point(40, 40),
-          });
-        },
+        iconCreateFunction: cluster => createClusterIcon(cluster.getChildCount()),
       });
 
       // Helper function to create a marker with popup
@@ -576,6 +578,17 @@ const MapContent = ({ markers, selectedEntityType, viewport, onViewportChange, r
 
       // Add markers based on clustering threshold
       markers.forEach(marker => {
+        // Server-side clusters are already aggregated: no popup, zoom in on click
+        if (marker.entityType === 'dive_site_cluster') {
+          const clusterMarker = L.marker(marker.position, { icon: marker.icon });
+          clusterMarker.on('click', () => {
+            map.setView(marker.position, Math.min(map.getZoom() + 2, map.getMaxZoom()));
+          });
+          map.addLayer(clusterMarker);
+          individualMarkersRef.current.push(clusterMarker);
+          return;
+        }
+
         const leafletMarker = createMarker(marker);
         if (!leafletMarker) return;
 
@@ -1195,6 +1208,19 @@ const LeafletMapView = ({
       });
     }
 
+    // Server-side dive site clusters (low zoom without filters)
+    if (selectedEntityType === 'dive-sites') {
+      (data.dive_sites?.clusters || []).forEach(cluster => {
+        allMarkers.push({
+          id: `dive-site-cluster-${cluster.id}`,
+          position: [cluster.latitude, cluster.longitude],
+          entityType: 'dive_site_cluster',
+          clusterCount: cluster.count,
+          icon: createClusterIcon(cluster.count),
+        });
+      });
+    }
+
     // Process diving centers
     if (divingCentersArr.length > 0 && selectedEntityType === 'diving-centers') {
       divingCentersArr.forEach(center => {
@@ -1,11 +1,12 @@
 import { format } from 'date-fns';
 import { MessageSquare, ExternalLink, Loader2 } from 'lucide-react';
 import React, { useState, useRef, useMemo } from 'react';
-import { useQuery } from 'react-query';
+import { useQuery, useQueryClient } from 'react-query';
 import { Link, useNavigate } from 'react-router-dom';
 
 import { getChatRooms, getTotalUnreadChatMessages } from '../../api';
 import { useAuth } from '../../contexts/AuthContext';
+import useChatEvents from '../../hooks/useChatEvents';
 import useClickOutside from '../../hooks/useClickOutside';
 import { parseUTCDate } from '../../utils/dateHelpers';
 import Avatar from '../Avatar';
@@ -16,10 +17,22 @@ const ChatDropdown = () => {
   const [showDropdown, setShowDropdown] = useState(false);
   const dropdownRef = useRef(null);
 
+  const queryClient = useQueryClient();
+
+  // Refresh the badge and recent rooms when the server pushes a change
+  const pushConnected = useChatEvents(event => {
+    if (event.type === 'unread' || event.type === 'resync') {
+      queryClient.invalidateQueries('unreadChatCount');
+    }
+    if (event.type === 'message' || event.type === 'resync') {
+      queryClient.invalidateQueries('chat-rooms-dropdown');
+    }
+  }, !!user);
+
   // 1. Total Unread Count for the Badge
   const { data: unreadChatData } = useQuery('unreadChatCount', getTotalUnreadChatMessages, {
     enabled: !!user,
-    refetchInterval: 30000, // Check every 30 seconds
+    refetchInterval: pushConnected ? 300000 : 30000, // Check every 30 seconds without push
   });
 
   const unreadChatCount = unreadChatData?.unread_count || 0;
@@ -14,6 +14,7 @@ import {
   editUserChatMessage,
   markChatRoomRead,
 } from '../../api';
+import useChatEvents from '../../hooks/useChatEvents';
 import { parseUTCDate } from '../../utils/dateHelpers';
 import Avatar from '../Avatar';
 
@@ -83,12 +84,19 @@ const ChatRoom = ({ roomId, room, currentUserId, onToggleSettings, onBack }) =>
   const isCustomer = room?.members?.some(m => m.user_id === currentUserId);
   const canPost = !room?.is_broadcast || !isCustomer;
 
-  // 1. Initial Load & Optimized Polling
-  const { isFetching } = useQuery(
+  // 1. Initial Load, then sync when the server pushes a change (polling while disconnected)
+  const refetchRef = useRef(null);
+  const pushConnected = useChatEvents(event => {
+    if (event.type === 'resync' || (event.type === 'message' && event.room_id === roomId)) {
+      refetchRef.current?.();
+    }
+  }, !!roomId);
+
+  const { isFetching, refetch } = useQuery(
     ['chat-messages', roomId, lastSyncTime.current],
     () => getChatMessages(roomId, lastSyncTime.current),
     {
-      refetchInterval: 3000, // Poll every 3 seconds
+      refetchInterval: pushConnected ? 60000 : 3000, // Poll every 3 seconds without push
       enabled: !!roomId,
       onSuccess: newMessages => {
         if (newMessages.length > 0) {
@@ -126,6 +134,8 @@ const ChatRoom = ({ roomId, room, currentUserId, onToggleSettings, onBack }) =>
     }
   );
 
+  refetchRef.current = refetch;
+
   // 2. Scroll to bottom on new messages
   useEffect(() => {
     if (scrollRef.current) {
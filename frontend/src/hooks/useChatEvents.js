@@ -0,0 +1,128 @@
+import { useEffect, useRef, useState } from 'react';
+
+import api from '../api';
+
+// One event stream per tab, shared by every component listening to it.
+// EventSource cannot send the Authorization header, so the stream is read
+// with fetch.
+const listeners = new Set();
+const statusListeners = new Set();
+let controller = null;
+let connected = false;
+let retryTimer = null;
+
+const RETRY_DELAY_MS = 5000;
+
+const setConnected = value => {
+  if (connected !== value) {
+    connected = value;
+    statusListeners.forEach(listener => listener(value));
+  }
+};
+
+const dispatch = frame => {
+  let eventType = 'message';
+  let data = '';
+  frame.split('\n').forEach(line => {
+    if (line.startsWith('event:')) eventType = line.slice(6).trim();
+    else if (line.startsWith('data:')) data += line.slice(5).trim();
+  });
+  if (!data) return;
+  try {
+    const event = { ...JSON.parse(data), type: eventType };
+    listeners.forEach(listener => listener(event));
+  } catch (error) {
+    console.error('Invalid chat event:', error);
+  }
+};
+
+const connect = async () => {
+  const token = localStorage.getItem('access_token');
+  if (!token || controller) return;
+
+  controller = new AbortController();
+  const { signal } = controller;
+  try {
+    const response = await fetch(`${api.defaults.baseURL}/api/v1/user-chat/events`, {
+      headers: { Authorization: `Bearer ${token}`, Accept: 'text/event-stream' },
+      credentials: 'include',
+      signal,
+    });
+    if (!response.ok || !response.body) throw new Error(`HTTP ${response.status}`);
+
+    setConnected(true);
+    // Events may have been missed while disconnected
+    listeners.forEach(listener => listener({ type: 'resync' }));
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+    for (;;) {
+      const { value, done } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary > -1) {
+        dispatch(buffer.slice(0, boundary));
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+      }
+    }
+  } catch (error) {
+    if (signal.aborted) return;
+  } finally {
+    if (controller?.signal === signal) {
+      controller = null;
+      setConnected(false);
+      // Reconnect while someone is listening; callers fall back to polling meanwhile
+      if (listeners.size > 0 && !signal.aborted) {
+        retryTimer = setTimeout(() => {
+          retryTimer = null;
+          connect();
+        }, RETRY_DELAY_MS);
+      }
+    }
+  }
+};
+
+const disconnect = () => {
+  clearTimeout(retryTimer);
+  retryTimer = null;
+  if (controller) {
+    controller.abort();
+    controller = null;
+  }
+  setConnected(false);
+};
+
+/**
+ * Subscribe to pushed buddy chat events ("message", "unread", "resync").
+ * @param {Function} onEvent - Called with each event
+ * @param {boolean} enabled - Whether to listen (e.g. only when logged in)
+ * @returns {boolean} Whether the stream is connected; poll as a fallback when it is not
+ */
+const useChatEvents = (onEvent, enabled = true) => {
+  const [isConnected, setIsConnected] = useState(connected);
+  const handlerRef = useRef(onEvent);
+  handlerRef.current = onEvent;
+
+  useEffect(() => {
+    if (!enabled) return undefined;
+
+    const listener = event => handlerRef.current(event);
+    listeners.add(listener);
+    statusListeners.add(setIsConnected);
+    setIsConnected(connected);
+    if (!controller && !retryTimer) connect();
+
+    return () => {
+      listeners.delete(listener);
+      statusListeners.delete(setIsConnected);
+      if (listeners.size === 0) disconnect();
+    };
+  }, [enabled]);
+
+  return isConnected;
+};
+
+export default useChatEvents;
@@ -3,6 +3,34 @@ import { useQuery } from 'react-query';
 
 import api from '../api';
 
+// Below this zoom, unfiltered dive sites come pre-clustered from the server
+export const SERVER_CLUSTER_MAX_ZOOM = 8;
+
+const DIVE_SITE_FILTER_KEYS = [
+  'search',
+  'name',
+  'difficulty_code',
+  'wind_suitability',
+  'min_rating',
+  'tag_ids',
+  'country',
+  'region',
+  'exclude_unspecified_difficulty',
+];
+
+// Server clusters only cover all approved sites, so any filter falls back to the site list
+const shouldUseServerClusters = (zoom, filters, entityType, windDateTime) =>
+  entityType === 'dive-sites' &&
+  zoom < SERVER_CLUSTER_MAX_ZOOM &&
+  !windDateTime &&
+  !Object.entries(filters || {}).some(
+    ([key, value]) =>
+      DIVE_SITE_FILTER_KEYS.includes(key) &&
+      value &&
+      value !== '' &&
+      !(Array.isArray(value) && value.length === 0)
+  );
+
 /**
  * Hook for viewport-based data loading with performance optimization
  * Loads only data visible in the current map viewport
@@ -65,6 +93,11 @@ export const useViewportData = (viewport, filters, selectedEntityType, windDateT
     // Include windDateTime in cache key if provided (for wind suitability filtering)
     const datetimeKey = windDateTime ? `-${windDateTime}` : '';
 
+    // Server clusters differ per integer zoom level
+    if (shouldUseServerClusters(zoom, filters, entityType, windDateTime)) {
+      detailLevel = `clusters-${Math.floor(zoom)}`;
+    }
+
     // For world view (zoom < 4) or dive-trips (no bounds filtering), don't include bounds in cache key
     if (zoom < 4 || !bounds || entityType === 'dive-trips') {
       return `${entityType}-${detailLevel}-${JSON.stringify(filters)}${datetimeKey}`;
@@ -218,8 +251,31 @@ export const useViewportData = (viewport, filters, selectedEntityType, windDateT
           }
         }
 
-        // Fetch dive sites if needed
-        if (entityType === 'dive-sites') {
+        // Fetch pre-clustered dive sites at low zoom
+        if (shouldUseServerClusters(zoom, filters, entityType, windDateTimeParam)) {
+          const clustersParams = new URLSearchParams();
+          clustersParams.append('zoom', Math.floor(zoom).toString());
+
+          if (zoom >= 4 && bounds) {
+            clustersParams.append('north', Math.min(90, bounds.north).toString());
+            clustersParams.append('south', Math.max(-90, bounds.south).toString());
+            clustersParams.append('east', Math.min(180, bounds.east).toString());
+            clustersParams.append('west', Math.max(-180, bounds.west).toString());
+          }
+
+          const clustersResponse = await api.get(
+            `/api/v1/dive-sites/clusters?${clustersParams.toString()}`
+          );
+          const clusters = clustersResponse.data.clusters || [];
+
+          // Lone sites are plotted as regular markers (with their popup details), the rest as cluster markers
+          results.dive_sites = {
+            items: clusters.filter(cluster => cluster.count === 1),
+            clusters: clusters.filter(cluster => cluster.count > 1),
+            total: clustersResponse.data.total,
+          };
+        } else if (entityType === 'dive-sites') {
+          // Fetch dive sites if needed
           const diveSitesParams = new URLSearchParams();
           diveSitesParams.append('page_size', '1000'); // Max allowed page size
           diveSitesParams.append('page', '1');
@@ -516,7 +572,16 @@ export const useViewportData = (viewport, filters, selectedEntityType, windDateT
 
     // Include detail_level and zoom threshold in query key so React Query refetches when crossing thresholds
     // Use Math.floor(zoom) to group zoom levels into thresholds (0-3, 4-7, 8-9, 10+)
-    const zoomThreshold = zoom < 4 ? 0 : zoom < 8 ? 4 : zoom < 10 ? 8 : 10;
+    // Server clusters change with every zoom level, so key on the integer zoom instead
+    const zoomThreshold = shouldUseServerClusters(zoom, filters, selectedEntityType, windDateTime)
+      ? `clusters-${Math.floor(zoom)}`
+      : zoom < 4
+        ? 0
+        : zoom < 8
+          ? 4
+          : zoom < 10
+            ? 8
+            : 10;
 
     // Calculate viewport center for movement detection
     // Round center to create "buckets" - refetch when center moves to a new bucket
@@ -600,9 +665,9 @@ export const useViewportData = (viewport, filters, selectedEntityType, windDateT
       // Calculate points based on selected entity type and filter for valid coordinates
       let totalPoints = 0;
       if (selectedEntityType === 'dive-sites') {
-        totalPoints = (data?.dive_sites?.items || []).filter(
-          site => site.latitude && site.longitude
-        ).length;
+        totalPoints =
+          (data?.dive_sites?.items || []).filter(site => site.latitude && site.longitude).length +
+          (data?.dive_sites?.clusters || []).reduce((sum, cluster) => sum + cluster.count, 0);
       } else if (selectedEntityType === 'diving-centers') {
         totalPoints = (data?.diving_centers?.items || []).filter(
           center => center.latitude && center.longitude
@@ -40,7 +40,6 @@ import Fullscreen from 'yet-another-react-lightbox/plugins/fullscreen';
 import Slideshow from 'yet-another-react-lightbox/plugins/slideshow';
 import Thumbnails from 'yet-another-react-lightbox/plugins/thumbnails';
 
-import api from '../api';
 import Breadcrumbs from '../components/Breadcrumbs';
 import DiveInfoGrid from '../components/DiveInfoGrid';
 import {
@@ -66,6 +65,7 @@ import { useResponsive } from '../hooks/useResponsive';
 import {
   getDive,
   getDiveMedia,
+  getDiveProfile,
   deleteDive,
   deleteDiveMedia,
   removeBuddy,
@@ -293,16 +293,16 @@ const DiveDetail = () => {
     }
   }, [dive?.id, dive?.dive_site?.id, dive?.selected_route?.id]); // More specific dependencies
 
-  // Fetch dive profile data
+  // Fetch dive profile data, downsampled to what the chart can show
+  // (the full view page loads every sample)
+  const profileMaxPoints = isMobile ? 500 : 2000;
   const {
     data: profileData,
     isLoading: profileLoading,
     error: profileError,
   } = useQuery(
-    ['dive-profile', id],
-    () => {
-      return api.get(`/api/v1/dives/${id}/profile`).then(res => res.data);
-    },
+    ['dive-profile', id, profileMaxPoints],
+    () => getDiveProfile(id, { maxPoints: profileMaxPoints }),
     {
       enabled: !!id && (activeTab === 'profile' || activeTab === 'details'),
       retry: false, // Don't retry on 404
@@ -2,7 +2,7 @@ import { Smartphone, X } from 'lucide-react';
 /* global Notification */
 import React, { useState, useEffect } from 'react';
 import toast from 'react-hot-toast';
-import { useQuery } from 'react-query';
+import { useQuery, useQueryClient } from 'react-query';
 import { useLocation, useNavigate } from 'react-router-dom';
 
 import api, { getChatRooms, getUserFriendships, getAIChatLastActivity } from '../api';
@@ -15,6 +15,7 @@ import NewChatModal from '../components/UserChat/NewChatModal';
 import RoomSettings from '../components/UserChat/RoomSettings';
 import { useAuth } from '../contexts/AuthContext';
 import { useChat } from '../hooks/useChat';
+import useChatEvents from '../hooks/useChatEvents';
 
 const urlBase64ToUint8Array = base64String => {
   const padding = '='.repeat((4 - (base64String.length % 4)) % 4);
@@ -127,8 +128,15 @@ const Messages = () => {
     }
   }, [location.state, location.search, navigate]);
 
+  const queryClient = useQueryClient();
+
+  // Refresh the inbox when the server pushes a change (polling while disconnected)
+  const pushConnected = useChatEvents(() => {
+    queryClient.invalidateQueries('chat-rooms');
+  });
+
   const { data: rooms = [], isLoading: isRoomsLoading } = useQuery('chat-rooms', getChatRooms, {
-    refetchInterval: 10000, // Refresh inbox every 10 seconds
+    refetchInterval: pushConnected ? 60000 : 10000, // Refresh inbox every 10 seconds without push
   });
 
   const { data: friendships = [], isLoading: isFriendshipsLoading } = useQuery(
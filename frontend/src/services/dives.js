@@ -50,8 +50,9 @@ export const uploadDiveProfile = async (diveId, file) => {
   return response.data;
 };
 
-export const getDiveProfile = async id => {
-  const response = await api.get(`/api/v1/dives/${id}/profile`);
+export const getDiveProfile = async (id, { maxPoints } = {}) => {
+  const params = maxPoints ? { max_points: maxPoints } : undefined;
+  const response = await api.get(`/api/v1/dives/${id}/profile`, { params });
   return response.data;
 };
 